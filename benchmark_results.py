@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark Result Store CLI for the Mannequin Segmenter load generators
+Az elmentett futások listázása, megtekintése és két futás statisztikai
+összehasonlítása (throughput és p99 regresszió jelzéssel).
+
+Használat:
+    python benchmark_results.py list [N]
+    python benchmark_results.py show RUN_ID
+    python benchmark_results.py compare [BASELINE_RUN_ID CANDIDATE_RUN_ID]
+      (run id helyett annak egyértelmű részlete, "latest" vagy "previous" is megadható;
+       paraméter nélkül: a legutóbbi futás vs. az előző azonos driver / mód / gép / instance számú futás)
+"""
+
+import os
+import sys
+
+from loadgen import (
+    DEFAULT_RESULTS_DB,
+    ResultStore,
+    compare_frames,
+    print_summary_statistics,
+)
+
+# ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
+RESULTS_DB = DEFAULT_RESULTS_DB     # SQLite adatbázis a futásokkal
+ALPHA = 0.05                        # Szignifikancia szint
+MIN_RELATIVE_CHANGE = 0.02          # Ennél kisebb (2%) romlás nem számít regressziónak
+BOOTSTRAP_RESAMPLES = 2000          # Bootstrap újramintavételezések száma
+THROUGHPUT_BIN_SECONDS = 1.0        # Throughput minták: sikeres kérések / bin
+
+# Ezeknek egyezniük kell, különben a két futás nem ugyanazt méri
+COMPARABLE_KEYS = ("driver", "mode", "machine_type", "instance_count")
+
+# ===============================================
+
+def short_digest(run):
+    digest = run["image_digest"] or "-"
+    return digest[:19] if digest.startswith("sha256:") else digest
+
+def format_value(value, fmt=".3f"):
+    return "N/A" if value is None else format(value, fmt)
+
+def list_runs(store, limit=20):
+    runs = store.runs(limit=limit)
+    if not runs:
+        print(f"📭 Nincs elmentett futás ({RESULTS_DB})")
+        return
+    print(f"📚 ELMENTETT FUTÁSOK ({RESULTS_DB}, legújabb elöl)")
+    print(f"   {'Run id':24s} {'Indulás':19s} {'Driver':32s} {'Mód':22s} {'Image':19s} {'Gép':14s} {'VM':>3s} {'Kérés':>7s} {'kérés/s':>8s} {'p99':>7s}")
+    for run in runs:
+        print(
+            f"   {run['run_id']:24s} {run['started_at'] or '':19s} {run['driver']:32s} {run['mode']:22s} "
+            f"{short_digest(run):19s} {run['machine_type'] or '-':14s} {run['instance_count']:3d} {run['requests']:7d} "
+            f"{format_value(run['throughput'], '.2f'):>8s} {format_value(run['p99']):>7s}"
+        )
+
+def show_run(store, run):
+    print(f"📋 FUTÁS: {run['run_id']}")
+    for key in ("started_at", "driver", "mode", "image_uri", "machine_type", "instance_count", "notes"):
+        print(f"   🔹 {key}: {run[key] if run[key] is not None else '-'}")
+    print(f"   🔹 duration: {format_value(run['duration'], '.2f')}s")
+    frame = store.load_frame(run["run_id"])
+    successful = frame.successful()
+    print(f"   🔹 Kérések: {len(frame)} ({len(successful)} sikeres)")
+    throughput = successful.throughput()
+    if throughput:
+        print(f"   🔹 Throughput: {throughput:.2f} kérés/s")
+    summary = successful.summary()
+    if summary:
+        print(f"\n⏰ VÁLASZIDŐ (sikeres kérések)")
+        print_summary_statistics(summary)
+        print(f"   🔹 {summary.format_quantiles()}")
+
+def resolve(store, run_id):
+    try:
+        run = store.run(run_id)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    if run is None:
+        print(f"❌ Nincs ilyen futás: {run_id}")
+        sys.exit(2)
+    return run
+
+def compare(store, baseline, candidate):
+    """Két futás összevetése; True, ha regressziót találtunk"""
+    print(f"⚖️  ÖSSZEHASONLÍTÁS")
+    print(f"   🔹 Baseline:  {baseline['run_id']} ({short_digest(baseline)}, {baseline['started_at']})")
+    print(f"   🔹 Candidate: {candidate['run_id']} ({short_digest(candidate)}, {candidate['started_at']})")
+    for key in COMPARABLE_KEYS:
+        if baseline[key] != candidate[key]:
+            print(f"   ⚠️  Eltérő {key}: {baseline[key]} vs {candidate[key]} - az összevetés nem azonos terhelést mér")
+
+    comparisons = compare_frames(
+        store.load_frame(baseline["run_id"]),
+        store.load_frame(candidate["run_id"]),
+        alpha=ALPHA,
+        min_change=MIN_RELATIVE_CHANGE,
+        resamples=BOOTSTRAP_RESAMPLES,
+        bin_seconds=THROUGHPUT_BIN_SECONDS,
+    )
+    if not comparisons:
+        print(f"\n❌ Nincs elég sikeres kérés az összehasonlításhoz")
+        return False
+
+    print(f"\n   {'Metrika':12s} {'Baseline':>16s} {'Candidate':>16s} {'Változás':>9s} {'95% CI (különbség)':>24s} {'p-érték':>9s}  Módszer")
+    regressions = []
+    for c in comparisons:
+        change = f"{c.change*100:+.1f}%" if c.change is not None else "N/A"
+        interval = f"[{c.low:+.4f}, {c.high:+.4f}]"
+        marker = "  ⚠️  REGRESSZIÓ" if c.regression else ""
+        print(
+            f"   {c.metric:12s} {f'{c.baseline:.3f} {c.unit}':>16s} {f'{c.candidate:.3f} {c.unit}':>16s} {change:>9s} "
+            f"{interval:>24s} {c.p_value:9.4f}  {c.method}{marker}"
+        )
+        if c.regression:
+            regressions.append(c.metric)
+
+    if regressions:
+        print(f"\n❌ Szignifikáns regresszió: {', '.join(regressions)} (α={ALPHA}, min. {MIN_RELATIVE_CHANGE*100:.0f}%)")
+        return True
+    print(f"\n✅ Nincs szignifikáns regresszió (α={ALPHA}, min. {MIN_RELATIVE_CHANGE*100:.0f}%)")
+    return False
+
+def main():
+    """Fő program belépési pont"""
+    args = sys.argv[1:]
+    command = args[0] if args else "list"
+    if command not in ("list", "show", "compare") or (command == "show" and len(args) != 2) or (command == "compare" and len(args) not in (1, 3)):
+        print(__doc__)
+        sys.exit(2)
+    if not os.path.exists(RESULTS_DB):
+        print(f"📭 Nincs eredmény adatbázis: {RESULTS_DB}")
+        sys.exit(2)
+
+    with ResultStore(RESULTS_DB) as store:
+        if command == "list":
+            list_runs(store, int(args[1]) if len(args) > 1 else 20)
+        elif command == "show":
+            show_run(store, resolve(store, args[1]))
+        elif len(args) == 3:
+            sys.exit(1 if compare(store, resolve(store, args[1]), resolve(store, args[2])) else 0)
+        else:
+            candidate = resolve(store, "latest")
+            baseline = store.previous_run(candidate)
+            if baseline is None:
+                print(f"📭 Nincs korábbi futás {candidate['driver']} / {candidate['mode']} / {candidate['machine_type']} / {candidate['instance_count']} VM kulccsal")
+                sys.exit(2)
+            sys.exit(1 if compare(store, baseline, candidate) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Boot Time Report Script for Mannequin Segmenter API
+A startup scriptek (startup-script-mannequin.sh, startup-script-gcs-secret.sh) fázis idejeinek
+összesítése a fleet-re: fázisonként medián / p90 / max, a teljes boot idő és a leglassabb VM-ek.
+
+Használat:
+    python boot_time_report.py                      # élő VM-ek (VM_INSTANCES, nginx /boot/timings.jsonl)
+    python boot_time_report.py boot-logs/           # mentett naplók (timings.jsonl / soros konzol kimenet)
+    python boot_time_report.py "logs/*.log" vm1.jsonl
+
+Soros konzol napló mentése: gcloud compute instances get-serial-port-output <vm> > logs/<vm>.log
+"""
+
+import asyncio
+import sys
+
+from loadgen import (
+    BootTimeReport,
+    fetch_fleet_boot_timings,
+    load_boot_logs,
+    print_boot_time_report,
+    save_boot_logs,
+)
+
+# ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
+SAVE_DIR = "boot-logs"      # Élő lekérésnél a VM-enkénti idők ide mentődnek; None = nincs mentés
+SLOWEST_HOSTS = 3           # Ennyi leglassabb VM a riportban
+
+# VM Instance IP címek
+VM_INSTANCES = [
+    "http://35.233.66.133:5001",
+    "http://34.34.136.96:5001",
+    "http://192.158.29.6:5001",
+    "http://35.187.98.56:5001"
+]
+
+# ===============================================
+
+async def main():
+    """Fő program belépési pont"""
+    paths = sys.argv[1:]
+    if paths:
+        print(f"📂 Mentett naplók: {', '.join(paths)}")
+        hosts = load_boot_logs(paths)
+    else:
+        print(f"🌐 Lekérés {len(VM_INSTANCES)} VM-ről...")
+        hosts = await fetch_fleet_boot_timings(VM_INSTANCES)
+        if len(hosts) < len(VM_INSTANCES):
+            print(f"⚠️  {len(VM_INSTANCES) - len(hosts)} VM-ről nem érhető el boot timing")
+        if hosts and SAVE_DIR:
+            save_boot_logs(hosts, SAVE_DIR)
+            print(f"💾 Mentve: {SAVE_DIR}/")
+
+    if not hosts:
+        print("❌ Nincs boot fázis adat")
+        sys.exit(1)
+    print_boot_time_report(BootTimeReport(hosts), slowest=SLOWEST_HOSTS)
+
+if __name__ == "__main__":
+    print("🔧 Mannequin Segmenter Boot Time Report")
+    print("=" * 50)
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Capacity Planner for the Mannequin Segmenter fleet
+Egy VM-et több konkurencia szinten végigmér (zárt hurok), a throughput görbére
+Universal Scalability Law modellt illeszt, és ajánl instance számot + instance-onkénti
+konkurenciát a cél RPS-hez p99 SLO mellett - az eredményt kész .conf fájlba írja.
+
+Használat:
+    python capacity_planner.py             # mérés TARGET_INSTANCE-en, illesztés, ajánlás
+    python capacity_planner.py --from-db   # mérés nélkül, a RESULTS_DB-ben lévő legutóbbi
+                                           # sweep-ekből (géptípusonként)
+"""
+
+import asyncio
+import os
+import re
+import sys
+import uuid
+from datetime import datetime
+
+from loadgen import (
+    CapacityPoint,
+    ClosedLoopPacing,
+    InstanceState,
+    Lane,
+    LoadEngine,
+    PinnedTarget,
+    RandomUrlWorkload,
+    ResultColumns,
+    ResultStore,
+    deployment_metadata,
+    extract_pulover_urls_from_csv,
+    fit_usl,
+    load_urls_from_file,
+    recommend,
+    record_run,
+    write_deployment_config,
+)
+
+# ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
+TARGET_INSTANCE = "http://34.140.252.94:5001"  # A mért VM (a deployment config géptípusával)
+CONCURRENCY_LEVELS = [1, 2, 3, 4, 6, 8]        # Egyidejű kérések a VM-en szintenként
+SECONDS_PER_LEVEL = 60                         # Mérési idő szintenként
+WARMUP_SECONDS = 10                            # Szintenként ennyi ideig induló kérések nem számítanak
+COOLDOWN_BETWEEN_LEVELS = 5                    # Szünet két szint között (másodperc)
+REQUEST_TIMEOUT = 60                           # Timeout másodpercben
+
+TARGET_RPS = 20.0                              # Cél fleet throughput (kérés/másodperc)
+P99_SLO_SECONDS = 3.0                          # p99 válaszidő cél
+TARGET_UTILIZATION = 0.8                       # Instance-ok terhelése a becsült kapacitásukhoz képest
+
+RESULTS_DB = "benchmark_results.db"            # Szintenkénti futások mentése (és --from-db forrás)
+BASE_CONFIG = None                             # None = CONFIG_FILE env / deployment-config.conf
+OUTPUT_CONFIG = "example-configs/recommended-deployment.conf"
+
+CSV_FILE = "data_for_categorisation.csv"
+URL_LIST_FILE = "pulover_urls.txt"
+
+# API endpoint
+API_ENDPOINT = "/infer"
+
+# ===============================================
+
+SWEEP_DRIVER = "capacity_sweep"
+
+def sweep_mode(concurrency):
+    return f"closed-loop c={concurrency}"
+
+def load_image_urls():
+    if os.path.exists(URL_LIST_FILE):
+        return load_urls_from_file(URL_LIST_FILE)
+    return extract_pulover_urls_from_csv(CSV_FILE)
+
+async def measure_level(concurrency, image_urls, sweep_id):
+    """Egy konkurencia szint: concurrency darab worker ugyanarra a VM-re, SECONDS_PER_LEVEL ideig"""
+    instance = InstanceState(TARGET_INSTANCE, 1)
+    workload = RandomUrlWorkload(image_urls)
+    lanes = [Lane(lane_id, workload, PinnedTarget(instance)) for lane_id in range(1, concurrency + 1)]
+    engine = LoadEngine(
+        [instance],
+        lanes,
+        ClosedLoopPacing(duration=SECONDS_PER_LEVEL),
+        api_endpoint=API_ENDPOINT,
+        request_timeout=REQUEST_TIMEOUT,
+        keep_results=False,
+        columns=ResultColumns(),
+    )
+    print(f"🔄 Konkurencia {concurrency}: {SECONDS_PER_LEVEL}s mérés...")
+    await engine.run()
+    if RESULTS_DB:
+        record_run(RESULTS_DB, engine, SWEEP_DRIVER, mode=sweep_mode(concurrency), config_file=BASE_CONFIG, notes=f"sweep {sweep_id}")
+
+    point = CapacityPoint.from_frame(concurrency, engine.columns.frame(), warmup=WARMUP_SECONDS)
+    if point is None:
+        print(f"   ⚠️  Nincs elég sikeres kérés a szinten")
+    else:
+        print(f"   ✅ {point.throughput:.2f} kérés/s, átlag {point.mean_latency:.3f}s, p99 {point.p99:.3f}s")
+    return point
+
+async def run_sweep():
+    """Mérés az összes konkurencia szinten -> {géptípus: pontok}"""
+    image_urls = load_image_urls()
+    if not image_urls:
+        print("❌ Nem sikerült URL-eket betölteni")
+        return {}
+    sweep_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    points = []
+    for i, concurrency in enumerate(CONCURRENCY_LEVELS):
+        if i > 0 and COOLDOWN_BETWEEN_LEVELS > 0:
+            await asyncio.sleep(COOLDOWN_BETWEEN_LEVELS)
+        point = await measure_level(concurrency, image_urls, sweep_id)
+        if point is not None:
+            points.append(point)
+    machine_type = deployment_metadata(BASE_CONFIG)["machine_type"] or "ismeretlen"
+    return {machine_type: points}
+
+def load_sweeps():
+    """A legutóbbi sweep géptípusonként a RESULTS_DB-ből -> {géptípus: pontok}"""
+    if not RESULTS_DB or not os.path.exists(RESULTS_DB):
+        print(f"📭 Nincs eredmény adatbázis: {RESULTS_DB}")
+        return {}
+    sweeps = {}
+    with ResultStore(RESULTS_DB) as store:
+        latest = {}
+        # runs(): legújabb elöl, így géptípusonként az első sweep azonosító a legutóbbi
+        for run in store.runs():
+            if run["driver"] != SWEEP_DRIVER:
+                continue
+            machine_type = run["machine_type"] or "ismeretlen"
+            latest.setdefault(machine_type, run["notes"])
+            if run["notes"] != latest[machine_type]:
+                continue
+            match = re.search(r"c=(\d+)", run["mode"])
+            if not match:
+                continue
+            point = CapacityPoint.from_frame(int(match.group(1)), store.load_frame(run["run_id"]), warmup=WARMUP_SECONDS)
+            if point is not None:
+                sweeps.setdefault(machine_type, []).append(point)
+    return sweeps
+
+def print_model(machine_type, model, points):
+    print(f"\n📐 USL MODELL: {machine_type}")
+    print(f"   🔹 λ (egy kérés egyedül): {model.lam:.3f} kérés/s")
+    print(f"   🔹 σ (versengés): {model.sigma:.4f}")
+    print(f"   🔹 κ (koherencia): {model.kappa:.5f}")
+    peak = model.peak_concurrency
+    if peak != float("inf"):
+        print(f"   🔹 Throughput csúcs: N*={peak:.1f} konkurencián, {float(model.throughput(peak)):.2f} kérés/s")
+    print(f"   {'Konk.':>6s} {'mért kérés/s':>13s} {'modell':>8s} {'hiba':>7s} {'mért p99':>9s} {'modell p99':>11s}")
+    ordered = sorted(points, key=lambda p: p.concurrency)
+    for point, error in zip(ordered, model.fitted_errors(ordered)):
+        print(
+            f"   {point.concurrency:6d} {point.throughput:13.2f} {float(model.throughput(point.concurrency)):8.2f} "
+            f"{error*100:+6.1f}% {point.p99:8.3f}s {float(model.p99(point.concurrency)):10.3f}s"
+        )
+
+def main():
+    """Fő program belépési pont"""
+    print("🔧 Mannequin Segmenter Capacity Planner")
+    print("=" * 60)
+    print(f"🎯 Cél: {TARGET_RPS:g} kérés/s, p99 <= {P99_SLO_SECONDS:g}s, {TARGET_UTILIZATION*100:.0f}% kihasználtság")
+
+    sweeps = load_sweeps() if "--from-db" in sys.argv else asyncio.run(run_sweep())
+
+    recommendations = {}
+    for machine_type, points in sweeps.items():
+        try:
+            model = fit_usl(points)
+        except ValueError as e:
+            print(f"\n⚠️  {machine_type}: {e}")
+            continue
+        print_model(machine_type, model, points)
+        # Legfeljebb a mért tartomány kétszereséig extrapolálunk
+        max_concurrency = 2 * max(point.concurrency for point in points)
+        recommendation = recommend(model, TARGET_RPS, P99_SLO_SECONDS, TARGET_UTILIZATION, max_concurrency)
+        if recommendation is None:
+            print(f"   ❌ Egyik konkurencia szinten sem teljesül a p99 <= {P99_SLO_SECONDS:g}s")
+            continue
+        recommendations[machine_type] = recommendation
+        print(f"   💡 {recommendation.instances} instance × {recommendation.concurrency} konkurencia "
+              f"({recommendation.per_instance_rps:.2f} kérés/s/instance, becsült p99 {recommendation.predicted_p99:.3f}s)")
+
+    if not recommendations:
+        print(f"\n❌ Nincs ajánlás (kevés mérési pont vagy teljesíthetetlen SLO)")
+        sys.exit(1)
+
+    machine_type, best = min(recommendations.items(), key=lambda item: item[1].instances)
+    print(f"\n🏆 AJÁNLÁS: {best.instances} × {machine_type}, instance-onként {best.concurrency} egyidejű kérés")
+    print(f"   🔹 Fleet kapacitás: {best.fleet_rps:.2f} kérés/s (cél: {TARGET_RPS:g}, {TARGET_UTILIZATION*100:.0f}% kihasználtság)")
+
+    overrides = {
+        "INSTANCE_COUNT": best.instances,
+        "MACHINE_TYPE": machine_type,
+        "MAX_IN_FLIGHT_PER_INSTANCE": best.concurrency,
+        "TARGET_RPS": TARGET_RPS,
+        "P99_SLO_SECONDS": P99_SLO_SECONDS,
+    }
+    header = (
+        f"Capacity planner ajánlás ({datetime.now().isoformat(timespec='seconds')})",
+        f"Cél: {TARGET_RPS:g} kérés/s, p99 <= {P99_SLO_SECONDS:g}s; becsült p99 {best.predicted_p99:.3f}s,"
+        f" {best.per_instance_rps:.2f} kérés/s/instance",
+        "",
+    )
+    if machine_type == "ismeretlen":
+        del overrides["MACHINE_TYPE"]
+    write_deployment_config(OUTPUT_CONFIG, overrides, BASE_CONFIG, header)
+    print(f"💾 Konfiguráció kiírva: {OUTPUT_CONFIG}")
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ BOOT_DISK_SIZE="100GB"
 IMAGE_FAMILY="ubuntu-2204-lts"
 IMAGE_PROJECT="ubuntu-os-cloud"
 IMAGE_URI=${IMAGE_URI:-""} # e.g. europe-west1-docker.pkg.dev/PROJECT/REPO/mannequin:<tag>
+INSTANCE_REGISTRY=${INSTANCE_REGISTRY:-"instance-registry.txt"} # "URL name" per line, read by the load tests (DISCOVERY_SOURCE="registry")
 
 echo "🚀 Deploying Mannequin Benchmark to GCP Compute Engine [v2024.09.04]"
 echo "============================================================"
@@ -247,6 +248,15 @@ echo "   External IP: $EXTERNAL_IP"
 echo "   Internal IP: $INTERNAL_IP"
 echo "   Machine Type: $MACHINE_TYPE"
 
+# Register the instance for the load tests (replaces an older entry of the same VM)
+if [ -n "$INSTANCE_REGISTRY" ] && [ -n "$EXTERNAL_IP" ]; then
+    touch "$INSTANCE_REGISTRY"
+    grep -v " $INSTANCE_NAME\$" "$INSTANCE_REGISTRY" > "$INSTANCE_REGISTRY.tmp" || true
+    echo "http://$EXTERNAL_IP:5001 $INSTANCE_NAME" >> "$INSTANCE_REGISTRY.tmp"
+    mv "$INSTANCE_REGISTRY.tmp" "$INSTANCE_REGISTRY"
+    echo "   Registry: $INSTANCE_REGISTRY"
+fi
+
 echo ""
 echo "⏳ Startup script is running... This may take a few minutes."
 echo "   The script will install Docker and run the mannequin-segmenter service on port 5001."
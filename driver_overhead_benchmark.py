@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Driver Self-Overhead Benchmark for the Mannequin Segmenter load generators
+Minden meglévő driver-t nulla késleltetésű lokális mock /infer ellen futtat, és
+méri a max elérhető kérés/sec-et, a kérésenkénti CPU időt és allokációkat -
+így a driver regressziók kiderülnek, mielőtt a fleet méréseket torzítanák.
+"""
+
+import asyncio
+import contextlib
+import gc
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+from loadgen import (
+    ClosedLoopPacing,
+    FixedUrlWorkload,
+    Lane,
+    LatencyModel,
+    LoadEngine,
+    RoundRobinTargets,
+    make_instances,
+    start_mock_fleet,
+)
+
+# ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
+MOCK_INSTANCES = 4              # Nulla késleltetésű mock instance-ok (külön process-ben)
+MOCK_BASE_PORT = 18101
+REQUESTS_PER_DRIVER = 2000      # Kérések száma driver-enként
+TRACE_ALLOCATIONS = True        # tracemalloc: megmaradt bájt / kérés és csúcs (lassítja a futást, külön menetben fut)
+BASELINE_FILE = "driver_overhead_baseline.json"
+REGRESSION_TOLERANCE = 0.20     # Ennyivel (20%) több CPU / kérés a baseline-hoz képest = regresszió
+IMAGE_URL = "https://storage.googleapis.com/public-images-redi/131727003.jpg"
+
+# ===============================================
+
+def run_mock_fleet(ready):
+    """Mock fleet egy külön process-ben (a szerver CPU-ja ne számítson a driver-be)"""
+    async def serve():
+        await start_mock_fleet(
+            MOCK_INSTANCES, MOCK_BASE_PORT,
+            model_factory=lambda i: LatencyModel(image_conversion=0, model_inference=0, gcs_upload=0, jitter=0, capacity=64),
+        )
+        ready.set()
+        while True:
+            await asyncio.sleep(3600)
+    asyncio.run(serve())
+
+def mock_urls():
+    return [f"http://127.0.0.1:{MOCK_BASE_PORT + i}" for i in range(MOCK_INSTANCES)]
+
+def configure(module_name, **overrides):
+    """Driver modul konfigurációs konstansainak felülírása a benchmarkhoz"""
+    module = importlib.import_module(module_name)
+    # A benchmark futásai ne kerüljenek a mérési eredmény adatbázisba
+    overrides = {"RESULTS_DB": None, **overrides}
+    for name, value in overrides.items():
+        setattr(module, name, value)
+    return module
+
+def make_bare_engine():
+    """Alapvonal: a közös engine kiírás és nyers eredmény lista nélkül"""
+    instances = make_instances(mock_urls())
+    targets = RoundRobinTargets(instances)
+    per_lane = REQUESTS_PER_DRIVER // len(instances)
+    lanes = [Lane(i, FixedUrlWorkload(IMAGE_URL, total=per_lane), targets) for i in range(len(instances))]
+    return LoadEngine(instances, lanes, ClosedLoopPacing(), keep_results=False)
+
+def make_load_balancer_test():
+    module = configure(
+        "load_balancer_test",
+        VM_INSTANCES=mock_urls(), CONCURRENT_REQUESTS=MOCK_INSTANCES,
+        DELAY_BETWEEN_REQUESTS=0, TEST_DURATION_SECONDS=REQUESTS_PER_DRIVER / 1000,
+    )
+    return module.LoadBalancerTest()
+
+def make_improved_dynamic():
+    module = configure(
+        "improved_dynamic_load_balancer",
+        VM_INSTANCES=mock_urls(), TOTAL_REQUESTS=REQUESTS_PER_DRIVER, TEST_DURATION_SECONDS=3600,
+    )
+    return module.ImprovedDynamicLoadBalancer([f"{IMAGE_URL}?v={i}" for i in range(REQUESTS_PER_DRIVER)])
+
+def make_parallel_fixed_url():
+    module = configure(
+        "parallel_fixed_url_test",
+        VM_INSTANCES=mock_urls(), TOTAL_REQUESTS_PER_INSTANCE=REQUESTS_PER_DRIVER // MOCK_INSTANCES,
+        DELAY_BETWEEN_REQUESTS=0, STAGGER_BETWEEN_WORKERS_MS=0, WORKER_PROCESSES=1,
+    )
+    return module.ParallelFixedUrlTester([IMAGE_URL])
+
+def make_single_instance():
+    module = configure(
+        "single_instance_test",
+        TARGET_INSTANCE=mock_urls()[0], NUMBER_OF_REQUESTS=REQUESTS_PER_DRIVER, DELAY_BETWEEN_REQUESTS=0,
+    )
+    return module.SingleInstanceTest()
+
+def make_sequential():
+    module = configure(
+        "sequential_single_instance_test",
+        TOTAL_REQUESTS=REQUESTS_PER_DRIVER, DELAY_BETWEEN_REQUESTS=0,
+    )
+    return module.SequentialTester([f"{IMAGE_URL}?v={i}" for i in range(REQUESTS_PER_DRIVER)], mock_urls()[0])
+
+def make_fixed_url_sequential():
+    module = configure(
+        "fixed_url_sequential_test",
+        TOTAL_REQUESTS=REQUESTS_PER_DRIVER, DELAY_BETWEEN_REQUESTS=0,
+    )
+    return module.FixedUrlTester(mock_urls()[0], IMAGE_URL)
+
+# Driver-ek: (név, tesztobjektum gyár, futtató metódus neve)
+DRIVERS = [
+    ("bare_engine", make_bare_engine, "run"),
+    ("LoadBalancerTest", make_load_balancer_test, "run_test"),
+    ("ImprovedDynamicLoadBalancer", make_improved_dynamic, "run_test"),
+    ("ParallelFixedUrlTester", make_parallel_fixed_url, "run_parallel_test"),
+    ("SingleInstanceTest", make_single_instance, "run_test"),
+    ("SequentialTester", make_sequential, "run_sequential_test"),
+    ("FixedUrlTester", make_fixed_url_sequential, "run_sequential_test"),
+]
+
+def completed_requests(driver):
+    engine = driver if isinstance(driver, LoadEngine) else driver.engine
+    return engine.recorder.succeeded + engine.recorder.failed
+
+async def measure(factory, method_name, trace):
+    """Egy driver futtatása: fal idő, CPU idő, GC / allokációs számlálók"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # A print formázás és írás költsége benne marad, csak a terminál renderelés nem
+        driver = factory()
+        gc.collect()
+        blocks_before = sys.getallocatedblocks()
+        if trace:
+            tracemalloc.start()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        await getattr(driver, method_name)()
+
+        cpu_time = time.process_time() - cpu_start
+        wall_time = time.perf_counter() - wall_start
+        traced = peak = None
+        if trace:
+            # A mérés előtt indult: a current a futás alatt lefoglalt és még élő memória
+            traced, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        retained_blocks = sys.getallocatedblocks() - blocks_before
+
+    requests = completed_requests(driver)
+    return {
+        "requests": requests,
+        "wall_time": wall_time,
+        "cpu_time": cpu_time,
+        "requests_per_sec": requests / wall_time if wall_time > 0 else 0.0,
+        "cpu_us_per_request": cpu_time / requests * 1e6 if requests else None,
+        "retained_blocks_per_request": retained_blocks / requests if requests else None,
+        "traced_bytes_per_request": traced / requests if traced is not None and requests else None,
+        "traced_peak_kb": peak / 1024 if peak is not None else None,
+    }
+
+def load_baseline():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_baseline(results):
+    baseline = {name: {"cpu_us_per_request": r["cpu_us_per_request"]} for name, r in results.items()}
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+    print(f"💾 Baseline elmentve: {BASELINE_FILE}")
+
+def print_report(results, baseline):
+    """Összefoglaló táblázat + regresszió ellenőrzés; visszaadja a regressziók listáját"""
+    print(f"\n📈 DRIVER OVERHEAD ({REQUESTS_PER_DRIVER} kérés / driver, nulla késleltetésű mock)")
+    print(f"=" * 100)
+    print(f"   {'Driver':28s} {'Kérés/sec':>10s} {'CPU µs/kérés':>13s} {'élő bájt/kérés':>15s} {'megtartott blokk':>17s} {'tracemalloc csúcs':>18s}")
+    regressions = []
+    for name, r in results.items():
+        cpu = f"{r['cpu_us_per_request']:.0f}" if r["cpu_us_per_request"] is not None else "N/A"
+        traced = f"{r['traced_bytes_per_request']:.0f}" if r.get("traced_bytes_per_request") is not None else "-"
+        retained = f"{r['retained_blocks_per_request']:.1f}" if r["retained_blocks_per_request"] is not None else "N/A"
+        peak = f"{r['traced_peak_kb']:.0f} KB" if r.get("traced_peak_kb") is not None else "-"
+        marker = ""
+        reference = baseline.get(name, {}).get("cpu_us_per_request")
+        if reference and r["cpu_us_per_request"] and r["cpu_us_per_request"] > reference * (1 + REGRESSION_TOLERANCE):
+            marker = f"  ⚠️  REGRESSZIÓ (baseline {reference:.0f} µs)"
+            regressions.append(name)
+        print(f"   {name:28s} {r['requests_per_sec']:10.0f} {cpu:>13s} {traced:>15s} {retained:>17s} {peak:>18s}{marker}")
+    return regressions
+
+async def run_benchmarks():
+    results = {}
+    for name, factory, method_name in DRIVERS:
+        print(f"🔄 {name}...", flush=True)
+        result = await measure(factory, method_name, trace=False)
+        if TRACE_ALLOCATIONS:
+            # Külön menet: a tracemalloc overhead ne torzítsa a CPU mérést
+            traced = await measure(factory, method_name, trace=True)
+            result["traced_bytes_per_request"] = traced["traced_bytes_per_request"]
+            result["traced_peak_kb"] = traced["traced_peak_kb"]
+        print(f"   ✅ {result['requests']} kérés, {result['requests_per_sec']:.0f} kérés/sec, {result['cpu_us_per_request']:.0f} µs CPU / kérés")
+        results[name] = result
+    return results
+
+def main():
+    """Fő program belépési pont (--save-baseline: az eredmény lesz az új baseline)"""
+    print("🔧 Driver Self-Overhead Benchmark")
+    print("=" * 60)
+
+    context = multiprocessing.get_context("spawn")
+    ready = context.Event()
+    server = context.Process(target=run_mock_fleet, args=(ready,), daemon=True)
+    server.start()
+    if not ready.wait(30):
+        print("❌ A mock fleet nem indult el")
+        server.terminate()
+        sys.exit(2)
+    print(f"🖥️  {MOCK_INSTANCES} mock instance fut ({MOCK_BASE_PORT}-{MOCK_BASE_PORT + MOCK_INSTANCES - 1})")
+
+    try:
+        results = asyncio.run(run_benchmarks())
+    finally:
+        server.terminate()
+        server.join()
+
+    regressions = print_report(results, load_baseline())
+    if "--save-baseline" in sys.argv:
+        save_baseline(results)
+    if regressions:
+        print(f"\n❌ Driver regresszió: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\n✅ Nincs driver regresszió")
+
+if __name__ == "__main__":
+    main()
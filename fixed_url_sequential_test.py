@@ -5,17 +5,29 @@ Sends the same image URL repeatedly to test consistency and eliminate image-spec
 """
 
 import asyncio
-import aiohttp
 import time
-import statistics
 from datetime import datetime
-import json
+
+import numpy as np
+
+from loadgen import (
+    ClosedLoopPacing,
+    FixedUrlWorkload,
+    InstanceState,
+    Lane,
+    LoadEngine,
+    PinnedTarget,
+    ResultColumns,
+    print_summary_statistics,
+    record_run,
+)
 
 # ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
 TARGET_INSTANCE = "http://34.140.252.94:5001"  # Tesztelendő VM instance
 TOTAL_REQUESTS = 50                             # Összes kérések száma
 REQUEST_TIMEOUT = 120                           # Timeout másodpercben
 DELAY_BETWEEN_REQUESTS = 0.5                    # Kis szünet kérések között (másodperc)
+RESULTS_DB = "benchmark_results.db"             # Futás mentése (összevetés: benchmark_results.py compare); None = nincs mentés
 
 # FIXED URL - mindig ugyanaz a kép
 FIXED_IMAGE_URL = "https://storage.googleapis.com/public-images-redi/131727003.jpg"
@@ -29,98 +41,47 @@ class FixedUrlTester:
     def __init__(self, target_instance, image_url):
         self.target_instance = target_instance
         self.image_url = image_url
-        self.results = []
-        self.errors = []
+        
+        instance = InstanceState(target_instance, 1)
+        self.engine = LoadEngine(
+            [instance],
+            [Lane(1, FixedUrlWorkload(image_url, total=TOTAL_REQUESTS), PinnedTarget(instance))],
+            ClosedLoopPacing(delay=DELAY_BETWEEN_REQUESTS),
+            api_endpoint=API_ENDPOINT,
+            request_timeout=REQUEST_TIMEOUT,
+            on_dispatch=self.print_dispatch,
+            on_complete=self.print_result,
+            keep_results=True,     # Véges kéréssor: a riport kérésenként listáz
+            columns=ResultColumns(),
+        )
+        self.columns = self.engine.columns
+        self.results = self.engine.results
+        self.errors = self.engine.errors
         
         print(f"🎯 Fixed URL teszt: {TOTAL_REQUESTS} kérés ugyanazzal a képpel")
         print(f"🖼️  Teszt kép: {image_url}")
     
-    async def make_single_request(self, session, request_id):
-        """Egyetlen API kérés végrehajtása"""
-        full_url = f"{self.target_instance}{API_ENDPOINT}"
-        request_start = time.time()
-        
-        print(f"🔄 Request {request_id:2d}/50: Fixed URL teszt", end="", flush=True)
+    def print_dispatch(self, instance, task):
+        print(f"🔄 Request {task['task_id']:2d}/{TOTAL_REQUESTS}: Fixed URL teszt", end="", flush=True)
+    
+    def print_result(self, result):
+        if "error" in result:
+            if result["error"] == "Timeout":
+                print(f" ⏰ TIMEOUT ({result['response_time']:.3f}s)")
+            else:
+                print(f" ❌ ERROR: {result['error']}")
+        else:
+            # Részletes kimenet
+            status_icon = "✅" if result["success"] else "❌"
+            server_info = ""
+            if "server_model_inference" in result and "server_gcs_total" in result:
+                server_info = f" (model: {result['server_model_inference']:.2f}s, gcs: {result['server_gcs_total']:.2f}s)"
+            print(f" {status_icon} {result['status_code']} ({result['response_time']:.3f}s{server_info})")
         
-        try:
-            payload = {
-                "image_url": self.image_url,
-                "prompt_mode": "both"
-            }
-            
-            async with session.post(
-                full_url,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
-            ) as response:
-                response_text = await response.text()
-                request_end = time.time()
-                response_time = request_end - request_start
-                
-                result = {
-                    "request_id": request_id,
-                    "image_url": self.image_url,
-                    "status_code": response.status,
-                    "response_time": response_time,
-                    "timestamp": datetime.fromtimestamp(request_start),
-                    "success": response.status == 200,
-                    "response_size": len(response_text)
-                }
-                
-                if response.status == 200:
-                    try:
-                        json_response = json.loads(response_text)
-                        result["has_visualization_url"] = "visualization_url" in json_response
-                        if "timing" in json_response:
-                            result["server_timing"] = json_response["timing"]
-                            # Server-side timing részletezése
-                            timing = json_response["timing"]
-                            if "model_inference" in timing and "gcs_total" in timing:
-                                result["server_model_inference"] = timing["model_inference"]
-                                result["server_gcs_total"] = timing["gcs_total"]
-                                result["server_total_request"] = timing.get("total_request", 0)
-                                result["server_image_conversion"] = timing.get("image_conversion", 0)
-                                result["server_gcs_upload"] = timing.get("gcs_upload", 0)
-                    except json.JSONDecodeError:
-                        result["has_visualization_url"] = False
-                
-                self.results.append(result)
-                
-                # Részletes kimenet
-                status_icon = "✅" if response.status == 200 else "❌"
-                server_info = ""
-                if "server_timing" in result:
-                    model_time = result.get("server_model_inference", 0)
-                    gcs_time = result.get("server_gcs_total", 0)
-                    server_info = f" (model: {model_time:.2f}s, gcs: {gcs_time:.2f}s)"
-                
-                print(f" {status_icon} {response.status} ({response_time:.3f}s{server_info})")
-                
-        except asyncio.TimeoutError:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "request_id": request_id,
-                "image_url": self.image_url,
-                "error": "Timeout",
-                "response_time": response_time,
-                "timestamp": datetime.fromtimestamp(request_start)
-            }
-            self.errors.append(error)
-            print(f" ⏰ TIMEOUT ({response_time:.3f}s)")
-            
-        except Exception as e:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "request_id": request_id,
-                "image_url": self.image_url,
-                "error": str(e),
-                "response_time": response_time,
-                "timestamp": datetime.fromtimestamp(request_start)
-            }
-            self.errors.append(error)
-            print(f" ❌ ERROR: {e}")
+        # Progress minden 10. kérésnél
+        done = len(self.columns)
+        if done % 10 == 0 or done == TOTAL_REQUESTS:
+            print(f"📊 Progress: {done}/{TOTAL_REQUESTS} kérés, {self.engine.recorder.succeeded} sikeres ({self.engine.elapsed():.1f}s)")
     
     async def run_sequential_test(self):
         """Szekvenciális teszt futtatása"""
@@ -136,91 +97,67 @@ class FixedUrlTester:
         
         start_time = time.time()
         
-        async with aiohttp.ClientSession() as session:
-            for i in range(1, TOTAL_REQUESTS + 1):
-                await self.make_single_request(session, i)
-                
-                # Kis szünet a következő kérés előtt (kivéve az utolsó után)
-                if i < TOTAL_REQUESTS:
-                    await asyncio.sleep(DELAY_BETWEEN_REQUESTS)
-                
-                # Progress minden 10. kérésnél
-                if i % 10 == 0 or i == TOTAL_REQUESTS:
-                    elapsed = time.time() - start_time
-                    successful = len([r for r in self.results if r["success"]])
-                    print(f"📊 Progress: {i}/{TOTAL_REQUESTS} kérés, {successful} sikeres ({elapsed:.1f}s)")
+        await self.engine.run()
         
         end_time = time.time()
         total_time = end_time - start_time
         
         print(f"\n⏱️  Teszt befejezve! (összes idő: {total_time:.2f}s)")
         self.print_detailed_statistics()
+        if RESULTS_DB:
+            record_run(RESULTS_DB, self.engine, "fixed_url_sequential_test")
     
     def print_detailed_statistics(self):
-        """Részletes statisztikák kiírása"""
-        successful_requests = [r for r in self.results if r["success"]]
-        failed_requests = len(self.results) - len(successful_requests)
-        total_requests = len(self.results) + len(self.errors)
+        """Részletes statisztikák kiírása (oszlopos eredményekből, vektorizáltan)"""
+        frame = self.columns.frame()
+        successful = frame.successful()
+        total_requests = len(frame)
         
         print(f"\n📈 FIXED URL TESZT EREDMÉNYEK - CONSISTENCY ELEMZÉS")
         print(f"=" * 80)
         print(f"🎯 Target Instance: {self.target_instance}")
         print(f"🖼️  Fixed Image URL: {self.image_url}")
         print(f"📊 Összes kérés: {total_requests}")
-        print(f"✅ Sikeres kérések: {len(successful_requests)}")
-        print(f"❌ Sikertelen kérések: {failed_requests + len(self.errors)}")
+        print(f"✅ Sikeres kérések: {len(successful)}")
+        print(f"❌ Sikertelen kérések: {total_requests - len(successful)}")
         if total_requests > 0:
-            print(f"📈 Sikeresség arány: {len(successful_requests)/total_requests*100:.1f}%")
+            print(f"📈 Sikeresség arány: {len(successful)/total_requests*100:.1f}%")
         
-        if successful_requests:
-            response_times = [r["response_time"] for r in successful_requests]
+        if len(successful):
+            response = successful.summary()
             
-            print(f"\n⏰ VÁLASZIDŐ STATISZTIKÁK (ugyanaz a kép {len(successful_requests)}x)")
-            print(f"   🔹 Minimum: {min(response_times):.3f} másodperc")
-            print(f"   🔹 Maximum: {max(response_times):.3f} másodperc")
-            print(f"   🔹 Átlag: {statistics.mean(response_times):.3f} másodperc")
-            print(f"   🔹 Medián: {statistics.median(response_times):.3f} másodperc")
-            if len(response_times) > 1:
-                print(f"   🔹 Szórás: {statistics.stdev(response_times):.3f} másodperc")
-                variability = (statistics.stdev(response_times) / statistics.mean(response_times)) * 100
-                print(f"   🔹 Variabilitás: {variability:.1f}% (CV)")
+            print(f"\n⏰ VÁLASZIDŐ STATISZTIKÁK (ugyanaz a kép {len(successful)}x)")
+            print_summary_statistics(response)
+            if response.cv is not None:
+                print(f"   🔹 Variabilitás: {response.cv:.1f}% (CV)")
             
             # Server-side timing statisztikák ha elérhetők
-            model_times = [r.get("server_model_inference", 0) for r in successful_requests if "server_model_inference" in r]
-            gcs_times = [r.get("server_gcs_total", 0) for r in successful_requests if "server_gcs_total" in r]
-            image_conv_times = [r.get("server_image_conversion", 0) for r in successful_requests if "server_image_conversion" in r]
-            gcs_upload_times = [r.get("server_gcs_upload", 0) for r in successful_requests if "server_gcs_upload" in r]
+            model = successful.summary("model_inference")
+            gcs = successful.summary("gcs_total")
+            image_conversion = successful.summary("image_conversion")
+            gcs_upload = successful.summary("gcs_upload")
             
-            if model_times:
+            if model:
                 print(f"\n🤖 SERVER-SIDE MODEL INFERENCE STATISZTIKÁK")
-                print(f"   🔹 Minimum: {min(model_times):.3f} másodperc")
-                print(f"   🔹 Maximum: {max(model_times):.3f} másodperc")
-                print(f"   🔹 Átlag: {statistics.mean(model_times):.3f} másodperc")
-                print(f"   🔹 Medián: {statistics.median(model_times):.3f} másodperc")
-                if len(model_times) > 1:
-                    model_var = (statistics.stdev(model_times) / statistics.mean(model_times)) * 100
-                    print(f"   🔹 Variabilitás: {model_var:.1f}% (CV)")
+                print_summary_statistics(model, stdev=False)
+                if model.cv is not None:
+                    print(f"   🔹 Variabilitás: {model.cv:.1f}% (CV)")
             
-            if gcs_times:
+            if gcs:
                 print(f"\n☁️  SERVER-SIDE GCS STATISZTIKÁK")
-                print(f"   🔹 Minimum: {min(gcs_times):.3f} másodperc")
-                print(f"   🔹 Maximum: {max(gcs_times):.3f} másodperc")
-                print(f"   🔹 Átlag: {statistics.mean(gcs_times):.3f} másodperc")
-                print(f"   🔹 Medián: {statistics.median(gcs_times):.3f} másodperc")
+                print_summary_statistics(gcs, stdev=False)
             
-            if image_conv_times:
+            if image_conversion:
                 print(f"\n🖼️  IMAGE CONVERSION STATISZTIKÁK")
-                print(f"   🔹 Minimum: {min(image_conv_times):.3f} másodperc")
-                print(f"   🔹 Maximum: {max(image_conv_times):.3f} másodperc")
-                print(f"   🔹 Átlag: {statistics.mean(image_conv_times):.3f} másodperc")
+                print_summary_statistics(image_conversion, median=False, stdev=False)
                 
-            if gcs_upload_times:
+            if gcs_upload:
                 print(f"\n📤 GCS UPLOAD STATISZTIKÁK")
-                print(f"   🔹 Minimum: {min(gcs_upload_times):.3f} másodperc")
-                print(f"   🔹 Maximum: {max(gcs_upload_times):.3f} másodperc")
-                print(f"   🔹 Átlag: {statistics.mean(gcs_upload_times):.3f} másodperc")
+                print_summary_statistics(gcs_upload, median=False, stdev=False)
             
-            # Consistency elemzés - bemelegedési hatás
+            # Consistency elemzés - bemelegedési hatás (indulási sorrendben)
+            ordered = successful.in_start_order()
+            response_times = ordered["response_time"]
             if len(response_times) >= 10:
                 print(f"\n🔥 BEMELEGEDÉSI HATÁS ELEMZÉS")
                 first_5 = response_times[:5]
@@ -228,15 +165,15 @@ class FixedUrlTester:
                 last_10 = response_times[-10:]
                 middle_section = response_times[10:-10] if len(response_times) > 20 else response_times[5:-5]
                 
-                print(f"   🔹 Első 5 kérés átlag: {statistics.mean(first_5):.3f}s")
-                print(f"   🔹 Első 10 kérés átlag: {statistics.mean(first_10):.3f}s")
-                if middle_section:
-                    print(f"   🔹 Középső rész átlag: {statistics.mean(middle_section):.3f}s")
-                print(f"   🔹 Utolsó 10 kérés átlag: {statistics.mean(last_10):.3f}s")
+                print(f"   🔹 Első 5 kérés átlag: {first_5.mean():.3f}s")
+                print(f"   🔹 Első 10 kérés átlag: {first_10.mean():.3f}s")
+                if len(middle_section):
+                    print(f"   🔹 Középső rész átlag: {middle_section.mean():.3f}s")
+                print(f"   🔹 Utolsó 10 kérés átlag: {last_10.mean():.3f}s")
                 
                 # Trend kiértékelés
-                first_avg = statistics.mean(first_5)
-                stable_avg = statistics.mean(last_10)
+                first_avg = first_5.mean()
+                stable_avg = last_10.mean()
                 
                 if stable_avg < first_avg * 0.8:
                     improvement = ((first_avg - stable_avg) / first_avg) * 100
@@ -248,17 +185,13 @@ class FixedUrlTester:
             
             # Outlier elemzés
             print(f"\n🔍 OUTLIER ELEMZÉS (ugyanaz a kép!)")
-            avg_time = statistics.mean(response_times)
-            std_time = statistics.stdev(response_times) if len(response_times) > 1 else 0
-            threshold = avg_time + 2 * std_time
-            
-            outliers = [(i+1, r) for i, r in enumerate(successful_requests) if r["response_time"] > threshold]
+            threshold, outliers = ordered.outliers(k=2.0)
             
-            if outliers:
+            if len(outliers):
                 print(f"   ⚠️  {len(outliers)} outlier találva (>{threshold:.3f}s) UGYANAZZAL a képpel:")
-                for req_num, outlier in outliers:
-                    model_time = outlier.get("server_model_inference", 0)
-                    print(f"      Request {req_num:2d}: {outlier['response_time']:6.3f}s (model: {model_time:.3f}s)")
+                model_times = np.nan_to_num(ordered["model_inference"])
+                for index in outliers:
+                    print(f"      Request {ordered['task_id'][index]:2d}: {response_times[index]:6.3f}s (model: {model_times[index]:.3f}s)")
                 print(f"   💡 Ez azt jelenti, hogy NEM a kép komplexitása okozza a lassulást!")
             else:
                 print(f"   ✅ Nincs outlier - konzisztens teljesítmény")
@@ -283,7 +216,7 @@ class FixedUrlTester:
         print(f"{'-'*3} {'-'*12} {'-'*10} {'-'*8} {'-'*6} {'-'*7}")
         
         for i, result in enumerate(self.results, 1):
-            timestamp_str = result["timestamp"].strftime("%H:%M:%S")
+            timestamp_str = datetime.fromtimestamp(result["timestamp"]).strftime("%H:%M:%S")
             model_time = result.get("server_model_inference", 0)
             gcs_time = result.get("server_gcs_total", 0)
             status = "✅ 200" if result["success"] else f"❌ {result['status_code']}"
@@ -292,7 +225,7 @@ class FixedUrlTester:
         
         # Hibás kérések
         for i, error in enumerate(self.errors, len(self.results) + 1):
-            timestamp_str = error["timestamp"].strftime("%H:%M:%S")
+            timestamp_str = datetime.fromtimestamp(error["timestamp"]).strftime("%H:%M:%S")
             print(f"{i:<3} {timestamp_str:<12} {error['response_time']:8.3f}s {'N/A':>6} {'N/A':>4} ❌ ERR")
 
 async def main():
@@ -5,22 +5,67 @@ Generates random pulover URLs to a file, then uses each URL individually for req
 """
 
 import asyncio
-import aiohttp
-import time
-import statistics
 from datetime import datetime
-import json
-from collections import deque
-import random
-import csv
 import os
 
+from loadgen import (
+    ClosedLoopPacing,
+    ConnectionPool,
+    Lane,
+    LiveDashboard,
+    LoadEngine,
+    PinnedTarget,
+    QueueWorkload,
+    ReadinessGate,
+    ResultColumns,
+    build_payload,
+    extract_pulover_urls_from_csv,
+    format_percentiles,
+    load_urls_from_file,
+    make_discovery,
+    make_instances,
+    make_limit,
+    make_sink,
+    make_targets,
+    pacing_mode,
+    preflight_urls,
+    print_connection_statistics,
+    print_histogram_statistics,
+    print_image_size_report,
+    print_phase_breakdown,
+    print_preflight_report,
+    print_readiness_report,
+    record_run,
+    short_image_name,
+    size_latency_correlation,
+)
+
 # ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
 TEST_DURATION_SECONDS = 30  # Teszt futási ideje másodpercben
 TOTAL_REQUESTS = 50         # Összes kérések száma amit fel akarunk dolgozni
 REQUEST_TIMEOUT = 60        # Timeout másodpercben
 CSV_FILE = "data_for_categorisation.csv"
 URL_LIST_FILE = "pulover_urls.txt"
+MAX_IN_FLIGHT_PER_INSTANCE = 1  # Egyidejű task-ok instance-onként (adaptív módban kezdőérték)
+ADAPTIVE_CONCURRENCY = None # None = fix limit, "aimd" / "gradient" = limit keresés a mért késleltetésből
+MAX_ADAPTIVE_LIMIT = 8      # Adaptív limit felső korlátja instance-onként
+AIMD_LATENCY_THRESHOLD = None  # AIMD: e fölötti válaszidő (s) is visszavág; None = csak a min RTT 1.5x-e felett
+ROUTING_POLICY = None       # None = instance-onként saját worker; különben közös policy (least_outstanding, peak_ewma, ...)
+KEEP_RAW_RESULTS = False    # Kérésenkénti eredmények megtartása a kérésenkénti listákhoz (False: csak hisztogramok, konstans memória)
+RESULTS_FILE = None         # Kérésenkénti eredmények fájlba: "results.jsonl" / ".csv" / ".parquet"
+RESULTS_DB = "benchmark_results.db"  # Futás mentése (összevetés: benchmark_results.py compare); None = nincs mentés
+PRINT_EACH_REQUEST = False  # True: kérésenkénti sor a terminálra (nagy kérés/sec-nél lassít)
+DASHBOARD_INTERVAL = 3      # Élő státusz sor frissítése másodpercben
+KEEPALIVE_TIMEOUT = 60      # Üresjáratú keep-alive kapcsolat megtartása (s)
+DNS_CACHE_TTL = 300         # Feloldott hostnevek cache ideje (s)
+PREWARM_CONNECTIONS = True  # Kapcsolatok megnyitása a teszt előtt (a TCP felépítés ne az első kérésnél mérődjön)
+PREFLIGHT_IMAGES = True     # Képek ellenőrzése futás előtt (méret, origin idő); a halott URL-ek kiesnek
+PREFLIGHT_CONCURRENCY = 32  # Egyidejű pre-flight kérések
+READINESS_GATE = True       # Indulás előtt warm-up /infer minden VM-re; csak a kész VM-ek kapnak terhelést
+READY_LATENCY_THRESHOLD = 10  # Kész, ha a warm-up /infer ennyi másodpercen belül sikeres
+READY_TIMEOUT = 300         # Legfeljebb eddig várunk a VM-ekre (s)
+DISCOVERY_SOURCE = None     # None = a lenti VM_INSTANCES; "fleet" / "registry" / "gcloud" (induláskor olvasva)
+DISCOVERY_PATH = "fleet-instances.json"  # A forrás fájlja (gcloud: None = élő lekérés a gcloud CLI-vel)
 
 # VM Instance IP címek
 VM_INSTANCES = [
@@ -36,47 +81,6 @@ API_ENDPOINT = "/infer"
 
 # ===============================================
 
-def extract_pulover_urls_from_csv(csv_file, count):
-    """Kiválaszt random pulover URL-eket a CSV-ből"""
-    pulover_urls = []
-    
-    print(f"📖 CSV fájl olvasása: {csv_file}")
-    
-    try:
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-            
-            for line_num, line in enumerate(lines[1:], 2):  # Skip header
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Split by comma and clean up
-                parts = line.split(',')
-                if len(parts) >= 3:
-                    full_name = parts[1].lower()
-                    image_url = parts[2]
-                    
-                    # Ellenőrizzük hogy pulover van a nevében vagy a kategóriában és b.jpg végződésű
-                    if ('pulover' in full_name or 'пуловери' in full_name) and image_url.endswith('b.jpg'):
-                        pulover_urls.append(image_url)
-        
-        print(f"🔍 Összesen talált pulover képek (b.jpg): {len(pulover_urls)}")
-        
-        # Random kiválasztás
-        if len(pulover_urls) < count:
-            print(f"⚠️  Csak {len(pulover_urls)} kép elérhető, az összeset használjuk")
-            selected_urls = pulover_urls
-        else:
-            selected_urls = random.sample(pulover_urls, count)
-        
-        print(f"✅ Kiválasztott képek száma: {len(selected_urls)}")
-        return selected_urls
-        
-    except Exception as e:
-        print(f"❌ Hiba a CSV olvasásakor: {e}")
-        return []
-
 def save_urls_to_file(urls, filename):
     """URL-ek mentése fájlba"""
     try:
@@ -89,189 +93,86 @@ def save_urls_to_file(urls, filename):
         print(f"❌ Hiba a fájl mentésekor: {e}")
         return False
 
-def load_urls_from_file(filename):
-    """URL-ek betöltése fájlból"""
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip()]
-        print(f"📂 URL-ek betöltve: {filename} ({len(urls)} darab)")
-        return urls
-    except Exception as e:
-        print(f"❌ Hiba a fájl olvasásakor: {e}")
-        return []
-
-class InstanceState:
-    def __init__(self, url):
-        self.url = url
-        self.is_busy = False
-        self.current_task_id = None
-        self.completed_tasks = 0
-        self.total_response_time = 0.0
-        self.errors = 0
-        self.last_completed = None
-        # Concurrency guard
-        self.in_flight = 0
-        self.violations = 0
+def timing_suffix(result):
+    """Szerver timing rövid megjelenítése (model / gcs), ha van"""
+    model_time = result.get("server_model_inference")
+    gcs_time = result.get("server_gcs_total", result.get("server_gcs_upload"))
+    if model_time is None or gcs_time is None:
+        return ""
+    return f" (model: {model_time:.2f}s, gcs: {gcs_time:.2f}s)"
 
 class ImprovedDynamicLoadBalancer:
-    def __init__(self, image_urls):
-        self.instances = [InstanceState(url) for url in VM_INSTANCES]
+    def __init__(self, image_urls, image_sizes=None, vm_instances=None):
+        self.instances = make_instances(
+            VM_INSTANCES if vm_instances is None else vm_instances,
+            limit_factory=lambda: make_limit(
+                ADAPTIVE_CONCURRENCY, MAX_IN_FLIGHT_PER_INSTANCE, MAX_ADAPTIVE_LIMIT, AIMD_LATENCY_THRESHOLD,
+            ),
+        )
         self.image_urls = image_urls
-        self.task_queue = deque()
-        self.completed_results = []
-        self.errors = []
-        self.start_time = None
-        self.next_task_id = 1
         
         # Feltöltjük a task queue-t - minden kérés KÜLÖN URL-t kap
-        for i in range(min(TOTAL_REQUESTS, len(image_urls))):
-            self.task_queue.append({
-                "task_id": i + 1,
-                "payload": {
-                    "image_url": image_urls[i],  # Minden task külön URL-t kap
-                    "prompt_mode": "both"
-                }
-            })
+        self.task_queue = QueueWorkload(build_payload(url) for url in image_urls[:TOTAL_REQUESTS])
         
         print(f"📋 Task queue feltöltve {len(self.task_queue)} egyedi URL-lel")
+        
+        # Instance-onként annyi worker, amennyi a limit maximum lehet; a limitet
+        # az engine tartatja be (respect_limits), a fölösleges worker-ek várakoznak
+        workers_per_instance = MAX_ADAPTIVE_LIMIT if ADAPTIVE_CONCURRENCY else MAX_IN_FLIGHT_PER_INSTANCE
+        if ROUTING_POLICY is None:
+            # Instance-hoz kötött worker-ek
+            lanes = [
+                Lane(len(self.instances) * slot + instance.instance_id, self.task_queue, PinnedTarget(instance))
+                for slot in range(workers_per_instance)
+                for instance in self.instances
+            ]
+        else:
+            # Közös worker-ek, a policy dönt az élő terhelés / késleltetés alapján
+            targets = make_targets(ROUTING_POLICY, self.instances)
+            lanes = [
+                Lane(worker_id, self.task_queue, targets)
+                for worker_id in range(1, len(self.instances) * workers_per_instance + 1)
+            ]
+        # Instance-onként annyi kapcsolat, ahány worker egyszerre küldhet oda; a kezdő limitnyi előre megnyitva
+        connections = ConnectionPool(
+            per_host=workers_per_instance,
+            hosts=len(self.instances),
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            dns_ttl=DNS_CACHE_TTL,
+            prewarm=MAX_IN_FLIGHT_PER_INSTANCE if PREWARM_CONNECTIONS else 0,
+        )
+        self.engine = LoadEngine(
+            self.instances,
+            lanes,
+            ClosedLoopPacing(duration=TEST_DURATION_SECONDS),
+            connections=connections,
+            image_sizes=image_sizes,
+            api_endpoint=API_ENDPOINT,
+            request_timeout=REQUEST_TIMEOUT,
+            on_dispatch=self.check_concurrency,
+            on_complete=self.print_result if PRINT_EACH_REQUEST else None,
+            keep_results=KEEP_RAW_RESULTS,
+            respect_limits=True,
+            sink=make_sink(RESULTS_FILE),
+            columns=ResultColumns(),
+        )
+        self.completed_results = self.engine.results
+        self.errors = self.engine.errors
     
-    def get_available_instance(self):
-        """Visszaad egy szabad instance-t, ha van"""
-        for instance in self.instances:
-            if not instance.is_busy:
-                return instance
-        return None
-    
-    def get_next_task(self):
-        """Kivesz egy task-ot a queue-ból"""
-        if self.task_queue:
-            return self.task_queue.popleft()
-        return None
-    
-    async def execute_task(self, session, instance, task):
-        """Végrehajtja a task-ot egy adott instance-on"""
-        # Concurrency guard start
-        instance.in_flight += 1
-        if instance.in_flight > 1:
-            instance.violations += 1
+    def check_concurrency(self, instance, task):
+        if instance.in_flight > instance.max_in_flight:
             print(f"⚠️  CONCURRENCY VIOLATION on {instance.url} (in_flight={instance.in_flight})")
-        instance.is_busy = True
-        instance.current_task_id = task["task_id"]
-        
-        full_url = f"{instance.url}{API_ENDPOINT}"
-        request_start = time.time()
-        
-        # URL rövid megjelenítése
-        image_url = task["payload"]["image_url"]
-        short_url = image_url.split('/')[-1][:30] + "..." if len(image_url.split('/')[-1]) > 30 else image_url.split('/')[-1]
-        
-        print(f"🔄 Task {task['task_id']}: {instance.url} -> {short_url}", end="", flush=True)
-        
-        try:
-            async with session.post(
-                full_url,
-                json=task["payload"],
-                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
-            ) as response:
-                response_text = await response.text()
-                request_end = time.time()
-                response_time = request_end - request_start
-                
-                result = {
-                    "task_id": task["task_id"],
-                    "instance_url": instance.url,
-                    "status_code": response.status,
-                    "response_time": response_time,
-                    "timestamp": request_start,
-                    "success": response.status == 200,
-                    "response_size": len(response_text),
-                    "image_url": task["payload"]["image_url"]
-                }
-                
-                if response.status == 200:
-                    try:
-                        json_response = json.loads(response_text)
-                        result["has_visualization_url"] = "visualization_url" in json_response
-                        if "timing" in json_response:
-                            result["server_timing"] = json_response["timing"]
-                            # Server timing részletek kinyerése
-                            if "model_inference_time" in json_response["timing"]:
-                                result["model_time"] = json_response["timing"]["model_inference_time"]
-                            if "gcs_upload_time" in json_response["timing"]:
-                                result["gcs_time"] = json_response["timing"]["gcs_upload_time"]
-                    except json.JSONDecodeError:
-                        result["has_visualization_url"] = False
-                
-                self.completed_results.append(result)
-                
-                # Instance statisztikák frissítése
-                instance.completed_tasks += 1
-                instance.total_response_time += response_time
-                instance.last_completed = time.time()
-                
-                # Server timing megjelenítése ha van
-                timing_str = ""
-                if response.status == 200 and "model_time" in result and "gcs_time" in result:
-                    timing_str = f" (model: {result['model_time']:.2f}s, gcs: {result['gcs_time']:.2f}s)"
-                print(f" ✅ {response.status} ({response_time:.2f}s){timing_str}")
-                
-        except asyncio.TimeoutError:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "task_id": task["task_id"],
-                "instance_url": instance.url,
-                "error": "Timeout",
-                "response_time": response_time,
-                "timestamp": request_start,
-                "image_url": task["payload"]["image_url"]
-            }
-            self.errors.append(error)
-            instance.errors += 1
-            print(f" ⏰ TIMEOUT ({response_time:.2f}s)")
-            
-        except Exception as e:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "task_id": task["task_id"],
-                "instance_url": instance.url,
-                "error": str(e),
-                "response_time": response_time,
-                "timestamp": request_start,
-                "image_url": task["payload"]["image_url"]
-            }
-            self.errors.append(error)
-            instance.errors += 1
-            print(f" ❌ ERROR: {e}")
-        
-        # Instance felszabadítása + concurrency guard end
-        instance.is_busy = False
-        instance.current_task_id = None
-        instance.in_flight = max(0, instance.in_flight - 1)
     
-    async def instance_worker(self, session, instance):
-        """Worker egy adott instance-hoz - folyamatosan dolgozik"""
-        while True:
-            # Ellenőrizzük hogy van-e még munka és nincs-e időtúllépés
-            current_time = time.time()
-            if (current_time - self.start_time >= TEST_DURATION_SECONDS and 
-                len(self.task_queue) == 0):
-                break
-                
-            if current_time - self.start_time >= TEST_DURATION_SECONDS:
-                print(f"⏰ {instance.url}: Időtúllépés, leállítás")
-                break
-            
-            # Próbálunk task-ot szerezni
-            task = self.get_next_task()
-            if task is None:
-                # Nincs több task, várunk egy kicsit
-                await asyncio.sleep(0.1)
-                continue
-            
-            # Végrehajtjuk a task-ot
-            await self.execute_task(session, instance, task)
+    def print_result(self, result):
+        # Egy teljes sor a válasz után: párhuzamos kéréseknél sem keverednek a sorok
+        short_url = short_image_name(result["image_url"], 30)
+        prefix = f"🔄 Task {result['task_id']}: {result['instance_url']} -> {short_url}"
+        if "error" not in result:
+            print(f"{prefix} ✅ {result['status_code']} ({result['response_time']:.2f}s){timing_suffix(result)}")
+        elif result["error"] == "Timeout":
+            print(f"{prefix} ⏰ TIMEOUT ({result['response_time']:.2f}s)")
+        else:
+            print(f"{prefix} ❌ ERROR: {result['error']}")
     
     async def run_test(self):
         """Fő teszt futtatás"""
@@ -279,9 +180,16 @@ class ImprovedDynamicLoadBalancer:
         print(f"📊 Konfiguráció:")
         print(f"   - Teszt időtartam: {TEST_DURATION_SECONDS} másodperc")
         print(f"   - Összes task: {len(self.task_queue)}")
-        print(f"   - VM instance-ok: {len(VM_INSTANCES)}")
+        print(f"   - VM instance-ok: {len(self.instances)}")
         print(f"   - Request timeout: {REQUEST_TIMEOUT}s")
-        print(f"   - Stratégia: Minden instance max 1 task egyszerre")
+        if ADAPTIVE_CONCURRENCY:
+            print(f"   - Concurrency limit: adaptív ({ADAPTIVE_CONCURRENCY}, {MAX_IN_FLIGHT_PER_INSTANCE}..{MAX_ADAPTIVE_LIMIT} / instance)")
+        else:
+            print(f"   - Concurrency limit: {MAX_IN_FLIGHT_PER_INSTANCE} / instance")
+        if ROUTING_POLICY is None:
+            print(f"   - Stratégia: Minden instance a saját worker-eivel húz a közös queue-ból")
+        else:
+            print(f"   - Stratégia: Routing policy: {ROUTING_POLICY}")
         print(f"   - Képek: Minden task EGYEDI pulover képet használ")
         print()
         
@@ -289,48 +197,26 @@ class ImprovedDynamicLoadBalancer:
             print(f"   VM {i+1}: {instance.url}")
         print()
         
-        self.start_time = time.time()
-        
-        async with aiohttp.ClientSession() as session:
-            # Minden instance-hoz egy worker task
-            tasks = []
-            for instance in self.instances:
-                task = asyncio.create_task(self.instance_worker(session, instance))
-                tasks.append(task)
-            
-            # Progress monitoring task
-            monitor_task = asyncio.create_task(self.progress_monitor())
-            tasks.append(monitor_task)
-            
-            # Várjuk meg az összes worker befejezését
-            await asyncio.gather(*tasks, return_exceptions=True)
+        dashboard = LiveDashboard(self.engine, DASHBOARD_INTERVAL, total=len(self.task_queue))
+        await asyncio.gather(self.engine.run(), dashboard.run())
         
         print(f"\n⏱️  Teszt befejezve!")
         self.print_statistics()
+        if RESULTS_DB:
+            record_run(RESULTS_DB, self.engine, "improved_dynamic_load_balancer", mode=self.run_mode())
     
-    async def progress_monitor(self):
-        """Folyamatosan monitorozza a progresst"""
-        while True:
-            await asyncio.sleep(3)  # 3 másodpercenként
-            
-            current_time = time.time()
-            elapsed = current_time - self.start_time
-            
-            if elapsed >= TEST_DURATION_SECONDS:
-                break
-            
-            completed = len(self.completed_results)
-            remaining = len(self.task_queue)
-            busy_instances = sum(1 for inst in self.instances if inst.is_busy)
-            successful = len([r for r in self.completed_results if r["success"]])
-            
-            print(f"📊 Progress: {completed} kész ({successful} sikeres), {remaining} várakozik, {busy_instances}/{len(self.instances)} instance dolgozik ({elapsed:.0f}s)")
+    def run_mode(self):
+        """Összevetési kulcs: csak az azonos konkurencia / limit / routing beállítású futások párosíthatók"""
+        if ADAPTIVE_CONCURRENCY:
+            limit = f"{ADAPTIVE_CONCURRENCY} {MAX_IN_FLIGHT_PER_INSTANCE}..{MAX_ADAPTIVE_LIMIT}/instance"
+        else:
+            limit = f"fixed {MAX_IN_FLIGHT_PER_INSTANCE}/instance"
+        return f"{pacing_mode(self.engine.pacing)}, {limit}, {ROUTING_POLICY or 'pinned'}"
     
     def print_statistics(self):
         """Statisztikák kiírása"""
-        successful_requests = [r for r in self.completed_results if r["success"]]
-        failed_requests = len(self.completed_results) - len(successful_requests)
-        total_requests = len(self.completed_results) + len(self.errors)
+        recorder = self.engine.recorder
+        total_requests = recorder.succeeded + recorder.failed
         
         print(f"\n📈 TESZT EREDMÉNYEK - EGYEDI PULOVER KÉPEK")
         print(f"=" * 70)
@@ -338,19 +224,16 @@ class ImprovedDynamicLoadBalancer:
         print(f"📊 Összes task: {len(self.task_queue) + total_requests}")
         print(f"✅ Befejezett task-ok: {total_requests}")
         print(f"🔄 Feldolgozatlan task-ok: {len(self.task_queue)}")
-        print(f"✅ Sikeres kérések: {len(successful_requests)}")
-        print(f"❌ Sikertelen kérések: {failed_requests + len(self.errors)}")
+        print(f"✅ Sikeres kérések: {recorder.succeeded}")
+        print(f"❌ Sikertelen kérések: {recorder.failed}")
         if total_requests > 0:
-            print(f"📈 Sikeresség arány: {len(successful_requests)/total_requests*100:.1f}%")
+            print(f"📈 Sikeresség arány: {recorder.succeeded/total_requests*100:.1f}%")
         
-        if successful_requests:
-            response_times = [r["response_time"] for r in successful_requests]
-            
+        if recorder.succeeded:
             print(f"\n⏰ VÁLASZIDŐ STATISZTIKÁK (sikeres kérések)")
-            print(f"   🔹 Minimum: {min(response_times):.3f} másodperc")
-            print(f"   🔹 Maximum: {max(response_times):.3f} másodperc")
-            print(f"   🔹 Átlag: {statistics.mean(response_times):.3f} másodperc")
-            print(f"   🔹 Medián: {statistics.median(response_times):.3f} másodperc")
+            print_histogram_statistics(recorder.histogram("client_total"))
+            print_phase_breakdown(recorder)
+            print_connection_statistics(recorder, self.engine.connections)
             
             # Instance-onkénti teljesítmény
             print(f"\n🖥️  INSTANCE-ONKÉNTI TELJESÍTMÉNY")
@@ -359,43 +242,61 @@ class ImprovedDynamicLoadBalancer:
                 print(f"      - Befejezett task-ok: {instance.completed_tasks}")
                 print(f"      - Hibák: {instance.errors}")
                 print(f"      - Concurrency violations: {instance.violations}")
+                print(f"      - Concurrency limit: {instance.limiter.current} (csúcs: {instance.limiter.peak_limit}, {instance.limiter.name})")
                 if instance.completed_tasks > 0:
                     avg_time = instance.total_response_time / instance.completed_tasks
                     print(f"      - Átlag válaszidő: {avg_time:.3f}s")
                     
-                    # Instance-specifikus task-ok
-                    instance_results = [r for r in successful_requests if r["instance_url"] == instance.url]
-                    if instance_results:
-                        instance_times = [r["response_time"] for r in instance_results]
-                        print(f"      - Min/Max: {min(instance_times):.3f}s / {max(instance_times):.3f}s")
+                    # Instance-specifikus hisztogram
+                    instance_histogram = recorder.histogram("client_total", instance.instance_id)
+                    if instance_histogram.count:
+                        print(f"      - Min/Max: {instance_histogram.min:.3f}s / {instance_histogram.max:.3f}s")
+                        print(f"      - {format_percentiles(instance_histogram)}")
                 else:
                     print(f"      - Átlag válaszidő: N/A")
             
+            if ADAPTIVE_CONCURRENCY:
+                print(f"\n🎚️  FELDERÍTETT CONCURRENCY LIMITEK ({ADAPTIVE_CONCURRENCY})")
+                for i, instance in enumerate(self.instances):
+                    print(f"   VM {i+1} ({instance.name}): {instance.limiter.current} egyidejű kérés (csúcs: {instance.limiter.peak_limit}, {instance.limiter.samples} minta)")
+            
             # Throughput számítás
-            if successful_requests:
-                actual_test_duration = max([r["timestamp"] for r in successful_requests]) - min([r["timestamp"] for r in successful_requests])
-                if actual_test_duration > 0:
-                    throughput = len(successful_requests) / actual_test_duration
-                    print(f"\n🚀 THROUGHPUT")
-                    print(f"   🔹 Sikeres kérések/másodperc: {throughput:.2f}")
-                    print(f"   🔹 Átlagos instance terhelés: {throughput/len(self.instances):.2f} kérés/sec/instance")
+            throughput = recorder.throughput()
+            if throughput:
+                print(f"\n🚀 THROUGHPUT")
+                print(f"   🔹 Sikeres kérések/másodperc: {throughput:.2f}")
+                print(f"   🔹 Átlagos instance terhelés: {throughput/len(self.instances):.2f} kérés/sec/instance")
+            
+            print_image_size_report(size_latency_correlation(self.engine.columns.frame()))
         
         # Queue és task-ok státusza
         print(f"\n📋 TASK QUEUE STATISZTIKÁK")
         print(f"   🔹 Eredeti task-ok: {len(self.task_queue) + total_requests}")
-        print(f"   🔹 Befejezett: {len(self.completed_results) + len(self.errors)}")
+        print(f"   🔹 Befejezett: {total_requests}")
         print(f"   🔹 Feldolgozatlan: {len(self.task_queue)}")
         
+        # Kérésenkénti listák csak megtartott nyers eredményekkel
+        if KEEP_RAW_RESULTS:
+            self.print_raw_results()
+        
+        # Hibák részletezése
+        error_types = recorder.errors_by_type()
+        if error_types:
+            print(f"\n❌ HIBÁK RÉSZLETEZÉSE")
+            for error_type, count in error_types.items():
+                print(f"   🔹 {error_type}: {count} alkalom")
+    
+    def print_raw_results(self):
+        """Összes sikeres / sikertelen futás kérésenként (KEEP_RAW_RESULTS=True)"""
+        successful_requests = [r for r in self.completed_results if r["success"]]
+        
         # Összes futás eredménye
         if successful_requests:
             print(f"\n🖼️  ÖSSZES SIKERES FUTÁS EREDMÉNYE")
             for i, result in enumerate(successful_requests, 1):
                 short_url = result['image_url'].split('/')[-1]
                 instance_name = result['instance_url'].split('/')[-1].split(':')[0]
-                timing_details = ""
-                if "model_time" in result and "gcs_time" in result:
-                    timing_details = f" (model: {result['model_time']:.2f}s, gcs: {result['gcs_time']:.2f}s)"
-                print(f"   {i:2d}. Task {result['task_id']:2d} | {instance_name:13s} | {short_url:50s} | {result['response_time']:6.2f}s{timing_details}")
+                print(f"   {i:2d}. Task {result['task_id']:2d} | {instance_name:13s} | {short_url:50s} | {result['response_time']:6.2f}s{timing_suffix(result)}")
         
         # Sikertelen futások
         failed_all = [r for r in self.completed_results if not r["success"]] + self.errors
@@ -417,19 +318,6 @@ class ImprovedDynamicLoadBalancer:
             for i, result in enumerate(successful_requests[:sample_size]):
                 short_url = result['image_url'].split('/')[-1]
                 print(f"   {i+1}. {short_url} ({result['response_time']:.2f}s)")
-        
-        # Hibák részletezése
-        if self.errors:
-            print(f"\n❌ HIBÁK RÉSZLETEZÉSE")
-            error_types = {}
-            for error in self.errors:
-                error_type = error["error"]
-                if error_type not in error_types:
-                    error_types[error_type] = 0
-                error_types[error_type] += 1
-            
-            for error_type, count in error_types.items():
-                print(f"   🔹 {error_type}: {count} alkalom")
 
 def main():
     """Fő program belépési pont"""
@@ -468,8 +356,42 @@ def main():
     
     print(f"🎯 {len(image_urls)} egyedi pulover kép betöltve a teszthez")
     
+    # Pre-flight: halott képek kiszűrése, méretek a riporthoz
+    image_sizes = None
+    if PREFLIGHT_IMAGES:
+        report = asyncio.run(preflight_urls(image_urls, PREFLIGHT_CONCURRENCY))
+        print_preflight_report(report)
+        image_urls = report.alive_urls()
+        image_sizes = report.sizes()
+        if not image_urls:
+            print("❌ Egyik kép sem érhető el")
+            return
+    
+    # Readiness gate: csak a betöltött modellel, gyorsan válaszoló VM-ek kapnak terhelést
+    # Instance-onként kötött worker-ek: a tagság csak induláskor jön a discovery forrásból
+    vm_instances = VM_INSTANCES
+    if DISCOVERY_SOURCE:
+        source = make_discovery(DISCOVERY_SOURCE, path=DISCOVERY_PATH)
+        try:
+            vm_instances = asyncio.run(source.urls())
+        except RuntimeError as e:
+            print(f"❌ Discovery hiba: {e}")
+            return
+        print(f"🔎 Discovery: {source.describe()} -> {len(vm_instances)} VM")
+        if not vm_instances:
+            print("❌ Nincs VM a discovery forrásban, a teszt nem indul")
+            return
+    if READINESS_GATE:
+        gate = ReadinessGate(image_urls[0], latency_threshold=READY_LATENCY_THRESHOLD, timeout=READY_TIMEOUT)
+        readiness = asyncio.run(gate.wait(vm_instances))
+        print_readiness_report(readiness)
+        vm_instances = readiness.ready_urls()
+        if not vm_instances:
+            print("❌ Egyik VM sem lett kész, a teszt nem indul")
+            return
+    
     # Load balancer teszt futtatása
-    balancer = ImprovedDynamicLoadBalancer(image_urls)
+    balancer = ImprovedDynamicLoadBalancer(image_urls, image_sizes, vm_instances)
     asyncio.run(balancer.run_test())
 
 if __name__ == "__main__":
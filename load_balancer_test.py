@@ -5,17 +5,76 @@ Tests multiple VM instances with round-robin load balancing and collects perform
 """
 
 import asyncio
-import aiohttp
-import time
-import statistics
+import math
 from datetime import datetime
-import json
+
+from loadgen import (
+    ConnectionPool,
+    DynamicFleet,
+    FixedUrlWorkload,
+    Lane,
+    LiveDashboard,
+    LoadEngine,
+    ReadinessGate,
+    ResultColumns,
+    detect_knee,
+    make_discovery,
+    make_instances,
+    make_pacing,
+    make_profile,
+    make_profile_pacing,
+    make_sink,
+    make_targets,
+    pacing_mode,
+    print_connection_statistics,
+    print_fleet_changes,
+    print_open_loop_latency,
+    print_phase_breakdown,
+    print_readiness_report,
+    print_saturation_report,
+    print_summary_statistics,
+    profile_target,
+    record_run,
+    window_stats,
+)
 
 # ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
 TEST_DURATION_SECONDS = 10  # Teszt futási ideje másodpercben
 CONCURRENT_REQUESTS = 5     # Egyidejű kérések száma
 REQUEST_TIMEOUT = 30        # Timeout másodpercben
 DELAY_BETWEEN_REQUESTS = 0.1 # Késleltetés kérések között másodpercben
+ROUTING_POLICY = "round_robin"  # round_robin / least_outstanding / peak_ewma / power_of_two / weighted_round_robin
+INSTANCE_WEIGHTS = None     # weighted_round_robin súlyok VM-enként (None = egyenlő)
+RESULTS_FILE = None         # Kérésenkénti eredmények fájlba: "results.jsonl" / ".csv" / ".parquet"
+RESULTS_DB = "benchmark_results.db"  # Futás mentése (összevetés: benchmark_results.py compare); None = nincs mentés
+PRINT_EACH_REQUEST = False  # True: kérésenkénti sor a terminálra (nagy kérés/sec-nél lassít)
+DASHBOARD_INTERVAL = 1      # Élő státusz sor frissítése másodpercben
+KEEPALIVE_TIMEOUT = 60      # Üresjáratú keep-alive kapcsolat megtartása (s)
+DNS_CACHE_TTL = 300         # Feloldott hostnevek cache ideje (s)
+PREWARM_CONNECTIONS = True  # Kapcsolatok megnyitása a teszt előtt (a TCP felépítés ne az első kérésnél mérődjön)
+READINESS_GATE = True       # Indulás előtt warm-up /infer minden VM-re; csak a kész VM-ek kapnak terhelést
+READY_LATENCY_THRESHOLD = 10  # Kész, ha a warm-up /infer ennyi másodpercen belül sikeres
+READY_TIMEOUT = 300         # Legfeljebb eddig várunk a VM-ekre (s)
+
+# Instance discovery (None = a lenti VM_INSTANCES lista). "fleet": provision_fleet.py fleet fájl,
+# "registry": deploy-gcp.sh registry fájl, "gcloud": gcloud compute instances list JSON dump
+DISCOVERY_SOURCE = None
+DISCOVERY_PATH = "fleet-instances.json"  # A forrás fájlja (gcloud: None = élő lekérés a gcloud CLI-vel)
+DISCOVERY_REFRESH_SECONDS = 15  # Tagság újraolvasása futás közben: új VM be, eltűnt VM drain (None = csak induláskor)
+
+# Nyílt hurkú mód (None = zárt hurok: a worker-ek megvárják a választ)
+OPEN_LOOP_RPS = None        # Cél kérés/másodperc, független a válaszidőktől
+POISSON_ARRIVALS = False    # True = Poisson érkezések, False = egyenletes ütem
+MAX_OUTSTANDING = 1000      # Max nyitott kérés nyílt hurokban (felette eldobjuk)
+
+# Terhelés profil (None = állandó terhelés a fenti beállításokkal). A profil adja a teszt
+# hosszát; "target": "rps" = nyílt hurkú cél kérés/s, "concurrency" = egyidejű worker-ek száma.
+# Shape-ek: ramp (start, end, duration), step (start, step, step_duration, steps),
+# spike (base, peak_value, duration, spike_at, spike_duration), soak (value, duration),
+# sine (mean, amplitude, period, duration)
+LOAD_PROFILE = None         # pl. {"shape": "step", "target": "rps", "start": 2, "step": 2, "step_duration": 30, "steps": 8}
+PROFILE_WINDOW_SECONDS = 10 # Elemzési ablak hossza (step profilnál lépcsőnként egy ablak)
+P99_SLO_SECONDS = None      # Könyök keresésnél a p99 SLO feletti ablak már nem fenntartható (None = csak görbe alapján)
 
 # VM Instance IP címek
 VM_INSTANCES = [
@@ -34,190 +93,237 @@ TEST_PAYLOAD = {
 
 # ===============================================
 
+def print_fleet_event(event, subject):
+    if event == "join":
+        print(f"\n➕ Új VM a terhelésben: {subject.url}")
+    elif event == "drain":
+        print(f"\n➖ VM kivonva (drain, {subject.in_flight} kérés még fut): {subject.url}")
+    elif event == "readiness":
+        print_readiness_report(subject)
+    elif event == "error":
+        print(f"\n⚠️  Discovery: {subject}")
+
 class LoadBalancerTest:
-    def __init__(self):
-        self.results = []
-        self.errors = []
-        self.start_time = None
-        self.current_instance_index = 0
-        
-    def get_next_instance(self):
-        """Round-robin load balancing"""
-        instance = VM_INSTANCES[self.current_instance_index]
-        self.current_instance_index = (self.current_instance_index + 1) % len(VM_INSTANCES)
-        return instance
+    def __init__(self, vm_instances=None, fleet=None):
+        self.fleet = fleet
+        if fleet is not None:
+            # Élő tagság: a policy és az engine a fleet aktív listáját látja, a frissítés helyben módosítja
+            self.instances = fleet.instances
+        else:
+            # A readiness gate kiszűrheti a még nem kész VM-eket: a súlyok a megmaradtakhoz tartoznak
+            vm_instances = VM_INSTANCES if vm_instances is None else vm_instances
+            weights = [w for url, w in zip(VM_INSTANCES, INSTANCE_WEIGHTS) if url in vm_instances] if INSTANCE_WEIGHTS else None
+            self.instances = make_instances(vm_instances, weights)
+        # Közös routing policy (állapot) minden worker között
+        targets = make_targets(ROUTING_POLICY, self.instances)
+        self.profile = make_profile(LOAD_PROFILE) if LOAD_PROFILE else None
+        self.profile_target = profile_target(LOAD_PROFILE) if LOAD_PROFILE else None
+        if self.profile:
+            pacing = make_profile_pacing(
+                self.profile,
+                self.profile_target,
+                delay=DELAY_BETWEEN_REQUESTS,
+                poisson=POISSON_ARRIVALS,
+                max_outstanding=MAX_OUTSTANDING,
+            )
+            self.duration = self.profile.duration
+        else:
+            pacing = make_pacing(
+                OPEN_LOOP_RPS,
+                duration=TEST_DURATION_SECONDS,
+                delay=DELAY_BETWEEN_REQUESTS,
+                poisson=POISSON_ARRIVALS,
+                max_outstanding=MAX_OUTSTANDING,
+            )
+            self.duration = TEST_DURATION_SECONDS
+        # Konkurencia profilnál a csúcshoz annyi worker kell, amennyit a profil valaha aktivál
+        worker_count = math.ceil(self.profile.peak()) if self.profile_target == "concurrency" else CONCURRENT_REQUESTS
+        lanes = [
+            Lane(worker_id, FixedUrlWorkload(TEST_PAYLOAD["image_url"], prompt_mode=TEST_PAYLOAD["prompt_mode"]), targets)
+            for worker_id in range(worker_count)
+        ]
+        self.engine = LoadEngine(
+            self.instances,
+            lanes,
+            pacing,
+            connections=self.make_connections(pacing, worker_count),
+            api_endpoint=API_ENDPOINT,
+            request_timeout=REQUEST_TIMEOUT,
+            on_complete=self.print_result if PRINT_EACH_REQUEST else None,
+            sink=make_sink(RESULTS_FILE),
+            columns=ResultColumns(),
+        )
+        self.columns = self.engine.columns
     
-    async def make_request(self, session, instance_url, request_id):
-        """Egyetlen API kérés végrehajtása"""
-        full_url = f"{instance_url}{API_ENDPOINT}"
-        request_start = time.time()
-        
-        try:
-            async with session.post(
-                full_url,
-                json=TEST_PAYLOAD,
-                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
-            ) as response:
-                response_text = await response.text()
-                request_end = time.time()
-                response_time = request_end - request_start
-                
-                result = {
-                    "request_id": request_id,
-                    "instance_url": instance_url,
-                    "status_code": response.status,
-                    "response_time": response_time,
-                    "timestamp": request_start,
-                    "success": response.status == 200,
-                    "response_size": len(response_text)
-                }
-                
-                if response.status == 200:
-                    try:
-                        json_response = json.loads(response_text)
-                        result["has_visualization_url"] = "visualization_url" in json_response
-                    except json.JSONDecodeError:
-                        result["has_visualization_url"] = False
-                
-                self.results.append(result)
-                print(f"✅ Request {request_id}: {instance_url} -> {response.status} ({response_time:.2f}s)")
-                
-        except asyncio.TimeoutError:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "request_id": request_id,
-                "instance_url": instance_url,
-                "error": "Timeout",
-                "response_time": response_time,
-                "timestamp": request_start
-            }
-            self.errors.append(error)
-            print(f"⏰ Request {request_id}: {instance_url} -> TIMEOUT ({response_time:.2f}s)")
-            
-        except Exception as e:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "request_id": request_id,
-                "instance_url": instance_url,
-                "error": str(e),
-                "response_time": response_time,
-                "timestamp": request_start
-            }
-            self.errors.append(error)
-            print(f"❌ Request {request_id}: {instance_url} -> ERROR: {e}")
+    def report_instances(self):
+        """A riport VM-jei: élő tagságnál a futás közben kivont VM-ek is"""
+        return self.fleet.all_instances() if self.fleet is not None else self.instances
     
-    async def worker(self, session, worker_id):
-        """Worker coroutine, amely folyamatosan küld kéréseket"""
-        request_counter = 0
-        
-        while time.time() - self.start_time < TEST_DURATION_SECONDS:
-            instance_url = self.get_next_instance()
-            request_id = f"worker-{worker_id}-req-{request_counter}"
-            
-            await self.make_request(session, instance_url, request_id)
-            request_counter += 1
-            
-            # Kis szünet a következő kérés előtt
-            await asyncio.sleep(DELAY_BETWEEN_REQUESTS)
+    def make_connections(self, pacing, worker_count):
+        """Zárt hurokban egy VM-hez legfeljebb annyi kapcsolat, ahány worker van (a routing bármelyiket
+        odaküldheti), nyílt hurokban korlátlan; előre a worker-ek egyenletes elosztásának megfelelő szám"""
+        per_host = None if pacing.open_loop else worker_count
+        return ConnectionPool(
+            per_host=per_host,
+            hosts=len(self.instances),
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            dns_ttl=DNS_CACHE_TTL,
+            prewarm=math.ceil(worker_count / len(self.instances)) if PREWARM_CONNECTIONS else 0,
+        )
+    
+    def print_result(self, result):
+        """Egy kérés eredményének kiírása"""
+        request_id = f"worker-{result['lane_id']}-req-{result['request_id'] - 1}"
+        if "error" not in result:
+            print(f"✅ Request {request_id}: {result['instance_url']} -> {result['status_code']} ({result['response_time']:.2f}s)")
+        elif result["error"] == "Timeout":
+            print(f"⏰ Request {request_id}: {result['instance_url']} -> TIMEOUT ({result['response_time']:.2f}s)")
+        else:
+            print(f"❌ Request {request_id}: {result['instance_url']} -> ERROR: {result['error']}")
     
     async def run_test(self):
         """Fő teszt futtatás"""
         print(f"🚀 Load Balancer Teszt Indítás")
         print(f"📊 Konfiguráció:")
-        print(f"   - Teszt időtartam: {TEST_DURATION_SECONDS} másodperc")
-        print(f"   - Egyidejű worker-ek: {CONCURRENT_REQUESTS}")
-        print(f"   - VM instance-ok: {len(VM_INSTANCES)}")
-        print(f"   - Kérések közötti késleltetés: {DELAY_BETWEEN_REQUESTS}s")
+        print(f"   - Teszt időtartam: {self.duration:g} másodperc")
+        if self.profile:
+            unit = "egyidejű worker" if self.profile_target == "concurrency" else "kérés/sec"
+            print(f"   - Terhelés profil: {self.profile.describe()} ({unit}, csúcs {self.profile.peak():g})")
+        elif OPEN_LOOP_RPS:
+            print(f"   - Mód: NYÍLT HUROK ({OPEN_LOOP_RPS} kérés/sec, {'Poisson' if POISSON_ARRIVALS else 'egyenletes'} érkezés)")
+        else:
+            print(f"   - Egyidejű worker-ek: {CONCURRENT_REQUESTS}")
+            print(f"   - Kérések közötti késleltetés: {DELAY_BETWEEN_REQUESTS}s")
+        print(f"   - VM instance-ok: {len(self.instances)}")
+        if self.fleet is not None:
+            print(f"   - Discovery: {self.fleet.source.describe()}, frissítés {DISCOVERY_REFRESH_SECONDS}s")
+        print(f"   - Routing policy: {ROUTING_POLICY}")
         print(f"   - Request timeout: {REQUEST_TIMEOUT}s")
         print()
         
-        for i, vm in enumerate(VM_INSTANCES):
-            print(f"   VM {i+1}: {vm}")
+        for i, instance in enumerate(self.instances):
+            print(f"   VM {i+1}: {instance.url}")
         print()
         
-        self.start_time = time.time()
-        
-        async with aiohttp.ClientSession() as session:
-            # Worker task-ok létrehozása
-            tasks = []
-            for worker_id in range(CONCURRENT_REQUESTS):
-                task = asyncio.create_task(self.worker(session, worker_id))
-                tasks.append(task)
-            
-            # Várjuk meg az összes worker befejezését
-            await asyncio.gather(*tasks)
+        dashboard = LiveDashboard(self.engine, DASHBOARD_INTERVAL)
+        monitors = [dashboard.run()]
+        if self.fleet is not None:
+            monitors.append(self.fleet.watch(self.engine))
+        await asyncio.gather(self.engine.run(), *monitors)
         
         print(f"\n⏱️  Teszt befejezve!")
         self.print_statistics()
+        if self.profile:
+            self.print_saturation()
+        if RESULTS_DB:
+            record_run(RESULTS_DB, self.engine, "load_balancer_test", mode=self.run_mode())
+    
+    def run_mode(self):
+        """Összevetési kulcs: a pacing mellett a worker szám (zárt hurok, profil nélkül) és a routing policy"""
+        mode = pacing_mode(self.engine.pacing)
+        if not self.engine.pacing.open_loop and not self.profile:
+            mode += f" c={CONCURRENT_REQUESTS}"
+        return f"{mode}, {ROUTING_POLICY}"
     
     def print_statistics(self):
-        """Statisztikák kiírása"""
-        successful_requests = [r for r in self.results if r["success"]]
-        failed_requests = len(self.results) - len(successful_requests)
-        total_requests = len(self.results) + len(self.errors)
+        """Statisztikák kiírása (oszlopos eredményekből, vektorizáltan)"""
+        frame = self.columns.frame()
+        successful = frame.successful()
+        total_requests = len(frame)
         
         print(f"\n📈 TESZT EREDMÉNYEK")
         print(f"=" * 50)
-        print(f"⏱️  Teszt időtartam: {TEST_DURATION_SECONDS} másodperc")
+        print(f"⏱️  Teszt időtartam: {self.duration:g} másodperc")
         print(f"📊 Összes kérés: {total_requests}")
-        print(f"✅ Sikeres kérések: {len(successful_requests)}")
-        print(f"❌ Sikertelen kérések: {failed_requests + len(self.errors)}")
-        print(f"📈 Sikeresség arány: {len(successful_requests)/total_requests*100:.1f}%")
+        print(f"✅ Sikeres kérések: {len(successful)}")
+        print(f"❌ Sikertelen kérések: {total_requests - len(successful)}")
+        if total_requests > 0:
+            print(f"📈 Sikeresség arány: {len(successful)/total_requests*100:.1f}%")
         
-        if successful_requests:
-            response_times = [r["response_time"] for r in successful_requests]
-            
+        if len(successful):
             print(f"\n⏰ VÁLASZIDŐ STATISZTIKÁK (sikeres kérések)")
-            print(f"   🔹 Minimum: {min(response_times):.3f} másodperc")
-            print(f"   🔹 Maximum: {max(response_times):.3f} másodperc")
-            print(f"   🔹 Átlag: {statistics.mean(response_times):.3f} másodperc")
-            print(f"   🔹 Medián: {statistics.median(response_times):.3f} másodperc")
+            print_summary_statistics(successful.summary(), stdev=False)
             
-            # Instance-onkénti bontás
-            print(f"\n🖥️  INSTANCE-ONKÉNTI TELJESÍTMÉNY")
-            instance_stats = {}
-            for result in successful_requests:
-                url = result["instance_url"]
-                if url not in instance_stats:
-                    instance_stats[url] = []
-                instance_stats[url].append(result["response_time"])
+            print_phase_breakdown(self.engine.recorder)
+            print_open_loop_latency(self.engine.recorder)
+            print_connection_statistics(self.engine.recorder, self.engine.connections)
             
-            for i, vm_url in enumerate(VM_INSTANCES):
-                if vm_url in instance_stats:
-                    times = instance_stats[vm_url]
-                    print(f"   VM {i+1} ({vm_url}):")
-                    print(f"      - Kérések száma: {len(times)}")
-                    print(f"      - Átlag válaszidő: {statistics.mean(times):.3f}s")
-                    print(f"      - Min/Max: {min(times):.3f}s / {max(times):.3f}s")
+            # Instance-onkénti bontás (egy csoportosítás az összes instance-ra)
+            by_instance = successful.by_instance()
+            print(f"\n🖥️  INSTANCE-ONKÉNTI TELJESÍTMÉNY")
+            for i, instance in enumerate(self.report_instances()):
+                summary = by_instance.get(instance.instance_id)
+                if summary:
+                    print(f"   VM {i+1} ({instance.url}):")
+                    print(f"      - Kérések száma: {summary.count}")
+                    print(f"      - Átlag válaszidő: {summary.mean:.3f}s")
+                    print(f"      - Min/Max: {summary.min:.3f}s / {summary.max:.3f}s")
                 else:
-                    print(f"   VM {i+1} ({vm_url}): Nincs sikeres kérés")
+                    print(f"   VM {i+1} ({instance.url}): Nincs sikeres kérés")
             
             # Throughput számítás
-            actual_test_duration = max([r["timestamp"] for r in successful_requests]) - min([r["timestamp"] for r in successful_requests])
-            if actual_test_duration > 0:
-                throughput = len(successful_requests) / actual_test_duration
+            throughput = successful.throughput()
+            if throughput:
                 print(f"\n🚀 THROUGHPUT")
                 print(f"   🔹 Sikeres kérések/másodperc: {throughput:.2f}")
-                print(f"   🔹 Átlagos instance terhelés: {throughput/len(VM_INSTANCES):.2f} kérés/sec/instance")
+                print(f"   🔹 Átlagos instance terhelés: {throughput/len(self.instances):.2f} kérés/sec/instance")
+        
+        if self.fleet is not None:
+            print_fleet_changes(self.fleet)
         
         # Hibák részletezése
-        if self.errors:
+        error_types = self.engine.recorder.errors_by_type()
+        if error_types:
             print(f"\n❌ HIBÁK RÉSZLETEZÉSE")
-            error_types = {}
-            for error in self.errors:
-                error_type = error["error"]
-                if error_type not in error_types:
-                    error_types[error_type] = 0
-                error_types[error_type] += 1
-            
             for error_type, count in error_types.items():
                 print(f"   🔹 {error_type}: {count} alkalom")
 
+    def print_saturation(self):
+        """Profil ablakonkénti bontás, telítődési könyök és max fenntartható throughput"""
+        windows = window_stats(self.columns.frame(), self.profile, self.engine.start_time, PROFILE_WINDOW_SECONDS)
+        result = detect_knee(windows, p99_slo=P99_SLO_SECONDS)
+        unit = "egyidejű" if self.profile_target == "concurrency" else "kérés/s"
+        print_saturation_report(result, self.report_instances(), unit)
+
 async def main():
     """Fő program belépési pont"""
-    tester = LoadBalancerTest()
+    gate = None
+    if READINESS_GATE:
+        gate = ReadinessGate(
+            TEST_PAYLOAD["image_url"],
+            TEST_PAYLOAD["prompt_mode"],
+            API_ENDPOINT,
+            latency_threshold=READY_LATENCY_THRESHOLD,
+            timeout=READY_TIMEOUT,
+        )
+    if DISCOVERY_SOURCE:
+        # Az új VM-ek a readiness gate-en át kerülnek be (induláskor és frissítéskor is)
+        fleet = DynamicFleet(
+            make_discovery(DISCOVERY_SOURCE, path=DISCOVERY_PATH),
+            refresh_interval=DISCOVERY_REFRESH_SECONDS,
+            gate=gate,
+            on_event=print_fleet_event,
+        )
+        try:
+            instances = await fleet.load()
+        except RuntimeError as e:
+            print(f"❌ Discovery hiba: {e}")
+            return
+        if not instances:
+            print(f"❌ Nincs kész VM a discovery forrásban ({fleet.source.describe()}), a teszt nem indul")
+            return
+        tester = LoadBalancerTest(fleet=fleet)
+        await tester.run_test()
+        return
+    vm_instances = VM_INSTANCES
+    if gate is not None:
+        report = await gate.wait(VM_INSTANCES)
+        print_readiness_report(report)
+        vm_instances = report.ready_urls()
+        if not vm_instances:
+            print("❌ Egyik VM sem lett kész, a teszt nem indul")
+            return
+    tester = LoadBalancerTest(vm_instances)
     await tester.run_test()
 
 if __name__ == "__main__":
@@ -0,0 +1,290 @@
+"""
+Shared load-generation engine for the Mannequin Segmenter API test scripts
+"""
+
+from .boottimes import (
+    BOOT_PHASE_MARKER,
+    BootPhaseStats,
+    BootTimeReport,
+    boot_log_paths,
+    fetch_fleet_boot_timings,
+    load_boot_logs,
+    parse_boot_line,
+    parse_boot_log,
+    print_boot_time_report,
+    save_boot_logs,
+)
+from .capacity import CapacityPoint, Recommendation, UslModel, fit_usl, recommend
+from .catalog import UrlIndex, extract_pulover_urls_from_csv, load_url_index
+from .columns import SERVER_COLUMNS, ResultColumns, ResultFrame, Summary, summarize
+from .compare import Comparison, bootstrap_difference, compare_frames, mann_whitney_u, throughput_series
+from .connections import ConnectionPool, print_connection_statistics
+from .dashboard import LiveDashboard
+from .deployment import (
+    config_file_path,
+    deployment_metadata,
+    image_digest,
+    read_deployment_config,
+    write_deployment_config,
+)
+from .discovery import (
+    DEFAULT_REFRESH_INTERVAL,
+    DISCOVERY_SOURCES,
+    DynamicFleet,
+    FleetFileSource,
+    GcloudListSource,
+    RegistryFileSource,
+    StaticSource,
+    instance_url,
+    make_discovery,
+    print_fleet_changes,
+)
+from .engine import (
+    API_ENDPOINT,
+    DEFAULT_REQUEST_TIMEOUT,
+    Lane,
+    LoadEngine,
+    extract_server_timing,
+    short_image_name,
+)
+from .histogram import LatencyHistogram, LatencyRecorder
+from .instances import InstanceState, instance_name_from_url, make_instances
+from .limits import AimdLimit, FixedLimit, GradientLimit, make_limit
+from .mockserver import LatencyModel, MockInferServer, start_mock_fleet
+from .multiproc import MergedRun, run_sharded, split_evenly
+from .pacing import (
+    ClosedLoopPacing,
+    OpenLoopPacing,
+    ProfileClosedLoopPacing,
+    ProfileOpenLoopPacing,
+    make_pacing,
+    make_profile_pacing,
+    print_open_loop_latency,
+)
+from .preflight import (
+    ImageProbe,
+    PreflightReport,
+    preflight_urls,
+    print_image_size_report,
+    print_preflight_report,
+    probe_url,
+    size_latency_correlation,
+)
+from .profiles import (
+    PROFILES,
+    LoadProfile,
+    RampProfile,
+    SineProfile,
+    SoakProfile,
+    SpikeProfile,
+    StepProfile,
+    make_profile,
+    profile_target,
+)
+from .provisioning import (
+    BACKENDS,
+    FakeComputeBackend,
+    FleetProvisioner,
+    GcloudBackend,
+    InstanceSpec,
+    ProvisionedInstance,
+    ProvisioningReport,
+    fleet_specs,
+    instance_from_gcloud,
+    instance_metadata,
+    make_backend,
+    print_provisioning_report,
+)
+from .readiness import (
+    BOOT_TIMINGS_PATH,
+    ReadinessGate,
+    ReadinessProbe,
+    ReadinessReport,
+    boot_timings_url,
+    fetch_boot_timings,
+    format_boot_phases,
+    print_readiness_report,
+    warmup_infer,
+)
+from .replay import ReplayPacing, TraceWorkload, iter_trace, parse_time
+from .response import InferResponseScanner, read_infer_response
+from .saturation import KneeResult, LoadWindow, detect_knee, print_saturation_report, window_stats
+from .sink import CsvSink, JsonlSink, ParquetSink, ResultSink, make_sink
+from .stats import format_percentiles, percentile, print_histogram_statistics, print_summary_statistics
+from .store import DEFAULT_RESULTS_DB, ResultStore, pacing_mode, record_run
+from .targets import (
+    ROUTING_POLICIES,
+    LeastOutstandingTargets,
+    PeakEwmaTargets,
+    PinnedTarget,
+    PowerOfTwoTargets,
+    RoundRobinTargets,
+    WeightedRoundRobinTargets,
+    make_targets,
+)
+from .tracing import PHASE_FIELDS, RequestTracer, network_overhead, phase_breakdown, print_phase_breakdown
+from .workload import (
+    DEFAULT_PROMPT_MODE,
+    FixedUrlWorkload,
+    QueueWorkload,
+    RandomUrlWorkload,
+    build_payload,
+    load_urls_from_file,
+)
+
+__all__ = [
+    "API_ENDPOINT",
+    "BACKENDS",
+    "BOOT_PHASE_MARKER",
+    "BOOT_TIMINGS_PATH",
+    "DEFAULT_PROMPT_MODE",
+    "DEFAULT_REFRESH_INTERVAL",
+    "DEFAULT_REQUEST_TIMEOUT",
+    "DEFAULT_RESULTS_DB",
+    "DISCOVERY_SOURCES",
+    "PHASE_FIELDS",
+    "PROFILES",
+    "ROUTING_POLICIES",
+    "SERVER_COLUMNS",
+    "AimdLimit",
+    "BootPhaseStats",
+    "BootTimeReport",
+    "CapacityPoint",
+    "ClosedLoopPacing",
+    "Comparison",
+    "ConnectionPool",
+    "CsvSink",
+    "DynamicFleet",
+    "FakeComputeBackend",
+    "FixedLimit",
+    "FixedUrlWorkload",
+    "FleetFileSource",
+    "FleetProvisioner",
+    "GcloudBackend",
+    "GcloudListSource",
+    "GradientLimit",
+    "ImageProbe",
+    "InferResponseScanner",
+    "InstanceSpec",
+    "InstanceState",
+    "JsonlSink",
+    "KneeResult",
+    "Lane",
+    "LatencyHistogram",
+    "LatencyModel",
+    "LatencyRecorder",
+    "LeastOutstandingTargets",
+    "LiveDashboard",
+    "LoadEngine",
+    "LoadProfile",
+    "LoadWindow",
+    "MergedRun",
+    "MockInferServer",
+    "OpenLoopPacing",
+    "ParquetSink",
+    "PeakEwmaTargets",
+    "PinnedTarget",
+    "PowerOfTwoTargets",
+    "PreflightReport",
+    "ProfileClosedLoopPacing",
+    "ProfileOpenLoopPacing",
+    "ProvisionedInstance",
+    "ProvisioningReport",
+    "QueueWorkload",
+    "RampProfile",
+    "RandomUrlWorkload",
+    "ReadinessGate",
+    "ReadinessProbe",
+    "ReadinessReport",
+    "Recommendation",
+    "RegistryFileSource",
+    "ReplayPacing",
+    "RequestTracer",
+    "ResultColumns",
+    "ResultFrame",
+    "ResultSink",
+    "ResultStore",
+    "RoundRobinTargets",
+    "SineProfile",
+    "SoakProfile",
+    "SpikeProfile",
+    "StaticSource",
+    "StepProfile",
+    "Summary",
+    "TraceWorkload",
+    "UrlIndex",
+    "UslModel",
+    "WeightedRoundRobinTargets",
+    "boot_log_paths",
+    "boot_timings_url",
+    "bootstrap_difference",
+    "build_payload",
+    "compare_frames",
+    "config_file_path",
+    "deployment_metadata",
+    "detect_knee",
+    "extract_pulover_urls_from_csv",
+    "extract_server_timing",
+    "fetch_boot_timings",
+    "fetch_fleet_boot_timings",
+    "fit_usl",
+    "fleet_specs",
+    "format_boot_phases",
+    "format_percentiles",
+    "image_digest",
+    "instance_from_gcloud",
+    "instance_metadata",
+    "instance_name_from_url",
+    "instance_url",
+    "iter_trace",
+    "load_boot_logs",
+    "load_url_index",
+    "load_urls_from_file",
+    "make_backend",
+    "make_discovery",
+    "make_instances",
+    "make_limit",
+    "make_pacing",
+    "make_profile",
+    "make_profile_pacing",
+    "make_sink",
+    "make_targets",
+    "mann_whitney_u",
+    "network_overhead",
+    "pacing_mode",
+    "parse_boot_line",
+    "parse_boot_log",
+    "parse_time",
+    "percentile",
+    "phase_breakdown",
+    "preflight_urls",
+    "print_boot_time_report",
+    "print_connection_statistics",
+    "print_fleet_changes",
+    "print_histogram_statistics",
+    "print_image_size_report",
+    "print_open_loop_latency",
+    "print_phase_breakdown",
+    "print_preflight_report",
+    "print_provisioning_report",
+    "print_readiness_report",
+    "print_saturation_report",
+    "print_summary_statistics",
+    "probe_url",
+    "profile_target",
+    "read_deployment_config",
+    "read_infer_response",
+    "recommend",
+    "record_run",
+    "run_sharded",
+    "save_boot_logs",
+    "short_image_name",
+    "size_latency_correlation",
+    "split_evenly",
+    "start_mock_fleet",
+    "summarize",
+    "throughput_series",
+    "warmup_infer",
+    "window_stats",
+    "write_deployment_config",
+]
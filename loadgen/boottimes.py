@@ -0,0 +1,197 @@
+"""
+Boot phase timing collection for the Mannequin Segmenter fleet
+A startup scriptek fázisonként egy JSON sort írnak (/var/www/boot/timings.jsonl, illetve
+"BOOT_PHASE {...}" sorként a soros konzol / journal naplóba). Ez a modul beolvassa ezeket
+mentett naplófájlokból vagy élő VM-ekről, és fázisonként összesíti a fleet-re (medián, max).
+"""
+
+import asyncio
+import glob
+import json
+import os
+
+import aiohttp
+import numpy as np
+
+from .columns import summarize
+from .readiness import fetch_boot_timings
+from .stats import percentile
+
+BOOT_PHASE_MARKER = "BOOT_PHASE "
+TOTAL_PHASE = "total"           # A teljes startup script idő (külön sor a riportban)
+LOG_PATTERNS = ("*.jsonl", "*.log", "*.txt")   # Könyvtár megadásakor ezek a fájlok olvasódnak
+
+
+def parse_boot_line(line):
+    """Egy fázis rekord (dict) egy napló sorból: tiszta JSON vagy "... BOOT_PHASE {...}"; különben None"""
+    line = line.strip()
+    marker = line.find(BOOT_PHASE_MARKER)
+    if marker >= 0:
+        line = line[marker + len(BOOT_PHASE_MARKER):].strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or "phase" not in record:
+        return None
+    return record
+
+
+def parse_boot_log(lines, default_host=None):
+    """host -> fázis rekordok; újraindult VM-nél (új vm_boot sor) csak az utolsó boot marad"""
+    hosts = {}
+    for line in lines:
+        record = parse_boot_line(line)
+        if record is None:
+            continue
+        host = record.setdefault("host", default_host)
+        if record["phase"] == "vm_boot" or host not in hosts:
+            hosts[host] = []
+        hosts[host].append(record)
+    return hosts
+
+
+def boot_log_paths(paths):
+    """Fájlok, könyvtárak (LOG_PATTERNS) és glob minták kibontása, rendezve, ismétlés nélkül"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in LOG_PATTERNS:
+                found.extend(glob.glob(os.path.join(path, pattern)))
+        elif glob.has_magic(path):
+            found.extend(glob.glob(path))
+        else:
+            found.append(path)
+    return sorted(set(found))
+
+
+def load_boot_logs(paths):
+    """host -> fázis rekordok a mentett naplókból; a host mező hiányában a fájl neve a host"""
+    hosts = {}
+    for path in boot_log_paths(paths):
+        default_host = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            hosts.update(parse_boot_log(f, default_host))
+    return hosts
+
+
+async def fetch_fleet_boot_timings(urls):
+    """host -> fázis rekordok az élő VM-ekről (nginx /boot/timings.jsonl, párhuzamosan); elérhetetlen VM: kimarad"""
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(*(fetch_boot_timings(session, url) for url in urls))
+    hosts = {}
+    for url, phases in zip(urls, results):
+        if phases:
+            hosts.update(parse_boot_log((json.dumps(phase) for phase in phases), url))
+    return hosts
+
+
+def save_boot_logs(hosts, directory):
+    """Hostonként egy <host>.jsonl a könyvtárba (később load_boot_logs-szal újra riportolható)"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for host, phases in hosts.items():
+        name = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(host))
+        path = os.path.join(directory, f"{name}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for phase in phases:
+                f.write(json.dumps(phase) + "\n")
+        paths.append(path)
+    return paths
+
+
+class BootPhaseStats:
+    """Egy fázis a fleet-en: lefutott (ok) idők összesítése, státuszok száma, leglassabb host"""
+
+    def __init__(self, phase):
+        self.phase = phase
+        self.durations = []
+        self.hosts = []
+        self.statuses = {}
+
+    def add(self, host, record):
+        status = record.get("status", "ok")
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status == "ok" and record.get("seconds") is not None:
+            self.durations.append(float(record["seconds"]))
+            self.hosts.append(host)
+
+    @property
+    def summary(self):
+        """Summary az ok idők felett (None, ha egyik hoston sem futott le)"""
+        return summarize(np.asarray(self.durations, dtype=float), quantiles=(50, 90))
+
+    @property
+    def slowest_host(self):
+        if not self.durations:
+            return None
+        return self.hosts[int(np.argmax(self.durations))]
+
+
+class BootTimeReport:
+    """A fleet boot fázisai: fázisonkénti statisztika (első előfordulás sorrendjében) és hostonkénti teljes idő"""
+
+    def __init__(self, hosts):
+        self.hosts = hosts
+        self.phases = {}
+        for host, records in hosts.items():
+            for record in records:
+                phase = record["phase"]
+                if phase not in self.phases:
+                    self.phases[phase] = BootPhaseStats(phase)
+                self.phases[phase].add(host, record)
+
+    def phase_stats(self):
+        """A fázisok a teljes idő (total) nélkül"""
+        return [stats for name, stats in self.phases.items() if name != TOTAL_PHASE]
+
+    def totals(self):
+        """host -> teljes startup script idő; total sor híján a vm_boot utáni fázisok összege"""
+        totals = {}
+        for host, records in self.hosts.items():
+            total = next((r for r in records if r["phase"] == TOTAL_PHASE and r.get("status") == "ok"), None)
+            if total is not None:
+                totals[host] = float(total["seconds"])
+            elif records:
+                totals[host] = sum(float(r.get("seconds") or 0) for r in records if r["phase"] != "vm_boot")
+        return totals
+
+    def failed(self):
+        """host -> az első failed fázis neve"""
+        failed = {}
+        for host, records in self.hosts.items():
+            phase = next((r["phase"] for r in records if r.get("status") == "failed"), None)
+            if phase is not None:
+                failed[host] = phase
+        return failed
+
+
+def print_boot_time_report(report, slowest=3):
+    """Fleet boot riport: fázisonként medián / p90 / max (leglassabb host), cached / skipped / failed darab,
+    a teljes startup script idő és a leglassabb VM-ek"""
+    print(f"\n🥾 BOOT FÁZISOK ({len(report.hosts)} VM)")
+    for stats in report.phase_stats():
+        summary = stats.summary
+        others = ", ".join(f"{status} {count}" for status, count in sorted(stats.statuses.items()) if status != "ok")
+        if summary:
+            line = (f"   🔹 {stats.phase:<16s} medián {summary.median:7.1f}s, p90 {summary.quantiles[90]:7.1f}s, "
+                    f"max {summary.max:7.1f}s ({stats.slowest_host}), {summary.count} VM")
+        else:
+            line = f"   🔹 {stats.phase:<16s} nem futott"
+        print(line + (f" [{others}]" if others else ""))
+
+    totals = report.totals()
+    if totals:
+        values = sorted(totals.values())
+        print(f"\n⏱️  TELJES STARTUP SCRIPT IDŐ")
+        print(f"   🔹 Medián: {percentile(values, 50):.1f}s, max: {values[-1]:.1f}s, min: {values[0]:.1f}s")
+        for host, seconds in sorted(totals.items(), key=lambda item: -item[1])[:slowest]:
+            print(f"   🐢 {host}: {seconds:.1f}s")
+
+    failed = report.failed()
+    if failed:
+        print(f"\n❌ SIKERTELEN BOOT")
+        for host, phase in failed.items():
+            print(f"   🔹 {host}: {phase}")
@@ -0,0 +1,146 @@
+"""
+Capacity model for the Mannequin Segmenter fleet
+Egy instance különböző konkurencia szinteken mért throughput-jára Universal
+Scalability Law (USL) illesztés, ebből p99 becslés (Little törvény + mért farok
+arány), és instance szám / konkurencia ajánlás cél RPS-hez p99 SLO mellett.
+"""
+
+import math
+
+import numpy as np
+
+DEFAULT_TARGET_UTILIZATION = 0.8   # Az instance-ok a becsült max throughput ennyi részén fussanak (tartalék)
+MAX_SEARCHED_CONCURRENCY = 64
+
+
+class CapacityPoint:
+    """Egy mérési pont: konkurencia (egyidejű kérés / instance), throughput, átlag és p99 válaszidő"""
+
+    def __init__(self, concurrency, throughput, mean_latency, p99):
+        self.concurrency = concurrency
+        self.throughput = throughput
+        self.mean_latency = mean_latency
+        self.p99 = p99
+
+    @classmethod
+    def from_frame(cls, concurrency, frame, warmup=0.0):
+        """Pont egy futás eredményeiből (a warmup másodpercen belül induló kérések nélkül); None, ha kevés a minta"""
+        if warmup and len(frame):
+            frame = frame.where(frame["start"] >= frame["start"].min() + warmup)
+        successful = frame.successful()
+        summary = successful.summary(quantiles=(99,))
+        throughput = successful.throughput()
+        if summary is None or not throughput:
+            return None
+        return cls(concurrency, throughput, summary.mean, summary.quantiles[99])
+
+
+class UslModel:
+    """X(N) = λN / (1 + σ(N-1) + κN(N-1)) - λ: egy kérés/s egyedül, σ: versengés, κ: koherencia költség"""
+
+    def __init__(self, lam, sigma, kappa, tail_points=()):
+        self.lam = lam
+        self.sigma = sigma
+        self.kappa = kappa
+        # (konkurencia, p99 / átlag) párok a farok becsléséhez
+        self.tail_points = sorted(tail_points)
+
+    def throughput(self, concurrency):
+        n = np.asarray(concurrency, dtype=np.float64)
+        return self.lam * n / (1 + self.sigma * (n - 1) + self.kappa * n * (n - 1))
+
+    def mean_latency(self, concurrency):
+        """Little törvény zárt hurokban: R(N) = N / X(N)"""
+        return np.asarray(concurrency, dtype=np.float64) / self.throughput(concurrency)
+
+    def tail_ratio(self, concurrency):
+        """p99 / átlag a mért pontok között lineárisan interpolálva (a széleken konstans)"""
+        if not self.tail_points:
+            return np.ones_like(np.asarray(concurrency, dtype=np.float64))
+        levels, ratios = zip(*self.tail_points)
+        return np.interp(concurrency, levels, ratios)
+
+    def p99(self, concurrency):
+        return self.mean_latency(concurrency) * self.tail_ratio(concurrency)
+
+    @property
+    def peak_concurrency(self):
+        """A throughput maximumhelye: N* = sqrt((1 - σ) / κ) (κ = 0 esetén nincs csúcs)"""
+        if self.kappa <= 0:
+            return math.inf
+        return math.sqrt(max(0.0, 1 - self.sigma) / self.kappa)
+
+    def fitted_errors(self, points):
+        """Relatív illesztési hibák a mért throughput-hoz képest"""
+        return [float(self.throughput(p.concurrency) / p.throughput - 1) for p in points]
+
+
+def _best_fit(n, throughput, sigmas, kappas):
+    """Rács keresés (σ, κ) felett; adott (σ, κ)-hoz az optimális λ zárt alakban (relatív hibára)"""
+    sigma = sigmas[:, None, None]
+    kappa = kappas[None, :, None]
+    shape = n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+    ratio = shape / throughput                                     # X_modell / X_mért = λ * ratio
+    lam = (ratio.sum(axis=2) / (ratio * ratio).sum(axis=2))[:, :, None]
+    errors = ((lam * ratio - 1) ** 2).sum(axis=2)
+    i, j = np.unravel_index(np.argmin(errors), errors.shape)
+    return float(lam[i, j, 0]), float(sigmas[i]), float(kappas[j])
+
+
+def fit_usl(points):
+    """USL illesztés a relatív throughput hibák négyzetösszegére (σ, κ >= 0):
+    durva rács, majd finomítás a legjobb pont körül"""
+    points = [p for p in points if p.throughput > 0]
+    if len({p.concurrency for p in points}) < 2:
+        raise ValueError("fit_usl: legalább két különböző konkurencia szint kell")
+    n = np.array([p.concurrency for p in points], dtype=np.float64)
+    throughput = np.array([p.throughput for p in points], dtype=np.float64)
+
+    kappas = np.concatenate([[0.0], np.logspace(-6, 0, 240)])
+    lam, sigma, kappa = _best_fit(n, throughput, np.linspace(0, 1, 201), kappas)
+    fine_kappas = np.concatenate([[0.0], np.linspace(kappa * 0.9, kappa * 1.1, 81)]) if kappa else kappas[:40]
+    lam, sigma, kappa = _best_fit(
+        n, throughput, np.clip(np.linspace(sigma - 0.005, sigma + 0.005, 81), 0, 1), fine_kappas,
+    )
+
+    tail_points = [(p.concurrency, p.p99 / p.mean_latency) for p in points if p.mean_latency > 0]
+    return UslModel(lam, sigma, kappa, tail_points)
+
+
+class Recommendation:
+    """Ajánlás: instance szám és instance-onkénti konkurencia a cél RPS-hez"""
+
+    def __init__(self, instances, concurrency, per_instance_rps, predicted_p99, target_rps, p99_slo, utilization):
+        self.instances = instances
+        self.concurrency = concurrency
+        self.per_instance_rps = per_instance_rps      # Becsült max throughput az ajánlott konkurencián
+        self.predicted_p99 = predicted_p99
+        self.target_rps = target_rps
+        self.p99_slo = p99_slo
+        self.utilization = utilization
+
+    @property
+    def fleet_rps(self):
+        """Becsült fleet kapacitás (tartalék nélkül)"""
+        return self.instances * self.per_instance_rps
+
+
+def recommend(model, target_rps, p99_slo, utilization=DEFAULT_TARGET_UTILIZATION,
+              max_concurrency=MAX_SEARCHED_CONCURRENCY):
+    """A legnagyobb throughput-ot adó konkurencia, aminél a becsült p99 <= SLO; None, ha egyik sem felel meg
+
+    Az instance szám úgy adódik, hogy a cél RPS az instance-ok kapacitásának legfeljebb
+    utilization részét terhelje (a nyílt hurkú sorban állás ne vigye el a p99-et).
+    """
+    levels = np.arange(1, max_concurrency + 1)
+    throughput = model.throughput(levels)
+    p99 = model.p99(levels)
+    feasible = np.flatnonzero(p99 <= p99_slo)
+    if not len(feasible):
+        return None
+    best = feasible[np.argmax(throughput[feasible])]
+    per_instance_rps = float(throughput[best])
+    instances = max(1, math.ceil(target_rps / (per_instance_rps * utilization)))
+    return Recommendation(
+        instances, int(levels[best]), per_instance_rps, float(p99[best]), target_rps, p99_slo, utilization,
+    )
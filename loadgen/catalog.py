@@ -0,0 +1,217 @@
+"""
+Streaming CSV URL indexer for the product catalogue (data_for_categorisation.csv)
+Egyetlen streamelt menetben kigyűjti a kulcsszó + végződés szerinti kép URL-eket
+egy bináris index fájlba, amit a következő futások mmap-pel olvasnak vissza,
+amíg a CSV nem változik.
+"""
+
+import csv
+import hashlib
+import mmap
+import os
+import random
+import struct
+
+PULOVER_KEYWORDS = ("pulover", "пуловери")
+DEFAULT_SUFFIX = "b.jpg"
+
+NAME_COLUMN = 1
+URL_COLUMN = 2
+
+INDEX_MAGIC = b"LGURLIX1"
+# magic, CSV méret, CSV mtime_ns, ujjlenyomat, találatok száma, kulcs hossza
+_HEADER = struct.Struct("<8sQQ32sQI")
+_OFFSET = struct.Struct("<Q")
+FINGERPRINT_CHUNK = 1024 * 1024    # Ennyi bájt az elejéről és a végéről kerül a hash-be
+
+
+def index_key(keywords, suffix):
+    """Index kulcs, pl. 'pulover|пуловери+b.jpg'"""
+    return "|".join(keywords) + "+" + suffix
+
+
+def default_index_path(csv_file, keywords, suffix):
+    """Index fájl a CSV mellett, kulcsonként külön fájl"""
+    digest = hashlib.sha1(index_key(keywords, suffix).encode("utf-8")).hexdigest()[:12]
+    return f"{csv_file}.{keywords[0]}-{suffix}.{digest}.idx"
+
+
+def csv_fingerprint(csv_file, size=None):
+    """Olcsó tartalom hash: méret + első és utolsó FINGERPRINT_CHUNK bájt
+    (multi-GB fájlnál sem kell végigolvasni)"""
+    if size is None:
+        size = os.path.getsize(csv_file)
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    with open(csv_file, "rb") as f:
+        digest.update(f.read(FINGERPRINT_CHUNK))
+        if size > 2 * FINGERPRINT_CHUNK:
+            f.seek(size - FINGERPRINT_CHUNK)
+            digest.update(f.read(FINGERPRINT_CHUNK))
+        else:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def _iter_rows(f):
+    """(sor kezdő offset, nyers sor) párok bináris fájlból; az idézőjeles mezőkben
+    lévő sortöréseket összefűzi, hogy egy rekord egy elem legyen"""
+    offset = 0
+    pending = b""
+    pending_offset = 0
+    for line in f:
+        if not pending:
+            pending_offset = offset
+        pending += line
+        offset += len(line)
+        # Páratlan számú idézőjel = nyitott mező, a rekord a következő sorban folytatódik
+        if pending.count(b'"') % 2:
+            continue
+        yield pending_offset, pending
+        pending = b""
+    if pending:
+        yield pending_offset, pending
+
+
+def scan_csv(csv_file, keywords=PULOVER_KEYWORDS, suffix=DEFAULT_SUFFIX):
+    """Egy menetes, streamelt szűrés: (sor offset, URL) párok a CSV sorrendjében"""
+    suffix_bytes = suffix.encode("utf-8")
+    keywords = tuple(k.lower() for k in keywords)
+    with open(csv_file, "rb") as f:
+        rows = _iter_rows(f)
+        next(rows, None)  # Skip header
+        for row_offset, raw in rows:
+            # Gyors előszűrés bájtokon: a végződésnek szerepelnie kell a sorban
+            if suffix_bytes not in raw:
+                continue
+            text = raw.decode("utf-8", errors="replace")
+            parts = next(csv.reader([text]), None)
+            if not parts or len(parts) <= max(NAME_COLUMN, URL_COLUMN):
+                continue
+            full_name = parts[NAME_COLUMN].lower()
+            image_url = parts[URL_COLUMN].strip()
+            if image_url.endswith(suffix) and any(k in full_name for k in keywords):
+                yield row_offset, image_url
+
+
+def build_url_index(csv_file, index_file, keywords=PULOVER_KEYWORDS, suffix=DEFAULT_SUFFIX):
+    """Index fájl írása (atomikusan): fejléc, sor offsetek, URL offsetek, URL blob"""
+    stat = os.stat(csv_file)
+    row_offsets = []
+    url_offsets = [0]
+    blob = bytearray()
+    for row_offset, url in scan_csv(csv_file, keywords, suffix):
+        row_offsets.append(row_offset)
+        blob += url.encode("utf-8")
+        url_offsets.append(len(blob))
+
+    key = index_key(keywords, suffix).encode("utf-8")
+    tmp_file = f"{index_file}.tmp{os.getpid()}"
+    with open(tmp_file, "wb") as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns,
+                             csv_fingerprint(csv_file, stat.st_size), len(row_offsets), len(key)))
+        f.write(key)
+        f.write(struct.pack(f"<{len(row_offsets)}Q", *row_offsets))
+        f.write(struct.pack(f"<{len(url_offsets)}Q", *url_offsets))
+        f.write(blob)
+    os.replace(tmp_file, index_file)
+
+
+class UrlIndex:
+    """Memory-mapped, csak olvasható URL index: len(), index[i], sample()"""
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        with open(index_file, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.source_size, self.source_mtime_ns, self.source_fingerprint,
+         self.count, key_length) = _HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            self._map.close()
+            raise ValueError(f"UrlIndex: ismeretlen index formátum: {index_file}")
+        self.key = self._map[_HEADER.size:_HEADER.size + key_length].decode("utf-8")
+        self._rows_start = _HEADER.size + key_length
+        self._urls_start = self._rows_start + self.count * _OFFSET.size
+        self._blob_start = self._urls_start + (self.count + 1) * _OFFSET.size
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return self.count
+
+    def _url_span(self, i):
+        start = _OFFSET.unpack_from(self._map, self._urls_start + i * _OFFSET.size)[0]
+        end = _OFFSET.unpack_from(self._map, self._urls_start + (i + 1) * _OFFSET.size)[0]
+        return self._blob_start + start, self._blob_start + end
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("UrlIndex index out of range")
+        start, end = self._url_span(i)
+        return self._map[start:end].decode("utf-8")
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def row_offset(self, i):
+        """A találat sorának bájt offsetje a CSV-ben"""
+        return _OFFSET.unpack_from(self._map, self._rows_start + i * _OFFSET.size)[0]
+
+    def sample(self, count, rng=random):
+        """count darab különböző URL véletlenszerűen (csak a kiválasztottak dekódolódnak)"""
+        return [self[i] for i in rng.sample(range(self.count), count)]
+
+    def is_fresh(self, csv_file):
+        """Érvényes-e még az index: méret + mtime egyezés, mtime eltérésnél tartalom hash"""
+        stat = os.stat(csv_file)
+        if stat.st_size != self.source_size:
+            return False
+        if stat.st_mtime_ns == self.source_mtime_ns:
+            return True
+        return csv_fingerprint(csv_file, stat.st_size) == self.source_fingerprint
+
+
+def load_url_index(csv_file, keywords=PULOVER_KEYWORDS, suffix=DEFAULT_SUFFIX, index_file=None):
+    """Meglévő, friss index megnyitása, különben újraépítés a CSV-ből"""
+    if index_file is None:
+        index_file = default_index_path(csv_file, keywords, suffix)
+    if os.path.exists(index_file):
+        try:
+            index = UrlIndex(index_file)
+            if index.key == index_key(keywords, suffix) and index.is_fresh(csv_file):
+                return index
+            index.close()
+        except (ValueError, struct.error):
+            pass  # Sérült / régi formátum - újraépítjük
+    print(f"📖 CSV indexelése: {csv_file}")
+    build_url_index(csv_file, index_file, keywords, suffix)
+    return UrlIndex(index_file)
+
+
+def extract_pulover_urls_from_csv(csv_file, count=None):
+    """Kiválaszt random pulover URL-eket a CSV-ből (count=None: az összeset, CSV sorrendben)"""
+    try:
+        index = load_url_index(csv_file)
+    except Exception as e:
+        print(f"❌ Hiba a CSV olvasásakor: {e}")
+        return []
+
+    try:
+        print(f"🔍 Összesen talált pulover képek ({DEFAULT_SUFFIX}): {len(index)}")
+
+        # Random kiválasztás
+        if count is None:
+            return list(index)
+        if len(index) < count:
+            print(f"⚠️  Csak {len(index)} kép elérhető, az összeset használjuk")
+            selected_urls = list(index)
+        else:
+            selected_urls = index.sample(count)
+
+        print(f"✅ Kiválasztott képek száma: {len(selected_urls)}")
+        return selected_urls
+    finally:
+        index.close()
@@ -0,0 +1,222 @@
+"""
+Columnar result storage and vectorised post-run analysis for the load generators
+A kérésenkénti eredmények dict-ek helyett oszloponként (array) gyűlnek; a riport
+numpy-val, egy menetben számol összesítést, instance-onkénti bontást, outlier-eket
+és bemelegedési elemzést - milliós mintaszámnál is másodperc alatt.
+"""
+
+import math
+from array import array
+
+import numpy as np
+
+DEFAULT_QUANTILES = (50, 90, 99, 99.9)
+
+# Szerver timing oszlopok: oszlop neve -> eredmény kulcs
+SERVER_COLUMNS = (
+    ("model_inference", "server_model_inference"),
+    ("gcs_total", "server_gcs_total"),
+    ("image_conversion", "server_image_conversion"),
+    ("gcs_upload", "server_gcs_upload"),
+    ("total_request", "server_total_request"),
+)
+
+# Oszlop neve -> (eredmény kulcs, array típus); hiányzó érték: NaN, illetve 0 / -1
+COLUMNS = (
+    ("task_id", "task_id", "q"),
+    ("instance", "instance_id", "q"),
+    ("start", "timestamp", "d"),
+    ("ttfb", "client_ttfb", "d"),
+    ("ttlb", "client_ttlb", "d"),
+    ("response_time", "response_time", "d"),
+    ("status", "status_code", "q"),
+    ("success", "success", "b"),
+    ("image_bytes", "image_bytes", "d"),      # Pre-flight képméret (NaN, ha nem ismert)
+) + tuple((name, key, "d") for name, key in SERVER_COLUMNS)
+
+_MISSING = {"q": -1, "d": math.nan, "b": 0}
+_DTYPES = {"q": np.int64, "d": np.float64, "b": np.int8}
+
+
+class ResultColumns:
+    """Gyűjtő: append(record) oszloponként tárol (engine columns= paraméterhez)"""
+
+    def __init__(self):
+        self._columns = {name: array(typecode) for name, _, typecode in COLUMNS}
+
+    def __len__(self):
+        return len(self._columns["start"])
+
+    def append(self, record):
+        for name, key, typecode in COLUMNS:
+            value = record.get(key)
+            self._columns[name].append(_MISSING[typecode] if value is None else value)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+        return self
+
+    @classmethod
+    def from_records(cls, records):
+        return cls().extend(records)
+
+    def merge(self, other):
+        """Másik gyűjtő (pl. másik process) oszlopainak hozzáfűzése"""
+        for name, column in other._columns.items():
+            self._columns[name].extend(column)
+        return self
+
+    def frame(self):
+        """Numpy pillanatkép az eddig gyűjtött oszlopokról (egy memcpy oszloponként,
+        így a gyűjtés futás közben is folytatódhat)"""
+        return ResultFrame.from_arrays(self._columns)
+
+
+class Summary:
+    """Egy oszlop összesítése: darab, min/max, átlag, medián, szórás, CV, percentilisek"""
+
+    def __init__(self, count, minimum, maximum, mean, stdev, quantiles):
+        self.count = count
+        self.min = minimum
+        self.max = maximum
+        self.mean = mean
+        self.stdev = stdev
+        self.quantiles = quantiles
+        self.median = quantiles.get(50)
+
+    @property
+    def cv(self):
+        """Relatív szórás százalékban (None, ha az átlag 0)"""
+        if not self.mean or self.count < 2:
+            return None
+        return self.stdev / self.mean * 100
+
+    def format_quantiles(self):
+        return " / ".join(f"p{q:g} {value:.3f}s" for q, value in self.quantiles.items())
+
+
+def _sorted_quantiles(sorted_values, quantiles):
+    """Percentilisek rendezett tömbből, lineáris interpolációval (mint a statistics.median)"""
+    n = len(sorted_values)
+    ranks = (n - 1) * np.asarray(quantiles, dtype=np.float64) / 100.0
+    low = np.floor(ranks).astype(np.int64)
+    high = np.ceil(ranks).astype(np.int64)
+    values = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (ranks - low)
+    return dict(zip(quantiles, values.tolist()))
+
+
+def summarize(values, quantiles=DEFAULT_QUANTILES):
+    """Summary egy numpy tömbből (NaN-ok nélkül); üres tömbre None"""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    sorted_values = np.sort(values)
+    quantiles = tuple(sorted(set(quantiles) | {50}))
+    stdev = float(np.std(sorted_values, ddof=1)) if len(values) > 1 else 0.0
+    return Summary(
+        len(values), float(sorted_values[0]), float(sorted_values[-1]),
+        float(sorted_values.mean()), stdev, _sorted_quantiles(sorted_values, quantiles),
+    )
+
+
+class ResultFrame:
+    """Oszlopos eredmények numpy tömbökben; a szűrés új frame-et ad"""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_arrays(cls, data):
+        """Frame oszlop név -> szekvencia dict-ből, a COLUMNS típusaival (None -> NaN)"""
+        return cls({
+            name: np.array(data[name], dtype=_DTYPES[typecode])
+            for name, _, typecode in COLUMNS
+        })
+
+    def __len__(self):
+        return len(self.columns["start"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def end(self):
+        return self.columns["start"] + self.columns["response_time"]
+
+    def where(self, mask):
+        return ResultFrame({name: column[mask] for name, column in self.columns.items()})
+
+    def successful(self):
+        return self.where(self.columns["success"] == 1)
+
+    def has(self, column):
+        """Van-e legalább egy mért érték az oszlopban"""
+        return bool(len(self)) and not np.isnan(self.columns[column]).all()
+
+    def summary(self, column="response_time", quantiles=DEFAULT_QUANTILES):
+        return summarize(self.columns[column], quantiles)
+
+    def by_instance(self, column="response_time", quantiles=DEFAULT_QUANTILES):
+        """{instance_id: Summary} egyetlen rendezéssel (instance, érték) szerint"""
+        values = self.columns[column]
+        valid = ~np.isnan(values)
+        values = values[valid]
+        instances = self.columns["instance"][valid]
+        if not len(values):
+            return {}
+
+        order = np.lexsort((values, instances))
+        values = values[order]
+        instances = instances[order]
+        starts = np.flatnonzero(np.r_[True, instances[1:] != instances[:-1]])
+        counts = np.diff(np.r_[starts, len(values)])
+        sums = np.add.reduceat(values, starts)
+        squares = np.add.reduceat(values * values, starts)
+        means = sums / counts
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variances = np.where(counts > 1, (squares - sums * means) / (counts - 1), 0.0)
+        stdevs = np.sqrt(np.maximum(variances, 0.0))
+
+        # Csoportonkénti percentilisek: rang a csoporton belül + csoport eleje
+        quantiles = tuple(sorted(set(quantiles) | {50}))
+        ranks = (counts[:, None] - 1) * (np.asarray(quantiles) / 100.0)[None, :]
+        low = np.floor(ranks).astype(np.int64)
+        high = np.ceil(ranks).astype(np.int64)
+        low_values = values[starts[:, None] + low]
+        high_values = values[starts[:, None] + high]
+        quantile_values = low_values + (high_values - low_values) * (ranks - low)
+
+        ends = starts + counts - 1
+        return {
+            int(instances[start]): Summary(
+                int(counts[g]), float(values[start]), float(values[ends[g]]),
+                float(means[g]), float(stdevs[g]), dict(zip(quantiles, quantile_values[g].tolist())),
+            )
+            for g, start in enumerate(starts)
+        }
+
+    def counts_by_instance(self):
+        """{instance_id: darab}"""
+        ids, counts = np.unique(self.columns["instance"], return_counts=True)
+        return dict(zip(ids.tolist(), counts.tolist()))
+
+    def outliers(self, column="response_time", k=2.0):
+        """átlag + k * szórás feletti minták: (küszöb, indexek a frame-ben)"""
+        summary = self.summary(column)
+        if summary is None:
+            return None, np.empty(0, dtype=np.int64)
+        threshold = summary.mean + k * summary.stdev
+        return threshold, np.flatnonzero(self.columns[column] > threshold)
+
+    def in_start_order(self):
+        """Frame a kérések indulási sorrendjében (bemelegedési elemzéshez: első / utolsó N kérés)"""
+        return self.where(np.argsort(self.columns["start"], kind="stable"))
+
+    def throughput(self):
+        """Sikeres kérések / másodperc az első és utolsó sikeres indulás között"""
+        starts = self.successful().columns["start"]
+        if len(starts) < 2:
+            return None
+        span = float(starts.max() - starts.min())
+        return len(starts) / span if span > 0 else None
@@ -0,0 +1,186 @@
+"""
+Run-to-run regression comparison for the Mannequin Segmenter load generators
+Két elmentett futás összevetése: throughput (másodpercenkénti sikeres kérések,
+Mann-Whitney U próba) és p50 / p99 válaszidő (bootstrap konfidencia intervallum,
+illetve Mann-Whitney U) - a regresszió csak szignifikáns és érdemi eltérésnél jelez.
+"""
+
+import math
+
+import numpy as np
+
+DEFAULT_ALPHA = 0.05
+DEFAULT_RESAMPLES = 2000
+DEFAULT_MIN_CHANGE = 0.02        # Ennél kisebb relatív eltérés nem regresszió (nagy mintánál minden szignifikáns)
+DEFAULT_BIN_SECONDS = 1.0
+
+# Egy bootstrap batch-ben legfeljebb ennyi mintát sorsolunk (memória korlát)
+_BOOTSTRAP_BATCH_ELEMENTS = 4_000_000
+
+
+def _normal_sf(z):
+    """Standard normális eloszlás felső farka: P(Z > z)"""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def rank_data(values):
+    """Rangok 1-től, holtversenyben átlagrang"""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    return (ends - (counts - 1) / 2.0)[inverse]
+
+
+def mann_whitney_u(baseline, candidate, alternative="two-sided"):
+    """Mann-Whitney U próba normális közelítéssel (holtverseny- és folytonossági korrekcióval)
+
+    alternative: "greater" = a candidate jellemzően nagyobb, "less" = kisebb, "two-sided"
+    Visszaad: (U a candidate-re, p-érték); üres mintára (None, 1.0).
+    """
+    baseline = np.asarray(baseline, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    n1, n2 = len(baseline), len(candidate)
+    if not n1 or not n2:
+        return None, 1.0
+    combined = np.concatenate([baseline, candidate])
+    u = float(rank_data(combined)[n1:].sum() - n2 * (n2 + 1) / 2.0)
+
+    n = n1 + n2
+    _, counts = np.unique(combined, return_counts=True)
+    ties = float((counts ** 3 - counts).sum())
+    variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return u, 1.0
+    sigma = math.sqrt(variance)
+    mean = n1 * n2 / 2.0
+    if alternative == "greater":
+        p = _normal_sf((u - mean - 0.5) / sigma)
+    elif alternative == "less":
+        p = _normal_sf((mean - u - 0.5) / sigma)
+    else:
+        p = min(1.0, 2 * _normal_sf((abs(u - mean) - 0.5) / sigma))
+    return u, p
+
+
+def bootstrap_difference(baseline, candidate, statistic, resamples=DEFAULT_RESAMPLES, confidence=0.95, rng=None):
+    """Bootstrap a statistic(candidate) - statistic(baseline) különbségre
+
+    statistic: 2D tömbön soronként számoló függvény (pl. lambda x: np.percentile(x, 99, axis=1))
+    Visszaad: (megfigyelt különbség, CI alsó, CI felső, újramintavételezett különbségek)
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    baseline = np.asarray(baseline, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    observed = float(statistic(candidate[None, :])[0] - statistic(baseline[None, :])[0])
+
+    batch = max(1, _BOOTSTRAP_BATCH_ELEMENTS // max(len(baseline), len(candidate)))
+    differences = []
+    for done in range(0, resamples, batch):
+        size = min(batch, resamples - done)
+        base_sample = baseline[rng.integers(0, len(baseline), (size, len(baseline)))]
+        cand_sample = candidate[rng.integers(0, len(candidate), (size, len(candidate)))]
+        differences.append(statistic(cand_sample) - statistic(base_sample))
+    differences = np.concatenate(differences)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(differences, (tail, 100 - tail))
+    return observed, float(low), float(high), differences
+
+
+def throughput_series(frame, bin_seconds=DEFAULT_BIN_SECONDS):
+    """Sikeres befejezések száma / másodperc bin-enként (a csonka utolsó bin nélkül)"""
+    successful = frame.successful()
+    if len(successful) < 2:
+        return np.empty(0)
+    t0 = float(frame["start"].min())
+    ends = successful.end - t0
+    full_bins = int(float(frame.end.max() - t0) // bin_seconds)
+    if full_bins < 1:
+        return np.empty(0)
+    counts = np.bincount((ends // bin_seconds).astype(np.int64), minlength=full_bins)[:full_bins]
+    return counts / bin_seconds
+
+
+class Comparison:
+    """Egy metrika összevetése két futás között"""
+
+    def __init__(self, metric, unit, baseline, candidate, low, high, p_value, method, higher_is_better,
+                 alpha=DEFAULT_ALPHA, min_change=DEFAULT_MIN_CHANGE):
+        self.metric = metric
+        self.unit = unit
+        self.baseline = baseline
+        self.candidate = candidate
+        self.low = low              # A különbség (candidate - baseline) konfidencia intervalluma
+        self.high = high
+        self.p_value = p_value      # Egyoldali p-érték a romlás irányára
+        self.method = method
+        self.higher_is_better = higher_is_better
+        self.alpha = alpha
+        self.min_change = min_change
+
+    @property
+    def change(self):
+        """Relatív változás (candidate / baseline - 1), None, ha nem számolható"""
+        if self.baseline is None or self.candidate is None or not self.baseline:
+            return None
+        return self.candidate / self.baseline - 1
+
+    @property
+    def significant(self):
+        return self.p_value is not None and self.p_value < self.alpha
+
+    @property
+    def regression(self):
+        """Szignifikáns és legalább min_change mértékű romlás"""
+        change = self.change
+        if change is None or not self.significant:
+            return False
+        worse = -change if self.higher_is_better else change
+        return worse >= self.min_change
+
+
+def _one_sided_bootstrap_p(differences, worse_is_positive):
+    """A romlás hipotézisének bootstrap p-értéke: a különbségek mekkora része nem romlás"""
+    if worse_is_positive:
+        return float(np.mean(differences <= 0))
+    return float(np.mean(differences >= 0))
+
+
+def compare_frames(baseline, candidate, alpha=DEFAULT_ALPHA, min_change=DEFAULT_MIN_CHANGE,
+                   resamples=DEFAULT_RESAMPLES, bin_seconds=DEFAULT_BIN_SECONDS, rng=None):
+    """Throughput, p50 és p99 összevetése két ResultFrame között -> Comparison lista"""
+    rng = rng if rng is not None else np.random.default_rng(0)
+    comparisons = []
+    options = {"alpha": alpha, "min_change": min_change}
+
+    base_rates = throughput_series(baseline, bin_seconds)
+    cand_rates = throughput_series(candidate, bin_seconds)
+    if len(base_rates) and len(cand_rates):
+        _, p_value = mann_whitney_u(base_rates, cand_rates, alternative="less")
+        _, low, high, _ = bootstrap_difference(base_rates, cand_rates, lambda x: x.mean(axis=1), resamples, rng=rng)
+        comparisons.append(Comparison(
+            "throughput", "kérés/s", float(base_rates.mean()), float(cand_rates.mean()), low, high, p_value,
+            f"Mann-Whitney U ({bin_seconds:g}s bin-ek)", higher_is_better=True, **options,
+        ))
+
+    base_times = baseline.successful()["response_time"]
+    cand_times = candidate.successful()["response_time"]
+    base_times = base_times[~np.isnan(base_times)]
+    cand_times = cand_times[~np.isnan(cand_times)]
+    if len(base_times) and len(cand_times):
+        _, p_value = mann_whitney_u(base_times, cand_times, alternative="greater")
+        _, low, high, _ = bootstrap_difference(
+            base_times, cand_times, lambda x: np.median(x, axis=1), resamples, rng=rng,
+        )
+        comparisons.append(Comparison(
+            "p50", "s", float(np.median(base_times)), float(np.median(cand_times)), low, high, p_value,
+            "Mann-Whitney U", higher_is_better=False, **options,
+        ))
+
+        _, low, high, differences = bootstrap_difference(
+            base_times, cand_times, lambda x: np.percentile(x, 99, axis=1), resamples, rng=rng,
+        )
+        comparisons.append(Comparison(
+            "p99", "s", float(np.percentile(base_times, 99)), float(np.percentile(cand_times, 99)), low, high,
+            _one_sided_bootstrap_p(differences, worse_is_positive=True),
+            f"bootstrap ({resamples} újramintavételezés)", higher_is_better=False, **options,
+        ))
+    return comparisons
@@ -0,0 +1,114 @@
+"""
+Connection management for the Mannequin Segmenter load generators
+Instance-onként a konkurenciához méretezett keep-alive pool, DNS cache, és opcionálisan
+a futás előtt előre megnyitott kapcsolatok, hogy a TCP felépítés ne az első kérések
+válaszidejében jelenjen meg. Az új kapcsolatok felépítési idejét kérésenként a tracing
+modul méri (client_connect), itt csak a számlálók vannak.
+"""
+
+import asyncio
+import time
+
+import aiohttp
+
+from .stats import format_percentiles
+
+DEFAULT_KEEPALIVE_TIMEOUT = 60   # Üresjáratú kapcsolat megtartása (s) - a szerver oldali (nginx 75s) alatt
+DEFAULT_DNS_TTL = 300            # Feloldott címek cache ideje (s)
+PREWARM_PATH = "/health"         # Bármilyen HTTP válasz jó: csak a kapcsolat kell, ami a pool-ban marad
+PREWARM_TIMEOUT = 10
+
+
+class ConnectionPool:
+    """Közös connector beállítások + kapcsolat statisztika (új / újrahasznált / előre megnyitott)
+
+    per_host: max kapcsolat instance-onként (None = korlátlan), hosts: instance-ok száma a pool-ban,
+    prewarm: ennyi kapcsolat instance-onként a futás előtt (legfeljebb per_host)
+    """
+
+    def __init__(self, per_host=None, hosts=1, keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+                 dns_ttl=DEFAULT_DNS_TTL, prewarm=0, prewarm_path=PREWARM_PATH, prewarm_timeout=PREWARM_TIMEOUT):
+        self.per_host = per_host
+        self.hosts = hosts
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.prewarm = min(prewarm, per_host) if per_host else prewarm
+        self.prewarm_path = prewarm_path
+        self.prewarm_timeout = aiohttp.ClientTimeout(total=prewarm_timeout)
+
+        self.created = 0            # Futás közben létrehozott kapcsolatok
+        self.reused = 0             # Keep-alive kapcsolaton küldött kérések
+        self.prewarmed = 0          # Előre megnyitott kapcsolatok
+        self.prewarm_failed = 0
+        self.prewarm_seconds = 0.0
+        self._warming = False
+
+    def connector(self):
+        """Új TCPConnector a pool beállításaival (session-önként egy)"""
+        per_host = self.per_host or 0
+        return aiohttp.TCPConnector(
+            limit=per_host * self.hosts,
+            limit_per_host=per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_ttl,
+            enable_cleanup_closed=True,
+        )
+
+    def trace_configs(self):
+        """TraceConfig: új / újrahasznált kapcsolatok számlálása (az előre megnyitás nem számít)"""
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._on_create_end)
+        trace.on_connection_reuseconn.append(self._on_reuse)
+        return [trace]
+
+    async def _on_create_end(self, session, context, params):
+        if not self._warming:
+            self.created += 1
+
+    async def _on_reuse(self, session, context, params):
+        if not self._warming:
+            self.reused += 1
+
+    async def _open(self, session, url):
+        try:
+            async with session.get(url, timeout=self.prewarm_timeout) as response:
+                await response.read()
+            return True
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def warm(self, session, instances):
+        """prewarm darab egyidejű kérés instance-onként -> ennyi nyitott kapcsolat marad a pool-ban"""
+        if not self.prewarm or not instances:
+            return 0
+        self._warming = True
+        started = time.perf_counter()
+        try:
+            opened = await asyncio.gather(*(
+                self._open(session, instance.url + self.prewarm_path)
+                for instance in instances
+                for _ in range(self.prewarm)
+            ))
+        finally:
+            self._warming = False
+        self.prewarm_seconds += time.perf_counter() - started
+        self.prewarmed += sum(opened)
+        self.prewarm_failed += len(opened) - sum(opened)
+        return sum(opened)
+
+
+def print_connection_statistics(recorder, connections=None):
+    """Kapcsolat felépítés külön (a kérések válaszideje ezt is tartalmazza, ha új kapcsolatot nyitott)"""
+    connects = recorder.histogram("connect")
+    if not connects.count and not (connections and connections.prewarmed):
+        return
+
+    print(f"\n🔌 KAPCSOLATOK")
+    if connections is not None:
+        if connections.prewarm:
+            print(f"   🔹 Előre megnyitva: {connections.prewarmed} kapcsolat ({connections.prewarm_seconds:.3f}s alatt"
+                  f"{f', {connections.prewarm_failed} sikertelen' if connections.prewarm_failed else ''})")
+        print(f"   🔹 Futás közben új kapcsolat: {connections.created}, keep-alive újrahasználat: {connections.reused}")
+    if connects.count:
+        print(f"   🔹 Kapcsolat felépítés ({connects.count} kérésnél): {format_percentiles(connects)} / max {connects.max:.3f}s")
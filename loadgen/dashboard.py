@@ -0,0 +1,65 @@
+"""
+Rate-limited live dashboard for the Mannequin Segmenter load generators
+A kérésenkénti kiírás helyett egyetlen, fix időközönként frissülő státusz sor:
+a stdout költsége a kérés/sec-től független.
+"""
+
+import sys
+
+
+class LiveDashboard:
+    """Egy sor interval másodpercenként: kész / sikeres / hibás, aktuális kérés/sec,
+    p50 / p99 válaszidő, folyamatban lévő és várakozó kérések
+
+    TTY-n ugyanazt a sort írja felül (\\r), fájlba / pipe-ba soronként ír.
+    """
+
+    def __init__(self, engine, interval=1.0, total=None, stream=None):
+        self.engine = engine
+        self.interval = interval
+        self.total = total
+        self.stream = stream if stream is not None else sys.stdout
+        self.overwrite = self.stream.isatty()
+        self._last_completed = 0
+        self._last_elapsed = 0.0
+        self._width = 0
+
+    def line(self):
+        recorder = self.engine.recorder
+        elapsed = self.engine.elapsed()
+        completed = recorder.succeeded + recorder.failed
+        window = elapsed - self._last_elapsed
+        rate = (completed - self._last_completed) / window if window > 0 else 0.0
+        self._last_completed = completed
+        self._last_elapsed = elapsed
+
+        done = f"{completed}/{self.total}" if self.total else f"{completed}"
+        parts = [
+            f"📊 {elapsed:5.0f}s",
+            f"{done} kész ({recorder.succeeded} ✅ / {recorder.failed} ❌)",
+            f"{rate:.1f} kérés/s",
+        ]
+        histogram = recorder.histogram("client_total")
+        if histogram.count:
+            values = histogram.percentiles((50, 99))
+            parts.append(f"p50 {values[50]:.2f}s / p99 {values[99]:.2f}s")
+        in_flight = sum(instance.in_flight for instance in self.engine.instances)
+        parts.append(f"{in_flight} folyamatban, {self.engine.pending()} várakozik")
+        return " | ".join(parts)
+
+    def render(self, final=False):
+        text = self.line()
+        if self.overwrite:
+            # Rövidebb új sor esetén a régi maradékát letöröljük
+            padding = " " * max(0, self._width - len(text))
+            self._width = len(text)
+            self.stream.write("\r" + text + padding + ("\n" if final else ""))
+        else:
+            self.stream.write(text + "\n")
+        self.stream.flush()
+
+    async def run(self):
+        """A futás végéig frissít, a végén egy záró sort ír"""
+        while not await self.engine.wait_finished(self.interval):
+            self.render()
+        self.render(final=True)
@@ -0,0 +1,103 @@
+"""
+Deployment configuration access for the Mannequin Segmenter load generators
+A deploy szkriptek által is használt KEY=VALUE .conf fájl (pl. deployment-config.conf)
+beolvasása, hogy a mérések a tesztelt image-hez és géptípushoz köthetők legyenek.
+"""
+
+import os
+
+DEFAULT_CONFIG_FILE = "deployment-config.conf"
+
+
+def config_file_path(path=None):
+    """A deploy-gcp.sh logikája: explicit útvonal, CONFIG_FILE környezeti változó, deployment-config.conf"""
+    return path or os.environ.get("CONFIG_FILE") or DEFAULT_CONFIG_FILE
+
+
+def _parse_value(raw):
+    """Shell érték: idézőjelek le, sor végi # komment le (idézőjelen kívül)"""
+    raw = raw.strip()
+    if raw[:1] in ("'", '"'):
+        quote = raw[0]
+        end = raw.find(quote, 1)
+        return raw[1:end] if end != -1 else raw[1:]
+    return raw.split("#", 1)[0].strip()
+
+
+def read_deployment_config(path=None):
+    """{KULCS: érték} a .conf fájlból; hiányzó fájlra üres dict"""
+    path = config_file_path(path)
+    config = {}
+    if not os.path.exists(path):
+        return config
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, raw = line.split("=", 1)
+            key = key.strip()
+            if key.startswith("export "):
+                key = key[len("export "):].strip()
+            config[key] = _parse_value(raw)
+    return config
+
+
+def image_digest(image_uri):
+    """Build azonosító az IMAGE_URI-ből: sha256:... digest, ennek hiányában a tag ('' ha egyik sincs)"""
+    if not image_uri:
+        return ""
+    if "@" in image_uri:
+        return image_uri.rsplit("@", 1)[1]
+    last = image_uri.rsplit("/", 1)[-1]
+    return last.rsplit(":", 1)[1] if ":" in last else ""
+
+
+def deployment_metadata(path=None):
+    """A futás kulcsaihoz: image URI / digest és géptípus (a config felülírja a környezeti változókat,
+    mint a deploy szkriptek source-olásánál)"""
+    config = read_deployment_config(path)
+    image_uri = config.get("IMAGE_URI") or os.environ.get("IMAGE_URI", "")
+    return {
+        "image_uri": image_uri,
+        "image_digest": image_digest(image_uri),
+        "machine_type": config.get("MACHINE_TYPE") or os.environ.get("MACHINE_TYPE", ""),
+        "config_file": config_file_path(path),
+    }
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return f"{value:g}" if isinstance(value, float) else str(value)
+    return f'"{value}"'
+
+
+def write_deployment_config(path, overrides, base_path=None, header=()):
+    """Új .conf a base config alapján: a felülírt kulcsok sora kicserélve (a régi értékre vonatkozó
+    sor végi komment nélkül), a base-ben nem szereplők a végére kerülnek; header: komment sorok az elejére"""
+    base_path = config_file_path(base_path)
+    lines = []
+    if os.path.exists(base_path):
+        with open(base_path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    remaining = dict(overrides)
+    output = [f"# {line}" if line else "#" for line in header]
+    for line in lines:
+        stripped = line.strip()
+        key = stripped.split("=", 1)[0].strip() if "=" in stripped and not stripped.startswith("#") else None
+        if key in remaining:
+            output.append(f"{key}={_format_value(remaining.pop(key))}")
+        else:
+            output.append(line)
+    if remaining:
+        while output and not output[-1].strip():
+            output.pop()
+        output.append("")
+        output.extend(f"{key}={_format_value(value)}" for key, value in remaining.items())
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(output).rstrip("\n") + "\n")
+    return path
@@ -0,0 +1,238 @@
+"""
+Dynamic instance discovery for the Mannequin Segmenter load generators
+A VM_INSTANCES listák helyett a cél instance-ok egy discovery forrásból jönnek: gcloud
+compute instances list JSON (mentett dump vagy élő lekérés), a provision_fleet.py fleet
+fájlja vagy a deploy-gcp.sh által írt registry fájl. Futás közben a tagság újraolvasható:
+az új VM-ek (opcionálisan readiness gate után) bekerülnek a routing policy-be, a forrásból
+eltűnők nem kapnak több kérést, a már futó kéréseik befejeződnek (drain).
+"""
+
+import asyncio
+import json
+import time
+
+from .instances import InstanceState
+from .provisioning import DEFAULT_SERVICE_PORT, GcloudBackend, instance_from_gcloud
+
+DEFAULT_REFRESH_INTERVAL = 30   # Tagság újraolvasása futás közben (s)
+
+
+def instance_url(address, port=DEFAULT_SERVICE_PORT):
+    """Instance URL egy IP-ből / hostból; a már teljes URL változatlan"""
+    address = address.strip().rstrip("/")
+    if "://" in address:
+        return address
+    return f"http://{address}:{port}"
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"A discovery fájl nem olvasható ({path}): {e}")
+
+
+class GcloudListSource:
+    """gcloud compute instances list --format=json: path = mentett dump, None = élő lekérés a gcloud CLI-vel;
+    csak a RUNNING, külső IP-s VM-ek, name_prefix: csak az így kezdődő nevűek (pl. INSTANCE_NAME)"""
+
+    def __init__(self, path=None, gcloud="gcloud", project=None, name_prefix=None, port=DEFAULT_SERVICE_PORT):
+        self.path = path
+        self.backend = GcloudBackend(gcloud)
+        self.project = project
+        self.name_prefix = name_prefix
+        self.port = port
+
+    async def urls(self):
+        if self.path:
+            instances = [instance_from_gcloud(item) for item in _read_json(self.path)]
+        else:
+            instances = await self.backend.list_instances(self.project)
+        return [
+            instance_url(instance["external_ip"], self.port)
+            for instance in sorted(instances, key=lambda instance: instance["name"] or "")
+            if instance["status"] == "RUNNING" and instance["external_ip"]
+            and (not self.name_prefix or (instance["name"] or "").startswith(self.name_prefix))
+        ]
+
+    def describe(self):
+        return f"gcloud list ({self.path or 'élő lekérés'})"
+
+
+class FleetFileSource:
+    """A provision_fleet.py fleet fájlja (ProvisioningReport.write): a kész instance-ok URL-jei"""
+
+    def __init__(self, path="fleet-instances.json"):
+        self.path = path
+
+    async def urls(self):
+        data = _read_json(self.path)
+        return [instance["url"] for instance in data.get("instances", []) if instance.get("ready") and instance.get("url")]
+
+    def describe(self):
+        return f"fleet fájl ({self.path})"
+
+
+class RegistryFileSource:
+    """Registry fájl (a deploy-gcp.sh írja): soronként "URL vagy IP [VM név]", # megjegyzés; vagy JSON lista"""
+
+    def __init__(self, path="instance-registry.txt", port=DEFAULT_SERVICE_PORT):
+        self.path = path
+        self.port = port
+
+    async def urls(self):
+        if self.path.endswith(".json"):
+            return [instance_url(address, self.port) for address in _read_json(self.path)]
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError as e:
+            raise RuntimeError(f"A discovery fájl nem olvasható ({self.path}): {e}")
+        urls = []
+        for line in lines:
+            fields = line.split("#", 1)[0].split()
+            if fields:
+                url = instance_url(fields[0], self.port)
+                if url not in urls:
+                    urls.append(url)
+        return urls
+
+    def describe(self):
+        return f"registry ({self.path})"
+
+
+class StaticSource:
+    """Fix URL lista (a régi VM_INSTANCES) DynamicFleet-hez kódból; nem fájl alapú, ezért a
+    make_discovery-vel (path=...) nem választható"""
+
+    def __init__(self, urls):
+        self._urls = list(urls)
+
+    async def urls(self):
+        return list(self._urls)
+
+    def describe(self):
+        return f"statikus lista ({len(self._urls)} VM)"
+
+
+DISCOVERY_SOURCES = {
+    "gcloud": GcloudListSource,
+    "fleet": FleetFileSource,
+    "registry": RegistryFileSource,
+}
+
+
+def make_discovery(name, **kwargs):
+    if name not in DISCOVERY_SOURCES:
+        raise ValueError(f"Ismeretlen discovery forrás: {name} (választható: {', '.join(DISCOVERY_SOURCES)})")
+    return DISCOVERY_SOURCES[name](**kwargs)
+
+
+class DynamicFleet:
+    """Élő tagság egy discovery forrásból
+
+    instances: az aktív InstanceState lista - a routing policy és a LoadEngine ugyanezt a listát kapja,
+    a frissítés helyben módosítja. Új URL: gate (ReadinessGate) esetén csak a kész VM kerül be;
+    eltűnt URL: kikerül a listából (drain), de a riportokhoz megmarad (all_instances). Az utolsó aktív
+    instance nem kerül ki, üres / hibás forrásnál a tagság változatlan. on_event(event, subject):
+    "join" / "drain" (InstanceState), "readiness" (ReadinessReport), "error" (hiba szöveg).
+    """
+
+    def __init__(self, source, refresh_interval=DEFAULT_REFRESH_INTERVAL, gate=None, limit_factory=None,
+                 on_event=None):
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.gate = gate
+        self.limit_factory = limit_factory
+        self.on_event = on_event
+        self.instances = []
+        self.members = {}       # URL -> InstanceState (minden valaha felvett instance)
+        self.events = []        # (idő s a load() óta, "join" / "drain", URL)
+        self.start_time = None
+
+    def all_instances(self):
+        """Minden valaha aktív instance az azonosító sorrendjében (a drain-elt is)"""
+        return sorted(self.members.values(), key=lambda instance: instance.instance_id)
+
+    def _emit(self, event, subject):
+        if event in ("join", "drain"):
+            self.events.append((time.perf_counter() - self.start_time, event, subject.url))
+        if self.on_event is not None:
+            self.on_event(event, subject)
+
+    async def _admit(self, urls):
+        if self.gate is None or not urls:
+            return urls
+        report = await self.gate.wait(urls)
+        self._emit("readiness", report)
+        return report.ready_urls()
+
+    def _join(self, url):
+        instance = self.members.get(url)
+        if instance is None:
+            instance = InstanceState(
+                url, len(self.members) + 1, limiter=self.limit_factory() if self.limit_factory is not None else None,
+            )
+            self.members[url] = instance
+        self.instances.append(instance)
+        return instance
+
+    async def load(self):
+        """Kezdő tagság (a forrás hibája kivételként jön); az aktív instance-ok listája"""
+        self.start_time = time.perf_counter()
+        for url in await self._admit(await self.source.urls()):
+            self._join(url)
+        return self.instances
+
+    async def refresh(self):
+        """A forrás újraolvasása és a különbség alkalmazása; (felvett, drain-elt) instance-ok"""
+        try:
+            urls = await self.source.urls()
+        except RuntimeError as e:
+            self._emit("error", str(e))
+            return [], []
+        if not urls:
+            self._emit("error", f"Üres discovery forrás: {self.source.describe()}, a tagság változatlan")
+            return [], []
+
+        active = {instance.url for instance in self.instances}
+        joined = [self._join(url) for url in await self._admit([url for url in urls if url not in active])]
+        for instance in joined:
+            self._emit("join", instance)
+
+        wanted = set(urls)
+        drained = []
+        for instance in list(self.instances):
+            if instance.url in wanted:
+                continue
+            if len(self.instances) == 1:
+                self._emit("error", f"{instance.url} kikerült a forrásból, de ez az utolsó aktív instance - marad")
+                break
+            # Helyben: a policy-k ugyanezt a listát látják; a futó kérések az instance referenciával fejeződnek be
+            self.instances.remove(instance)
+            drained.append(instance)
+            self._emit("drain", instance)
+        return joined, drained
+
+    async def watch(self, engine):
+        """refresh_interval másodpercenként frissít a futás végéig (a folyamatban lévő frissítés a végén megszakad)"""
+        if not self.refresh_interval:
+            return
+        while not await engine.wait_finished(self.refresh_interval):
+            refresh = asyncio.ensure_future(self.refresh())
+            finished = asyncio.ensure_future(engine.finished.wait())
+            await asyncio.wait((refresh, finished), return_when=asyncio.FIRST_COMPLETED)
+            finished.cancel()
+            if not refresh.done():
+                refresh.cancel()
+                return
+
+
+def print_fleet_changes(fleet):
+    """Futás közbeni tagság változások (DynamicFleet): mikor került be / ki melyik VM"""
+    if not fleet.events:
+        return
+    print(f"\n🔄 FLEET VÁLTOZÁSOK ({fleet.source.describe()}, {len(fleet.instances)} aktív / {len(fleet.members)} összes)")
+    for elapsed, event, url in fleet.events:
+        print(f"   {'➕' if event == 'join' else '➖'} {elapsed:7.1f}s: {url} {'bekerült' if event == 'join' else 'kivonva (drain)'}")
@@ -0,0 +1,405 @@
+"""
+Async load-generation engine for the Mannequin Segmenter /infer API
+Egyetlen közös make_request / execute_task implementáció minden teszt scripthez:
+a workload, a target választás és a pacing cserélhető stratégia.
+"""
+
+import asyncio
+import contextlib
+import time
+
+import aiohttp
+
+from .connections import ConnectionPool
+from .histogram import LatencyRecorder
+from .pacing import sleep_or_stop
+from .response import read_infer_response
+from .tracing import RequestTracer, network_overhead, phase_breakdown
+
+API_ENDPOINT = "/infer"
+DEFAULT_REQUEST_TIMEOUT = 60
+
+# Szerver timing mezők -> eredmény kulcsok (régi mezőnevek alternatívaként)
+SERVER_TIMING_FIELDS = (
+    ("server_model_inference", ("model_inference", "model_inference_time")),
+    ("server_gcs_total", ("gcs_total",)),
+    ("server_total_request", ("total_request",)),
+    ("server_image_conversion", ("image_conversion",)),
+    ("server_gcs_upload", ("gcs_upload", "gcs_upload_time")),
+)
+
+
+def short_image_name(image_url, max_len=None):
+    """Kép URL utolsó szegmense (opcionálisan levágva)"""
+    name = image_url.rsplit('/', 1)[-1]
+    if max_len is not None and len(name) > max_len:
+        return name[:max_len] + "..."
+    return name
+
+
+def extract_server_timing(record, timing):
+    """Szerver oldali timing mezők átmásolása az eredménybe"""
+    record["server_timing"] = timing
+    for key, sources in SERVER_TIMING_FIELDS:
+        for source in sources:
+            if source in timing:
+                record[key] = timing[source]
+                break
+
+
+class Lane:
+    """Egy worker: honnan jön a munka, melyik instance-ra megy, mikor indul"""
+
+    def __init__(self, lane_id, workload, targets, start_delay=0.0):
+        self.lane_id = lane_id
+        self.workload = workload
+        self.targets = targets
+        self.start_delay = start_delay
+        self.sent = 0
+
+
+class LoadEngine:
+    def __init__(self, instances, lanes, pacing,
+                 api_endpoint=API_ENDPOINT,
+                 request_timeout=DEFAULT_REQUEST_TIMEOUT,
+                 session_per_lane=False,
+                 connector_factory=None,
+                 connections=None,
+                 trace_phases=True,
+                 image_sizes=None,
+                 on_dispatch=None,
+                 on_complete=None,
+                 recorder=None,
+                 keep_results=False,
+                 respect_limits=False,
+                 sink=None,
+                 columns=None):
+        self.instances = instances
+        self.lanes = lanes
+        self.pacing = pacing
+        self.api_endpoint = api_endpoint
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout)
+        self.session_per_lane = session_per_lane
+        self.connector_factory = connector_factory
+        # Pool beállítások (keep-alive, DNS cache, előre megnyitott kapcsolatok) + kapcsolat statisztika
+        self.connections = connections if connections is not None else ConnectionPool()
+        # Kérés fázis időbélyegek (pool, DNS, connect, küldés, fejlécek) aiohttp TraceConfig-gal
+        self.tracer = RequestTracer() if trace_phases else None
+        # Opcionális {kép URL: byte} a pre-flight-ból: a rekordok image_bytes mezője
+        self.image_sizes = image_sizes
+        self.on_dispatch = on_dispatch
+        self.on_complete = on_complete
+        # True: a worker megvárja, amíg a kiválasztott instance limit alá kerül
+        self.respect_limits = respect_limits
+        # Opcionális ResultSink: minden befejezett kérés rekordja batch-elve fájlba
+        self.sink = sink
+        # Opcionális ResultColumns: oszlopos tárolás a vektorizált riporthoz
+        self.columns = columns
+
+        # Hisztogramok mindig; a kérésenkénti dict listák csak keep_results=True esetén
+        self.recorder = recorder if recorder is not None else LatencyRecorder()
+        self.keep_results = keep_results
+        self.results = []   # HTTP válaszok (bármilyen státusz)
+        self.errors = []    # Timeout / hálózati hibák
+        self.start_time = None
+        self.end_time = None
+        self.running = False
+        # Leállítás (időkorlát / stop()) és befejezés jelzése a worker-eknek és monitoroknak
+        self.stop_event = asyncio.Event()
+        self.finished = asyncio.Event()
+
+    def stop(self):
+        """Új kérések indításának leállítása; a várakozó worker-ek azonnal kilépnek,
+        a már futó kérések még befejeződnek"""
+        self.stop_event.set()
+        for instance in self.instances:
+            instance.wake_waiters()
+
+    async def wait_finished(self, timeout=None):
+        """Vár a futás végére; True, ha befejeződött a timeout lejárta előtt"""
+        try:
+            await asyncio.wait_for(self.finished.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stopping(self):
+        return self.stop_event.is_set() or self.pacing.should_stop(self.elapsed())
+
+    async def next_task(self, lane):
+        """Következő task a sáv workload-jából: azonnal, ha van; üres nyitott queue-nál
+        a worker alszik, amíg új task vagy leállítás nem jön (nincs polling)"""
+        task = lane.workload.next_task()
+        if task is not None or lane.workload.exhausted():
+            return task
+
+        getter = asyncio.ensure_future(lane.workload.wait_task())
+        stopper = asyncio.ensure_future(self.stop_event.wait())
+        await asyncio.wait((getter, stopper), return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+        if getter.done():
+            return getter.result()
+        getter.cancel()
+        return None
+
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        return time.time() - self.start_time
+
+    def open_session(self):
+        """Új ClientSession a pool connectorával (vagy a connector_factory-éval), kapcsolat méréssel"""
+        connector = self.connector_factory() if self.connector_factory else self.connections.connector()
+        trace_configs = self.connections.trace_configs()
+        if self.tracer is not None:
+            trace_configs.append(self.tracer.trace_config())
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout, trace_configs=trace_configs)
+
+    async def warm_sessions(self, sessions):
+        """Kapcsolatok előre megnyitása session-önként a sávjai által használt instance-okhoz"""
+        targets = {}
+        for lane in self.lanes:
+            session = sessions[lane.lane_id]
+            instances = getattr(lane.targets, "instances", None) or [lane.targets.instance]
+            known = targets.setdefault(id(session), (session, {}))[1]
+            for instance in instances:
+                known[instance.url] = instance
+        for session, instances in targets.values():
+            await self.connections.warm(session, list(instances.values()))
+
+    async def execute(self, session, instance, task, lane=None, request_id=None, intended_at=None):
+        """Végrehajtja a task-ot egy adott instance-on, visszaadja az eredményt
+
+        intended_at: tervezett indulás (perf_counter) nyílt hurkú módban
+        """
+        payload = task["payload"]
+        record = {
+            "task_id": task["task_id"],
+            "request_id": request_id if request_id is not None else task["task_id"],
+            "lane_id": lane.lane_id if lane is not None else None,
+            "instance_id": instance.instance_id,
+            "instance_url": instance.url,
+            "instance_name": instance.name,
+            "image_url": payload.get("image_url"),
+            "prompt_mode": payload.get("prompt_mode"),
+        }
+        if self.image_sizes is not None:
+            record["image_bytes"] = self.image_sizes.get(record["image_url"])
+
+        instance.begin(task["task_id"])
+        if self.on_dispatch is not None:
+            self.on_dispatch(instance, task)
+
+        record["timestamp"] = time.time()
+        request_start = time.perf_counter()
+        last_byte_at = None
+        if intended_at is not None:
+            # Mennyit késett a küldés a tervezetthez képest (kliens oldali sorban állás)
+            record["send_lag"] = request_start - intended_at
+            record["intended_timestamp"] = record["timestamp"] - record["send_lag"]
+
+        try:
+            # trace_request_ctx: a fázis időbélyegek (client_timing) a rekordba kerülnek
+            async with session.post(instance.url + self.api_endpoint, json=payload, trace_request_ctx=record) as response:
+                # Chunk-onként: méret menet közben, nagy törzsnél csak a timing / visualization_url dekódolva
+                body = await read_infer_response(response, parse=response.status == 200)
+            last_byte_at = body.last_byte_at
+
+            record["status_code"] = response.status
+            record["response_time"] = body.last_byte_at - request_start
+            # TTFB: az első törzs byte (a fejlécek megérkezése a client_timing headers_received-ben van)
+            record["client_ttfb"] = body.first_byte_at - request_start
+            record["client_ttlb"] = body.last_byte_at - request_start
+            record["success"] = response.status == 200
+            record["response_size"] = body.size
+
+            if body.fields is not None:
+                record["has_visualization_url"] = "visualization_url" in body.fields
+                timing = body.fields.get("timing")
+                if isinstance(timing, dict):
+                    extract_server_timing(record, timing)
+
+            if self.keep_results:
+                self.results.append(record)
+            instance.record_response(record["response_time"], time.time(), ok=record["success"])
+
+        except asyncio.TimeoutError:
+            record["error"] = "Timeout"
+            record["success"] = False
+            record["response_time"] = time.perf_counter() - request_start
+            if self.keep_results:
+                self.errors.append(record)
+            instance.record_error(record["response_time"], time.time())
+
+        except Exception as e:
+            record["error"] = str(e)
+            record["success"] = False
+            record["response_time"] = time.perf_counter() - request_start
+            if self.keep_results:
+                self.errors.append(record)
+            instance.record_error(record["response_time"], time.time())
+
+        finally:
+            instance.release()
+
+        phase_breakdown(record, request_start, last_byte_at)
+        overhead = network_overhead(record)
+        if overhead is not None:
+            record["network_overhead"] = overhead
+
+        if intended_at is not None:
+            # Coordinated omission nélküli késleltetés: tervezett indulástól a válaszig
+            record["intended_response_time"] = record["send_lag"] + record["response_time"]
+
+        self.complete(record)
+        return record
+
+    def complete(self, record):
+        """Befejezett (vagy eldobott) kérés könyvelése: hisztogramok, oszlopok, sink, callback"""
+        self.recorder.record(record)
+        if self.columns is not None:
+            self.columns.append(record)
+        if self.sink is not None:
+            self.sink.write(record)
+        if self.on_complete is not None:
+            self.on_complete(record)
+
+    async def run_lane(self, session, lane, slot=0):
+        """Worker egy sávhoz - addig dolgozik, amíg van munka és idő
+        (slot: a sáv sorszáma, profil alapú konkurenciánál csak az aktív slot-ok dolgoznak)"""
+        if lane.start_delay > 0:
+            await asyncio.sleep(lane.start_delay)
+
+        while not self.stopping():
+            if lane.workload.exhausted():
+                break
+            if await self.pacing.wait_turn(slot, self.elapsed, self.stop_event):
+                break
+            instance = lane.targets.select()
+            if self.respect_limits:
+                await instance.acquire_slot(self.stop_event)
+                if self.stopping():
+                    break
+
+            task = await self.next_task(lane)
+            if task is None:
+                break
+
+            await self.execute(session, instance, task, lane, request_id=lane.sent + 1)
+            lane.sent += 1
+
+            # Szünet a következő kérés előtt (kivéve az utolsó után)
+            if lane.workload.exhausted():
+                break
+            await self.pacing.pause(self.stop_event)
+
+    async def run_open_loop(self, sessions):
+        """Nyílt hurok: a kérések a pacing ütemezése szerint indulnak,
+        nem várnak az előző válaszra; a sávok round-robin kapják az érkezéseket"""
+        in_flight = set()
+        clock_start = time.perf_counter()
+        lane_index = 0
+
+        for offset in self.pacing.schedule():
+            if self.pacing.should_stop(offset) or self.stop_event.is_set():
+                break
+
+            # Következő sáv, amelyiknek van még munkája
+            task = None
+            for _ in range(len(self.lanes)):
+                lane = self.lanes[lane_index]
+                lane_index = (lane_index + 1) % len(self.lanes)
+                task = lane.workload.next_task()
+                if task is not None:
+                    break
+            if task is None:
+                break
+
+            intended_at = clock_start + offset
+            delay = intended_at - time.perf_counter()
+            if delay > 0 and await sleep_or_stop(delay, self.stop_event):
+                break
+
+            lane.sent += 1
+            instance = lane.targets.select()
+            if self.pacing.max_outstanding is not None and len(in_flight) >= self.pacing.max_outstanding:
+                # A kliens nem tudja tartani az ütemet - eldobjuk, de számoljuk
+                dropped = {
+                    "task_id": task["task_id"],
+                    "request_id": lane.sent,
+                    "lane_id": lane.lane_id,
+                    "instance_id": instance.instance_id,
+                    "instance_url": instance.url,
+                    "instance_name": instance.name,
+                    "image_url": task["payload"].get("image_url"),
+                    "prompt_mode": task["payload"].get("prompt_mode"),
+                    "timestamp": time.time(),
+                    "error": "Dropped (max_outstanding)",
+                    "success": False,
+                    "response_time": 0.0,
+                }
+                if self.keep_results:
+                    self.errors.append(dropped)
+                self.complete(dropped)
+                continue
+
+            request = asyncio.create_task(self.execute(
+                sessions[lane.lane_id], instance, task, lane,
+                request_id=lane.sent, intended_at=intended_at,
+            ))
+            in_flight.add(request)
+            request.add_done_callback(in_flight.discard)
+            # A task elindul (instance.begin) mielőtt a következő érkezéshez targetet választunk
+            await asyncio.sleep(0)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def run(self):
+        """Összes sáv futtatása, visszatér ha mind végzett"""
+        self.running = True
+        deadline = None
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                if self.sink is not None:
+                    await self.sink.start()
+                    stack.push_async_callback(self.sink.close)
+                if self.session_per_lane:
+                    sessions = {}
+                    for lane in self.lanes:
+                        sessions[lane.lane_id] = await stack.enter_async_context(self.open_session())
+                else:
+                    # Egy közös session = közös connection pool, keep-alive minden worker-nek
+                    shared = await stack.enter_async_context(self.open_session())
+                    sessions = {lane.lane_id: shared for lane in self.lanes}
+
+                # Az előre megnyitás nem számít bele a teszt idejébe
+                if self.connections.prewarm:
+                    await self.warm_sessions(sessions)
+                self.start_time = time.time()
+                # Időkorlátnál pontosan ekkor áll le, nem a következő kérés végén
+                if self.pacing.duration is not None:
+                    deadline = asyncio.get_running_loop().call_later(self.pacing.duration, self.stop)
+
+                if self.pacing.open_loop:
+                    await self.run_open_loop(sessions)
+                else:
+                    await asyncio.gather(*(
+                        self.run_lane(sessions[lane.lane_id], lane, slot) for slot, lane in enumerate(self.lanes)
+                    ))
+        finally:
+            if deadline is not None:
+                deadline.cancel()
+            self.running = False
+            self.end_time = time.time()
+            self.finished.set()
+
+    def pending(self):
+        """Még ki nem osztott task-ok száma (az ismert hosszú workload-oknál; a stream-elt napló kimarad)"""
+        seen = set()
+        total = 0
+        for lane in self.lanes:
+            if id(lane.workload) not in seen and hasattr(lane.workload, "__len__"):
+                seen.add(id(lane.workload))
+                total += len(lane.workload)
+        return total
@@ -0,0 +1,238 @@
+"""
+Log-bucketed (HDR-style) latency histograms for the Mannequin Segmenter load generators
+Konstans memória kérésszámtól függetlenül, összefésülhető percentilisek;
+nyers minták csak opcionálisan.
+"""
+
+import math
+from array import array
+
+DEFAULT_LOWEST = 0.0001     # 100 µs
+DEFAULT_HIGHEST = 3600.0    # 1 óra
+DEFAULT_PRECISION = 0.01    # ~1% relatív hiba bucketenként
+
+DEFAULT_PERCENTILES = (50, 90, 99, 99.9)
+
+# Válasz méret hisztogram (byte): 1 B - 10 GB
+SIZE_HISTOGRAM_OPTIONS = {"lowest": 1.0, "highest": 1e10, "precision": DEFAULT_PRECISION}
+
+# Mért fázisok: fázis neve -> eredmény kulcs
+PHASES = (
+    ("client_total", "response_time"),
+    ("ttfb", "client_ttfb"),
+    ("ttlb", "client_ttlb"),
+    ("pool_wait", "client_pool_wait"),
+    ("dns", "client_dns"),
+    ("connect", "client_connect"),
+    ("send", "client_send"),
+    ("server_wait", "client_server_wait"),
+    ("download", "client_download"),
+    ("server_total", "server_total_request"),
+    ("network_overhead", "network_overhead"),
+    ("model_inference", "server_model_inference"),
+    ("gcs_total", "server_gcs_total"),
+    ("intended", "intended_response_time"),
+    ("send_lag", "send_lag"),
+)
+
+
+class LatencyHistogram:
+    """Logaritmikus bucket-ekre osztott hisztogram (másodpercben mért értékekhez)"""
+
+    def __init__(self, lowest=DEFAULT_LOWEST, highest=DEFAULT_HIGHEST, precision=DEFAULT_PRECISION):
+        if lowest <= 0 or highest <= lowest:
+            raise ValueError("LatencyHistogram: 0 < lowest < highest szükséges")
+        self.lowest = lowest
+        self.highest = highest
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.bucket_count = int(math.ceil(math.log(highest / lowest) / self._log_base)) + 1
+        self.counts = array('Q', [0]) * self.bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.min = None
+        self.max = None
+
+    def bucket_index(self, value):
+        if value <= self.lowest:
+            return 0
+        if value >= self.highest:
+            return self.bucket_count - 1
+        return int(math.log(value / self.lowest) / self._log_base)
+
+    def bucket_value(self, index):
+        """A bucket reprezentatív értéke (geometriai közép)"""
+        return self.lowest * (1.0 + self.precision) ** (index + 0.5)
+
+    def record(self, value, count=1):
+        self.counts[self.bucket_index(value)] += count
+        self.count += count
+        self.total += value * count
+        self.total_squares += value * value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def compatible(self, other):
+        return (self.lowest, self.highest, self.precision) == (other.lowest, other.highest, other.precision)
+
+    def merge(self, other):
+        """Másik hisztogram hozzáadása ehhez (azonos beállítások szükségesek)"""
+        if not self.compatible(other):
+            raise ValueError("LatencyHistogram.merge: eltérő bucket beállítások")
+        if other.count == 0:
+            return self
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.total_squares += other.total_squares
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def copy(self):
+        clone = LatencyHistogram(self.lowest, self.highest, self.precision)
+        return clone.merge(self)
+
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def stdev(self):
+        """Minta szórás (mint a statistics.stdev)"""
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_squares - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(0.0, variance))
+
+    def percentiles(self, qs=DEFAULT_PERCENTILES):
+        """Több percentilis egyetlen bejárással: {q: érték}"""
+        if not self.count:
+            return {q: None for q in qs}
+        targets = sorted((max(1, math.ceil(q / 100.0 * self.count)), q) for q in qs)
+        result = {}
+        cumulative = 0
+        t = 0
+        for index, c in enumerate(self.counts):
+            if not c:
+                continue
+            cumulative += c
+            while t < len(targets) and cumulative >= targets[t][0]:
+                value = self.bucket_value(index)
+                # A pontos min/max-on kívülre ne becsüljünk
+                result[targets[t][1]] = min(max(value, self.min), self.max)
+                t += 1
+            if t == len(targets):
+                break
+        return result
+
+    def percentile(self, q):
+        return self.percentiles((q,))[q]
+
+    def count_above(self, threshold):
+        """Küszöb feletti minták (bucket pontossággal)"""
+        start = self.bucket_index(threshold) + 1
+        return sum(self.counts[start:])
+
+
+class LatencyRecorder:
+    """Instance-onkénti és fázisonkénti hisztogramok + sikeres/hibás számlálók"""
+
+    def __init__(self, keep_samples=False, lowest=DEFAULT_LOWEST, highest=DEFAULT_HIGHEST, precision=DEFAULT_PRECISION):
+        self.keep_samples = keep_samples
+        self.histogram_options = {"lowest": lowest, "highest": highest, "precision": precision}
+        self.histograms = {}    # (instance_id, fázis) -> LatencyHistogram
+        self.samples = []       # Nyers eredmények, csak keep_samples=True esetén
+        self.succeeded = 0
+        self.failed = 0
+        self.error_types = {}   # (instance_id, hiba típus) -> darab
+        self.response_sizes = LatencyHistogram(**SIZE_HISTOGRAM_OPTIONS)   # Sikeres válaszok mérete byte-ban
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    def _histogram(self, instance_id, phase):
+        key = (instance_id, phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram(**self.histogram_options)
+        return histogram
+
+    def record(self, result):
+        """Egy eredmény könyvelése (sikeres -> hisztogramok, hibás -> számlálók)"""
+        instance_id = result.get("instance_id")
+        if result.get("success"):
+            self.succeeded += 1
+            for phase, key in PHASES:
+                value = result.get(key)
+                if value is not None:
+                    self._histogram(instance_id, phase).record(value)
+            if result.get("response_size") is not None:
+                self.response_sizes.record(result["response_size"])
+            timestamp = result["timestamp"]
+            if self.first_timestamp is None or timestamp < self.first_timestamp:
+                self.first_timestamp = timestamp
+            if self.last_timestamp is None or timestamp > self.last_timestamp:
+                self.last_timestamp = timestamp
+        else:
+            self.failed += 1
+            error_type = result.get("error") or f"HTTP {result.get('status_code', 'Unknown')}"
+            key = (instance_id, error_type)
+            self.error_types[key] = self.error_types.get(key, 0) + 1
+        if self.keep_samples:
+            self.samples.append(result)
+
+    def histogram(self, phase, instance_id=None):
+        """Egy instance hisztogramja, vagy instance_id=None esetén az összesített"""
+        if instance_id is not None:
+            return self.histograms.get((instance_id, phase)) or LatencyHistogram(**self.histogram_options)
+        merged = LatencyHistogram(**self.histogram_options)
+        for (_, p), histogram in self.histograms.items():
+            if p == phase:
+                merged.merge(histogram)
+        return merged
+
+    def instance_ids(self):
+        return sorted({i for i, _ in self.histograms if i is not None} | {i for i, _ in self.error_types if i is not None})
+
+    def errors_by_type(self, instance_id=None):
+        """{hiba típus: darab}, opcionálisan egy instance-ra szűrve"""
+        counts = {}
+        for (i, error_type), count in self.error_types.items():
+            if instance_id is None or i == instance_id:
+                counts[error_type] = counts.get(error_type, 0) + count
+        return counts
+
+    def failed_for(self, instance_id):
+        return sum(c for (i, _), c in self.error_types.items() if i == instance_id)
+
+    def throughput(self):
+        """Sikeres kérések / másodperc az első és utolsó sikeres indulás között"""
+        if self.succeeded < 2 or self.last_timestamp <= self.first_timestamp:
+            return None
+        return self.succeeded / (self.last_timestamp - self.first_timestamp)
+
+    def merge(self, other):
+        """Másik recorder (pl. másik process) hozzáadása ehhez"""
+        for key, histogram in other.histograms.items():
+            if key in self.histograms:
+                self.histograms[key].merge(histogram)
+            else:
+                self.histograms[key] = histogram.copy()
+        for key, count in other.error_types.items():
+            self.error_types[key] = self.error_types.get(key, 0) + count
+        self.response_sizes.merge(other.response_sizes)
+        self.succeeded += other.succeeded
+        self.failed += other.failed
+        if other.first_timestamp is not None:
+            if self.first_timestamp is None or other.first_timestamp < self.first_timestamp:
+                self.first_timestamp = other.first_timestamp
+            if self.last_timestamp is None or other.last_timestamp > self.last_timestamp:
+                self.last_timestamp = other.last_timestamp
+        if self.keep_samples:
+            self.samples.extend(other.samples)
+        return self
@@ -0,0 +1,125 @@
+"""
+Instance state tracking for the Mannequin Segmenter load generators
+Minden VM instance-hoz egy állapot objektum, amit a motor és a riportok közösen használnak.
+"""
+
+import asyncio
+import math
+
+EWMA_DECAY_SECONDS = 10.0   # Peak-EWMA lecsengési időállandó
+ERROR_PENALTY_SECONDS = 5.0 # Hibánál legalább ennyi késleltetést könyvelünk (gyors hiba != gyors instance)
+
+
+def instance_name_from_url(url):
+    """IP / hostname kinyerése az instance URL-ből"""
+    return url.split('/')[-1].split(':')[0]
+
+
+class InstanceState:
+    def __init__(self, url, instance_id=None, weight=1, limiter=None):
+        self.url = url
+        self.instance_id = instance_id
+        self.name = instance_name_from_url(url)
+        self.is_busy = False
+        self.current_task_id = None
+        self.completed_tasks = 0
+        self.total_response_time = 0.0
+        self.errors = 0
+        self.last_completed = None
+        # Concurrency guard (fix vagy adaptív limit)
+        self.limiter = limiter
+        self.max_in_flight = limiter.current if limiter is not None else 1
+        self.in_flight = 0
+        self.violations = 0
+        self._slot_waiters = []
+        # Élő késleltetés a routing policy-knek
+        self.weight = weight
+        self.ewma_latency = None
+        self.last_latency = None
+        self.last_observed = None
+
+    def begin(self, task_id):
+        """Task indítása ezen az instance-on (concurrency guard start)"""
+        self.in_flight += 1
+        if self.in_flight > self.max_in_flight:
+            self.violations += 1
+        self.is_busy = True
+        self.current_task_id = task_id
+
+    async def acquire_slot(self, stop_event=None):
+        """Várakozás, amíg a limit alatt van a nyitott kérések száma (vagy leállításig)"""
+        while self.in_flight >= self.max_in_flight:
+            if stop_event is not None and stop_event.is_set():
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._slot_waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._slot_waiters:
+                    self._slot_waiters.remove(waiter)
+
+    def wake_waiters(self):
+        """Minden várakozó újra ellenőrzi a limitet (akik nem férnek be, visszaállnak)"""
+        waiters, self._slot_waiters = self._slot_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _update_limit(self, latency, dropped):
+        if self.limiter is None:
+            return
+        self.limiter.on_sample(latency, self.in_flight, dropped)
+        self.max_in_flight = self.limiter.current
+
+    def observe_latency(self, latency, now):
+        """Peak-EWMA frissítés: a csúcsra azonnal ugrik, lefelé időarányosan csillapodik"""
+        if self.ewma_latency is None or latency > self.ewma_latency:
+            self.ewma_latency = latency
+        else:
+            weight = math.exp(-max(0.0, now - self.last_observed) / EWMA_DECAY_SECONDS)
+            self.ewma_latency = self.ewma_latency * weight + latency * (1.0 - weight)
+        self.last_latency = latency
+        self.last_observed = now
+
+    def load_cost(self):
+        """Várható várakozás egy új kérésre: EWMA késleltetés * (nyitott kérések + 1)"""
+        return (self.ewma_latency or 0.0) * (self.in_flight + 1)
+
+    def record_response(self, response_time, finished_at, ok=True):
+        """Befejezett HTTP válasz könyvelése (ok=False: nem 200-as státusz)"""
+        self.completed_tasks += 1
+        self.total_response_time += response_time
+        self.last_completed = finished_at
+        self.observe_latency(response_time, finished_at)
+        self._update_limit(response_time, dropped=not ok)
+
+    def record_error(self, response_time=None, finished_at=None):
+        """Hálózati hiba / timeout könyvelése (büntető késleltetéssel)"""
+        self.errors += 1
+        if response_time is not None:
+            self.observe_latency(max(response_time, ERROR_PENALTY_SECONDS), finished_at)
+            self._update_limit(response_time, dropped=True)
+
+    def release(self):
+        """Instance felszabadítása (concurrency guard end)"""
+        self.in_flight = max(0, self.in_flight - 1)
+        if self.in_flight == 0:
+            self.is_busy = False
+            self.current_task_id = None
+        self.wake_waiters()
+
+
+def make_instances(urls, weights=None, limit_factory=None):
+    """InstanceState lista létrehozása URL-ekből (1-től számozva, opcionális súlyokkal)
+
+    limit_factory: instance-onként új limiter (pl. lambda: make_limit("aimd"))
+    """
+    if weights is None:
+        weights = [1] * len(urls)
+    if len(weights) != len(urls):
+        raise ValueError("make_instances: a súlyok száma nem egyezik az URL-ekével")
+    return [
+        InstanceState(url, i, weight, limit_factory() if limit_factory is not None else None)
+        for i, (url, weight) in enumerate(zip(urls, weights), 1)
+    ]
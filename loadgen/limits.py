@@ -0,0 +1,118 @@
+"""
+Per-instance concurrency limits for the Mannequin Segmenter load generators
+Fix vagy adaptív (AIMD / gradient) limit: hány kérés lehet egyszerre nyitva egy VM-en.
+Az adaptív limitek a megfigyelt késleltetésből és hibákból keresik az optimumot
+(a Netflix concurrency-limits könyvtár AIMD és Gradient algoritmusai alapján).
+"""
+
+import math
+
+
+class FixedLimit:
+    """Állandó limit (az eredeti 'instance-onként max 1 task' viselkedés limit=1-gyel)"""
+
+    name = "fixed"
+
+    def __init__(self, limit=1):
+        if limit < 1:
+            raise ValueError("FixedLimit: a limit legalább 1")
+        self.limit = limit
+        self.peak_limit = limit
+        self.samples = 0
+
+    @property
+    def current(self):
+        return int(self.limit)
+
+    def on_sample(self, rtt, in_flight, dropped):
+        self.samples += 1
+
+
+class AimdLimit:
+    """Additive increase / multiplicative decrease: sikeres válasznál +1, hibánál vagy
+    túl lassú válasznál * backoff_ratio. Túl lassú: rtt > rtt_tolerance * a legkisebb mért RTT
+    (sorban állás a VM-en), vagy ha meg van adva, rtt > latency_threshold (abszolút, másodperc)"""
+
+    name = "aimd"
+
+    def __init__(self, initial=1, min_limit=1, max_limit=32, backoff_ratio=0.9, rtt_tolerance=1.5,
+                 latency_threshold=None):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.rtt_tolerance = rtt_tolerance
+        self.latency_threshold = latency_threshold
+        self.min_rtt = None
+        self.peak_limit = initial
+        self.samples = 0
+
+    @property
+    def current(self):
+        return max(self.min_limit, int(self.limit))
+
+    def too_slow(self, rtt):
+        if self.latency_threshold is not None and rtt > self.latency_threshold:
+            return True
+        return self.rtt_tolerance is not None and self.min_rtt is not None and rtt > self.rtt_tolerance * self.min_rtt
+
+    def on_sample(self, rtt, in_flight, dropped):
+        self.samples += 1
+        if not dropped and (self.min_rtt is None or rtt < self.min_rtt):
+            self.min_rtt = rtt
+        if dropped or self.too_slow(rtt):
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        elif in_flight * 2 >= self.limit:
+            # Csak akkor növelünk, ha a limit tényleg szűk keresztmetszet volt
+            self.limit = min(self.max_limit, self.limit + 1)
+        self.peak_limit = max(self.peak_limit, self.current)
+
+
+class GradientLimit:
+    """Gradient: a terheletlen (minimális) és az aktuális RTT arányából számolt gradiens
+    csökkenti a limitet, ha a késleltetés sorban állás miatt nő; sqrt(limit) tartalék a növekedéshez"""
+
+    name = "gradient"
+
+    def __init__(self, initial=1, min_limit=1, max_limit=32, smoothing=0.2, rtt_tolerance=1.5):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.rtt_tolerance = rtt_tolerance
+        self.min_rtt = None
+        self.peak_limit = initial
+        self.samples = 0
+
+    @property
+    def current(self):
+        return max(self.min_limit, int(self.limit))
+
+    def on_sample(self, rtt, in_flight, dropped):
+        self.samples += 1
+        if not dropped and (self.min_rtt is None or rtt < self.min_rtt):
+            self.min_rtt = rtt
+
+        if not dropped and in_flight * 2 < self.limit:
+            return  # Alkalmazás-limitált: nincs elég forgalom, hogy a limitről bármit tanuljunk
+
+        if dropped or self.min_rtt is None:
+            gradient = 0.5
+        else:
+            gradient = max(0.5, min(1.0, self.rtt_tolerance * self.min_rtt / rtt))
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        new_limit = self.limit * (1.0 - self.smoothing) + new_limit * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, new_limit))
+        self.peak_limit = max(self.peak_limit, self.current)
+
+
+def make_limit(mode=None, limit=1, max_limit=32, latency_threshold=None):
+    """None = fix limit, 'aimd' vagy 'gradient' = adaptív (limit a kezdőérték);
+    latency_threshold: AIMD abszolút késleltetés küszöb a min RTT alapú mellett (None = csak az)"""
+    if mode is None:
+        return FixedLimit(limit)
+    if mode == "aimd":
+        return AimdLimit(initial=limit, max_limit=max_limit, latency_threshold=latency_threshold)
+    if mode == "gradient":
+        return GradientLimit(initial=limit, max_limit=max_limit)
+    raise ValueError(f"Ismeretlen concurrency limit mód: {mode} (választható: aimd, gradient)")
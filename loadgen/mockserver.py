@@ -0,0 +1,154 @@
+"""
+Local mock of the mannequin-segmenter /infer endpoint for offline benchmarking
+Ugyanazt a payload-ot fogadja ({"image_url", "prompt_mode"}) és ugyanolyan
+timing dict-et ad vissza, mint a valódi szerver; a késleltetés, a hibaarány és
+az egyszerre feldolgozható kérések száma konfigurálható.
+"""
+
+import asyncio
+import math
+import random
+import time
+import uuid
+
+from aiohttp import web
+
+DEFAULT_BASE_PORT = 18001
+
+
+class LatencyModel:
+    """Fázisonkénti átlagos késleltetés (másodperc) lognormális szórással
+
+    capacity: egyszerre futó model inference-ek száma (GPU), a többi sorban áll
+    time_scale: minden késleltetés szorzója (CI-ben pl. 0.01)
+    """
+
+    def __init__(self, image_conversion=0.05, model_inference=0.8, gcs_upload=0.25,
+                 jitter=0.15, error_rate=0.0, capacity=1, time_scale=1.0, rng=None):
+        if capacity < 1:
+            raise ValueError("LatencyModel: a capacity legalább 1")
+        self.image_conversion = image_conversion
+        self.model_inference = model_inference
+        self.gcs_upload = gcs_upload
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.time_scale = time_scale
+        self.rng = rng or random.Random()
+
+    def sample(self, mean):
+        """Lognormális minta a megadott átlaggal"""
+        if mean <= 0:
+            return 0.0
+        if self.jitter <= 0:
+            return mean * self.time_scale
+        noise = math.exp(self.rng.gauss(0.0, self.jitter) - self.jitter * self.jitter / 2)
+        return mean * noise * self.time_scale
+
+    def should_fail(self):
+        return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+
+class MockInferServer:
+    """Egy mock instance: /infer (POST) és /health (GET)"""
+
+    def __init__(self, model, name="mock"):
+        self.model = model
+        self.name = name
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._gpu = None
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_post("/infer", self.infer)
+        app.router.add_get("/health", self.health)
+        return app
+
+    async def health(self, request):
+        return web.Response(text="OK\n")
+
+    async def infer(self, request):
+        request_start = time.perf_counter()
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({"error": "Invalid JSON"}, status=400)
+        image_url = payload.get("image_url") if isinstance(payload, dict) else None
+        if not image_url:
+            return web.json_response({"error": "image_url is required"}, status=400)
+
+        if self._gpu is None:
+            self._gpu = asyncio.Semaphore(self.model.capacity)
+
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            # Kép letöltés + konverzió (párhuzamosan futhat)
+            image_conversion = self.model.sample(self.model.image_conversion)
+            await asyncio.sleep(image_conversion)
+
+            # Model inference - legfeljebb capacity egyszerre, a többi vár
+            async with self._gpu:
+                model_inference = self.model.sample(self.model.model_inference)
+                await asyncio.sleep(model_inference)
+
+            if self.model.should_fail():
+                self.errors += 1
+                return web.json_response({"error": "Mock inference failure"}, status=500)
+
+            # Eredmény feltöltése GCS-re
+            gcs_upload = self.model.sample(self.model.gcs_upload)
+            await asyncio.sleep(gcs_upload)
+        finally:
+            self.in_flight -= 1
+
+        result_id = uuid.uuid4().hex
+        return web.json_response({
+            "visualization_url": f"https://storage.googleapis.com/mock-results/{self.name}/{result_id}.png",
+            "prompt_mode": payload.get("prompt_mode"),
+            "timing": {
+                "image_conversion": image_conversion,
+                "model_inference": model_inference,
+                "gcs_upload": gcs_upload,
+                "gcs_total": gcs_upload,
+                "total_request": time.perf_counter() - request_start,
+            },
+        })
+
+
+class MockFleet:
+    """Futó mock instance-ok (URL-ek a VM_INSTANCES helyére)"""
+
+    def __init__(self, servers, runners, urls):
+        self.servers = servers
+        self.runners = runners
+        self.urls = urls
+
+    async def close(self):
+        for runner in self.runners:
+            await runner.cleanup()
+
+
+async def start_mock_fleet(count, base_port=DEFAULT_BASE_PORT, host="127.0.0.1", model_factory=None):
+    """count darab mock instance indítása base_port-tól egymás utáni portokon
+
+    model_factory: instance sorszám (1-től) -> LatencyModel; eltérő VM-ek szimulálásához
+    """
+    servers = []
+    runners = []
+    urls = []
+    for i in range(1, count + 1):
+        model = model_factory(i) if model_factory is not None else LatencyModel()
+        server = MockInferServer(model, name=f"mock-{i}")
+        runner = web.AppRunner(server.make_app(), access_log=None)
+        await runner.setup()
+        port = base_port + i - 1
+        await web.TCPSite(runner, host, port).start()
+        servers.append(server)
+        runners.append(runner)
+        urls.append(f"http://{host}:{port}")
+    return MockFleet(servers, runners, urls)
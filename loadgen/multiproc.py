@@ -0,0 +1,84 @@
+"""
+Multi-process sharding for the Mannequin Segmenter load generators
+Nagy fleet-eknél egy event loop / egy process a szűk keresztmetszet: a VM-eket
+N process között osztjuk szét (mindegyiknek saját event loop és aiohttp session),
+a végén a hisztogramokat összefésüljük.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .columns import ResultColumns
+from .histogram import LatencyRecorder
+
+
+def split_evenly(items, parts):
+    """Lista szétosztása legfeljebb parts részre, round-robin (üres részek nélkül)"""
+    parts = max(1, min(parts, len(items)))
+    return [items[i::parts] for i in range(parts)]
+
+
+class ShardResult:
+    """Egy process eredménye (picklable): recorder, instance állapotok, opcionális nyers eredmények / oszlopok"""
+
+    def __init__(self, index, engine):
+        self.index = index
+        self.recorder = engine.recorder
+        self.instances = engine.instances
+        self.results = engine.results
+        self.errors = engine.errors
+        self.columns = engine.columns
+        self.start_time = engine.start_time
+        self.end_time = engine.end_time
+
+
+class MergedRun:
+    """Az összes shard összefésülve - ugyanazokkal a mezőkkel, amiket a riportok használnak"""
+
+    def __init__(self, shard_results):
+        self.shards = sorted(shard_results, key=lambda r: r.index)
+        self.recorder = LatencyRecorder()
+        self.instances = []
+        self.results = []
+        self.errors = []
+        self.columns = ResultColumns() if any(shard.columns is not None for shard in self.shards) else None
+        for shard in self.shards:
+            self.recorder.merge(shard.recorder)
+            self.instances.extend(shard.instances)
+            self.results.extend(shard.results)
+            self.errors.extend(shard.errors)
+            if shard.columns is not None:
+                self.columns.merge(shard.columns)
+        self.instances.sort(key=lambda instance: instance.instance_id)
+        self.start_time = min(shard.start_time for shard in self.shards)
+        self.end_time = max(shard.end_time for shard in self.shards)
+
+
+def _run_shard(engine_factory, shard):
+    """Process belépési pont: saját event loop, engine_factory(shard) -> LoadEngine"""
+    engine = engine_factory(shard)
+    asyncio.run(engine.run())
+    return ShardResult(shard["index"], engine)
+
+
+async def run_sharded(engine_factory, shards):
+    """Shard-ok futtatása külön process-ekben, a végén összefésülve
+
+    engine_factory: modul szintű függvény (picklable), shard dict -> LoadEngine
+    shards: dict-ek listája, mindegyikben legalább "index"
+    """
+    # spawn: a szülő futó event loop-ja nem öröklődik a gyerek process-ekbe
+    context = multiprocessing.get_context("spawn")
+    loop = asyncio.get_running_loop()
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+        futures = [loop.run_in_executor(pool, _run_shard, engine_factory, shard) for shard in shards]
+        shard_results = []
+        for future in asyncio.as_completed(futures):
+            result = await future
+            completed = result.recorder.succeeded + result.recorder.failed
+            print(f"🧵 Process {result.index} kész: {completed} kérés ({time.time() - start:.1f}s)")
+            shard_results.append(result)
+    return MergedRun(shard_results)
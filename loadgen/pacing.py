@@ -0,0 +1,163 @@
+"""
+Pacing strategies for the Mannequin Segmenter load generators
+Meghatározzák, mikor induljon a következő kérés és mikor álljon le a teszt.
+"""
+
+import asyncio
+import random
+
+from .stats import format_percentiles
+
+
+async def sleep_or_stop(delay, stop_event=None):
+    """Alvás delay másodpercig, vagy amíg a stop_event be nem áll; True, ha leállítottak"""
+    if stop_event is None:
+        await asyncio.sleep(delay)
+        return False
+    if stop_event.is_set():
+        return True
+    try:
+        await asyncio.wait_for(stop_event.wait(), delay)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+class ClosedLoopPacing:
+    """Zárt hurok: válasz után opcionális szünet, opcionális időkorlát"""
+
+    open_loop = False
+
+    def __init__(self, delay=0.0, duration=None):
+        self.delay = delay
+        self.duration = duration
+
+    def should_stop(self, elapsed):
+        return self.duration is not None and elapsed >= self.duration
+
+    async def pause(self, stop_event=None):
+        """Szünet két kérés között ugyanazon a worker-en (leállításkor azonnal visszatér)"""
+        if self.delay > 0:
+            await sleep_or_stop(self.delay, stop_event)
+
+    async def wait_turn(self, slot, elapsed, stop_event=None):
+        """Fix konkurencia: minden worker mindig dolgozhat (profil alapú pacing felülírja)"""
+        return False
+
+
+class OpenLoopPacing:
+    """Nyílt hurok: a kérések indulási ideje előre ütemezett (cél RPS),
+    független a válaszoktól - így a mért késleltetés tartalmazza a sorban állást"""
+
+    open_loop = True
+
+    def __init__(self, rate, duration=None, poisson=False, max_outstanding=None, rng=None):
+        if rate <= 0:
+            raise ValueError("OpenLoopPacing: a rate legyen pozitív")
+        self.rate = rate
+        self.duration = duration
+        self.poisson = poisson
+        self.max_outstanding = max_outstanding
+        self.rng = rng or random.Random()
+
+    def should_stop(self, elapsed):
+        return self.duration is not None and elapsed >= self.duration
+
+    def schedule(self):
+        """Tervezett indulási időpontok (másodperc a teszt kezdetétől)"""
+        if self.poisson:
+            offset = 0.0
+            while True:
+                yield offset
+                offset += self.rng.expovariate(self.rate)
+        else:
+            interval = 1.0 / self.rate
+            i = 0
+            while True:
+                yield i * interval
+                i += 1
+
+
+def make_pacing(rate=None, duration=None, delay=0.0, poisson=False, max_outstanding=None):
+    """Zárt hurok, ha nincs cél RPS megadva, különben nyílt hurok"""
+    if rate:
+        return OpenLoopPacing(rate, duration=duration, poisson=poisson, max_outstanding=max_outstanding)
+    return ClosedLoopPacing(delay=delay, duration=duration)
+
+
+# Nulla cél kérés/s mellett ennyi időnként nézünk rá újra a profilra
+IDLE_RATE_CHECK = 0.05
+
+
+class ProfileOpenLoopPacing:
+    """Nyílt hurok időben változó cél RPS-sel (LoadProfile.value(t) kérés/s);
+    az érkezések ütemezése a pillanatnyi rátával lépked"""
+
+    open_loop = True
+
+    def __init__(self, profile, poisson=False, max_outstanding=None, rng=None):
+        self.profile = profile
+        self.duration = profile.duration
+        self.poisson = poisson
+        self.max_outstanding = max_outstanding
+        self.rng = rng or random.Random()
+
+    @property
+    def rate(self):
+        return self.profile.peak()
+
+    def should_stop(self, elapsed):
+        return elapsed >= self.duration
+
+    def schedule(self):
+        offset = 0.0
+        while offset < self.duration:
+            rate = self.profile.value(offset)
+            if rate <= 0:
+                offset += IDLE_RATE_CHECK
+                continue
+            yield offset
+            offset += self.rng.expovariate(rate) if self.poisson else 1.0 / rate
+
+
+class ProfileClosedLoopPacing(ClosedLoopPacing):
+    """Zárt hurok időben változó konkurenciával: a profil.peak() worker közül
+    t másodpercnél csak az első round(profile.value(t)) dolgozik, a többi vár"""
+
+    def __init__(self, profile, delay=0.0, check_interval=0.1):
+        super().__init__(delay=delay, duration=profile.duration)
+        self.profile = profile
+        self.check_interval = check_interval
+
+    def active_slots(self, elapsed):
+        return int(round(self.profile.value(elapsed)))
+
+    async def wait_turn(self, slot, elapsed, stop_event=None):
+        """Vár, amíg a slot (0-tól) aktív nem lesz; True, ha közben leállítottak"""
+        while slot >= self.active_slots(elapsed()):
+            if self.should_stop(elapsed()) or await sleep_or_stop(self.check_interval, stop_event):
+                return True
+        return False
+
+
+def make_profile_pacing(profile, target="rps", delay=0.0, poisson=False, max_outstanding=None):
+    """Profil alapú pacing: "rps" -> nyílt hurok, "concurrency" -> zárt hurok"""
+    if target == "concurrency":
+        return ProfileClosedLoopPacing(profile, delay=delay)
+    return ProfileOpenLoopPacing(profile, poisson=poisson, max_outstanding=max_outstanding)
+
+
+def print_open_loop_latency(recorder):
+    """Nyílt hurkú mód riportja: tervezett vs tényleges indulás és korrigált késleltetés"""
+    corrected = recorder.histogram("intended")
+    if not corrected.count:
+        return
+
+    lags = recorder.histogram("send_lag")
+    service = recorder.histogram("client_total")
+
+    print(f"\n🕒 NYÍLT HURKÚ KÉSLELTETÉS (tervezett indulástól mérve)")
+    print(f"   🔹 Ütemezett kérések: {corrected.count}")
+    print(f"   🔹 Küldési csúszás: {format_percentiles(lags)} / max {lags.max:.3f}s")
+    print(f"   🔹 Korrigált (intended): {format_percentiles(corrected)}")
+    print(f"   🔹 Szerviz idő (actual): {format_percentiles(service)}")
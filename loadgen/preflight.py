@@ -0,0 +1,193 @@
+"""
+Image URL pre-flight for the Mannequin Segmenter load generators
+A szerver minden /infer kérésnél letölti a képet (media.remix.eu / storage.googleapis.com),
+ezért futás előtt párhuzamosan végigkérdezzük az URL-eket (HEAD, szükség esetén GET):
+méret, content type, origin válaszidő, elérhetőség. A halott URL-ek kiesnek, a méret
+a kérés rekordjába kerül (image_bytes), így a riport a válaszidőt a kép méretével veti össze.
+"""
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+import numpy as np
+
+from .columns import summarize
+from .compare import rank_data
+from .stats import format_bytes
+
+DEFAULT_PREFLIGHT_CONCURRENCY = 32
+DEFAULT_PREFLIGHT_TIMEOUT = 10
+DOWNLOAD_CHUNK = 64 * 1024
+SIZE_BUCKETS = 4    # Méret szerinti csoportok a riportban (kvantilisek)
+
+
+class ImageProbe:
+    """Egy URL pre-flight eredménye: státusz, méret (byte), content type, origin idő (fejlécekig), hiba"""
+
+    def __init__(self, url, status=None, size=None, content_type=None, latency=None, download=None,
+                 method="HEAD", error=None):
+        self.url = url
+        self.status = status
+        self.size = size
+        self.content_type = content_type
+        self.latency = latency
+        self.download = download
+        self.method = method
+        self.error = error
+
+    @property
+    def origin(self):
+        return urlsplit(self.url).netloc
+
+    @property
+    def ok(self):
+        """Elérhető kép: 2xx válasz, és ha van content type, az kép"""
+        if self.error or self.status is None or not 200 <= self.status < 300:
+            return False
+        return not self.content_type or self.content_type.startswith("image/")
+
+    def describe_error(self):
+        if self.error:
+            return self.error
+        if self.status is not None and not 200 <= self.status < 300:
+            return f"HTTP {self.status}"
+        return f"nem kép ({self.content_type})"
+
+
+async def probe_url(session, url, method="HEAD"):
+    """HEAD (vagy GET) egy URL-re; HEAD-et nem támogató vagy méretet nem küldő originnél GET-tel
+    letöltjük és megszámoljuk a byte-okat"""
+    request_start = time.perf_counter()
+    try:
+        async with session.request(method, url, allow_redirects=True) as response:
+            latency = time.perf_counter() - request_start
+            size = response.content_length
+            if method == "HEAD" and (response.status in (405, 501) or (response.status < 300 and size is None)):
+                return await probe_url(session, url, "GET")
+            download = None
+            if method == "GET" and response.status < 300:
+                size = 0
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK):
+                    size += len(chunk)
+                download = time.perf_counter() - request_start
+            return ImageProbe(
+                url, response.status, size, response.content_type, latency, download, method,
+            )
+    except asyncio.TimeoutError:
+        return ImageProbe(url, method=method, latency=time.perf_counter() - request_start, error="Timeout")
+    except aiohttp.ClientError as e:
+        return ImageProbe(url, method=method, latency=time.perf_counter() - request_start, error=str(e) or type(e).__name__)
+
+
+class PreflightReport:
+    """Az összes URL pre-flight eredménye (bemeneti sorrendben)"""
+
+    def __init__(self, probes, duration):
+        self.probes = probes
+        self.duration = duration
+
+    def alive(self):
+        return [probe for probe in self.probes if probe.ok]
+
+    def dead(self):
+        return [probe for probe in self.probes if not probe.ok]
+
+    def alive_urls(self):
+        return [probe.url for probe in self.alive()]
+
+    def sizes(self):
+        """{URL: méret byte-ban} az elérhető, ismert méretű képekre (engine image_sizes=)"""
+        return {probe.url: probe.size for probe in self.alive() if probe.size is not None}
+
+    def by_origin(self):
+        """{origin: (URL-ek, elérhetők, origin válaszidő Summary, átlag méret)}"""
+        groups = {}
+        for probe in self.probes:
+            groups.setdefault(probe.origin, []).append(probe)
+        result = {}
+        for origin, probes in groups.items():
+            alive = [p for p in probes if p.ok]
+            latency = summarize(np.array([p.latency for p in alive], dtype=np.float64), quantiles=(50, 90, 99))
+            sizes = [p.size for p in alive if p.size is not None]
+            result[origin] = (len(probes), len(alive), latency, sum(sizes) / len(sizes) if sizes else None)
+        return result
+
+
+async def preflight_urls(urls, concurrency=DEFAULT_PREFLIGHT_CONCURRENCY, timeout=DEFAULT_PREFLIGHT_TIMEOUT,
+                         method="HEAD"):
+    """Minden (egyedi) URL párhuzamos ellenőrzése, legfeljebb concurrency egyszerre"""
+    urls = list(dict.fromkeys(urls))
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    async def guarded(session, url):
+        async with semaphore:
+            return await probe_url(session, url, method)
+
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        probes = await asyncio.gather(*(guarded(session, url) for url in urls))
+    return PreflightReport(list(probes), time.perf_counter() - started)
+
+
+class SizeBucket:
+    """Méret tartomány (byte) és a benne lévő kérések válaszidő Summary-je"""
+
+    def __init__(self, low, high, summary):
+        self.low = low
+        self.high = high
+        self.summary = summary
+
+
+def size_latency_correlation(frame, column="response_time", buckets=SIZE_BUCKETS):
+    """(Pearson r, Spearman ρ, [SizeBucket]) a sikeres, ismert képméretű kérésekre; None, ha kevés a minta"""
+    successful = frame.successful()
+    sizes = successful["image_bytes"]
+    values = successful[column]
+    valid = ~np.isnan(sizes) & ~np.isnan(values)
+    sizes = sizes[valid]
+    values = values[valid]
+    if len(sizes) < 3 or np.ptp(sizes) == 0 or np.ptp(values) == 0:
+        return None
+
+    pearson = float(np.corrcoef(sizes, values)[0, 1])
+    spearman = float(np.corrcoef(rank_data(sizes), rank_data(values))[0, 1])
+
+    edges = np.unique(np.quantile(sizes, np.linspace(0, 1, buckets + 1)))
+    groups = np.clip(np.searchsorted(edges, sizes, side="right") - 1, 0, len(edges) - 2)
+    rows = []
+    for g in range(len(edges) - 1):
+        summary = summarize(values[groups == g], quantiles=(50, 99))
+        if summary is not None:
+            rows.append(SizeBucket(float(edges[g]), float(edges[g + 1]), summary))
+    return pearson, spearman, rows
+
+
+def print_preflight_report(report, max_dead=10):
+    """Pre-flight összesítő: origin-onként elérhetőség, válaszidő, átlag méret + halott URL-ek"""
+    alive = report.alive()
+    print(f"\n🛫 KÉP PRE-FLIGHT ({len(report.probes)} URL, {report.duration:.1f}s)")
+    print(f"   🔹 Elérhető: {len(alive)}, kiesik: {len(report.probes) - len(alive)}")
+    for origin, (count, available, latency, mean_size) in report.by_origin().items():
+        timing = f"p50 {latency.quantiles[50]:.3f}s / p99 {latency.quantiles[99]:.3f}s" if latency else "N/A"
+        print(f"   🌐 {origin}: {available}/{count} elérhető, origin idő {timing}, átlag méret {format_bytes(mean_size)}")
+    dead = report.dead()
+    for probe in dead[:max_dead]:
+        print(f"   ❌ {probe.url} -> {probe.describe_error()}")
+    if len(dead) > max_dead:
+        print(f"   ... és még {len(dead) - max_dead} halott URL")
+
+
+def print_image_size_report(correlation):
+    """Válaszidő a kép mérete szerint (size_latency_correlation eredménye)"""
+    if correlation is None:
+        return
+    pearson, spearman, buckets = correlation
+    print(f"\n🖼️  VÁLASZIDŐ vs KÉPMÉRET")
+    print(f"   🔹 Korreláció: Pearson r = {pearson:+.2f}, Spearman ρ = {spearman:+.2f}")
+    for bucket in buckets:
+        summary = bucket.summary
+        print(f"   🔹 {format_bytes(bucket.low):>8s} - {format_bytes(bucket.high):>8s}: {summary.count:5d} kérés, "
+              f"átlag {summary.mean:.3f}s, p50 {summary.quantiles[50]:.3f}s, p99 {summary.quantiles[99]:.3f}s")
@@ -0,0 +1,186 @@
+"""
+Declarative load profiles for the Mannequin Segmenter load generators
+A terhelés (cél kérés/s nyílt hurokban, vagy egyidejű kérések zárt hurokban) az
+idő függvényében: ramp, step, spike, soak, sine. A profil adja a teszt hosszát és
+az elemzési ablakokat is (step-nél lépcsőnként egy ablak).
+"""
+
+import math
+
+DEFAULT_WINDOW_SECONDS = 10.0
+
+
+class LoadProfile:
+    """Alaposztály: value(t) a cél terhelés t másodpercnél, duration a teljes hossz"""
+
+    shape = None
+    duration = 0.0
+
+    def value(self, t):
+        raise NotImplementedError
+
+    def peak(self):
+        """Maximális cél terhelés (zárt hurokban ennyi worker indul)"""
+        samples = max(2, int(self.duration * 10))
+        return max(self.value(self.duration * i / samples) for i in range(samples + 1))
+
+    def average(self, start, end):
+        """Átlagos cél terhelés egy időablakban (numerikus közelítés)"""
+        if end <= start:
+            return self.value(start)
+        samples = 20
+        step = (end - start) / samples
+        return sum(self.value(start + (i + 0.5) * step) for i in range(samples)) / samples
+
+    def windows(self, window_seconds=DEFAULT_WINDOW_SECONDS):
+        """Elemzési ablakok (kezdet, vég) a profil hosszában"""
+        count = max(1, int(math.ceil(self.duration / window_seconds)))
+        return [(i * window_seconds, min(self.duration, (i + 1) * window_seconds)) for i in range(count)]
+
+    def describe(self):
+        return self.shape
+
+
+class RampProfile(LoadProfile):
+    """Lineáris emelés start-ról end-re duration alatt"""
+
+    shape = "ramp"
+
+    def __init__(self, start, end, duration):
+        self.start = start
+        self.end = end
+        self.duration = duration
+
+    def value(self, t):
+        fraction = min(1.0, max(0.0, t / self.duration)) if self.duration > 0 else 1.0
+        return self.start + (self.end - self.start) * fraction
+
+    def peak(self):
+        return max(self.start, self.end)
+
+    def describe(self):
+        return f"ramp {self.start:g}->{self.end:g} / {self.duration:g}s"
+
+
+class StepProfile(LoadProfile):
+    """Lépcsők: start, start+step, ... (steps darab), mindegyik step_duration ideig"""
+
+    shape = "step"
+
+    def __init__(self, start, step, step_duration, steps):
+        self.start = start
+        self.step = step
+        self.step_duration = step_duration
+        self.steps = steps
+        self.duration = step_duration * steps
+
+    def value(self, t):
+        index = min(self.steps - 1, max(0, int(t // self.step_duration)))
+        return self.start + self.step * index
+
+    def peak(self):
+        return max(self.start, self.start + self.step * (self.steps - 1))
+
+    def average(self, start, end):
+        # Lépcsőn belüli ablaknál pontos
+        if int(start // self.step_duration) == int(max(start, end - 1e-9) // self.step_duration):
+            return self.value(start)
+        return super().average(start, end)
+
+    def windows(self, window_seconds=DEFAULT_WINDOW_SECONDS):
+        """Lépcsőnként egy ablak"""
+        return [(i * self.step_duration, (i + 1) * self.step_duration) for i in range(self.steps)]
+
+    def describe(self):
+        return f"step {self.start:g}+{self.step:g}×{self.steps} / {self.step_duration:g}s"
+
+
+class SpikeProfile(LoadProfile):
+    """Alap terhelés, spike_at-tól spike_duration ideig peak_value"""
+
+    shape = "spike"
+
+    def __init__(self, base, peak_value, duration, spike_at, spike_duration):
+        self.base = base
+        self.peak_value = peak_value
+        self.duration = duration
+        self.spike_at = spike_at
+        self.spike_duration = spike_duration
+
+    def value(self, t):
+        return self.peak_value if self.spike_at <= t < self.spike_at + self.spike_duration else self.base
+
+    def peak(self):
+        return max(self.base, self.peak_value)
+
+    def describe(self):
+        return f"spike {self.base:g}->{self.peak_value:g} @{self.spike_at:g}s / {self.spike_duration:g}s"
+
+
+class SoakProfile(LoadProfile):
+    """Állandó terhelés hosszú ideig (memória szivárgás, lassú romlás keresésére)"""
+
+    shape = "soak"
+
+    def __init__(self, value, duration):
+        self.level = value
+        self.duration = duration
+
+    def value(self, t):
+        return self.level
+
+    def peak(self):
+        return self.level
+
+    def describe(self):
+        return f"soak {self.level:g} / {self.duration:g}s"
+
+
+class SineProfile(LoadProfile):
+    """mean ± amplitude szinusz period másodperces periódussal (napi ciklus szimuláció)"""
+
+    shape = "sine"
+
+    def __init__(self, mean, amplitude, period, duration):
+        self.mean = mean
+        self.amplitude = amplitude
+        self.period = period
+        self.duration = duration
+
+    def value(self, t):
+        return max(0.0, self.mean + self.amplitude * math.sin(2 * math.pi * t / self.period))
+
+    def describe(self):
+        return f"sine {self.mean:g}±{self.amplitude:g} / {self.period:g}s"
+
+
+PROFILES = {
+    "ramp": RampProfile,
+    "step": StepProfile,
+    "spike": SpikeProfile,
+    "soak": SoakProfile,
+    "sine": SineProfile,
+}
+
+# Mit vezérel a profil: cél kérés/s (nyílt hurok) vagy egyidejű kérések (zárt hurok)
+PROFILE_TARGETS = ("rps", "concurrency")
+
+
+def make_profile(spec):
+    """Profil dict-ből, pl. {"shape": "step", "start": 2, "step": 2, "step_duration": 30, "steps": 8}
+
+    A "target" kulcs ("rps" / "concurrency") nem a profil része, a pacing választásához kell.
+    """
+    spec = dict(spec)
+    shape = spec.pop("shape", None)
+    spec.pop("target", None)
+    if shape not in PROFILES:
+        raise ValueError(f"Ismeretlen terhelés profil: {shape} (választható: {', '.join(PROFILES)})")
+    return PROFILES[shape](**spec)
+
+
+def profile_target(spec):
+    target = spec.get("target", "rps")
+    if target not in PROFILE_TARGETS:
+        raise ValueError(f"Ismeretlen profil target: {target} (választható: {', '.join(PROFILE_TARGETS)})")
+    return target
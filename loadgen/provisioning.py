@@ -0,0 +1,506 @@
+"""
+Parallel fleet provisioning for the Mannequin Segmenter benchmarks
+A deployment config (deployment-config.conf / example-configs/*.conf) alapján INSTANCE_COUNT
+VM létrehozása párhuzamosan, korlátos async pool-ban (a deploy-gcp.sh egyesével hozza létre),
+majd a készenlét párhuzamos lekérdezése: RUNNING állapot + külső IP, opcionálisan HTTP health.
+A backend cserélhető: gcloud CLI (más futtatható is megadható, pl. egy helyi fake gcloud
+szkript) vagy a folyamaton belüli FakeComputeBackend valódi VM nélküli próbához.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+import aiohttp
+
+from .deployment import read_deployment_config
+
+DEFAULT_SERVICE_PORT = 5001
+DEFAULT_MAX_PARALLEL = 5         # Egyszerre futó create hívások (API kvóta / rate limit miatt korlátos)
+DEFAULT_POLL_INTERVAL = 5        # Készenlét lekérdezés gyakorisága (s)
+DEFAULT_READY_TIMEOUT = 900      # A startup script docker build-je perceket vesz igénybe
+DEFAULT_STARTUP_SCRIPT = "startup-script-mannequin.sh"
+HEALTH_PATH = "/health"
+HEALTH_TIMEOUT = 5
+
+# A deploy-gcp.sh create paraméterei
+GCLOUD_SCOPES = (
+    "https://www.googleapis.com/auth/devstorage.read_only",
+    "https://www.googleapis.com/auth/logging.write",
+    "https://www.googleapis.com/auth/monitoring.write",
+    "https://www.googleapis.com/auth/servicecontrol",
+    "https://www.googleapis.com/auth/service.management.readonly",
+    "https://www.googleapis.com/auth/trace.append",
+)
+DEFAULT_LABELS = {"environment": "benchmark", "application": "image-download"}
+# (név, portok, leírás) - a {port} helyére a szolgáltatás portja kerül
+FIREWALL_RULES = (
+    ("allow-http", "tcp:80,tcp:443", "Allow HTTP and HTTPS traffic"),
+    ("allow-mannequin-{port}", "tcp:{port}", "Allow mannequin-segmenter service on port {port}"),
+)
+
+
+class InstanceSpec:
+    """Egy létrehozandó VM: név, projekt / zóna és a config géptípus, disk, image, metadata beállításai"""
+
+    def __init__(self, name, project, zone, machine_type="e2-medium", boot_disk_size="100GB",
+                 image_family="ubuntu-2204-lts", image_project="ubuntu-os-cloud", metadata=None,
+                 metadata_files=None, tags=(), labels=None):
+        self.name = name
+        self.project = project
+        self.zone = zone
+        self.machine_type = machine_type
+        self.boot_disk_size = boot_disk_size
+        self.image_family = image_family
+        self.image_project = image_project
+        self.metadata = metadata or {}
+        self.metadata_files = metadata_files or {}
+        self.tags = tuple(tags)
+        self.labels = DEFAULT_LABELS if labels is None else labels
+
+
+def _flag(config, key, default=False):
+    value = config.get(key)
+    return default if value in (None, "") else value.lower() == "true"
+
+
+def _encode_sa_key(key, already_base64=False):
+    """A deploy-gcp.sh heurisztikája: nyers JSON -> base64, base64-nek látszó érték változatlan"""
+    if already_base64:
+        return key
+    if re.search(r'"type"\s*:\s*"service_account"', key):
+        return base64.b64encode(key.encode()).decode()
+    if re.fullmatch(r"[A-Za-z0-9+/=]+", key) and len(key) % 4 == 0:
+        return key
+    return base64.b64encode(key.encode()).decode()
+
+
+def instance_metadata(config, env=None):
+    """Instance metadata a deploy-gcp.sh szerint: MANNEQUIN_ENV_B64 (credentials.env / .env),
+    IMAGE_URI, BOOT_MODE, GITHUB_TOKEN, GCP_SA_KEY (base64); CI-ban (GITHUB_ACTIONS) a környezeti változókból"""
+    env = os.environ if env is None else env
+    metadata = {}
+    if env.get("GITHUB_ACTIONS") == "true":
+        lines = [
+            "# Environment Variables for GitHub Actions Deployment",
+            f"PROJECT_ID={env.get('PROJECT_ID') or config.get('PROJECT_ID', '')}",
+            f"VM_ZONE={env.get('ZONE') or config.get('ZONE', '')}",
+            f"GCP_SA_KEY={env.get('GCP_SA_KEY', '')}",
+        ]
+        metadata["MANNEQUIN_ENV_B64"] = base64.b64encode(("\n".join(lines) + "\n").encode()).decode()
+    else:
+        env_file = next((path for path in ("credentials.env", ".env") if os.path.exists(path)), None)
+        if env_file:
+            with open(env_file, "rb") as f:
+                metadata["MANNEQUIN_ENV_B64"] = base64.b64encode(f.read()).decode()
+
+    image_uri = env.get("IMAGE_URI") or config.get("IMAGE_URI")
+    if image_uri:
+        metadata["IMAGE_URI"] = image_uri
+    # auto / pull / build: a startup script fast boot (IMAGE_URI pull) vagy forrásból build útja
+    if config.get("BOOT_MODE"):
+        metadata["BOOT_MODE"] = config["BOOT_MODE"]
+    if env.get("GITHUB_TOKEN"):
+        metadata["GITHUB_TOKEN"] = env["GITHUB_TOKEN"]
+
+    sa_key = env.get("GCP_SA_KEY") or read_deployment_config("credentials.env").get("GCP_SA_KEY")
+    if sa_key:
+        metadata["GCP_SA_KEY"] = _encode_sa_key(sa_key, env.get("GCP_SA_KEY_IS_BASE64") in ("1", "true"))
+    return metadata
+
+
+def fleet_specs(config, metadata=None, startup_script=DEFAULT_STARTUP_SCRIPT, env=None, run_id=None):
+    """InstanceSpec-ek a configból: {INSTANCE_NAME_PREFIX}-{run_id}-1 ... -{INSTANCE_COUNT} (run_id=None: run_id nélkül);
+    a PROJECT_ID / ZONE környezeti változó (a workflow inputjai) felülírja a configot"""
+    env = os.environ if env is None else env
+    project = env.get("PROJECT_ID") or config.get("PROJECT_ID")
+    zone = env.get("ZONE") or config.get("ZONE") or "europe-west1-b"
+    if not project:
+        raise ValueError("fleet_specs: nincs PROJECT_ID (config vagy környezeti változó)")
+    count = int(config.get("INSTANCE_COUNT") or 1)
+    prefix = config.get("INSTANCE_NAME_PREFIX") or "benchmark-vm"
+    if run_id:
+        # Futásonként egyedi nevek (mint a deploy-gcp.sh időbélyege): egy új futás nem nyúl a korábbi fleet-hez
+        prefix = f"{prefix}-{run_id}"
+
+    tags = []
+    if _flag(config, "ENABLE_HTTP_SERVER", True):
+        tags.append("http-server")
+    if _flag(config, "ENABLE_HTTPS_SERVER", True):
+        tags.append("https-server")
+    metadata = instance_metadata(config, env) if metadata is None else metadata
+    metadata_files = {"startup-script": startup_script} if startup_script else {}
+
+    return [
+        InstanceSpec(
+            f"{prefix}-{i + 1}", project, zone,
+            machine_type=config.get("MACHINE_TYPE") or "e2-medium",
+            boot_disk_size=config.get("BOOT_DISK_SIZE") or "100GB",
+            image_family=config.get("IMAGE_FAMILY") or "ubuntu-2204-lts",
+            image_project=config.get("IMAGE_PROJECT") or "ubuntu-os-cloud",
+            metadata=metadata,
+            metadata_files=metadata_files,
+            tags=tags,
+        )
+        for i in range(count)
+    ]
+
+
+def instance_from_gcloud(data):
+    """gcloud compute instances describe / list JSON elemből {name, zone, status, external_ip, internal_ip}"""
+    interfaces = data.get("networkInterfaces") or [{}]
+    access = interfaces[0].get("accessConfigs") or [{}]
+    return {
+        "name": data.get("name"),
+        "zone": (data.get("zone") or "").rsplit("/", 1)[-1],
+        "status": data.get("status"),
+        "external_ip": access[0].get("natIP"),
+        "internal_ip": interfaces[0].get("networkIP"),
+    }
+
+
+class GcloudBackend:
+    """A gcloud CLI aszinkron subprocess-ként; gcloud: a futtatható (teszthez egy helyi fake gcloud szkript)"""
+
+    def __init__(self, gcloud="gcloud"):
+        self.gcloud = gcloud
+
+    async def _run(self, *args):
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.gcloud, *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as e:
+            raise RuntimeError(f"A gcloud CLI nem futtatható ({self.gcloud}): {e}")
+        stdout, stderr = await process.communicate()
+        return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+    async def _check(self, action, *args):
+        code, stdout, stderr = await self._run(*args)
+        if code != 0:
+            message = stderr.strip().splitlines()[-1] if stderr.strip() else f"exit {code}"
+            raise RuntimeError(f"gcloud {action}: {message}")
+        return stdout
+
+    async def ensure_firewall(self, project, port=DEFAULT_SERVICE_PORT):
+        """A deploy-gcp.sh tűzfal szabályai, ha még nincsenek"""
+        for name, ports, description in FIREWALL_RULES:
+            name = name.format(port=port)
+            code, _, _ = await self._run("compute", "firewall-rules", "describe", name, f"--project={project}")
+            if code != 0:
+                await self._check(
+                    f"firewall-rules create {name}",
+                    "compute", "firewall-rules", "create", name,
+                    f"--allow={ports.format(port=port)}", "--source-ranges=0.0.0.0/0",
+                    f"--description={description.format(port=port)}", f"--project={project}",
+                )
+
+    async def describe(self, spec):
+        """Az instance állapota (instance_from_gcloud), None ha nem létezik"""
+        code, stdout, _ = await self._run(
+            "compute", "instances", "describe", spec.name,
+            f"--zone={spec.zone}", f"--project={spec.project}", "--format=json",
+        )
+        if code != 0:
+            return None
+        return instance_from_gcloud(json.loads(stdout))
+
+    async def list_instances(self, project=None):
+        """A projekt összes instance-a (instance_from_gcloud elemek); project=None: a gcloud alapértelmezett projektje"""
+        args = ["compute", "instances", "list", "--format=json"]
+        if project:
+            args.append(f"--project={project}")
+        stdout = await self._check("instances list", *args)
+        return [instance_from_gcloud(item) for item in json.loads(stdout or "[]")]
+
+    async def create(self, spec):
+        args = [
+            "compute", "instances", "create", spec.name,
+            f"--zone={spec.zone}",
+            f"--machine-type={spec.machine_type}",
+            "--network-interface=network-tier=PREMIUM,stack-type=IPV4_ONLY,subnet=default",
+            "--maintenance-policy=MIGRATE",
+            "--provisioning-model=STANDARD",
+            f"--scopes={','.join(GCLOUD_SCOPES)}",
+            f"--create-disk=auto-delete=yes,boot=yes,device-name={spec.name},"
+            f"image=projects/{spec.image_project}/global/images/family/{spec.image_family},mode=rw,"
+            f"size={spec.boot_disk_size},type=projects/{spec.project}/zones/{spec.zone}/diskTypes/pd-standard",
+            "--no-shielded-secure-boot",
+            "--shielded-vtpm",
+            "--shielded-integrity-monitoring",
+            "--reservation-affinity=any",
+            f"--project={spec.project}",
+            "--format=json",
+        ]
+        if spec.metadata_files:
+            args.append("--metadata-from-file=" + ",".join(f"{k}={v}" for k, v in spec.metadata_files.items()))
+        if spec.metadata:
+            args.append("--metadata=" + ",".join(f"{k}={v}" for k, v in spec.metadata.items()))
+        if spec.tags:
+            args.append("--tags=" + ",".join(spec.tags))
+        if spec.labels:
+            args.append("--labels=" + ",".join(f"{k}={v}" for k, v in spec.labels.items()))
+        await self._check(f"instances create {spec.name}", *args)
+
+    async def delete(self, spec):
+        await self._check(
+            f"instances delete {spec.name}",
+            "compute", "instances", "delete", spec.name,
+            f"--zone={spec.zone}", f"--project={spec.project}", "--quiet",
+        )
+
+
+class FakeComputeBackend:
+    """Valódi VM nélküli backend: a create create_seconds-ig tart, utána boot_seconds múlva RUNNING;
+    minden instance külső IP-je external_ip (pl. egy helyi mock szerver), fail_names: ezek create-je hibázik"""
+
+    def __init__(self, create_seconds=0.5, boot_seconds=1.0, external_ip="127.0.0.1", fail_names=(), existing=()):
+        self.create_seconds = create_seconds
+        self.boot_seconds = boot_seconds
+        self.external_ip = external_ip
+        self.fail_names = set(fail_names)
+        self.instances = {name: 0.0 for name in existing}   # név -> létrejött (perf_counter)
+        self.calls = []             # (művelet, név) a hívások sorrendjében
+        self.creating = 0
+        self.peak_creating = 0      # Egyszerre futó create hívások maximuma
+
+    async def ensure_firewall(self, project, port=DEFAULT_SERVICE_PORT):
+        self.calls.append(("firewall", project))
+
+    async def describe(self, spec):
+        self.calls.append(("describe", spec.name))
+        if spec.name not in self.instances:
+            return None
+        booted = time.perf_counter() - self.instances[spec.name] >= self.boot_seconds
+        index = sorted(self.instances).index(spec.name)
+        return {
+            "name": spec.name,
+            "zone": spec.zone,
+            "status": "RUNNING" if booted else "PROVISIONING",
+            "external_ip": self.external_ip if booted else None,
+            "internal_ip": f"10.132.0.{index + 2}",
+        }
+
+    async def create(self, spec):
+        self.calls.append(("create", spec.name))
+        self.creating += 1
+        self.peak_creating = max(self.peak_creating, self.creating)
+        try:
+            await asyncio.sleep(self.create_seconds)
+        finally:
+            self.creating -= 1
+        if spec.name in self.fail_names:
+            raise RuntimeError(f"gcloud instances create {spec.name}: QUOTA_EXCEEDED (fake)")
+        self.instances[spec.name] = time.perf_counter()
+
+    async def delete(self, spec):
+        self.calls.append(("delete", spec.name))
+        self.instances.pop(spec.name, None)
+
+
+BACKENDS = {
+    "gcloud": GcloudBackend,
+    "fake": FakeComputeBackend,
+}
+
+
+def make_backend(name="gcloud", **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"Ismeretlen provisioning backend: {name} (választható: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**kwargs)
+
+
+class ProvisionedInstance:
+    """Egy VM provisioning eredménye; az időbélyegek másodpercben a provisioning kezdetétől"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = spec.name
+        self.status = None
+        self.external_ip = None
+        self.internal_ip = None
+        self.url = None
+        self.reused = False         # Már létezett és RECREATE nélkül megtartottuk
+        self.started_at = None      # Sorra került a create pool-ban
+        self.created_at = None      # A create hívás visszatért
+        self.running_at = None      # RUNNING + külső IP
+        self.ready_at = None        # Health check OK (health nélkül = running_at)
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None and self.ready_at is not None
+
+    @property
+    def elapsed(self):
+        """Saját idő: sorra kerüléstől a készenlétig (ennyi lenne szekvenciálisan)"""
+        if self.started_at is None or self.ready_at is None:
+            return None
+        return self.ready_at - self.started_at
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "zone": self.spec.zone,
+            "status": self.status,
+            "external_ip": self.external_ip,
+            "internal_ip": self.internal_ip,
+            "url": self.url,
+            "ready": self.ok,
+            "create_seconds": None if self.created_at is None else round(self.created_at - self.started_at, 3),
+            "ready_seconds": None if self.ready_at is None else round(self.ready_at, 3),
+            "error": self.error,
+        }
+
+
+class ProvisioningReport:
+    """Az összes VM eredménye (a specek sorrendjében) + a teljes provisioning idő"""
+
+    def __init__(self, instances, duration, config_file=None):
+        self.instances = instances
+        self.duration = duration
+        self.config_file = config_file
+
+    def ready(self):
+        return [instance for instance in self.instances if instance.ok]
+
+    def failed(self):
+        return [instance for instance in self.instances if not instance.ok]
+
+    def urls(self):
+        """A kész instance-ok URL-jei (VM_INSTANCES formátum)"""
+        return [instance.url for instance in self.ready()]
+
+    def sequential_estimate(self):
+        """Becsült idő egyesével létrehozva: a kész VM-ek saját idejének összege"""
+        return sum(instance.elapsed for instance in self.ready())
+
+    def write(self, path):
+        """Fleet fájl (JSON) a kész és hibás instance-okkal, a load teszt szkripteknek"""
+        data = {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "config_file": self.config_file,
+            "duration": round(self.duration, 3),
+            "instances": [instance.to_dict() for instance in self.instances],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        return path
+
+
+class FleetProvisioner:
+    """VM-ek létrehozása korlátos párhuzamossággal (max_parallel create egyszerre), utána mindegyik
+    készenlétének párhuzamos lekérdezése; on_event(instance, esemény): created / running / ready / failed"""
+
+    def __init__(self, backend, specs, max_parallel=DEFAULT_MAX_PARALLEL, service_port=DEFAULT_SERVICE_PORT,
+                 health_path=HEALTH_PATH, poll_interval=DEFAULT_POLL_INTERVAL, ready_timeout=DEFAULT_READY_TIMEOUT,
+                 recreate=False, on_event=None, config_file=None):
+        self.backend = backend
+        self.specs = specs
+        self.max_parallel = max_parallel
+        self.service_port = service_port
+        self.health_path = health_path
+        self.poll_interval = poll_interval
+        self.ready_timeout = ready_timeout
+        self.recreate = recreate
+        self.on_event = on_event
+        self.config_file = config_file
+        self.start_time = None
+
+    def _now(self):
+        return time.perf_counter() - self.start_time
+
+    def _emit(self, instance, event):
+        if self.on_event:
+            self.on_event(instance, event)
+
+    async def provision(self):
+        self.start_time = time.perf_counter()
+        for project in sorted({spec.project for spec in self.specs}):
+            await self.backend.ensure_firewall(project, self.service_port)
+
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        timeout = aiohttp.ClientTimeout(total=HEALTH_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            instances = await asyncio.gather(*(
+                self._provision_one(spec, semaphore, session) for spec in self.specs
+            ))
+        return ProvisioningReport(list(instances), self._now(), self.config_file)
+
+    async def _provision_one(self, spec, semaphore, session):
+        instance = ProvisionedInstance(spec)
+        try:
+            async with semaphore:
+                instance.started_at = self._now()
+                existing = await self.backend.describe(spec)
+                if existing is not None and not self.recreate:
+                    instance.reused = True
+                else:
+                    if existing is not None:
+                        await self.backend.delete(spec)
+                    await self.backend.create(spec)
+                instance.created_at = self._now()
+            self._emit(instance, "created")
+            await self._wait_ready(instance, session)
+        except RuntimeError as e:
+            instance.error = str(e)
+        if instance.error:
+            self._emit(instance, "failed")
+        return instance
+
+    async def _healthy(self, session, url):
+        try:
+            async with session.get(url) as response:
+                await response.read()
+                return response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def _wait_ready(self, instance, session):
+        """RUNNING + külső IP, majd (ha van health_path) 200-as health válasz, legfeljebb ready_timeout-ig"""
+        deadline = instance.created_at + self.ready_timeout
+        while True:
+            if instance.running_at is None:
+                state = await self.backend.describe(instance.spec)
+                if state is not None:
+                    instance.status = state["status"]
+                    instance.internal_ip = state["internal_ip"]
+                    if state["status"] == "RUNNING" and state["external_ip"]:
+                        instance.external_ip = state["external_ip"]
+                        instance.url = f"http://{instance.external_ip}:{self.service_port}"
+                        instance.running_at = self._now()
+                        self._emit(instance, "running")
+            if instance.running_at is not None and (
+                    not self.health_path or await self._healthy(session, instance.url + self.health_path)):
+                instance.ready_at = self._now()
+                self._emit(instance, "ready")
+                return
+            if self._now() >= deadline:
+                phase = "health check" if instance.running_at is not None else f"állapot: {instance.status}"
+                instance.error = f"Nem lett kész {self.ready_timeout}s alatt ({phase})"
+                return
+            await asyncio.sleep(self.poll_interval)
+
+
+def print_provisioning_report(report):
+    """Provisioning összesítő: VM-enként create / RUNNING / kész idő, hibák, párhuzamos vs szekvenciális idő"""
+    ready = report.ready()
+    print(f"\n🏗️  FLEET PROVISIONING ({len(report.instances)} VM, {report.duration:.1f}s)")
+    print(f"   🔹 Kész: {len(ready)}, hibás: {len(report.instances) - len(ready)}")
+    for instance in report.instances:
+        if instance.ok:
+            created = instance.created_at - instance.started_at
+            running = instance.running_at - instance.created_at
+            print(f"   ✅ {instance.name} ({instance.url}): create {created:.1f}s, RUNNING +{running:.1f}s, "
+                  f"kész {instance.ready_at:.1f}s-nál{' (meglévő)' if instance.reused else ''}")
+        else:
+            print(f"   ❌ {instance.name}: {instance.error}")
+    if len(ready) > 1:
+        sequential = report.sequential_estimate()
+        print(f"   🔹 Egyesével becsült idő: {sequential:.1f}s -> párhuzamosan {report.duration:.1f}s "
+              f"({sequential / report.duration:.1f}x gyorsabb)")
@@ -0,0 +1,198 @@
+"""
+Readiness gate for the Mannequin Segmenter load generators
+A startup script a VM-en docker build + docker run után tölti be a modellt, addig az /infer
+hibázik vagy nagyon lassú. Terhelés előtt minden instance-ra párhuzamosan warm-up /infer kérés
+megy (exponenciális backoff-fal ismételve), amíg a válasz sikeres és a latency küszöb alatt
+van; csak a kész instance-ok kapnak terhelést, a riportban VM-enként az elkészülés ideje.
+A kész VM-ek startup script boot fázis idejei (nginx /boot/timings.jsonl) is beolvasódnak.
+"""
+
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .engine import API_ENDPOINT
+from .response import read_infer_response
+from .workload import DEFAULT_PROMPT_MODE, build_payload
+
+DEFAULT_READY_LATENCY = 10.0    # A warm-up /infer ennyi másodpercen belül kell válaszoljon
+DEFAULT_READY_TIMEOUT = 600     # Legfeljebb eddig várunk egy instance-ra (s)
+DEFAULT_WARMUP_TIMEOUT = 120    # Egy warm-up kérés timeout-ja (az első modell betöltés lassú)
+DEFAULT_INITIAL_BACKOFF = 2.0
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_REQUIRED_SUCCESSES = 2  # Egymás utáni gyors warm-up-ok (az első a cache-t is melegíti)
+BOOT_TIMINGS_PATH = "/boot/timings.jsonl"   # A startup script írja, az nginx szolgálja ki (80-as port)
+BOOT_TIMINGS_TIMEOUT = 5
+
+
+class ReadinessProbe:
+    """Egy instance warm-up állapota: próbálkozások, utolsó latency / hiba, kész időpont (s a kezdéstől)"""
+
+    def __init__(self, url):
+        self.url = url
+        self.attempts = 0
+        self.last_latency = None
+        self.last_error = None
+        self.ready_at = None
+        self.boot_phases = None     # A startup script fázisai (fetch_boot_timings), ha elérhetők
+
+    @property
+    def ok(self):
+        return self.ready_at is not None
+
+
+async def warmup_infer(session, url, payload, api_endpoint=API_ENDPOINT, timeout=None):
+    """Egy /infer kérés: (sikeres, latency, hiba szöveg); timeout: a session timeout-ja helyett (s)"""
+    request_start = time.perf_counter()
+    kwargs = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout is not None else {}
+    try:
+        async with session.post(url + api_endpoint, json=payload, **kwargs) as response:
+            body = await read_infer_response(response, parse=False)
+        latency = body.last_byte_at - request_start
+        if response.status != 200:
+            return False, latency, f"HTTP {response.status}"
+        return True, latency, None
+    except asyncio.TimeoutError:
+        return False, time.perf_counter() - request_start, "Timeout"
+    except aiohttp.ClientError as e:
+        return False, time.perf_counter() - request_start, str(e) or type(e).__name__
+
+
+def boot_timings_url(instance_url, path=BOOT_TIMINGS_PATH):
+    """Az instance boot timing fájlja: ugyanaz a host, az nginx (80-as port)"""
+    parts = urlsplit(instance_url)
+    return f"{parts.scheme}://{parts.hostname}{path}"
+
+
+async def fetch_boot_timings(session, instance_url):
+    """A startup script fázis sorai ({phase, status, start, end, seconds}); None, ha nem elérhető"""
+    try:
+        timeout = aiohttp.ClientTimeout(total=BOOT_TIMINGS_TIMEOUT)
+        async with session.get(boot_timings_url(instance_url), timeout=timeout) as response:
+            if response.status != 200:
+                return None
+            text = await response.text()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+    phases = []
+    for line in text.splitlines():
+        try:
+            phases.append(json.loads(line))
+        except ValueError:
+            continue
+    return phases or None
+
+
+class ReadinessReport:
+    """Az összes instance warm-up eredménye (bemeneti sorrendben)"""
+
+    def __init__(self, probes, duration, latency_threshold):
+        self.probes = probes
+        self.duration = duration
+        self.latency_threshold = latency_threshold
+
+    def ready(self):
+        return [probe for probe in self.probes if probe.ok]
+
+    def not_ready(self):
+        return [probe for probe in self.probes if not probe.ok]
+
+    def ready_urls(self):
+        return [probe.url for probe in self.ready()]
+
+
+class ReadinessGate:
+    """Párhuzamos warm-up minden instance-ra, backoff-fal (initial_backoff, duplázva max_backoff-ig, ±20% jitter);
+    kész: required_successes egymás utáni sikeres /infer latency_threshold alatt; on_ready(probe) hook;
+    boot_timings: a kész VM boot fázis idejeinek lekérése"""
+
+    def __init__(self, image_url, prompt_mode=DEFAULT_PROMPT_MODE, api_endpoint=API_ENDPOINT,
+                 latency_threshold=DEFAULT_READY_LATENCY, timeout=DEFAULT_READY_TIMEOUT,
+                 request_timeout=DEFAULT_WARMUP_TIMEOUT, initial_backoff=DEFAULT_INITIAL_BACKOFF,
+                 max_backoff=DEFAULT_MAX_BACKOFF, required_successes=DEFAULT_REQUIRED_SUCCESSES, on_ready=None,
+                 boot_timings=True):
+        self.payload = build_payload(image_url, prompt_mode)
+        self.api_endpoint = api_endpoint
+        self.latency_threshold = latency_threshold
+        self.timeout = timeout
+        self.request_timeout = request_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.required_successes = required_successes
+        self.on_ready = on_ready
+        self.boot_timings = boot_timings
+        self.start_time = None
+
+    async def wait(self, urls):
+        """ReadinessReport, amikor minden instance kész vagy lejárt a timeout"""
+        self.start_time = time.perf_counter()
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            probes = await asyncio.gather(*(self._wait_one(session, url) for url in urls))
+        return ReadinessReport(list(probes), time.perf_counter() - self.start_time, self.latency_threshold)
+
+    async def _wait_one(self, session, url):
+        probe = ReadinessProbe(url)
+        deadline = self.start_time + self.timeout
+        backoff = self.initial_backoff
+        streak = 0
+        while True:
+            # A gate timeout-ja minden próbálkozás előtt számít, és a kérés sem nyúlhat túl rajta
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                if probe.last_error is None:
+                    probe.last_error = f"lejárt a timeout ({streak}/{self.required_successes} egymás utáni siker)"
+                return probe
+            probe.attempts += 1
+            ok, latency, error = await warmup_infer(
+                session, url, self.payload, self.api_endpoint, timeout=min(self.request_timeout, remaining),
+            )
+            probe.last_latency = latency
+            if ok and latency <= self.latency_threshold:
+                streak += 1
+                if streak >= self.required_successes:
+                    probe.ready_at = time.perf_counter() - self.start_time
+                    probe.last_error = None
+                    if self.boot_timings:
+                        probe.boot_phases = await fetch_boot_timings(session, url)
+                    if self.on_ready:
+                        self.on_ready(probe)
+                    return probe
+                continue
+            streak = 0
+            probe.last_error = error or f"lassú: {latency:.2f}s > {self.latency_threshold:g}s"
+            delay = backoff * random.uniform(0.8, 1.2)
+            if time.perf_counter() + delay >= deadline:
+                return probe
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+def format_boot_phases(phases):
+    """Startup script fázisok egy sorban: "apt 41.2s, docker_install cached, pull 18.0s, ..." """
+    parts = []
+    for phase in phases:
+        if phase.get("status") == "ok":
+            parts.append(f"{phase['phase']} {phase['seconds']:.1f}s")
+        else:
+            parts.append(f"{phase['phase']} {phase.get('status')}")
+    return ", ".join(parts)
+
+
+def print_readiness_report(report):
+    """Readiness gate összesítő: VM-enként az elkészülés ideje (warm-up /infer a küszöb alatt) vagy az utolsó hiba"""
+    ready = report.ready()
+    print(f"\n🚦 READINESS GATE ({len(report.probes)} VM, {report.duration:.1f}s, küszöb {report.latency_threshold:g}s)")
+    for probe in report.probes:
+        if probe.ok:
+            print(f"   ✅ {probe.url}: kész {probe.ready_at:.1f}s alatt ({probe.attempts} próbálkozás, "
+                  f"warm-up {probe.last_latency:.2f}s)")
+            if probe.boot_phases:
+                print(f"      boot: {format_boot_phases(probe.boot_phases)}")
+        else:
+            print(f"   ❌ {probe.url}: nem lett kész ({probe.attempts} próbálkozás, utolsó hiba: {probe.last_error})")
+    print(f"   🔹 Terhelést kap: {len(ready)}/{len(report.probes)} VM")
@@ -0,0 +1,174 @@
+"""
+Production trace replay for the Mannequin Segmenter load generators
+Időbélyeges kérés napló (JSONL / CSV: image_url, prompt_mode, érkezési idő) lusta,
+soronkénti beolvasása és visszajátszása az eredeti ütemben (vagy gyorsítva / lassítva),
+hogy a löketek, ismétlődő képek és a prompt_mode keverék a mérésben is megjelenjenek.
+"""
+
+import csv
+import hashlib
+import json
+import math
+import os
+from datetime import datetime
+
+from .workload import DEFAULT_PROMPT_MODE, build_payload
+
+# Az érkezési idő mező lehetséges nevei (az első meglévő számít)
+TIME_FIELDS = ("arrival_time", "timestamp", "time", "offset")
+DISTINCT_PRECISION = 14     # Különböző képek becslése: 2**14 regiszter (16 KB), ~0.8% relatív hiba
+
+
+def parse_time(value):
+    """Érkezési idő másodpercben: szám (epoch vagy relatív) vagy ISO 8601 időbélyeg"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _read_records(path):
+    """Nyers rekordok (dict) soronként; .csv fejléc alapján, minden más JSONL"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if os.path.splitext(path)[1].lower() == ".csv":
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_trace(path, default_prompt_mode=DEFAULT_PROMPT_MODE):
+    """(eltolás másodpercben az első kéréstől, payload) párok a napló sorrendjében
+
+    Időrendben rendezett naplót vár; a visszafelé ugró időbélyeg a megelőző kéréssel
+    együtt indul. Hiányzó / hibás image_url vagy időbélyeg esetén a sor kimarad.
+    """
+    origin = None
+    last = 0.0
+    for record in _read_records(path):
+        image_url = record.get("image_url")
+        field = next((name for name in TIME_FIELDS if record.get(name) not in (None, "")), None)
+        if not image_url or field is None:
+            continue
+        try:
+            arrival = parse_time(record[field])
+        except ValueError:
+            continue
+        if origin is None:
+            origin = arrival
+        last = max(last, arrival - origin)
+        yield last, build_payload(image_url, record.get("prompt_mode") or default_prompt_mode)
+
+
+class DistinctCounter:
+    """Különböző értékek becsült száma fix memóriában (HyperLogLog, stabil blake2b digest-en)
+
+    2**precision bájtos regiszter tömb a napló méretétől függetlenül; relatív hiba ~1.04 / sqrt(2**precision),
+    kis elemszámnál (linear counting) gyakorlatilag pontos.
+    """
+
+    def __init__(self, precision=DISTINCT_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        digest = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        index = digest >> (64 - self.precision)
+        rest = digest & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class TraceWorkload:
+    """A napló kérései sorrendben, egyszer; a következő kérés eltolását a ReplayPacing olvassa (peek)"""
+
+    def __init__(self, path, default_prompt_mode=DEFAULT_PROMPT_MODE, limit=None, track_repeats=True):
+        self.path = path
+        self.limit = limit
+        self._records = iter_trace(path, default_prompt_mode)
+        self._next = None
+        self.issued = 0
+        self.last_offset = 0.0    # Az utolsó kiadott kérés eltolása (a napló eddigi hossza)
+        self._done = False
+        # Ismétlődő képek aránya: fix méretű becslő, a memória nem nő a különböző képek számával
+        self._distinct = DistinctCounter() if track_repeats else None
+        self.prompt_modes = {}
+
+    @property
+    def repeated(self):
+        """Ismétlődő képek becsült száma (kiadott - különböző); None, ha nincs követve"""
+        if self._distinct is None:
+            return None
+        return max(0, self.issued - self._distinct.count())
+
+    def peek_offset(self):
+        """A következő kérés eltolása (None, ha a napló végére értünk)"""
+        if self._next is None and not self._done:
+            if self.limit is not None and self.issued >= self.limit:
+                self._done = True
+            else:
+                self._next = next(self._records, None)
+                self._done = self._next is None
+        return None if self._next is None else self._next[0]
+
+    def next_task(self):
+        if self.peek_offset() is None:
+            return None
+        offset, payload = self._next
+        self._next = None
+        self.issued += 1
+        self.last_offset = offset
+
+        if self._distinct is not None:
+            self._distinct.add(payload["image_url"])
+        mode = payload["prompt_mode"]
+        self.prompt_modes[mode] = self.prompt_modes.get(mode, 0) + 1
+        return {"task_id": self.issued, "payload": payload, "trace_offset": offset}
+
+    def exhausted(self):
+        return self.peek_offset() is None
+
+    async def wait_task(self):
+        return self.next_task()
+
+
+class ReplayPacing:
+    """Nyílt hurok a napló időbélyegei szerint: eltolás / speed (speed=2: kétszeres tempó)"""
+
+    open_loop = True
+    poisson = False
+
+    def __init__(self, workload, speed=1.0, duration=None, max_outstanding=None):
+        if speed <= 0:
+            raise ValueError("ReplayPacing: a speed legyen pozitív")
+        self.workload = workload
+        self.speed = speed
+        self.duration = duration
+        self.max_outstanding = max_outstanding
+
+    def should_stop(self, elapsed):
+        return self.duration is not None and elapsed >= self.duration
+
+    def schedule(self):
+        while True:
+            offset = self.workload.peek_offset()
+            if offset is None:
+                return
+            yield offset / self.speed
+
+    def describe(self):
+        return f"replay {os.path.basename(self.workload.path)} x{self.speed:g}"
@@ -0,0 +1,247 @@
+"""
+Streaming /infer response handling for the Mannequin Segmenter load generators
+A választ chunk-onként olvassuk (response.content), a méretet menet közben
+számoljuk, és a JSON-ból csak a "timing" és "visualization_url" mezőket dekódoljuk;
+a többi (pl. inline maszk, base64 vizualizáció) átugorva, pufferelés nélkül.
+"""
+
+import json
+import re
+import time
+
+# Ezeket a legfelső szintű mezőket dekódoljuk, minden mást átugrunk
+WANTED_FIELDS = ("timing", "visualization_url")
+
+# Ennél kisebb törzset egyben dekódolunk (gyorsabb), efölött streamelt szkenner
+SMALL_BODY_LIMIT = 64 * 1024
+
+WHITESPACE = b" \t\r\n"
+
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_CONTAINER_SPECIAL = re.compile(rb'["\\{}\[\]]')
+_SCALAR_END = re.compile(rb'[,}\]\s]')
+
+# Parser állapotok
+_START, _KEY_OR_END, _KEY, _COLON, _VALUE_START, _VALUE, _DONE, _INVALID = range(8)
+
+
+class InferResponseScanner:
+    """Inkrementális JSON szkenner a legfelső szintű objektumhoz
+
+    feed(chunk) tetszőleges határon vágott byte-okat fogad; a keresett mezők
+    értékét a végén json.loads-szal dekódolja, a többi érték csak átugorva
+    (string: következő nem escape-elt idézőjelig, objektum/tömb: mélység számlálással).
+    """
+
+    def __init__(self, fields=WANTED_FIELDS):
+        self.fields = set(fields)
+        self.values = {}
+        self.state = _START
+        self._key = bytearray()
+        self._current = None
+        self._capture = None    # A dekódolandó érték byte-jai (csak keresett mezőnél)
+        self._kind = None       # "string" / "container" / "scalar"
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def valid(self):
+        """True, ha eddig érvényes objektumnak tűnik (nem ellenőriz teljes JSON szintaxist)"""
+        return self.state != _INVALID
+
+    @property
+    def complete(self):
+        """Minden keresett mező megvan (vagy nincs mit keresni) - a többi byte-ot nem kell elemezni"""
+        return self.state in (_DONE, _INVALID) or len(self.values) == len(self.fields)
+
+    def get(self, field, default=None):
+        return self.values.get(field, default)
+
+    def __contains__(self, field):
+        return field in self.values
+
+    def feed(self, chunk):
+        if self.complete:
+            return
+        i = 0
+        n = len(chunk)
+        while i < n and not self.complete:
+            state = self.state
+            if state == _VALUE:
+                i = self._scan_value(chunk, i)
+                continue
+
+            byte = chunk[i]
+            if byte in WHITESPACE and state != _KEY:
+                i += 1
+                continue
+
+            if state == _START:
+                self.state = _KEY_OR_END if byte == 0x7B else _INVALID   # {
+                i += 1
+            elif state == _KEY_OR_END:
+                if byte == 0x7D:                                         # }
+                    self.state = _DONE
+                elif byte == 0x22:                                       # "
+                    self._key.clear()
+                    self.state = _KEY
+                elif byte != 0x2C:                                       # ,
+                    self.state = _INVALID
+                i += 1
+            elif state == _KEY:
+                i = self._scan_key(chunk, i)
+            elif state == _COLON:
+                self.state = _VALUE_START if byte == 0x3A else _INVALID  # :
+                i += 1
+            elif state == _VALUE_START:
+                self._begin_value(byte)
+                if self._kind != "scalar":
+                    i += 1
+                    if self._capture is not None:
+                        self._capture.append(byte)
+
+    def _scan_key(self, chunk, i):
+        """Kulcs string (rövid, pufferelve) a záró idézőjelig"""
+        n = len(chunk)
+        while i < n:
+            if self._escape:
+                self._key.append(chunk[i])
+                self._escape = False
+                i += 1
+                continue
+            match = _STRING_SPECIAL.search(chunk, i)
+            if match is None:
+                self._key += chunk[i:]
+                return n
+            self._key += chunk[i:match.start()]
+            if chunk[match.start()] == 0x5C:                             # \
+                self._key.append(0x5C)
+                self._escape = True
+                i = match.end()
+                continue
+            self.state = _COLON
+            return match.end()
+        return i
+
+    def _begin_value(self, byte):
+        key = self._key.decode("utf-8", "replace")
+        if '\\' in key:
+            key = json.loads(b'"' + bytes(self._key) + b'"')
+        self._capture = bytearray() if key in self.fields else None
+        self._current = key
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        if byte == 0x22:
+            self._kind = "string"
+        elif byte in (0x7B, 0x5B):
+            self._kind = "container"
+            self._depth = 1
+        else:
+            self._kind = "scalar"
+        self.state = _VALUE
+
+    def _scan_value(self, chunk, i):
+        """Érték átugrása / gyűjtése; visszaadja a következő feldolgozandó pozíciót"""
+        start = i
+        end = self._find_value_end(chunk, i)
+        stop = len(chunk) if end is None else end
+        if self._capture is not None:
+            self._capture += chunk[start:stop]
+        if end is not None:
+            self._finish_value()
+        return stop
+
+    def _find_value_end(self, chunk, i):
+        """Az érték utáni első pozíció ebben a chunk-ban, vagy None, ha a következőben folytatódik"""
+        n = len(chunk)
+        if self._kind == "scalar":
+            match = _SCALAR_END.search(chunk, i)
+            return None if match is None else match.start()
+
+        while i < n:
+            if self._escape:
+                self._escape = False
+                i += 1
+                continue
+            in_string = self._kind == "string" or self._in_string
+            match = (_STRING_SPECIAL if in_string else _CONTAINER_SPECIAL).search(chunk, i)
+            if match is None:
+                return None
+            byte = chunk[match.start()]
+            i = match.end()
+            if byte == 0x5C:                                             # \
+                self._escape = True
+            elif byte == 0x22:                                           # "
+                if self._kind == "string":
+                    return i
+                self._in_string = not self._in_string
+            elif byte in (0x7B, 0x5B):
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return i
+        return None
+
+    def _finish_value(self):
+        if self._capture is not None:
+            try:
+                self.values[self._current] = json.loads(bytes(self._capture))
+            except ValueError:
+                self.state = _INVALID
+                return
+        self._capture = None
+        self.state = _KEY_OR_END
+
+
+class StreamedResponse:
+    """Egy letöltött válasz mérései: méret, első / utolsó törzs byte ideje (perf_counter; üres törzsnél
+    az első = utolsó), kinyert mezők (None, ha nem elemeztük)"""
+
+    def __init__(self, size, last_byte_at, fields=None, first_byte_at=None):
+        self.size = size
+        self.last_byte_at = last_byte_at
+        self.first_byte_at = last_byte_at if first_byte_at is None else first_byte_at
+        self.fields = fields
+
+
+def _decode_small_body(body, fields=WANTED_FIELDS):
+    """Kis válasz: egy json.loads gyorsabb, mint a szkenner"""
+    try:
+        document = json.loads(body)
+    except ValueError:
+        return {}
+    if not isinstance(document, dict):
+        return {}
+    return {field: document[field] for field in fields if field in document}
+
+
+async def read_infer_response(response, parse=True, small_body_limit=SMALL_BODY_LIMIT):
+    """Válasz törzs olvasása chunk-onként; parse=True esetén a timing / visualization_url
+    mezők kinyerése menet közben (small_body_limit feletti törzs nem kerül egyben a memóriába)"""
+    size = 0
+    first_byte_at = None
+    small = bytearray() if parse else None
+    scanner = None
+    async for chunk in response.content.iter_any():
+        if first_byte_at is None:
+            first_byte_at = time.perf_counter()
+        size += len(chunk)
+        if small is not None:
+            small += chunk
+            if len(small) > small_body_limit:
+                # Nagy válasz (pl. inline maszk): innentől inkrementális szkenner
+                scanner = InferResponseScanner()
+                scanner.feed(bytes(small))
+                small = None
+        elif scanner is not None and not scanner.complete:
+            scanner.feed(chunk)
+    last_byte_at = time.perf_counter()
+
+    if scanner is not None:
+        return StreamedResponse(size, last_byte_at, scanner.values, first_byte_at)
+    if small is not None:
+        return StreamedResponse(size, last_byte_at, _decode_small_body(bytes(small)), first_byte_at)
+    return StreamedResponse(size, last_byte_at, first_byte_at=first_byte_at)
@@ -0,0 +1,145 @@
+"""
+Saturation knee detection for profiled load runs
+A futást a profil ablakaira bontja (cél terhelés, throughput, p50 / p99, hibaarány),
+majd a cél terhelés szerint növekvő sorrendben megkeresi a könyököt: ahol a
+throughput már nem nő arányosan a terheléssel, a késleltetés pedig emelkedik.
+"""
+
+import numpy as np
+
+DEFAULT_MIN_GAIN = 0.5          # Normalizált meredekség (ΔX/X) / (ΔL/L) alatta telítődés
+DEFAULT_LATENCY_RISE = 0.10     # p99 ennyivel (10%) nő az előző szinthez képest
+DEFAULT_MAX_ERROR_RATE = 0.01   # Ennél több hiba egy ablakban = nem fenntartható
+MIN_LEVEL_STEP = 0.01           # Ennél kisebb relatív terhelés növekedés ugyanannak a szintnek számít
+
+
+class LoadWindow:
+    """Egy elemzési ablak: cél terhelés (offered), throughput, késleltetés, hibaarány, instance-onkénti kérés/s"""
+
+    def __init__(self, start, end, offered, requests, failed, throughput, p50, p99, per_instance):
+        self.start = start
+        self.end = end
+        self.offered = offered
+        self.requests = requests
+        self.failed = failed
+        self.throughput = throughput
+        self.p50 = p50
+        self.p99 = p99
+        self.per_instance = per_instance
+
+    @property
+    def error_rate(self):
+        return self.failed / self.requests if self.requests else 0.0
+
+
+def window_stats(frame, profile, origin, window_seconds=None):
+    """LoadWindow lista: throughput az ablakban befejezett sikeres kérésekből,
+    késleltetés / hibaarány az ablakban indult kérésekből (origin: a futás kezdete, time.time())"""
+    windows = profile.windows(window_seconds) if window_seconds else profile.windows()
+    starts = frame["start"] - origin
+    successful = frame.where(frame["success"] == 1)
+    ends = successful.end - origin
+    instances = successful["instance"]
+
+    result = []
+    for start, end in windows:
+        length = end - start
+        if length <= 0:
+            continue
+        started = (starts >= start) & (starts < end)
+        window = frame.where(started)
+        summary = window.successful().summary(quantiles=(50, 99))
+        completed = (ends >= start) & (ends < end)
+        ids, counts = np.unique(instances[completed], return_counts=True)
+        result.append(LoadWindow(
+            start, end, profile.average(start, end),
+            len(window), int((window["success"] != 1).sum()),
+            int(completed.sum()) / length,
+            summary.quantiles[50] if summary else None,
+            summary.quantiles[99] if summary else None,
+            {int(i): int(c) / length for i, c in zip(ids, counts)},
+        ))
+    return result
+
+
+class KneeResult:
+    """A könyök (első telített ablak, None ha nem értük el) és a legnagyobb fenntartható ablak"""
+
+    def __init__(self, windows, knee, sustainable, reason):
+        self.windows = windows
+        self.knee = knee
+        self.sustainable = sustainable
+        self.reason = reason
+
+    @property
+    def saturated(self):
+        return self.knee is not None
+
+    @property
+    def sustainable_throughput(self):
+        return self.sustainable.throughput if self.sustainable else None
+
+
+def detect_knee(windows, min_gain=DEFAULT_MIN_GAIN, latency_rise=DEFAULT_LATENCY_RISE,
+                p99_slo=None, max_error_rate=DEFAULT_MAX_ERROR_RATE):
+    """Könyök keresés a cél terhelés szerint rendezett ablakokon
+
+    Egy ablak nem fenntartható, ha a hibaarány vagy (megadott SLO esetén) a p99 túl magas;
+    telítődés, ha a normalizált throughput növekedés min_gain alatt van, miközben a p99
+    legalább latency_rise-szal nő. A fenntartható throughput a könyök előtti legjobb ablaké.
+    """
+    ordered = sorted((w for w in windows if w.requests and w.offered > 0), key=lambda w: w.offered)
+    best = None
+    previous = None
+    for window in ordered:
+        if window.error_rate > max_error_rate:
+            return KneeResult(windows, window, best, f"hibaarány {window.error_rate*100:.1f}%")
+        if p99_slo is not None and window.p99 is not None and window.p99 > p99_slo:
+            return KneeResult(windows, window, best, f"p99 {window.p99:.3f}s > SLO {p99_slo:g}s")
+
+        if previous is not None and window.offered > previous.offered * (1 + MIN_LEVEL_STEP) and previous.throughput > 0:
+            gain = (window.throughput / previous.throughput - 1) / (window.offered / previous.offered - 1)
+            latency_up = (
+                window.p99 is not None and previous.p99 is not None
+                and window.p99 > previous.p99 * (1 + latency_rise)
+            )
+            if gain < min_gain and latency_up:
+                return KneeResult(
+                    windows, window, best,
+                    f"throughput meredekség {gain:.2f}, p99 {previous.p99:.3f}s -> {window.p99:.3f}s",
+                )
+        if best is None or window.throughput > best.throughput:
+            best = window
+        previous = window
+    return KneeResult(windows, None, best, "a profil végéig nem telítődött")
+
+
+def print_saturation_report(result, instances, unit="kérés/s"):
+    """Ablakonkénti terhelés táblázat, könyök és max fenntartható throughput (fleet + instance-onként)
+
+    unit: a cél terhelés egysége ("kérés/s" nyílt hurokban, "egyidejű" zárt hurokban)
+    """
+    print(f"\n📶 TERHELÉS PROFIL ABLAKOK")
+    print(f"   {'Ablak':>13s} {'Cél (' + unit + ')':>18s} {'kérés/s':>9s} {'p50':>8s} {'p99':>8s} {'hiba':>6s}")
+    for window in result.windows:
+        p50 = f"{window.p50:.3f}s" if window.p50 is not None else "N/A"
+        p99 = f"{window.p99:.3f}s" if window.p99 is not None else "N/A"
+        marker = "  ⬅️  könyök" if window is result.knee else ("  ✅ max fenntartható" if window is result.sustainable else "")
+        print(
+            f"   {window.start:5.0f}-{window.end:5.0f}s {window.offered:18.2f} {window.throughput:9.2f} "
+            f"{p50:>8s} {p99:>8s} {window.error_rate*100:5.1f}%{marker}"
+        )
+
+    print(f"\n🏔️  TELÍTŐDÉS")
+    if result.saturated:
+        print(f"   🔹 Könyök: cél {result.knee.offered:.2f} {unit} ({result.reason})")
+    else:
+        print(f"   🔹 Nincs könyök: {result.reason} - a max fenntartható érték alsó becslés")
+    best = result.sustainable
+    if best is None:
+        print(f"   ❌ Nincs fenntartható ablak")
+        return
+    print(f"   🔹 Max fenntartható throughput (fleet): {best.throughput:.2f} kérés/s (cél {best.offered:.2f} {unit})")
+    print(f"   🔹 Instance átlag: {best.throughput/len(instances):.2f} kérés/s/instance")
+    for i, instance in enumerate(instances):
+        print(f"      VM {i+1} ({instance.url}): {best.per_instance.get(instance.instance_id, 0.0):.2f} kérés/s")
@@ -0,0 +1,204 @@
+"""
+Buffered result sinks for the Mannequin Segmenter load generators
+A kérésenkénti eredmények nem a terminálra mennek, hanem memóriában gyűlnek, és
+egy háttér writer task batch-enként írja ki őket JSONL, CSV vagy Parquet fájlba
+(a fájl I/O külön szálon fut, az event loop nem blokkolódik).
+"""
+
+import asyncio
+import csv
+import json
+import os
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Fix oszlopsorrend CSV / Parquet kimenethez (a hiányzó mezők üresek)
+RESULT_FIELDS = (
+    "task_id",
+    "request_id",
+    "lane_id",
+    "instance_id",
+    "instance_name",
+    "instance_url",
+    "image_url",
+    "image_bytes",
+    "prompt_mode",
+    "timestamp",
+    "intended_timestamp",
+    "send_lag",
+    "status_code",
+    "success",
+    "response_time",
+    "intended_response_time",
+    "client_ttfb",
+    "client_ttlb",
+    "client_pool_wait",
+    "client_dns",
+    "client_connect",
+    "client_send",
+    "client_server_wait",
+    "client_download",
+    "response_size",
+    "has_visualization_url",
+    "server_image_conversion",
+    "server_model_inference",
+    "server_gcs_upload",
+    "server_gcs_total",
+    "server_total_request",
+    "network_overhead",
+    "error",
+)
+
+# Parquet oszlop típusok (a többi RESULT_FIELDS mező float64)
+INTEGER_FIELDS = ("task_id", "request_id", "lane_id", "instance_id", "status_code", "response_size")
+BOOLEAN_FIELDS = ("success", "has_visualization_url")
+STRING_FIELDS = ("instance_name", "instance_url", "image_url", "prompt_mode", "error")
+
+
+class ResultSink:
+    """Alaposztály: write() csak a memória pufferbe tesz, a háttér task batch-enként ír
+
+    batch_size: ennyi rekordnál azonnal ír; flush_interval: legkésőbb ennyi másodpercenként
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._buffer = []
+        self._wakeup = None
+        self._closing = False
+        self._writer_task = None
+
+    def write(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        await asyncio.to_thread(self.open)
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._writer_task = asyncio.create_task(self._writer())
+
+    async def close(self):
+        """Maradék rekordok kiírása és a fájl lezárása"""
+        if self._writer_task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._writer_task
+        self._writer_task = None
+        await asyncio.to_thread(self.close_file)
+
+    async def _writer(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._buffer:
+                batch, self._buffer = self._buffer, []
+                await asyncio.to_thread(self.write_batch, batch)
+                self.written += len(batch)
+            if self._closing and not self._buffer:
+                return
+
+    # Formátum-specifikus rész (writer szálon fut)
+    def open(self):
+        raise NotImplementedError
+
+    def write_batch(self, batch):
+        raise NotImplementedError
+
+    def close_file(self):
+        raise NotImplementedError
+
+
+class JsonlSink(ResultSink):
+    """Egy JSON objektum soronként (a teljes rekord, server_timing-gel együtt)"""
+
+    def open(self):
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def write_batch(self, batch):
+        self._file.write("".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in batch))
+        self._file.flush()
+
+    def close_file(self):
+        self._file.close()
+
+
+class CsvSink(ResultSink):
+    """RESULT_FIELDS oszlopok, fejléccel"""
+
+    def open(self):
+        self._file = open(self.path, "w", encoding="utf-8", newline="")
+        self._csv_writer = csv.DictWriter(self._file, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+        self._csv_writer.writeheader()
+
+    def write_batch(self, batch):
+        self._csv_writer.writerows(batch)
+        self._file.flush()
+
+    def close_file(self):
+        self._file.close()
+
+
+class ParquetSink(ResultSink):
+    """RESULT_FIELDS oszlopok, batch-enként egy row group (pyarrow szükséges)"""
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        if pyarrow is None:
+            raise RuntimeError("ParquetSink: a pyarrow csomag nincs telepítve (pip install pyarrow)")
+        super().__init__(path, batch_size, flush_interval)
+        self._parquet_writer = None
+
+    @staticmethod
+    def schema():
+        """Fix séma, hogy a csupa üres első batch se rögzítsen null típust"""
+        def field_type(field):
+            if field in INTEGER_FIELDS:
+                return pyarrow.int64()
+            if field in BOOLEAN_FIELDS:
+                return pyarrow.bool_()
+            if field in STRING_FIELDS:
+                return pyarrow.string()
+            return pyarrow.float64()
+        return pyarrow.schema([(field, field_type(field)) for field in RESULT_FIELDS])
+
+    def open(self):
+        self._parquet_writer = pyarrow.parquet.ParquetWriter(self.path, self.schema())
+
+    def write_batch(self, batch):
+        columns = {field: [record.get(field) for record in batch] for field in RESULT_FIELDS}
+        self._parquet_writer.write_table(pyarrow.table(columns, schema=self._parquet_writer.schema))
+
+    def close_file(self):
+        self._parquet_writer.close()
+
+
+SINK_FORMATS = {
+    ".jsonl": JsonlSink,
+    ".csv": CsvSink,
+    ".parquet": ParquetSink,
+}
+
+
+def make_sink(path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+    """Sink a fájl kiterjesztése alapján (.jsonl / .csv / .parquet); path=None -> nincs sink"""
+    if path is None:
+        return None
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINK_FORMATS:
+        raise ValueError(f"Ismeretlen eredmény fájl formátum: {path} (választható: {', '.join(SINK_FORMATS)})")
+    return SINK_FORMATS[extension](path, batch_size, flush_interval)
@@ -0,0 +1,59 @@
+"""
+Small statistics helpers shared by the test script reports
+Riport segédfüggvények: percentilis és közös formázás (rendezett lista, LatencyHistogram,
+columns.Summary); az egyes funkciók riportjai a saját moduljuk mellett vannak.
+"""
+
+import math
+
+from .histogram import DEFAULT_PERCENTILES
+
+
+def percentile(sorted_values, q):
+    """q-adik percentilis (0-100) egy már rendezett listából, lineáris interpolációval"""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * q / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return sorted_values[low]
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def format_percentiles(histogram, qs=DEFAULT_PERCENTILES):
+    """'p50 0.123s / p90 ...' formátumú összefoglaló egy hisztogramból"""
+    values = histogram.percentiles(qs)
+    return " / ".join(f"p{q:g} {values[q]:.3f}s" for q in qs)
+
+
+def print_histogram_statistics(histogram, indent="   "):
+    """Min/max/átlag/medián/szórás + magas percentilisek egy hisztogramból"""
+    print(f"{indent}🔹 Minimum: {histogram.min:.3f} másodperc")
+    print(f"{indent}🔹 Maximum: {histogram.max:.3f} másodperc")
+    print(f"{indent}🔹 Átlag: {histogram.mean():.3f} másodperc")
+    print(f"{indent}🔹 Medián: {histogram.percentile(50):.3f} másodperc")
+    if histogram.count > 1:
+        print(f"{indent}🔹 Szórás: {histogram.stdev():.3f} másodperc")
+    print(f"{indent}🔹 Percentilisek: {format_percentiles(histogram)}")
+
+
+def print_summary_statistics(summary, indent="   ", median=True, stdev=True):
+    """Min/max/átlag(/medián/szórás) egy columns.Summary-ből, ugyanabban a formában"""
+    print(f"{indent}🔹 Minimum: {summary.min:.3f} másodperc")
+    print(f"{indent}🔹 Maximum: {summary.max:.3f} másodperc")
+    print(f"{indent}🔹 Átlag: {summary.mean:.3f} másodperc")
+    if median:
+        print(f"{indent}🔹 Medián: {summary.median:.3f} másodperc")
+    if stdev and summary.count > 1:
+        print(f"{indent}🔹 Szórás: {summary.stdev:.3f} másodperc")
+
+
+def format_bytes(size):
+    if size is None:
+        return "N/A"
+    if size >= 1024 * 1024:
+        return f"{size/1024/1024:.1f} MB"
+    return f"{size/1024:.0f} KB"
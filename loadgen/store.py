@@ -0,0 +1,191 @@
+"""
+Persistent benchmark result store for the Mannequin Segmenter load generators
+Minden futás egy lokális SQLite adatbázisba kerül (run id, image digest, géptípus,
+instance szám, driver és mód kulcsokkal), a kérésenkénti oszlopokkal együtt - így
+két build / konfiguráció később statisztikailag összehasonlítható.
+"""
+
+import os
+import sqlite3
+import uuid
+from datetime import datetime
+
+from .columns import COLUMNS, ResultFrame
+from .deployment import deployment_metadata
+
+DEFAULT_RESULTS_DB = "benchmark_results.db"
+
+# Futás szintű mezők (a runs tábla oszlopai, sorrendben)
+RUN_FIELDS = (
+    ("run_id", "TEXT PRIMARY KEY"),
+    ("started_at", "TEXT"),
+    ("driver", "TEXT"),
+    ("mode", "TEXT"),
+    ("image_uri", "TEXT"),
+    ("image_digest", "TEXT"),
+    ("machine_type", "TEXT"),
+    ("instance_count", "INTEGER"),
+    ("requests", "INTEGER"),
+    ("succeeded", "INTEGER"),
+    ("duration", "REAL"),
+    ("throughput", "REAL"),
+    ("p50", "REAL"),
+    ("p99", "REAL"),
+    ("notes", "TEXT"),
+)
+
+_SQL_TYPES = {"q": "INTEGER", "b": "INTEGER", "d": "REAL"}
+_SAMPLE_COLUMNS = [name for name, _, _ in COLUMNS]
+
+
+def pacing_mode(pacing):
+    """Driver mód leírása a pacing-ből: closed-loop / open-loop N rps (poisson), profilnál a profil,
+    describe()-os pacing-nél (pl. trace replay) a saját leírása"""
+    if hasattr(pacing, "describe"):
+        return f"open-loop {pacing.describe()}" if pacing.open_loop else f"closed-loop {pacing.describe()}"
+    profile = getattr(pacing, "profile", None)
+    if not getattr(pacing, "open_loop", False):
+        return f"closed-loop {profile.describe()}" if profile else "closed-loop"
+    if profile:
+        return f"open-loop {profile.describe()} rps{' poisson' if pacing.poisson else ''}"
+    return f"open-loop {pacing.rate:g} rps{' poisson' if pacing.poisson else ''}"
+
+
+def new_run_id():
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class ResultStore:
+    """SQLite adatbázis: runs (futásonként egy sor) + samples (kérésenként egy sor)"""
+
+    def __init__(self, path=DEFAULT_RESULTS_DB):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _create_tables(self):
+        run_columns = ", ".join(f"{name} {sql_type}" for name, sql_type in RUN_FIELDS)
+        sample_columns = ", ".join(f"{name} {_SQL_TYPES[typecode]}" for name, _, typecode in COLUMNS)
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS runs ({run_columns})")
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS samples (run_id TEXT NOT NULL, {sample_columns})")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS samples_run_id ON samples (run_id)")
+            # Régebbi adatbázis: az azóta bővült oszlopok hozzáadása (a régi futásoknál NULL)
+            existing = {row["name"] for row in self.connection.execute("PRAGMA table_info(samples)")}
+            for name, _, typecode in COLUMNS:
+                if name not in existing:
+                    self.connection.execute(f"ALTER TABLE samples ADD COLUMN {name} {_SQL_TYPES[typecode]}")
+
+    def save_run(self, frame, driver, mode, instance_count, metadata=None,
+                 run_id=None, started_at=None, duration=None, notes=None):
+        """Futás mentése (frame: ResultFrame); visszaadja a run id-t"""
+        metadata = metadata or {}
+        run_id = run_id or new_run_id()
+        successful = frame.successful()
+        summary = successful.summary(quantiles=(50, 99))
+        if duration is None and len(frame):
+            duration = float(frame.end.max() - frame["start"].min())
+        run = {
+            "run_id": run_id,
+            "started_at": started_at or datetime.now().isoformat(timespec="seconds"),
+            "driver": driver,
+            "mode": mode,
+            "image_uri": metadata.get("image_uri", ""),
+            "image_digest": metadata.get("image_digest", ""),
+            "machine_type": metadata.get("machine_type", ""),
+            "instance_count": instance_count,
+            "requests": len(frame),
+            "succeeded": len(successful),
+            "duration": duration,
+            "throughput": successful.throughput(),
+            "p50": summary.quantiles[50] if summary else None,
+            "p99": summary.quantiles[99] if summary else None,
+            "notes": notes,
+        }
+        placeholders = ", ".join("?" for _ in RUN_FIELDS)
+        sample_placeholders = ", ".join("?" for _ in range(len(_SAMPLE_COLUMNS) + 1))
+        columns = [frame[name].tolist() for name in _SAMPLE_COLUMNS]
+        with self.connection:
+            self.connection.execute(f"INSERT INTO runs VALUES ({placeholders})", [run[name] for name, _ in RUN_FIELDS])
+            self.connection.executemany(
+                f"INSERT INTO samples (run_id, {', '.join(_SAMPLE_COLUMNS)}) VALUES ({sample_placeholders})",
+                ((run_id,) + row for row in zip(*columns)),
+            )
+        return run_id
+
+    def runs(self, limit=None):
+        """Futások a legújabbal kezdve (dict-ek)"""
+        query = "SELECT * FROM runs ORDER BY started_at DESC, rowid DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.connection.execute(query)]
+
+    def run(self, run_id):
+        """Futás run id, annak egyértelmű részlete, "latest" vagy "previous" alapján (None, ha nincs)"""
+        if run_id in ("latest", "previous"):
+            runs = self.runs(limit=2)
+            index = 0 if run_id == "latest" else 1
+            return runs[index] if len(runs) > index else None
+        rows = self.connection.execute("SELECT * FROM runs WHERE run_id LIKE ?", (f"%{run_id}%",)).fetchall()
+        exact = [row for row in rows if row["run_id"] == run_id]
+        rows = exact or rows
+        if len(rows) > 1:
+            raise ValueError(f"Több futás is illeszkedik erre: {run_id} ({', '.join(row['run_id'] for row in rows)})")
+        return dict(rows[0]) if rows else None
+
+    def previous_run(self, run):
+        """Az előző futás ugyanazzal a driver-rel, móddal, géptípussal és instance számmal"""
+        row = self.connection.execute(
+            "SELECT * FROM runs WHERE driver = ? AND mode = ? AND machine_type = ? AND instance_count = ?"
+            " AND started_at <= ? AND run_id != ? ORDER BY started_at DESC, rowid DESC LIMIT 1",
+            (run["driver"], run["mode"], run["machine_type"], run["instance_count"], run["started_at"], run["run_id"]),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def load_frame(self, run_id):
+        """A futás kérésenkénti oszlopai ResultFrame-ként"""
+        rows = self.connection.execute(
+            f"SELECT {', '.join(_SAMPLE_COLUMNS)} FROM samples WHERE run_id = ? ORDER BY rowid", (run_id,)
+        ).fetchall()
+        data = {name: [row[i] for row in rows] for i, name in enumerate(_SAMPLE_COLUMNS)}
+        return ResultFrame.from_arrays(data)
+
+
+def record_run(path, run, driver, mode=None, config_file=None, notes=None):
+    """Egy befejezett futás mentése a driver szkriptekből
+
+    run: LoadEngine vagy MergedRun (columns, instances, start_time, end_time);
+    mode: alapértelmezetten a pacing-ből (MergedRun-nál kötelező, annak nincs pacing-je);
+    az image / géptípus a deployment configból jön.
+    """
+    if run.columns is None:
+        raise ValueError("record_run: az engine columns= paraméter nélkül futott (nincs mit menteni)")
+    if mode is None:
+        if getattr(run, "pacing", None) is None:
+            raise ValueError("record_run: a futásnak nincs pacing-je (pl. MergedRun), a mode= megadása kötelező")
+        mode = pacing_mode(run.pacing)
+    started_at = datetime.fromtimestamp(run.start_time).isoformat(timespec="seconds") if run.start_time else None
+    duration = run.end_time - run.start_time if run.start_time and run.end_time else None
+    with ResultStore(path) as store:
+        run_id = store.save_run(
+            run.columns.frame(),
+            driver,
+            mode,
+            len(run.instances),
+            metadata=deployment_metadata(config_file),
+            started_at=started_at,
+            duration=duration,
+            notes=notes,
+        )
+    print(f"💾 Futás elmentve: {run_id} ({os.path.abspath(path)})")
+    return run_id
@@ -0,0 +1,133 @@
+"""
+Target selection strategies for the Mannequin Segmenter load generators
+Eldöntik, hogy a következő kérés melyik VM instance-ra menjen. Az instance lista futás
+közben helyben változhat (DynamicFleet), ezért a policy-k minden választásnál az aktuális
+hosszal számolnak.
+"""
+
+import random
+
+
+class RoundRobinTargets:
+    """Round-robin load balancing (worker-ek között megosztható)"""
+
+    def __init__(self, instances):
+        if not instances:
+            raise ValueError("RoundRobinTargets: nincs instance")
+        self.instances = instances
+        self.index = 0
+
+    def select(self):
+        self.index %= len(self.instances)
+        instance = self.instances[self.index]
+        self.index = (self.index + 1) % len(self.instances)
+        return instance
+
+
+class PinnedTarget:
+    """Mindig ugyanaz az instance (instance-onkénti worker-ekhez)"""
+
+    def __init__(self, instance):
+        self.instance = instance
+
+    def select(self):
+        return self.instance
+
+
+class LeastOutstandingTargets:
+    """A legkevesebb nyitott kérést tartó instance; döntetlennél körbeforgó kezdőpont"""
+
+    def __init__(self, instances):
+        if not instances:
+            raise ValueError("LeastOutstandingTargets: nincs instance")
+        self.instances = instances
+        self.index = 0
+
+    def select(self):
+        count = len(self.instances)
+        best = None
+        for offset in range(count):
+            instance = self.instances[(self.index + offset) % count]
+            if best is None or instance.in_flight < best.in_flight:
+                best = instance
+        self.index = (self.index + 1) % count
+        return best
+
+
+class PeakEwmaTargets:
+    """A legkisebb várható várakozású instance (peak-EWMA késleltetés * nyitott kérések)"""
+
+    def __init__(self, instances):
+        if not instances:
+            raise ValueError("PeakEwmaTargets: nincs instance")
+        self.instances = instances
+        self.index = 0
+
+    def select(self):
+        count = len(self.instances)
+        best = None
+        for offset in range(count):
+            instance = self.instances[(self.index + offset) % count]
+            if best is None or (instance.load_cost(), instance.in_flight) < (best.load_cost(), best.in_flight):
+                best = instance
+        self.index = (self.index + 1) % count
+        return best
+
+
+class PowerOfTwoTargets:
+    """Két véletlen instance közül a kisebb peak-EWMA költségű (O(1), nincs csordaszellem)"""
+
+    def __init__(self, instances, rng=None):
+        if not instances:
+            raise ValueError("PowerOfTwoTargets: nincs instance")
+        self.instances = instances
+        self.rng = rng or random.Random()
+
+    def select(self):
+        if len(self.instances) == 1:
+            return self.instances[0]
+        first, second = self.rng.sample(self.instances, 2)
+        if (second.load_cost(), second.in_flight) < (first.load_cost(), first.in_flight):
+            return second
+        return first
+
+
+class WeightedRoundRobinTargets:
+    """Sima (nginx-féle) súlyozott round-robin az InstanceState.weight alapján"""
+
+    def __init__(self, instances):
+        if not instances:
+            raise ValueError("WeightedRoundRobinTargets: nincs instance")
+        if any(instance.weight <= 0 for instance in instances):
+            raise ValueError("WeightedRoundRobinTargets: a súlyok legyenek pozitívak")
+        self.instances = instances
+        self.current = {}   # URL -> aktuális súly (a tagság változásakor is megmarad)
+
+    def select(self):
+        total = 0
+        best = None
+        for instance in self.instances:
+            self.current[instance.url] = self.current.get(instance.url, 0) + instance.weight
+            total += instance.weight
+            if best is None or self.current[instance.url] > self.current[best.url]:
+                best = instance
+        self.current[best.url] -= total
+        return best
+
+
+ROUTING_POLICIES = {
+    "round_robin": RoundRobinTargets,
+    "least_outstanding": LeastOutstandingTargets,
+    "peak_ewma": PeakEwmaTargets,
+    "power_of_two": PowerOfTwoTargets,
+    "weighted_round_robin": WeightedRoundRobinTargets,
+}
+
+
+def make_targets(policy, instances):
+    """Routing policy példányosítása név alapján (közös az összes worker között)"""
+    try:
+        factory = ROUTING_POLICIES[policy]
+    except KeyError:
+        raise ValueError(f"Ismeretlen routing policy: {policy} (választható: {', '.join(ROUTING_POLICIES)})")
+    return factory(instances)
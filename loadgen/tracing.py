@@ -0,0 +1,129 @@
+"""
+Request phase tracing for the Mannequin Segmenter load generators
+aiohttp TraceConfig hook-ok kérésenkénti időbélyegekkel (pool várakozás, DNS, kapcsolat
+felépítés, kérés elküldve, válasz fejlécek megérkeztek), ezekből fázis idők, a szerver
+által küldött timing-gal összevetve: hálózati overhead = kliens teljes idő - szerver total_request.
+"""
+
+import time
+
+import aiohttp
+
+# Fázis idők a rekordban (másodperc); a client_ttfb / client_ttlb az engine-ben számolódik
+PHASE_FIELDS = (
+    "client_pool_wait",     # Várakozás szabad kapcsolatra (limit_per_host telített)
+    "client_dns",           # Hostnév feloldás (DNS cache találatnál nincs)
+    "client_connect",       # TCP kapcsolat felépítés (DNS nélkül)
+    "client_send",          # Kapcsolattól a kérés (fejlécek + törzs) elküldéséig
+    "client_server_wait",   # Elküldéstől a válasz fejlécekig: szerver feldolgozás + hálózat
+    "client_download",      # Válasz fejlécektől az utolsó byte-ig
+    "network_overhead",     # response_time - server_total_request
+)
+
+
+def _mark(context, event):
+    record = context.trace_request_ctx
+    if isinstance(record, dict):
+        record.setdefault("client_timing", {})[event] = time.perf_counter()
+
+
+class RequestTracer:
+    """Időbélyegek a kérés rekordjába (client_timing: esemény -> perf_counter);
+    a kérést trace_request_ctx=record paraméterrel kell indítani"""
+
+    def trace_config(self):
+        trace = aiohttp.TraceConfig()
+        for signal, event in (
+            (trace.on_connection_queued_start, "pool_wait_start"),
+            (trace.on_connection_queued_end, "pool_wait_end"),
+            (trace.on_dns_resolvehost_start, "dns_start"),
+            (trace.on_dns_resolvehost_end, "dns_end"),
+            (trace.on_connection_create_start, "connect_start"),
+            (trace.on_connection_create_end, "connect_end"),
+            (trace.on_connection_reuseconn, "connection_reused"),
+            (trace.on_request_headers_sent, "headers_sent"),
+            (trace.on_request_chunk_sent, "body_sent"),
+            (trace.on_request_end, "headers_received"),
+        ):
+            signal.append(self._hook(event))
+        return trace
+
+    @staticmethod
+    def _hook(event):
+        async def hook(session, context, params):
+            _mark(context, event)
+        return hook
+
+
+def phase_breakdown(record, request_start, last_byte_at=None):
+    """Fázis idők a client_timing időbélyegekből (request_start: perf_counter a kérés indulásakor);
+    a client_timing-ot a kérés indulásához képesti eltolásokra cseréli"""
+    marks = record.get("client_timing")
+    if not marks:
+        return record
+
+    def span(start, end):
+        if start in marks and end in marks:
+            return marks[end] - marks[start]
+        return None
+
+    pool_wait = span("pool_wait_start", "pool_wait_end")
+    dns = span("dns_start", "dns_end")
+    connect = span("connect_start", "connect_end")
+    if pool_wait is not None:
+        record["client_pool_wait"] = pool_wait
+    if dns is not None:
+        record["client_dns"] = dns
+    if connect is not None:
+        # A connection_create a feloldást is tartalmazza
+        record["client_connect"] = connect - (dns or 0.0)
+
+    # Kapcsolat kész: új kapcsolat vége / újrahasznált kapcsolat / különben a kérés indulása
+    ready = marks.get("connect_end", marks.get("connection_reused", request_start))
+    sent = marks.get("body_sent", marks.get("headers_sent"))
+    received = marks.get("headers_received")
+    if sent is not None:
+        record["client_send"] = sent - ready
+        if received is not None:
+            record["client_server_wait"] = received - sent
+    if received is not None and last_byte_at is not None:
+        record["client_download"] = last_byte_at - received
+
+    record["client_timing"] = {event: at - request_start for event, at in marks.items()}
+    return record
+
+
+def network_overhead(record):
+    """Kliens oldali teljes idő - szerver által mért total_request (None, ha nincs szerver timing)"""
+    server_total = record.get("server_total_request")
+    if server_total is None or record.get("response_time") is None:
+        return None
+    return record["response_time"] - server_total
+
+
+# Kérés fázisok a riportban: (hisztogram fázis, megjelenített név)
+REQUEST_PHASES = (
+    ("pool_wait", "pool várakozás"),
+    ("dns", "DNS"),
+    ("connect", "TCP connect"),
+    ("send", "kérés küldés"),
+    ("server_wait", "szerverre vár"),
+    ("download", "letöltés"),
+    ("client_total", "kliens teljes"),
+    ("server_total", "szerver total"),
+    ("network_overhead", "hálózat+kliens"),
+)
+
+
+def print_phase_breakdown(recorder, qs=(50, 90, 99)):
+    """Kérés fázisok (TraceConfig) + szerver timing; hálózati overhead = kliens teljes - szerver total_request"""
+    rows = [(name, recorder.histogram(phase)) for phase, name in REQUEST_PHASES]
+    rows = [(name, histogram) for name, histogram in rows if histogram.count]
+    if not rows:
+        return
+
+    print(f"\n🧬 KÉRÉS FÁZISOK (sikeres kérések)")
+    print(f"   {'fázis':16s} {'kérés':>7s} {'átlag':>8s} " + " ".join(f"{'p' + format(q, 'g'):>8s}" for q in qs))
+    for name, histogram in rows:
+        values = histogram.percentiles(qs)
+        print(f"   {name:16s} {histogram.count:7d} {histogram.mean():7.3f}s " + " ".join(f"{values[q]:7.3f}s" for q in qs))
@@ -0,0 +1,141 @@
+"""
+Workload strategies for the Mannequin Segmenter load generators
+Meghatározzák, hogy a következő kérés milyen payload-dal menjen ki.
+"""
+
+import asyncio
+import random
+
+DEFAULT_PROMPT_MODE = "both"
+
+
+def build_payload(image_url, prompt_mode=DEFAULT_PROMPT_MODE):
+    """/infer payload összeállítása"""
+    return {
+        "image_url": image_url,
+        "prompt_mode": prompt_mode
+    }
+
+
+def load_urls_from_file(filename):
+    """URL-ek betöltése fájlból"""
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            urls = [line.strip() for line in f if line.strip()]
+        print(f"📂 URL-ek betöltve: {filename} ({len(urls)} darab)")
+        return urls
+    except Exception as e:
+        print(f"❌ Hiba a fájl olvasásakor: {e}")
+        return []
+
+
+class QueueWorkload:
+    """Megosztott task queue (asyncio.Queue) - minden payload pontosan egyszer fut le
+
+    closed=True: előre feltöltött, véges queue (a régi deque viselkedés).
+    closed=False: menet közben put()-tal bővíthető; close() után a worker-ek
+    a shutdown sentinelt kapják és kilépnek, ahelyett hogy pollingolnának.
+    """
+
+    _SHUTDOWN = object()
+
+    def __init__(self, payloads=(), closed=True):
+        self.tasks = asyncio.Queue()
+        self.total = 0
+        self.closed = False
+        for payload in payloads:
+            self.put(payload)
+        if closed:
+            self.close()
+
+    def __len__(self):
+        return self.tasks.qsize() - (1 if self.closed else 0)
+
+    def put(self, payload):
+        """Új task a queue végére - a várakozó worker azonnal felébred"""
+        if self.closed:
+            raise RuntimeError("QueueWorkload: a queue már le van zárva")
+        self.total += 1
+        self.tasks.put_nowait({"task_id": self.total, "payload": payload})
+
+    def close(self):
+        """Nem jön több task: egyetlen sentinel, amit minden worker továbbad a következőnek"""
+        if not self.closed:
+            self.closed = True
+            self.tasks.put_nowait(self._SHUTDOWN)
+
+    def _unwrap(self, task):
+        if task is self._SHUTDOWN:
+            self.tasks.put_nowait(task)
+            return None
+        return task
+
+    def next_task(self):
+        """Kivesz egy task-ot a queue-ból (None, ha üres vagy lezárt)"""
+        try:
+            return self._unwrap(self.tasks.get_nowait())
+        except asyncio.QueueEmpty:
+            return None
+
+    async def wait_task(self):
+        """Vár a következő task-ra; None, ha a queue lezárult és kiürült"""
+        return self._unwrap(await self.tasks.get())
+
+    def exhausted(self):
+        return self.closed and len(self) == 0
+
+
+class _CountedWorkload:
+    """Közös alap a generált workload-okhoz (opcionális darabszám korláttal)"""
+
+    def __init__(self, total=None):
+        self.total = total
+        self.issued = 0
+
+    def __len__(self):
+        if self.total is None:
+            return 0
+        return self.total - self.issued
+
+    def next_task(self):
+        if self.exhausted():
+            return None
+        self.issued += 1
+        return {"task_id": self.issued, "payload": self.make_payload()}
+
+    def exhausted(self):
+        return self.total is not None and self.issued >= self.total
+
+    async def wait_task(self):
+        # Generált workload - soha nem kell várni
+        return self.next_task()
+
+    def make_payload(self):
+        raise NotImplementedError
+
+
+class FixedUrlWorkload(_CountedWorkload):
+    """Mindig ugyanaz a kép (consistency tesztekhez)"""
+
+    def __init__(self, image_url, total=None, prompt_mode=DEFAULT_PROMPT_MODE):
+        super().__init__(total)
+        self.payload = build_payload(image_url, prompt_mode)
+
+    def make_payload(self):
+        # Ugyanaz a dict minden kérésnél - az aiohttp csak olvassa
+        return self.payload
+
+
+class RandomUrlWorkload(_CountedWorkload):
+    """Minden kéréshez random kép a listából"""
+
+    def __init__(self, image_urls, total=None, prompt_mode=DEFAULT_PROMPT_MODE, rng=None):
+        super().__init__(total)
+        if not image_urls:
+            raise ValueError("RandomUrlWorkload: üres URL lista")
+        self.image_urls = list(image_urls)
+        self.prompt_mode = prompt_mode
+        self.rng = rng or random.Random()
+
+    def make_payload(self):
+        return build_payload(self.rng.choice(self.image_urls), self.prompt_mode)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Mock Mannequin Segmenter /infer Server
+Lokális helyettesítő a GCP fleet helyett: N instance egymás utáni portokon,
+konfigurálható késleltetéssel, hibaaránnyal és kapacitással (driver benchmark / CI).
+"""
+
+import asyncio
+
+from loadgen import LatencyModel, start_mock_fleet
+
+# ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
+MOCK_INSTANCES = 5              # Indítandó mock instance-ok száma
+BASE_PORT = 18001               # Első port (a többi egymás után)
+HOST = "127.0.0.1"
+
+IMAGE_CONVERSION_SECONDS = 0.05 # Kép letöltés + konverzió átlag
+MODEL_INFERENCE_SECONDS = 0.8   # Model inference átlag
+GCS_UPLOAD_SECONDS = 0.25       # GCS feltöltés átlag
+LATENCY_JITTER = 0.15           # Lognormális szórás (0 = determinisztikus)
+ERROR_RATE = 0.0                # HTTP 500 válaszok aránya (0.0 - 1.0)
+CAPACITY = 1                    # Egyszerre futó inference-ek instance-onként
+TIME_SCALE = 1.0                # Minden késleltetés szorzója (CI-ben pl. 0.01)
+
+# ===============================================
+
+def make_model(instance_number):
+    """Azonos latency modell minden instance-nak"""
+    return LatencyModel(
+        image_conversion=IMAGE_CONVERSION_SECONDS,
+        model_inference=MODEL_INFERENCE_SECONDS,
+        gcs_upload=GCS_UPLOAD_SECONDS,
+        jitter=LATENCY_JITTER,
+        error_rate=ERROR_RATE,
+        capacity=CAPACITY,
+        time_scale=TIME_SCALE,
+    )
+
+async def main():
+    """Fő program belépési pont"""
+    print("🔧 Mock Mannequin Segmenter /infer Server")
+    print("=" * 60)
+
+    fleet = await start_mock_fleet(MOCK_INSTANCES, BASE_PORT, HOST, make_model)
+
+    print(f"📊 Latency modell: conversion {IMAGE_CONVERSION_SECONDS}s, inference {MODEL_INFERENCE_SECONDS}s, gcs {GCS_UPLOAD_SECONDS}s (x{TIME_SCALE})")
+    print(f"   - Kapacitás: {CAPACITY} inference / instance, hibaarány: {ERROR_RATE*100:.1f}%")
+    print(f"\n🖥️  VM_INSTANCES = [")
+    for url in fleet.urls:
+        print(f'    "{url}",')
+    print(f"]")
+    print(f"\n✅ {len(fleet.urls)} mock instance fut - leállítás: Ctrl+C")
+
+    try:
+        while True:
+            await asyncio.sleep(10)
+            stats = ", ".join(f"{server.name}: {server.requests} kérés (csúcs {server.peak_in_flight})" for server in fleet.servers)
+            print(f"📊 {stats}")
+    finally:
+        await fleet.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n⏹️  Mock szerverek leállítva")
@@ -6,21 +6,65 @@ random pulóver képeket, amelyek 'b.jpg'-re végződnek.
 """
 
 import asyncio
-import aiohttp
 import time
-import statistics
-from datetime import datetime
-import json
-import random
-import csv
 import os
 
+from loadgen import (
+    ConnectionPool,
+    InstanceState,
+    Lane,
+    LiveDashboard,
+    LoadEngine,
+    PinnedTarget,
+    RandomUrlWorkload,
+    ReadinessGate,
+    ResultColumns,
+    extract_pulover_urls_from_csv,
+    format_percentiles,
+    make_instances,
+    make_pacing,
+    make_sink,
+    pacing_mode,
+    preflight_urls,
+    print_connection_statistics,
+    print_histogram_statistics,
+    print_image_size_report,
+    print_open_loop_latency,
+    print_phase_breakdown,
+    print_preflight_report,
+    print_readiness_report,
+    record_run,
+    run_sharded,
+    size_latency_correlation,
+    split_evenly,
+)
+
 # ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
 TOTAL_REQUESTS_PER_INSTANCE = 500               # Összes kérések száma instance-onként
 REQUEST_TIMEOUT = 10                         # Timeout másodpercben (same as single test)
 DELAY_BETWEEN_REQUESTS = 1                # Szünet kérések között instance-onként (same as single test)
 CSV_FILE = "data_for_categorisation.csv"     # Forrás CSV a képekhez
 STAGGER_BETWEEN_WORKERS_MS = 50           # Kezdési eltérés a workerek között (ms)
+KEEP_RAW_RESULTS = False                  # Kérésenkénti eredmények megtartása (False: csak hisztogramok)
+WORKER_PROCESSES = 1                      # >1: a VM-ek szétosztása ennyi process között (saját event loop + session)
+RESULTS_FILE = None                       # Kérésenkénti eredmények fájlba: "results.jsonl" / ".csv" / ".parquet"
+RESULTS_DB = "benchmark_results.db"       # Futás mentése (összevetés: benchmark_results.py compare); None = nincs mentés
+PRINT_EACH_REQUEST = False                # True: kérésenkénti sor a terminálra (nagy kérés/sec-nél lassít)
+DASHBOARD_INTERVAL = 5                    # Élő státusz sor frissítése másodpercben
+MAX_CONNECTIONS_PER_INSTANCE = 5          # Nyílt hurokban ennyi párhuzamos kapcsolat VM-enként (zárt hurokban 1 elég)
+KEEPALIVE_TIMEOUT = 30                    # Üresjáratú keep-alive kapcsolat megtartása (s)
+DNS_CACHE_TTL = 300                       # Feloldott hostnevek cache ideje (s)
+PREWARM_CONNECTIONS = True                # Kapcsolatok megnyitása a teszt előtt (a TCP felépítés ne az első kérésnél mérődjön)
+PREFLIGHT_IMAGES = True                   # Képek ellenőrzése futás előtt (méret, origin idő); a halott URL-ek kiesnek
+PREFLIGHT_CONCURRENCY = 32                # Egyidejű pre-flight kérések
+READINESS_GATE = True                     # Indulás előtt warm-up /infer minden VM-re; csak a kész VM-ek kapnak terhelést
+READY_LATENCY_THRESHOLD = 10              # Kész, ha a warm-up /infer ennyi másodpercen belül sikeres
+READY_TIMEOUT = 300                       # Legfeljebb eddig várunk a VM-ekre (s)
+
+# Nyílt hurkú mód (None = zárt hurok: válasz + DELAY_BETWEEN_REQUESTS után jön a következő)
+OPEN_LOOP_RPS_PER_INSTANCE = None         # Cél kérés/másodperc instance-onként
+POISSON_ARRIVALS = False                  # True = Poisson érkezések, False = egyenletes ütem
+MAX_OUTSTANDING = 1000                    # Max nyitott kérés nyílt hurokban (felette eldobjuk)
 
 # VM Instance IP címek
 VM_INSTANCES = [
@@ -31,194 +75,174 @@ VM_INSTANCES = [
     "http://34.14.34.215:5001",
 ]
 
-# URL kiválasztás CSV-ből (pulóver + 'b.jpg')
-def extract_pulover_urls_from_csv(csv_file):
-    urls = []
-    try:
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            for line in lines[1:]:  # skip header
-                line = line.strip()
-                if not line:
-                    continue
-                parts = line.split(',')
-                if len(parts) >= 3:
-                    full_name = parts[1].lower()
-                    image_url = parts[2]
-                    if ("pulover" in full_name or "пуловери" in full_name) and image_url.endswith('b.jpg'):
-                        urls.append(image_url)
-    except Exception as e:
-        print(f"❌ CSV olvasási hiba: {e}")
-    return urls
 # API endpoint
 API_ENDPOINT = "/infer"
 
 # ===============================================
 
 class InstanceWorker:
-    def __init__(self, instance_url, instance_id, image_urls):
-        self.instance_url = instance_url
-        self.instance_id = instance_id
-        self.instance_name = instance_url.split('/')[-1].split(':')[0]  # IP only
+    def __init__(self, instance, image_urls):
+        self.instance = instance
+        self.instance_url = instance.url
+        self.instance_id = instance.instance_id
+        self.instance_name = instance.name  # IP only
         self.results = []
         self.errors = []
         self.completed_requests = 0
-        self.image_urls = image_urls
-    
-    async def make_request(self, session, request_id):
-        """Egyetlen kérés végrehajtása ezen az instance-on"""
-        full_url = f"{self.instance_url}{API_ENDPOINT}"
-        request_start = time.time()
-        
-        try:
-            # Random pulóver kép kiválasztása a CSV-ből betöltött listából
-            image_url = random.choice(self.image_urls)
-            payload = {
-                "image_url": image_url,
-                "prompt_mode": "both"
-            }
-            
-            connect_start = time.time()
-            async with session.post(
-                full_url,
-                json=payload
-            ) as response:
-                first_byte_time = time.time()
-                response_text = await response.text()
-                request_end = time.time()
-                response_time = request_end - request_start
-                ttfb = first_byte_time - request_start
-                
-                result = {
-                    "instance_id": self.instance_id,
-                    "instance_url": self.instance_url,
-                    "instance_name": self.instance_name,
-                    "request_id": request_id,
-                    "global_request_id": f"VM{self.instance_id}-{request_id}",
-                    "status_code": response.status,
-                    "response_time": response_time,
-                    "timestamp": datetime.fromtimestamp(request_start),
-                    "success": response.status == 200,
-                    "response_size": len(response_text),
-                    "client_ttfb": ttfb
-                }
-                
-                if response.status == 200:
-                    try:
-                        json_response = json.loads(response_text)
-                        result["has_visualization_url"] = "visualization_url" in json_response
-                        if "timing" in json_response:
-                            result["server_timing"] = json_response["timing"]
-                            timing = json_response["timing"]
-                            result["server_model_inference"] = timing.get("model_inference", 0)
-                            result["server_gcs_total"] = timing.get("gcs_total", 0)
-                            result["server_total_request"] = timing.get("total_request", 0)
-                    except json.JSONDecodeError:
-                        result["has_visualization_url"] = False
-                
-                self.results.append(result)
-                self.completed_requests += 1
-                
-                # Azonnali kimenet minden kéréshez
-                status_icon = "✅" if response.status == 200 else "❌"
-                server_info = ""
-                if "server_timing" in result:
-                    model_time = result.get("server_model_inference", 0)
-                    gcs_time = result.get("server_gcs_total", 0)
-                    server_info = f" (model: {model_time:.2f}s, gcs: {gcs_time:.2f}s)"
-                client_info = f" | ttfb: {ttfb:.2f}s"
-                print(f"{status_icon} VM{self.instance_id} Req {request_id:2d}: {self.instance_name:13s} -> {response_time:.3f}s{server_info}{client_info}")
-                
-        except asyncio.TimeoutError:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "instance_id": self.instance_id,
-                "instance_url": self.instance_url,
-                "instance_name": self.instance_name,
-                "request_id": request_id,
-                "global_request_id": f"VM{self.instance_id}-{request_id}",
-                "error": "Timeout",
-                "response_time": response_time,
-                "timestamp": datetime.fromtimestamp(request_start)
-            }
-            self.errors.append(error)
-            print(f"⏰ VM{self.instance_id} Req {request_id:2d}: {self.instance_name:13s} -> TIMEOUT ({response_time:.3f}s)")
-            
-        except Exception as e:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "instance_id": self.instance_id,
-                "instance_url": self.instance_url,
-                "instance_name": self.instance_name,
-                "request_id": request_id,
-                "global_request_id": f"VM{self.instance_id}-{request_id}",
-                "error": str(e),
-                "response_time": response_time,
-                "timestamp": datetime.fromtimestamp(request_start)
-            }
-            self.errors.append(error)
-            print(f"❌ VM{self.instance_id} Req {request_id:2d}: {self.instance_name:13s} -> ERROR: {e}")
-    
-    async def run_worker(self):
-        """Worker egy adott instance-hoz - saját ClientSession-nel, szekvenciálisan küldi a kéréseket"""
-        print(f"🚀 VM{self.instance_id} worker started: {self.instance_url} | dynamic CSV pulover képek")
-        
-        # Staggered start to avoid bursty contention across instances (200ms lépés)
+        # Random pulóver kép kiválasztása a CSV-ből betöltött listából
+        self.workload = RandomUrlWorkload(image_urls, total=TOTAL_REQUESTS_PER_INSTANCE)
+        # Staggered start to avoid bursty contention across instances
         initial_delay = (self.instance_id - 1) * (STAGGER_BETWEEN_WORKERS_MS / 1000.0)
-        if initial_delay > 0:
-            await asyncio.sleep(initial_delay)
-        
-        # Minden worker-nek saját ClientSession
-        connector = aiohttp.TCPConnector(
-            limit=10,              # Kisebb pool per worker
-            limit_per_host=5,      # Max connections per host per worker
-            keepalive_timeout=30,   
-            enable_cleanup_closed=True
-        )
+        self.lane = Lane(self.instance_id, self.workload, PinnedTarget(instance), start_delay=initial_delay)
+    
+    def record(self, result):
+        """Eredmény könyvelése (kérésenkénti sor csak PRINT_EACH_REQUEST=True esetén)"""
+        request_id = result["request_id"]
+        result["global_request_id"] = f"VM{self.instance_id}-{request_id}"
         
-        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        if "error" in result:
+            if KEEP_RAW_RESULTS:
+                self.errors.append(result)
+            if not PRINT_EACH_REQUEST:
+                return
+            if result["error"] == "Timeout":
+                print(f"⏰ VM{self.instance_id} Req {request_id:2d}: {self.instance_name:13s} -> TIMEOUT ({result['response_time']:.3f}s)")
+            else:
+                print(f"❌ VM{self.instance_id} Req {request_id:2d}: {self.instance_name:13s} -> ERROR: {result['error']}")
+            return
         
-        async with aiohttp.ClientSession(
-            connector=connector, 
-            timeout=timeout
-        ) as session:
-            for request_id in range(1, TOTAL_REQUESTS_PER_INSTANCE + 1):
-                await self.make_request(session, request_id)
-                
-                # Kis szünet a következő kérés előtt (kivéve az utolsó után)
-                if request_id < TOTAL_REQUESTS_PER_INSTANCE:
-                    await asyncio.sleep(DELAY_BETWEEN_REQUESTS)
+        if KEEP_RAW_RESULTS:
+            self.results.append(result)
+        self.completed_requests += 1
+        if not PRINT_EACH_REQUEST:
+            return
         
-        print(f"✅ VM{self.instance_id} worker finished: {self.completed_requests}/{TOTAL_REQUESTS_PER_INSTANCE} completed")
+        status_icon = "✅" if result["success"] else "❌"
+        server_info = ""
+        if "server_timing" in result:
+            model_time = result.get("server_model_inference", 0)
+            gcs_time = result.get("server_gcs_total", 0)
+            server_info = f" (model: {model_time:.2f}s, gcs: {gcs_time:.2f}s)"
+        # client_ttfb: kérés indulásától a válasz törzs első byte-jáig (kapcsolat + küldés + szerver idő)
+        client_info = f" | ttfb: {result['client_ttfb']:.2f}s"
+        if "network_overhead" in result:
+            client_info += f", hálózat: {result['network_overhead']:.3f}s"
+        print(f"{status_icon} VM{self.instance_id} Req {request_id:2d}: {self.instance_name:13s} -> {result['response_time']:.3f}s{server_info}{client_info}")
 
-class ParallelFixedUrlTester:
-    def __init__(self):
-        # Betöltjük a pulóver 'b.jpg' képeket a CSV-ből
-        image_urls = extract_pulover_urls_from_csv(CSV_FILE)
-        if not image_urls:
-            raise RuntimeError("Nem találtunk megfelelő pulóver képeket a CSV-ben ('b.jpg').")
+def make_connection_pool():
+    """Worker-enként saját session / connector egy VM-re: zárt hurokban 1 kapcsolat elég,
+    nyílt hurokban legfeljebb MAX_CONNECTIONS_PER_INSTANCE párhuzamos"""
+    per_host = MAX_CONNECTIONS_PER_INSTANCE if OPEN_LOOP_RPS_PER_INSTANCE else 1
+    return ConnectionPool(
+        per_host=per_host,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        dns_ttl=DNS_CACHE_TTL,
+        prewarm=per_host if PREWARM_CONNECTIONS else 0,
+    )
+
+def build_engine(workers, on_complete=None, results_file=None, keep_columns=False, image_sizes=None):
+    """LoadEngine a megadott worker-ekhez - minden worker saját ClientSession-t kap
+    (keep_columns: kérésenkénti oszlopok a futás mentéséhez / képméret riporthoz)"""
+    instances = [worker.instance for worker in workers]
+    return LoadEngine(
+        instances,
+        [worker.lane for worker in workers],
+        make_pacing(
+            OPEN_LOOP_RPS_PER_INSTANCE and OPEN_LOOP_RPS_PER_INSTANCE * len(instances),
+            delay=DELAY_BETWEEN_REQUESTS,
+            poisson=POISSON_ARRIVALS,
+            max_outstanding=MAX_OUTSTANDING,
+        ),
+        api_endpoint=API_ENDPOINT,
+        request_timeout=REQUEST_TIMEOUT,
+        session_per_lane=True,
+        connections=make_connection_pool(),
+        on_complete=on_complete,
+        keep_results=KEEP_RAW_RESULTS,
+        sink=make_sink(results_file),
+        columns=ResultColumns() if keep_columns else None,
+        image_sizes=image_sizes,
+    )
+
+def shard_results_file(results_file, index):
+    """Process-enként külön eredmény fájl: results.jsonl -> results.2.jsonl"""
+    if results_file is None:
+        return None
+    root, extension = os.path.splitext(results_file)
+    return f"{root}.{index}{extension}"
+
+def build_shard_engine(shard):
+    """Process-enkénti engine a shard VM-jeihez (globális VM sorszámokkal, kérésenkénti kiírás nélkül)"""
+    instances = [InstanceState(url, instance_id) for instance_id, url in shard["instances"]]
+    return build_engine(
+        [InstanceWorker(instance, shard["image_urls"]) for instance in instances],
+        results_file=shard_results_file(shard["results_file"], shard["index"]),
+        keep_columns=shard["keep_columns"],
+        image_sizes=shard["image_sizes"],
+    )
+
+def load_image_urls():
+    """Pulóver 'b.jpg' képek a CSV-ből"""
+    image_urls = extract_pulover_urls_from_csv(CSV_FILE)
+    if not image_urls:
+        raise RuntimeError("Nem találtunk megfelelő pulóver képeket a CSV-ben ('b.jpg').")
+    return image_urls
 
-        self.workers = []
-        for i, instance_url in enumerate(VM_INSTANCES, 1):
-            worker = InstanceWorker(instance_url, i, image_urls)
-            self.workers.append(worker)
+async def preflight_images(image_urls):
+    """Pre-flight: (elérhető URL-ek, {URL: méret})"""
+    report = await preflight_urls(image_urls, PREFLIGHT_CONCURRENCY)
+    print_preflight_report(report)
+    if not report.alive_urls():
+        raise RuntimeError("Egyik kép sem érhető el a pre-flight alapján.")
+    return report.alive_urls(), report.sizes()
 
-        print(f"🎯 Parallel Dynamic URL Teszt: {len(VM_INSTANCES)} VM, {TOTAL_REQUESTS_PER_INSTANCE} kérés/VM")
+async def ready_instances(image_url):
+    """Readiness gate: a warm-up /infer-re gyorsan válaszoló VM-ek URL-jei"""
+    gate = ReadinessGate(image_url, latency_threshold=READY_LATENCY_THRESHOLD, timeout=READY_TIMEOUT)
+    report = await gate.wait(VM_INSTANCES)
+    print_readiness_report(report)
+    if not report.ready_urls():
+        raise RuntimeError("Egyik VM sem lett kész, a teszt nem indul.")
+    return report.ready_urls()
+
+class ParallelFixedUrlTester:
+    def __init__(self, image_urls, image_sizes=None, vm_instances=None):
+        self.image_urls = image_urls
+        self.image_sizes = image_sizes
+        self.instances = make_instances(VM_INSTANCES if vm_instances is None else vm_instances)
+        self.workers = [InstanceWorker(instance, image_urls) for instance in self.instances]
+        self.workers_by_id = {worker.instance_id: worker for worker in self.workers}
+        
+        # Egy process-es módban itt fut minden worker; több process-nél csak a riport használja
+        self.engine = build_engine(
+            self.workers, on_complete=self.record_result, results_file=RESULTS_FILE,
+            keep_columns=bool(RESULTS_DB or image_sizes), image_sizes=image_sizes,
+        )
+        self.recorder = self.engine.recorder
+        self.finished_run = self.engine
+
+        print(f"🎯 Parallel Dynamic URL Teszt: {len(self.instances)} VM, {TOTAL_REQUESTS_PER_INSTANCE} kérés/VM")
         print(f"🖼️  Elérhető pulóver képek száma (CSV): {len(image_urls)}")
     
+    def record_result(self, result):
+        self.workers_by_id[result["instance_id"]].record(result)
+    
     async def run_parallel_test(self):
         """Párhuzamos teszt futtatása"""
         print(f"\n🚀 Parallel Dynamic URL Test (CSV pulóver képek)")
         print(f"📊 Konfiguráció:")
-        print(f"   - VM instance-ok: {len(VM_INSTANCES)}")
+        print(f"   - VM instance-ok: {len(self.instances)}")
         print(f"   - Kérések/instance: {TOTAL_REQUESTS_PER_INSTANCE}")
-        print(f"   - Összes kérések: {len(VM_INSTANCES) * TOTAL_REQUESTS_PER_INSTANCE}")
+        print(f"   - Összes kérések: {len(self.instances) * TOTAL_REQUESTS_PER_INSTANCE}")
         print(f"   - Request timeout: {REQUEST_TIMEOUT}s")
-        print(f"   - Kérések közötti szünet: {DELAY_BETWEEN_REQUESTS}s")
-        print(f"   - Mód: PÁRHUZAMOS (minden VM egyszerre dolgozik)")
+        if OPEN_LOOP_RPS_PER_INSTANCE:
+            print(f"   - Mód: PÁRHUZAMOS, NYÍLT HUROK ({OPEN_LOOP_RPS_PER_INSTANCE} kérés/sec/VM, {'Poisson' if POISSON_ARRIVALS else 'egyenletes'} érkezés)")
+        else:
+            print(f"   - Kérések közötti szünet: {DELAY_BETWEEN_REQUESTS}s")
+            print(f"   - Mód: PÁRHUZAMOS (minden VM egyszerre dolgozik)")
         print(f"   - Kép: Random pulóver képek a CSV-ből ('b.jpg')")
+        if WORKER_PROCESSES > 1:
+            print(f"   - Load generator process-ek: {WORKER_PROCESSES}")
         print()
         
         for i, worker in enumerate(self.workers):
@@ -227,154 +251,154 @@ class ParallelFixedUrlTester:
         
         start_time = time.time()
         
-        # Minden worker saját ClientSession-t kap - nincs közös session
-        tasks = []
-        for worker in self.workers:
-            task = asyncio.create_task(worker.run_worker())  # No shared session!
-            tasks.append(task)
-        
-        # Progress monitoring
-        monitor_task = asyncio.create_task(self.progress_monitor(start_time))
-        tasks.append(monitor_task)
-        
-        # Várjuk meg az összes worker befejezését
-        await asyncio.gather(*tasks, return_exceptions=True)
+        if WORKER_PROCESSES > 1:
+            await self.run_multi_process()
+        else:
+            dashboard = LiveDashboard(self.engine, DASHBOARD_INTERVAL, total=len(self.workers) * TOTAL_REQUESTS_PER_INSTANCE)
+            await asyncio.gather(self.engine.run(), dashboard.run())
         
         end_time = time.time()
         total_time = end_time - start_time
         
         print(f"\n⏱️  Teszt befejezve! (összes idő: {total_time:.2f}s)")
         self.print_comprehensive_statistics()
+        if RESULTS_DB:
+            mode = f"{pacing_mode(self.engine.pacing)}, {WORKER_PROCESSES} process" if WORKER_PROCESSES > 1 else None
+            record_run(RESULTS_DB, self.finished_run, "parallel_fixed_url_test", mode=mode)
     
-    async def progress_monitor(self, start_time):
-        """Folyamatos progress monitoring"""
-        while True:
-            await asyncio.sleep(5)  # 5 másodpercenként
-            
-            current_time = time.time()
-            elapsed = current_time - start_time
-            
-            total_completed = sum(worker.completed_requests for worker in self.workers)
-            total_expected = len(self.workers) * TOTAL_REQUESTS_PER_INSTANCE
-            
-            if total_completed >= total_expected:
-                break
-            
-            # Per-instance progress
-            progress_info = []
-            for worker in self.workers:
-                progress_info.append(f"VM{worker.instance_id}:{worker.completed_requests}/{TOTAL_REQUESTS_PER_INSTANCE}")
-            
-            print(f"📊 Progress ({elapsed:.0f}s): {total_completed}/{total_expected} total, {' | '.join(progress_info)}")
+    async def run_multi_process(self):
+        """VM-ek szétosztása WORKER_PROCESSES process között, hisztogramok összefésülése"""
+        shards = [
+            {
+                "index": index,
+                "instances": [(instance.instance_id, instance.url) for instance in part],
+                "image_urls": self.image_urls,
+                "results_file": RESULTS_FILE,
+                "keep_columns": bool(RESULTS_DB or self.image_sizes),
+                "image_sizes": self.image_sizes,
+            }
+            for index, part in enumerate(split_evenly(self.instances, WORKER_PROCESSES), 1)
+        ]
+        print(f"🧵 {len(shards)} process indítása (kérésenkénti kiírás nélkül)...")
+        merged = await run_sharded(build_shard_engine, shards)
+        
+        # A riport a közös recorder-ből és a worker-ek listáiból dolgozik
+        self.recorder = merged.recorder
+        self.finished_run = merged
+        for result in merged.results + merged.errors:
+            worker = self.workers_by_id[result["instance_id"]]
+            (worker.errors if "error" in result else worker.results).append(result)
     
     def print_comprehensive_statistics(self):
         """Átfogó statisztikák kiírása"""
-        # Összesített adatok
-        all_successful = []
-        all_failed = []
-        
-        for worker in self.workers:
-            all_successful.extend([r for r in worker.results if r["success"]])
-            all_failed.extend([r for r in worker.results if not r["success"]])
-            all_failed.extend(worker.errors)
-        
-        total_requests = len(all_successful) + len(all_failed)
+        # Összesített adatok a hisztogramokból (több process-nél összefésülve)
+        recorder = self.recorder
+        total_requests = recorder.succeeded + recorder.failed
         
         print(f"\n📈 PÁRHUZAMOS DINAMIKUS URL TESZT EREDMÉNYEK (CSV)")
         print(f"=" * 80)
         print(f"🖼️  Forrás: {CSV_FILE} (pulóver + 'b.jpg')")
         print(f"📊 Összes kérés: {total_requests}")
-        print(f"✅ Sikeres kérések: {len(all_successful)}")
-        print(f"❌ Sikertelen kérések: {len(all_failed)}")
+        print(f"✅ Sikeres kérések: {recorder.succeeded}")
+        print(f"❌ Sikertelen kérések: {recorder.failed}")
         if total_requests > 0:
-            print(f"📈 Sikeresség arány: {len(all_successful)/total_requests*100:.1f}%")
+            print(f"📈 Sikeresség arány: {recorder.succeeded/total_requests*100:.1f}%")
         
-        if all_successful:
-            response_times = [r["response_time"] for r in all_successful]
+        if recorder.succeeded:
+            response_histogram = recorder.histogram("client_total")
             
             print(f"\n⏰ ÖSSZESÍTETT VÁLASZIDŐ STATISZTIKÁK")
-            print(f"   🔹 Minimum: {min(response_times):.3f} másodperc")
-            print(f"   🔹 Maximum: {max(response_times):.3f} másodperc")
-            print(f"   🔹 Átlag: {statistics.mean(response_times):.3f} másodperc")
-            print(f"   🔹 Medián: {statistics.median(response_times):.3f} másodperc")
-            if len(response_times) > 1:
-                print(f"   🔹 Szórás: {statistics.stdev(response_times):.3f} másodperc")
+            print_histogram_statistics(response_histogram)
+            
+            # Fázisonkénti percentilisek (kliens / szerver oldal)
+            print(f"\n🧩 FÁZISONKÉNTI PERCENTILISEK")
+            for phase in ("client_total", "ttfb", "ttlb", "model_inference", "gcs_total", "network_overhead"):
+                phase_histogram = recorder.histogram(phase)
+                if phase_histogram.count:
+                    print(f"   🔹 {phase:15s}: {format_percentiles(phase_histogram)}")
+            sizes = recorder.response_sizes
+            if sizes.count:
+                print(f"   🔹 {'válasz méret':15s}: átlag {sizes.mean()/1024:.1f} KB, max {sizes.max/1024:.1f} KB, összesen {sizes.total/1024/1024:.1f} MB")
+            
+            print_phase_breakdown(recorder)
+            print_open_loop_latency(recorder)
+            # Pool számlálók csak egy process-es futásnál (a kapcsolat idők hisztogramja összefésült)
+            print_connection_statistics(recorder, self.engine.connections if WORKER_PROCESSES == 1 else None)
             
             # Instance-onkénti részletes statisztikák
             print(f"\n🖥️  INSTANCE-ONKÉNTI TELJESÍTMÉNY")
             for worker in self.workers:
-                successful_results = [r for r in worker.results if r["success"]]
-                failed_count = len(worker.results) - len(successful_results) + len(worker.errors)
+                times = recorder.histogram("client_total", worker.instance_id)
+                failed_count = recorder.failed_for(worker.instance_id)
                 
                 print(f"\n   VM{worker.instance_id} ({worker.instance_name}):")
-                print(f"      - Befejezett kérések: {len(worker.results) + len(worker.errors)}/{TOTAL_REQUESTS_PER_INSTANCE}")
-                print(f"      - Sikeres: {len(successful_results)}")
+                print(f"      - Befejezett kérések: {times.count + failed_count}/{TOTAL_REQUESTS_PER_INSTANCE}")
+                print(f"      - Sikeres: {times.count}")
                 print(f"      - Sikertelen: {failed_count}")
                 
-                if successful_results:
-                    times = [r["response_time"] for r in successful_results]
-                    model_times = [r.get("server_model_inference", 0) for r in successful_results if "server_model_inference" in r]
+                if times.count:
+                    model_times = recorder.histogram("model_inference", worker.instance_id)
                     
-                    print(f"      - Válaszidő átlag: {statistics.mean(times):.3f}s")
-                    print(f"      - Válaszidő min/max: {min(times):.3f}s / {max(times):.3f}s")
-                    if len(times) > 1:
-                        print(f"      - Válaszidő szórás: {statistics.stdev(times):.3f}s")
+                    print(f"      - Válaszidő átlag: {times.mean():.3f}s")
+                    print(f"      - Válaszidő min/max: {times.min:.3f}s / {times.max:.3f}s")
+                    if times.count > 1:
+                        print(f"      - Válaszidő szórás: {times.stdev():.3f}s")
+                    print(f"      - Válaszidő {format_percentiles(times)}")
                     
-                    if model_times:
-                        print(f"      - Server model átlag: {statistics.mean(model_times):.3f}s")
+                    if model_times.count:
+                        print(f"      - Server model átlag: {model_times.mean():.3f}s")
             
             # Konkurens teljesítmény elemzés
             print(f"\n🔄 KONKURENS TELJESÍTMÉNY ELEMZÉS")
             
             # Időbélyeg alapú throughput számítás
-            if len(all_successful) > 1:
-                start_timestamp = min(r["timestamp"] for r in all_successful)
-                end_timestamp = max(r["timestamp"] for r in all_successful)
-                duration = (end_timestamp - start_timestamp).total_seconds()
-                
-                if duration > 0:
-                    throughput = len(all_successful) / duration
-                    print(f"   🔹 Átlagos throughput: {throughput:.2f} kérés/másodperc")
-                    print(f"   🔹 Instance átlag: {throughput/len(self.workers):.2f} kérés/sec/instance")
+            throughput = recorder.throughput()
+            if throughput:
+                print(f"   🔹 Átlagos throughput: {throughput:.2f} kérés/másodperc")
+                print(f"   🔹 Instance átlag: {throughput/len(self.workers):.2f} kérés/sec/instance")
             
             # Outlier elemzés párhuzamos környezetben
-            avg_time = statistics.mean(response_times)
-            std_time = statistics.stdev(response_times) if len(response_times) > 1 else 0
-            threshold = avg_time + 2 * std_time
-            
-            outliers = [r for r in all_successful if r["response_time"] > threshold]
+            threshold = response_histogram.mean() + 2 * response_histogram.stdev()
+            outlier_count = response_histogram.count_above(threshold)
             
             print(f"\n🔍 OUTLIER ELEMZÉS (párhuzamos terhelés)")
-            if outliers:
-                print(f"   ⚠️  {len(outliers)} outlier találva (>{threshold:.3f}s):")
-                for outlier in outliers[:5]:
-                    vm_id = outlier["instance_id"]
-                    req_id = outlier["request_id"]
-                    response_time = outlier["response_time"]
-                    print(f"      VM{vm_id} Req {req_id:2d}: {response_time:.3f}s")
-                if len(outliers) > 5:
-                    print(f"      ... és még {len(outliers) - 5} darab")
+            if outlier_count:
+                print(f"   ⚠️  {outlier_count} outlier találva (>{threshold:.3f}s):")
+                # Konkrét kérések: az oszlopos eredményekből, ezek híján a megtartott nyers eredményekből
+                if self.finished_run.columns is not None:
+                    frame = self.finished_run.columns.frame().successful()
+                    frame = frame.where(frame["response_time"] > threshold)
+                    outliers = list(zip(frame["instance"].tolist(), frame["task_id"].tolist(), frame["response_time"].tolist()))
+                    label = "Task"
+                else:
+                    outliers = [
+                        (r["instance_id"], r["request_id"], r["response_time"])
+                        for worker in self.workers for r in worker.results
+                        if r["success"] and r["response_time"] > threshold
+                    ]
+                    label = "Req"
+                if outliers:
+                    for vm_id, req_id, response_time in outliers[:5]:
+                        print(f"      VM{vm_id} {label} {req_id:2d}: {response_time:.3f}s")
+                    if len(outliers) > 5:
+                        print(f"      ... és még {len(outliers) - 5} darab")
+                else:
+                    print(f"   💡 A konkrét kérések listájához: RESULTS_DB vagy KEEP_RAW_RESULTS = True")
                 print(f"   💡 Párhuzamos terhelés miatt a lassulás VÁRHATÓ")
             else:
                 print(f"   ✅ Nincs jelentős outlier - stabil párhuzamos teljesítmény")
+            
+            if self.finished_run.columns is not None:
+                print_image_size_report(size_latency_correlation(self.finished_run.columns.frame()))
         
         # Hibák részletezése
-        if all_failed:
+        if recorder.failed:
             print(f"\n❌ HIBÁK RÉSZLETEZÉSE")
-            error_by_instance = {}
-            for error in all_failed:
-                instance_id = error.get("instance_id", "Unknown")
-                if instance_id not in error_by_instance:
-                    error_by_instance[instance_id] = []
-                error_by_instance[instance_id].append(error)
-            
-            for instance_id, errors in error_by_instance.items():
-                print(f"   VM{instance_id}: {len(errors)} hiba")
-                error_types = {}
-                for error in errors:
-                    error_type = error.get("error", f"HTTP {error.get('status_code', 'Unknown')}")
-                    error_types[error_type] = error_types.get(error_type, 0) + 1
-                
+            for worker in self.workers:
+                error_types = recorder.errors_by_type(worker.instance_id)
+                if not error_types:
+                    continue
+                print(f"   VM{worker.instance_id}: {sum(error_types.values())} hiba")
                 for error_type, count in error_types.items():
                     print(f"      - {error_type}: {count} alkalom")
 
@@ -387,8 +411,13 @@ async def main():
     print("📊 Minden kérés eredménye valós időben megjelenik")
     print()
     
-    # Teszter létrehozása és futtatása
-    tester = ParallelFixedUrlTester()
+    # Képek betöltése (és pre-flight), teszter létrehozása és futtatása
+    image_urls = load_image_urls()
+    image_sizes = None
+    if PREFLIGHT_IMAGES:
+        image_urls, image_sizes = await preflight_images(image_urls)
+    vm_instances = await ready_instances(image_urls[0]) if READINESS_GATE else None
+    tester = ParallelFixedUrlTester(image_urls, image_sizes, vm_instances)
     await tester.run_parallel_test()
 
 if __name__ == "__main__":
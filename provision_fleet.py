@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Fleet Provisioning Script for Mannequin Segmenter API
+A deployment config (deployment-config.conf vagy CONFIG_FILE=example-configs/*.conf) szerinti
+INSTANCE_COUNT VM párhuzamos létrehozása (a deploy-gcp.sh egyesével dolgozik), a készenlét
+párhuzamos lekérdezése, majd a kész instance-ok kiírása fleet fájlba és VM_INSTANCES formában.
+
+Használat:
+    python provision_fleet.py            # gcloud CLI
+    python provision_fleet.py --fake     # helyi fake backend (valódi VM nélkül)
+"""
+
+import asyncio
+import sys
+import time
+
+from loadgen import (
+    FleetProvisioner,
+    config_file_path,
+    fleet_specs,
+    make_backend,
+    print_provisioning_report,
+    read_deployment_config,
+)
+
+# ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
+CONFIG_FILE = None              # None = CONFIG_FILE env / deployment-config.conf
+BACKEND = "gcloud"              # gcloud / fake (a --fake kapcsoló is ezt állítja)
+GCLOUD = "gcloud"               # A gcloud futtatható (teszthez egy helyi fake gcloud szkript)
+MAX_PARALLEL_CREATES = 5        # Egyszerre futó create hívások
+UNIQUE_NAMES = True             # VM nevek futásonkénti időbélyeggel (<prefix>-<ts>-<i>), mint a deploy-gcp.sh
+RECREATE_EXISTING = False       # Meglévő, azonos nevű VM: False = megtartjuk (kihagyjuk a create-et), True = törlés + újra létrehozás
+STARTUP_SCRIPT = "startup-script-mannequin.sh"
+SERVICE_PORT = 5001
+HEALTH_PATH = "/health"         # None = elég a RUNNING állapot + külső IP
+POLL_INTERVAL = 10              # Készenlét lekérdezés gyakorisága (s)
+READY_TIMEOUT = 900             # Ennyi idő alatt kell elkészülnie (docker build a VM-en)
+FLEET_FILE = "fleet-instances.json"  # A kész VM-ek listája; None = nincs kiírás
+
+# Fake backend (--fake): szimulált create / boot idő
+FAKE_CREATE_SECONDS = 2.0
+FAKE_BOOT_SECONDS = 3.0
+
+# ===============================================
+
+def print_event(instance, event):
+    if event == "created":
+        print(f"   🖥️  {instance.name}: {'meglévő' if instance.reused else 'létrehozva'}")
+    elif event == "running":
+        print(f"   🌐 {instance.name}: RUNNING, {instance.external_ip}")
+    elif event == "ready":
+        print(f"   ✅ {instance.name}: kész ({instance.ready_at:.1f}s)")
+    elif event == "failed":
+        print(f"   ❌ {instance.name}: {instance.error}")
+
+async def main():
+    """Fő program belépési pont"""
+    backend_name = "fake" if "--fake" in sys.argv else BACKEND
+    config_path = config_file_path(CONFIG_FILE)
+    run_id = str(int(time.time())) if UNIQUE_NAMES else None
+    specs = fleet_specs(read_deployment_config(config_path), startup_script=STARTUP_SCRIPT, run_id=run_id)
+    if backend_name != "fake" and not specs[0].metadata.get("IMAGE_URI"):
+        print("❌ IMAGE_URI nincs megadva (környezeti változó vagy config). Példa:")
+        print(f"   europe-west1-docker.pkg.dev/{specs[0].project}/mannequin-repo/mannequin:<tag>")
+        sys.exit(1)
+
+    if backend_name == "fake":
+        backend = make_backend("fake", create_seconds=FAKE_CREATE_SECONDS, boot_seconds=FAKE_BOOT_SECONDS)
+        health_path = None
+        poll_interval = 0.5
+    else:
+        backend = make_backend("gcloud", gcloud=GCLOUD)
+        health_path = HEALTH_PATH
+        poll_interval = POLL_INTERVAL
+
+    print(f"📊 Konfiguráció:")
+    print(f"   - Config: {config_path}")
+    print(f"   - Backend: {backend_name}")
+    print(f"   - Projekt / zóna: {specs[0].project} / {specs[0].zone}")
+    print(f"   - VM-ek: {len(specs)} x {specs[0].machine_type} ({specs[0].name} ... {specs[-1].name})")
+    print(f"   - Párhuzamos create: {MAX_PARALLEL_CREATES}")
+    print(f"   - Készenlét: {'RUNNING + ' + health_path if health_path else 'RUNNING'}, timeout {READY_TIMEOUT}s")
+    print()
+
+    provisioner = FleetProvisioner(
+        backend,
+        specs,
+        max_parallel=MAX_PARALLEL_CREATES,
+        service_port=SERVICE_PORT,
+        health_path=health_path,
+        poll_interval=poll_interval,
+        ready_timeout=READY_TIMEOUT,
+        recreate=RECREATE_EXISTING,
+        on_event=print_event,
+        config_file=config_path,
+    )
+    report = await provisioner.provision()
+    print_provisioning_report(report)
+
+    if FLEET_FILE:
+        report.write(FLEET_FILE)
+        print(f"\n💾 Fleet fájl: {FLEET_FILE}")
+    if report.urls():
+        print(f"\n📋 VM_INSTANCES = [")
+        for url in report.urls():
+            print(f'    "{url}",')
+        print(f"]")
+    if report.failed():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    print("🔧 Mannequin Segmenter Fleet Provisioning")
+    print("=" * 50)
+    asyncio.run(main())
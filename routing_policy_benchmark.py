@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Routing Policy Benchmark for Mannequin Segmenter API
+Ugyanazt a workload-ot (azonos URL lista, azonos sorrend) lefuttatja minden
+routing policy-vel, majd összehasonlítja a fleet throughput-ot és a késleltetést.
+"""
+
+import asyncio
+import os
+import random
+
+from loadgen import (
+    ClosedLoopPacing,
+    Lane,
+    LoadEngine,
+    QueueWorkload,
+    build_payload,
+    extract_pulover_urls_from_csv,
+    format_percentiles,
+    load_urls_from_file,
+    make_instances,
+    make_targets,
+)
+
+# ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
+POLICIES = ["round_robin", "least_outstanding", "peak_ewma", "power_of_two", "weighted_round_robin"]
+REQUESTS_PER_POLICY = 200       # Kérések száma policy-nként (mindegyik ugyanazt a listát kapja)
+CONCURRENT_WORKERS = 5          # Egyidejű worker-ek (közös policy-n osztoznak)
+REQUEST_TIMEOUT = 60            # Timeout másodpercben
+COOLDOWN_BETWEEN_POLICIES = 10  # Szünet két policy futása között (másodperc)
+RANDOM_SEED = 42                # Azonos URL kiválasztás minden futásnál
+CSV_FILE = "data_for_categorisation.csv"
+URL_LIST_FILE = "pulover_urls.txt"
+
+# VM Instance IP címek
+VM_INSTANCES = [
+    "http://34.22.130.174:5001",
+    "http://34.79.218.203:5001",
+    "http://104.155.15.184:5001",
+    "http://35.195.4.217:5001",
+    "http://34.140.252.94:5001"
+]
+INSTANCE_WEIGHTS = None         # weighted_round_robin súlyok VM-enként (None = egyenlő)
+
+# API endpoint
+API_ENDPOINT = "/infer"
+
+# ===============================================
+
+async def run_policy(policy, image_urls):
+    """Egy policy lefuttatása friss instance állapotokkal, összefoglaló dict-et ad vissza"""
+    instances = make_instances(VM_INSTANCES, INSTANCE_WEIGHTS)
+    task_queue = QueueWorkload(build_payload(url) for url in image_urls)
+    targets = make_targets(policy, instances)
+    lanes = [Lane(worker_id, task_queue, targets) for worker_id in range(1, CONCURRENT_WORKERS + 1)]
+    engine = LoadEngine(
+        instances,
+        lanes,
+        ClosedLoopPacing(),
+        api_endpoint=API_ENDPOINT,
+        request_timeout=REQUEST_TIMEOUT,
+        keep_results=False,
+    )
+
+    print(f"🔄 {policy}: {len(task_queue)} kérés, {CONCURRENT_WORKERS} worker...")
+    await engine.run()
+
+    recorder = engine.recorder
+    wall_time = engine.end_time - engine.start_time
+    summary = {
+        "policy": policy,
+        "wall_time": wall_time,
+        "succeeded": recorder.succeeded,
+        "failed": recorder.failed,
+        "throughput": recorder.succeeded / wall_time if wall_time > 0 else 0.0,
+        "latency": recorder.histogram("client_total"),
+        "distribution": [instance.completed_tasks + instance.errors for instance in instances],
+    }
+    print(f"   ✅ {summary['succeeded']} sikeres, ❌ {summary['failed']} hiba, {summary['throughput']:.2f} kérés/sec ({wall_time:.1f}s)")
+    return summary
+
+def print_comparison(summaries):
+    """Policy-k összehasonlító táblázata throughput szerint rendezve"""
+    print(f"\n📈 ROUTING POLICY ÖSSZEHASONLÍTÁS ({REQUESTS_PER_POLICY} kérés, {CONCURRENT_WORKERS} worker)")
+    print(f"=" * 90)
+    print(f"   {'Policy':22s} {'Kérés/sec':>10s} {'Siker %':>8s} {'p50':>8s} {'p99':>8s}   Kérések VM-enként")
+
+    ranked = sorted(summaries, key=lambda s: s["throughput"], reverse=True)
+    for summary in ranked:
+        total = summary["succeeded"] + summary["failed"]
+        success_rate = summary["succeeded"] / total * 100 if total else 0.0
+        latency = summary["latency"]
+        if latency.count:
+            p50 = f"{latency.percentile(50):.3f}s"
+            p99 = f"{latency.percentile(99):.3f}s"
+        else:
+            p50 = p99 = "N/A"
+        distribution = "/".join(str(count) for count in summary["distribution"])
+        print(f"   {summary['policy']:22s} {summary['throughput']:10.2f} {success_rate:7.1f}% {p50:>8s} {p99:>8s}   {distribution}")
+
+    print(f"\n⏰ KÉSLELTETÉS PERCENTILISEK")
+    for summary in ranked:
+        if summary["latency"].count:
+            print(f"   🔹 {summary['policy']:22s}: {format_percentiles(summary['latency'])}")
+
+    best = ranked[0]
+    print(f"\n🏆 Legnagyobb fleet throughput: {best['policy']} ({best['throughput']:.2f} kérés/sec)")
+
+def load_benchmark_urls():
+    """Azonos URL lista minden policy-nek (fájlból vagy seed-elt CSV mintavétellel)"""
+    if os.path.exists(URL_LIST_FILE):
+        urls = load_urls_from_file(URL_LIST_FILE)
+    else:
+        random.seed(RANDOM_SEED)
+        urls = extract_pulover_urls_from_csv(CSV_FILE, REQUESTS_PER_POLICY)
+    if not urls:
+        return []
+    # Ha kevesebb URL van, ismételjük a listát ugyanabban a sorrendben
+    return [urls[i % len(urls)] for i in range(REQUESTS_PER_POLICY)]
+
+async def main():
+    """Fő program belépési pont"""
+    print("🔧 Routing Policy Benchmark")
+    print("=" * 60)
+
+    image_urls = load_benchmark_urls()
+    if not image_urls:
+        print("❌ Nem sikerült URL-eket betölteni")
+        return
+
+    print(f"🎯 {len(image_urls)} kérés policy-nként, {len(VM_INSTANCES)} VM")
+    print()
+
+    summaries = []
+    for i, policy in enumerate(POLICIES):
+        if i > 0 and COOLDOWN_BETWEEN_POLICIES > 0:
+            print(f"⏸️  Szünet {COOLDOWN_BETWEEN_POLICIES}s...")
+            await asyncio.sleep(COOLDOWN_BETWEEN_POLICIES)
+        summaries.append(await run_policy(policy, image_urls))
+
+    print_comparison(summaries)
+
+if __name__ == "__main__":
+    asyncio.run(main())
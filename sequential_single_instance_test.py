@@ -6,43 +6,43 @@ to analyze response time variations without any concurrency
 """
 
 import asyncio
-import aiohttp
 import time
-import statistics
 from datetime import datetime
-import json
 import random
 import os
 
+from loadgen import (
+    ClosedLoopPacing,
+    InstanceState,
+    Lane,
+    LoadEngine,
+    PinnedTarget,
+    QueueWorkload,
+    ResultColumns,
+    build_payload,
+    load_urls_from_file,
+    print_summary_statistics,
+    record_run,
+    short_image_name,
+)
+
 # ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
 TARGET_INSTANCE = "http://35.233.66.133:5001"  # Tesztelendő VM instance
 TOTAL_REQUESTS = 50                             # Összes kérések száma
 REQUEST_TIMEOUT = 120                           # Timeout másodpercben (hosszabb a stabilitásért)
 URL_LIST_FILE = "pulover_urls.txt"              # Pulover URL-ek fájlja
 DELAY_BETWEEN_REQUESTS = 0.5                    # Kis szünet kérések között (másodperc)
+RESULTS_DB = "benchmark_results.db"             # Futás mentése (összevetés: benchmark_results.py compare); None = nincs mentés
 
 # API endpoint
 API_ENDPOINT = "/infer"
 
 # ===============================================
 
-def load_urls_from_file(filename):
-    """URL-ek betöltése fájlból"""
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip()]
-        print(f"📂 URL-ek betöltve: {filename} ({len(urls)} darab)")
-        return urls
-    except Exception as e:
-        print(f"❌ Hiba a fájl olvasásakor: {e}")
-        return []
-
 class SequentialTester:
     def __init__(self, image_urls, target_instance):
         self.image_urls = image_urls
         self.target_instance = target_instance
-        self.results = []
-        self.errors = []
         
         # Random kiválasztás és keverés
         if len(image_urls) >= TOTAL_REQUESTS:
@@ -55,94 +55,46 @@ class SequentialTester:
         random.shuffle(self.test_urls)
         
         print(f"🎯 {len(self.test_urls)} random pulover kép kiválasztva szekvenciális teszthez")
-    
-    async def make_single_request(self, session, request_id, image_url):
-        """Egyetlen API kérés végrehajtása"""
-        full_url = f"{self.target_instance}{API_ENDPOINT}"
-        request_start = time.time()
         
-        # URL rövid megjelenítése
-        short_url = image_url.split('/')[-1][:50] + "..." if len(image_url.split('/')[-1]) > 50 else image_url.split('/')[-1]
-        
-        print(f"🔄 Request {request_id:2d}/50: {short_url}", end="", flush=True)
-        
-        try:
-            payload = {
-                "image_url": image_url,
-                "prompt_mode": "both"
-            }
-            
-            async with session.post(
-                full_url,
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
-            ) as response:
-                response_text = await response.text()
-                request_end = time.time()
-                response_time = request_end - request_start
-                
-                result = {
-                    "request_id": request_id,
-                    "image_url": image_url,
-                    "status_code": response.status,
-                    "response_time": response_time,
-                    "timestamp": datetime.fromtimestamp(request_start),
-                    "success": response.status == 200,
-                    "response_size": len(response_text)
-                }
-                
-                if response.status == 200:
-                    try:
-                        json_response = json.loads(response_text)
-                        result["has_visualization_url"] = "visualization_url" in json_response
-                        if "timing" in json_response:
-                            result["server_timing"] = json_response["timing"]
-                            # Server-side timing részletezése
-                            timing = json_response["timing"]
-                            if "model_inference" in timing and "gcs_total" in timing:
-                                result["server_model_inference"] = timing["model_inference"]
-                                result["server_gcs_total"] = timing["gcs_total"]
-                                result["server_total_request"] = timing.get("total_request", 0)
-                    except json.JSONDecodeError:
-                        result["has_visualization_url"] = False
-                
-                self.results.append(result)
-                
-                # Részletes kimenet
-                status_icon = "✅" if response.status == 200 else "❌"
-                server_info = ""
-                if "server_timing" in result:
-                    model_time = result.get("server_model_inference", 0)
-                    gcs_time = result.get("server_gcs_total", 0)
-                    server_info = f" (model: {model_time:.2f}s, gcs: {gcs_time:.2f}s)"
-                
-                print(f" {status_icon} {response.status} ({response_time:.3f}s{server_info})")
-                
-        except asyncio.TimeoutError:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "request_id": request_id,
-                "image_url": image_url,
-                "error": "Timeout",
-                "response_time": response_time,
-                "timestamp": datetime.fromtimestamp(request_start)
-            }
-            self.errors.append(error)
-            print(f" ⏰ TIMEOUT ({response_time:.3f}s)")
-            
-        except Exception as e:
-            request_end = time.time()
-            response_time = request_end - request_start
-            error = {
-                "request_id": request_id,
-                "image_url": image_url,
-                "error": str(e),
-                "response_time": response_time,
-                "timestamp": datetime.fromtimestamp(request_start)
-            }
-            self.errors.append(error)
-            print(f" ❌ ERROR: {e}")
+        instance = InstanceState(target_instance, 1)
+        workload = QueueWorkload(build_payload(url) for url in self.test_urls)
+        self.engine = LoadEngine(
+            [instance],
+            [Lane(1, workload, PinnedTarget(instance))],
+            ClosedLoopPacing(delay=DELAY_BETWEEN_REQUESTS),
+            api_endpoint=API_ENDPOINT,
+            request_timeout=REQUEST_TIMEOUT,
+            on_dispatch=self.print_dispatch,
+            on_complete=self.print_result,
+            keep_results=True,     # Véges kéréssor: a riport kérésenként listáz
+            columns=ResultColumns(),
+        )
+        self.columns = self.engine.columns
+        self.results = self.engine.results
+        self.errors = self.engine.errors
+    
+    def print_dispatch(self, instance, task):
+        short_url = short_image_name(task["payload"]["image_url"], 50)
+        print(f"🔄 Request {task['task_id']:2d}/{len(self.test_urls)}: {short_url}", end="", flush=True)
+    
+    def print_result(self, result):
+        if "error" in result:
+            if result["error"] == "Timeout":
+                print(f" ⏰ TIMEOUT ({result['response_time']:.3f}s)")
+            else:
+                print(f" ❌ ERROR: {result['error']}")
+        else:
+            # Részletes kimenet
+            status_icon = "✅" if result["success"] else "❌"
+            server_info = ""
+            if "server_model_inference" in result and "server_gcs_total" in result:
+                server_info = f" (model: {result['server_model_inference']:.2f}s, gcs: {result['server_gcs_total']:.2f}s)"
+            print(f" {status_icon} {result['status_code']} ({result['response_time']:.3f}s{server_info})")
+        
+        # Progress minden 10. kérésnél
+        done = len(self.columns)
+        if done % 10 == 0 or done == len(self.test_urls):
+            print(f"📊 Progress: {done}/{len(self.test_urls)} kérés, {self.engine.recorder.succeeded} sikeres ({self.engine.elapsed():.1f}s)")
     
     async def run_sequential_test(self):
         """Szekvenciális teszt futtatása"""
@@ -157,85 +109,64 @@ class SequentialTester:
         
         start_time = time.time()
         
-        async with aiohttp.ClientSession() as session:
-            for i, url in enumerate(self.test_urls, 1):
-                await self.make_single_request(session, i, url)
-                
-                # Kis szünet a következő kérés előtt (kivéve az utolsó után)
-                if i < len(self.test_urls):
-                    await asyncio.sleep(DELAY_BETWEEN_REQUESTS)
-                
-                # Progress minden 10. kérésnél
-                if i % 10 == 0 or i == len(self.test_urls):
-                    elapsed = time.time() - start_time
-                    successful = len([r for r in self.results if r["success"]])
-                    print(f"📊 Progress: {i}/{len(self.test_urls)} kérés, {successful} sikeres ({elapsed:.1f}s)")
+        await self.engine.run()
         
         end_time = time.time()
         total_time = end_time - start_time
         
         print(f"\n⏱️  Teszt befejezve! (összes idő: {total_time:.2f}s)")
         self.print_detailed_statistics()
+        if RESULTS_DB:
+            record_run(RESULTS_DB, self.engine, "sequential_single_instance_test")
     
     def print_detailed_statistics(self):
-        """Részletes statisztikák kiírása"""
-        successful_requests = [r for r in self.results if r["success"]]
-        failed_requests = len(self.results) - len(successful_requests)
-        total_requests = len(self.results) + len(self.errors)
+        """Részletes statisztikák kiírása (oszlopos eredményekből, vektorizáltan)"""
+        frame = self.columns.frame()
+        successful = frame.successful()
+        total_requests = len(frame)
         
         print(f"\n📈 RÉSZLETES TESZT EREDMÉNYEK - SZEKVENCIÁLIS")
         print(f"=" * 70)
         print(f"🎯 Target Instance: {self.target_instance}")
         print(f"📊 Összes kérés: {total_requests}")
-        print(f"✅ Sikeres kérések: {len(successful_requests)}")
-        print(f"❌ Sikertelen kérések: {failed_requests + len(self.errors)}")
+        print(f"✅ Sikeres kérések: {len(successful)}")
+        print(f"❌ Sikertelen kérések: {total_requests - len(successful)}")
         if total_requests > 0:
-            print(f"📈 Sikeresség arány: {len(successful_requests)/total_requests*100:.1f}%")
+            print(f"📈 Sikeresség arány: {len(successful)/total_requests*100:.1f}%")
         
-        if successful_requests:
-            response_times = [r["response_time"] for r in successful_requests]
-            
+        if len(successful):
             print(f"\n⏰ VÁLASZIDŐ STATISZTIKÁK")
-            print(f"   🔹 Minimum: {min(response_times):.3f} másodperc")
-            print(f"   🔹 Maximum: {max(response_times):.3f} másodperc")
-            print(f"   🔹 Átlag: {statistics.mean(response_times):.3f} másodperc")
-            print(f"   🔹 Medián: {statistics.median(response_times):.3f} másodperc")
-            if len(response_times) > 1:
-                print(f"   🔹 Szórás: {statistics.stdev(response_times):.3f} másodperc")
+            print_summary_statistics(successful.summary())
             
             # Server-side timing statisztikák ha elérhetők
-            model_times = [r.get("server_model_inference", 0) for r in successful_requests if "server_model_inference" in r]
-            gcs_times = [r.get("server_gcs_total", 0) for r in successful_requests if "server_gcs_total" in r]
+            model = successful.summary("model_inference")
+            gcs = successful.summary("gcs_total")
             
-            if model_times:
+            if model:
                 print(f"\n🤖 SERVER-SIDE MODEL INFERENCE STATISZTIKÁK")
-                print(f"   🔹 Minimum: {min(model_times):.3f} másodperc")
-                print(f"   🔹 Maximum: {max(model_times):.3f} másodperc")
-                print(f"   🔹 Átlag: {statistics.mean(model_times):.3f} másodperc")
-                print(f"   🔹 Medián: {statistics.median(model_times):.3f} másodperc")
+                print_summary_statistics(model, stdev=False)
             
-            if gcs_times:
+            if gcs:
                 print(f"\n☁️  SERVER-SIDE GCS STATISZTIKÁK")
-                print(f"   🔹 Minimum: {min(gcs_times):.3f} másodperc")
-                print(f"   🔹 Maximum: {max(gcs_times):.3f} másodperc")
-                print(f"   🔹 Átlag: {statistics.mean(gcs_times):.3f} másodperc")
-                print(f"   🔹 Medián: {statistics.median(gcs_times):.3f} másodperc")
+                print_summary_statistics(gcs, stdev=False)
             
-            # Teljesítmény trend elemzés
+            # Teljesítmény trend elemzés (indulási sorrendben)
+            ordered = successful.in_start_order()
+            response_times = ordered["response_time"]
             if len(response_times) >= 10:
                 print(f"\n📊 TELJESÍTMÉNY TREND ELEMZÉS")
                 first_10 = response_times[:10]
                 last_10 = response_times[-10:]
-                middle_section = response_times[10:-10] if len(response_times) > 20 else []
+                middle_section = response_times[10:-10]
                 
-                print(f"   🔹 Első 10 kérés átlag: {statistics.mean(first_10):.3f}s")
-                if middle_section:
-                    print(f"   🔹 Középső rész átlag: {statistics.mean(middle_section):.3f}s")
-                print(f"   🔹 Utolsó 10 kérés átlag: {statistics.mean(last_10):.3f}s")
+                print(f"   🔹 Első 10 kérés átlag: {first_10.mean():.3f}s")
+                if len(middle_section):
+                    print(f"   🔹 Középső rész átlag: {middle_section.mean():.3f}s")
+                print(f"   🔹 Utolsó 10 kérés átlag: {last_10.mean():.3f}s")
                 
                 # Trend kiértékelés
-                first_avg = statistics.mean(first_10)
-                last_avg = statistics.mean(last_10)
+                first_avg = first_10.mean()
+                last_avg = last_10.mean()
                 
                 if last_avg > first_avg * 1.1:
                     print(f"   ⚠️  Teljesítmény romlás észlelve (+{((last_avg/first_avg-1)*100):.1f}%)")
@@ -246,17 +177,14 @@ class SequentialTester:
             
             # Outlier elemzés
             print(f"\n🔍 OUTLIER ELEMZÉS")
-            avg_time = statistics.mean(response_times)
-            std_time = statistics.stdev(response_times) if len(response_times) > 1 else 0
-            threshold = avg_time + 2 * std_time
-            
-            outliers = [(i+1, r) for i, r in enumerate(successful_requests) if r["response_time"] > threshold]
+            threshold, outliers = ordered.outliers(k=2.0)
             
-            if outliers:
+            if len(outliers):
                 print(f"   ⚠️  {len(outliers)} outlier találva (>{threshold:.3f}s):")
-                for req_num, outlier in outliers[:5]:  # Első 5 outlier
-                    short_url = outlier["image_url"].split('/')[-1][:40]
-                    print(f"      {req_num:2d}. {outlier['response_time']:6.3f}s - {short_url}")
+                for index in outliers[:5]:  # Első 5 outlier
+                    task_id = ordered["task_id"][index]
+                    short_url = self.test_urls[task_id - 1].split('/')[-1][:40]
+                    print(f"      {task_id:2d}. {response_times[index]:6.3f}s - {short_url}")
                 if len(outliers) > 5:
                     print(f"      ... és még {len(outliers) - 5} darab")
             else:
@@ -281,7 +209,7 @@ class SequentialTester:
         print(f"{'-'*3} {'-'*12} {'-'*10} {'-'*8} {'-'*6} {'-'*7} {'-'*40}")
         
         for i, result in enumerate(self.results, 1):
-            timestamp_str = result["timestamp"].strftime("%H:%M:%S")
+            timestamp_str = datetime.fromtimestamp(result["timestamp"]).strftime("%H:%M:%S")
             model_time = result.get("server_model_inference", 0)
             gcs_time = result.get("server_gcs_total", 0)
             status = "✅ 200" if result["success"] else f"❌ {result['status_code']}"
@@ -291,7 +219,7 @@ class SequentialTester:
         
         # Hibás kérések
         for i, error in enumerate(self.errors, len(self.results) + 1):
-            timestamp_str = error["timestamp"].strftime("%H:%M:%S")
+            timestamp_str = datetime.fromtimestamp(error["timestamp"]).strftime("%H:%M:%S")
             short_url = error["image_url"].split('/')[-1][:35]
             print(f"{i:<3} {timestamp_str:<12} {error['response_time']:8.3f}s {'N/A':>6} {'N/A':>4} ❌ ERR {short_url:<40}")
 
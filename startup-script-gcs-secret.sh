@@ -2,11 +2,60 @@
 
 # GCP Compute Engine Startup Script with Secret Manager
 # Securely retrieves GCP Service Account key from Secret Manager
+# Records per-phase boot timings (JSON lines) to /var/www/boot/timings.jsonl, served by nginx at /boot/
 
-set -euo pipefail
+set -Eeuo pipefail
 
 echo "🚀 Starting VM setup with Secret Manager for credentials..."
 
+# ===============================================
+# BOOT PHASE TIMINGS
+# ===============================================
+
+BOOT_SCRIPT="gcs-secret"
+BOOT_TIMINGS_DIR="/var/www/boot"
+BOOT_TIMINGS_FILE="${BOOT_TIMINGS_DIR}/timings.jsonl"
+SCRIPT_START=$(date +%s.%N)
+mkdir -p "$BOOT_TIMINGS_DIR"
+: > "$BOOT_TIMINGS_FILE"
+
+# One JSON line per phase: host, script, phase, status (ok / cached / skipped / failed), start, end, seconds.
+# Appended to the timings file and echoed with a BOOT_PHASE prefix, so saved serial console /
+# journal logs carry the same records (boot_time_report.py reads both).
+record_phase() {
+  local line
+  line=$(awk -v host="$(hostname)" -v script="$BOOT_SCRIPT" -v phase="$1" -v status="$2" -v start="$3" -v end="$4" 'BEGIN {
+    printf "{\"host\":\"%s\",\"script\":\"%s\",\"phase\":\"%s\",\"status\":\"%s\",\"start\":%.3f,\"end\":%.3f,\"seconds\":%.3f}",
+      host, script, phase, status, start, end, end - start
+  }')
+  echo "$line" >> "$BOOT_TIMINGS_FILE"
+  echo "BOOT_PHASE $line"
+}
+
+PHASE_NAME=""
+phase_begin() {
+  PHASE_NAME="$1"
+  PHASE_START=$(date +%s.%N)
+  echo "⏱️  Phase: $PHASE_NAME"
+}
+
+phase_end() {
+  record_phase "$PHASE_NAME" "${1:-ok}" "$PHASE_START" "$(date +%s.%N)"
+  PHASE_NAME=""
+}
+
+phase_skip() {
+  local now
+  now=$(date +%s.%N)
+  record_phase "$1" "${2:-skipped}" "$now" "$now"
+}
+
+# A failing command aborts the script (set -e): close the running phase as failed first
+trap 'if [ -n "$PHASE_NAME" ]; then phase_end failed; fi' ERR
+
+# Kernel boot until this script started
+record_phase vm_boot ok "$(awk -v now="$SCRIPT_START" '{ printf "%.3f", now - $1 }' /proc/uptime)" "$SCRIPT_START"
+
 metadata_get() {
   local key="$1"; shift || true
   local default_value="${1:-}"
@@ -20,6 +69,7 @@ metadata_get() {
 }
 
 # Install required packages
+phase_begin apt
 apt-get update -y
 apt-get upgrade -y
 apt-get install -y \
@@ -29,20 +79,25 @@ apt-get install -y \
   gnupg \
   lsb-release \
   git
+phase_end
 
 # Install Google Cloud SDK first (needed for Secret Manager)
+phase_begin sdk_install
 echo "📦 Installing Google Cloud SDK..."
 echo "deb [signed-by=/usr/share/keyrings/cloud.google.gpg] http://packages.cloud.google.com/apt cloud-sdk main" | tee -a /etc/apt/sources.list.d/google-cloud-sdk.list
 curl -fsSL https://packages.cloud.google.com/apt/doc/apt-key.gpg | gpg --dearmor -o /usr/share/keyrings/cloud.google.gpg
 apt-get update -y
 apt-get install -y google-cloud-sdk
+phase_end
 
 # Install Docker
+phase_begin docker_install
 echo "🐳 Installing Docker..."
 curl -fsSL https://download.docker.com/linux/ubuntu/gpg | gpg --dearmor -o /usr/share/keyrings/docker-archive-keyring.gpg
 echo "deb [arch=$(dpkg --print-architecture) signed-by=/usr/share/keyrings/docker-archive-keyring.gpg] https://download.docker.com/linux/ubuntu $(lsb_release -cs) stable" | tee /etc/apt/sources.list.d/docker.list > /dev/null
 apt-get update -y
 apt-get install -y docker-ce docker-ce-cli containerd.io docker-compose-plugin
+phase_end
 systemctl start docker
 systemctl enable docker
 usermod -aG docker "$(whoami)" || true
@@ -88,7 +143,9 @@ if [ -n "$PROJECT_ID" ] && [ -n "$SECRET_NAME" ]; then
   echo "   Secret: $SECRET_NAME"
   
   # Use VM's service account to access Secret Manager
+  phase_begin secret_access
   if GCP_SA_KEY_JSON=$(gcloud secrets versions access latest --secret="$SECRET_NAME" --project="$PROJECT_ID" 2>/dev/null); then
+    phase_end
     # Remove any existing GCP_SA_KEY line first
     grep -v '^GCP_SA_KEY=' "$ENV_PATH" > "${ENV_PATH}.tmp" 2>/dev/null || cp "$ENV_PATH" "${ENV_PATH}.tmp"
     # Add GCP_SA_KEY to .env file
@@ -97,11 +154,13 @@ if [ -n "$PROJECT_ID" ] && [ -n "$SECRET_NAME" ]; then
     echo "✅ GCP Service Account key retrieved from Secret Manager and added to .env"
     echo "🔍 Debug: .env file now contains $(wc -l < "$ENV_PATH") lines"
   else
+    phase_end failed
     echo "❌ Failed to retrieve GCP_SA_KEY from Secret Manager"
     echo "   Make sure the VM's service account has 'Secret Manager Secret Accessor' role"
     echo "   and the secret '$SECRET_NAME' exists in project '$PROJECT_ID'"
   fi
 else
+  phase_skip secret_access
   echo "⚠️  PROJECT_ID or SECRET_NAME not provided - skipping Secret Manager retrieval"
   echo "   PROJECT_ID: ${PROJECT_ID:-NOT_SET}"
   echo "   SECRET_NAME: ${SECRET_NAME:-NOT_SET}"
@@ -164,6 +223,7 @@ if [ -z "$RESULTS_DIR_VAL" ]; then
 fi
 
 # Install Nginx
+phase_begin nginx
 echo "🐳 Installing Nginx..."
 apt-get install -y nginx
 
@@ -202,6 +262,13 @@ server {
         return 200 "OK\n";
         add_header Content-Type text/plain;
     }
+
+    # Boot phase timings for the readiness tooling
+    location /boot/ {
+        root /var/www;
+        default_type application/json;
+        add_header Cache-Control "no-store";
+    }
 }
 EOF
 else
@@ -223,6 +290,13 @@ server {
         return 200 "OK\n";
         add_header Content-Type text/plain;
     }
+
+    # Boot phase timings for the readiness tooling
+    location /boot/ {
+        root /var/www;
+        default_type application/json;
+        add_header Cache-Control "no-store";
+    }
 }
 EOF
 fi
@@ -239,8 +313,10 @@ else
     echo "❌ Nginx configuration test failed"
     nginx -t
 fi
+phase_end
 
 # Clone repository
+phase_begin clone
 echo "📦 Cloning mannequin-segmenter repository..."
 if [ -d "$REPO_DIR" ]; then
   rm -rf "$REPO_DIR"
@@ -254,6 +330,7 @@ if [ -n "$GITHUB_TOKEN" ]; then
     echo "✅ Repository cloned successfully"
   else
     echo "❌ Failed to clone repository with token"
+    phase_end failed
     exit 1
   fi
 else
@@ -262,9 +339,11 @@ else
     echo "✅ Repository cloned successfully (public)"
   else
     echo "❌ Failed to clone repository (public access)"
+    phase_end failed
     exit 1
   fi
 fi
+phase_end
 
 if [ ! -f "Dockerfile" ]; then
   echo "❌ Dockerfile not found in repository"
@@ -289,9 +368,12 @@ if docker ps -a --format '{{.Names}}' | grep -q '^mannequin-segmenter$'; then
 fi
 
 # Build and run
+phase_begin build
 echo "🏗️  Building Docker image from source..."
 docker build -t mannequin-segmenter:local -f Dockerfile .
+phase_end
 
+phase_begin run
 echo "▶️  Starting mannequin-segmenter container on port 5001"
 docker run -d \
   --name mannequin-segmenter \
@@ -301,6 +383,9 @@ docker run -d \
   -v "$RESULTS_DIR_VAL":"$RESULTS_DIR_VAL":rw \
   -p 5001:5001 \
   mannequin-segmenter:local
+phase_end
+record_phase total ok "$SCRIPT_START" "$(date +%s.%N)"
 
 echo "✅ Setup complete. Service is listening on port 5001."
 echo "ℹ️  Logs: docker logs -f mannequin-segmenter"
+echo "ℹ️  Boot timings: $BOOT_TIMINGS_FILE (http://<external-ip>/boot/timings.jsonl)"
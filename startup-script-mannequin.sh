@@ -1,13 +1,63 @@
 #!/bin/bash
 
 # GCP Compute Engine Startup Script for mannequin-segmenter service
-# - Installs Docker and Google Cloud SDK
-# - Pulls container image from Artifact Registry / GCR and runs on port 5001
+# - Installs Docker and Google Cloud SDK (skipped when already present)
+# - Fast boot: pulls the pinned IMAGE_URI from Artifact Registry / GCR and runs it on port 5001
+# - Otherwise builds from source, reusing a cached image when the source commit is unchanged
+# - Records per-phase boot timings (JSON lines) to /var/www/boot/timings.jsonl, served by nginx at /boot/
 
-set -euo pipefail
+set -Eeuo pipefail
 
 echo "🚀 Starting VM setup for mannequin-segmenter service..."
 
+# ===============================================
+# BOOT PHASE TIMINGS
+# ===============================================
+
+BOOT_SCRIPT="mannequin"
+BOOT_TIMINGS_DIR="/var/www/boot"
+BOOT_TIMINGS_FILE="${BOOT_TIMINGS_DIR}/timings.jsonl"
+SCRIPT_START=$(date +%s.%N)
+mkdir -p "$BOOT_TIMINGS_DIR"
+: > "$BOOT_TIMINGS_FILE"
+
+# One JSON line per phase: host, script, phase, status (ok / cached / skipped / failed), start, end, seconds.
+# Appended to the timings file and echoed with a BOOT_PHASE prefix, so saved serial console /
+# journal logs carry the same records (boot_time_report.py reads both).
+record_phase() {
+  local line
+  line=$(awk -v host="$(hostname)" -v script="$BOOT_SCRIPT" -v phase="$1" -v status="$2" -v start="$3" -v end="$4" 'BEGIN {
+    printf "{\"host\":\"%s\",\"script\":\"%s\",\"phase\":\"%s\",\"status\":\"%s\",\"start\":%.3f,\"end\":%.3f,\"seconds\":%.3f}",
+      host, script, phase, status, start, end, end - start
+  }')
+  echo "$line" >> "$BOOT_TIMINGS_FILE"
+  echo "BOOT_PHASE $line"
+}
+
+PHASE_NAME=""
+phase_begin() {
+  PHASE_NAME="$1"
+  PHASE_START=$(date +%s.%N)
+  echo "⏱️  Phase: $PHASE_NAME"
+}
+
+phase_end() {
+  record_phase "$PHASE_NAME" "${1:-ok}" "$PHASE_START" "$(date +%s.%N)"
+  PHASE_NAME=""
+}
+
+phase_skip() {
+  local now
+  now=$(date +%s.%N)
+  record_phase "$1" "${2:-skipped}" "$now" "$now"
+}
+
+# A failing command aborts the script (set -e): close the running phase as failed first
+trap 'if [ -n "$PHASE_NAME" ]; then phase_end failed; fi' ERR
+
+# Kernel boot until this script started
+record_phase vm_boot ok "$(awk -v now="$SCRIPT_START" '{ printf "%.3f", now - $1 }' /proc/uptime)" "$SCRIPT_START"
+
 metadata_get() {
   local key="$1"; shift || true
   local default_value="${1:-}"
@@ -20,8 +70,43 @@ metadata_get() {
   fi
 }
 
+echo "🔐 Reading metadata..."
+MANNEQUIN_ENV_B64="$(metadata_get MANNEQUIN_ENV_B64 "")"
+IMAGE_URI="$(metadata_get IMAGE_URI "")"
+GITHUB_TOKEN="$(metadata_get GITHUB_TOKEN "")"
+GCP_SA_KEY_B64="$(metadata_get GCP_SA_KEY "")"
+# auto: pull IMAGE_URI when set, otherwise build from source; pull / build: force one path
+BOOT_MODE="$(metadata_get BOOT_MODE "auto")"
+
+FAST_BOOT=false
+case "$BOOT_MODE" in
+  pull)
+    if [ -z "$IMAGE_URI" ]; then
+      echo "❌ BOOT_MODE=pull requires IMAGE_URI metadata"
+      exit 1
+    fi
+    FAST_BOOT=true
+    ;;
+  auto)
+    if [ -n "$IMAGE_URI" ]; then FAST_BOOT=true; fi
+    ;;
+  build)
+    ;;
+  *)
+    echo "⚠️  Unknown BOOT_MODE=$BOOT_MODE, using auto"
+    if [ -n "$IMAGE_URI" ]; then FAST_BOOT=true; fi
+    ;;
+esac
+echo "🔍 Debug: BOOT_MODE=$BOOT_MODE, fast boot: $FAST_BOOT"
+
+phase_begin apt
 apt-get update -y
-apt-get upgrade -y
+if [ "$FAST_BOOT" = true ]; then
+  # The pinned image carries all runtime dependencies; a full upgrade only delays scale-out
+  echo "⏩ Fast boot: skipping apt-get upgrade"
+else
+  apt-get upgrade -y
+fi
 apt-get install -y \
   apt-transport-https \
   ca-certificates \
@@ -30,36 +115,45 @@ apt-get install -y \
   lsb-release \
   git \
   nginx
+phase_end
 
-echo "🐳 Installing Docker..."
-curl -fsSL https://download.docker.com/linux/ubuntu/gpg | gpg --dearmor -o /usr/share/keyrings/docker-archive-keyring.gpg
-echo "deb [arch=$(dpkg --print-architecture) signed-by=/usr/share/keyrings/docker-archive-keyring.gpg] https://download.docker.com/linux/ubuntu $(lsb_release -cs) stable" | tee /etc/apt/sources.list.d/docker.list > /dev/null
-apt-get update -y
-apt-get install -y docker-ce docker-ce-cli containerd.io docker-compose-plugin
+if command -v docker >/dev/null 2>&1; then
+  echo "✅ Docker already installed: $(docker --version)"
+  phase_skip docker_install cached
+else
+  phase_begin docker_install
+  echo "🐳 Installing Docker..."
+  curl -fsSL https://download.docker.com/linux/ubuntu/gpg | gpg --dearmor --yes -o /usr/share/keyrings/docker-archive-keyring.gpg
+  echo "deb [arch=$(dpkg --print-architecture) signed-by=/usr/share/keyrings/docker-archive-keyring.gpg] https://download.docker.com/linux/ubuntu $(lsb_release -cs) stable" | tee /etc/apt/sources.list.d/docker.list > /dev/null
+  apt-get update -y
+  apt-get install -y docker-ce docker-ce-cli containerd.io docker-compose-plugin
+  phase_end
+fi
 systemctl start docker
 systemctl enable docker
 
 # Allow current user to use docker (usually root in startup script)
 usermod -aG docker "$(whoami)" || true
 
-# Install Google Cloud SDK for Artifact Registry authentication
-echo "📦 Installing Google Cloud SDK..."
-echo "deb [signed-by=/usr/share/keyrings/cloud.google.gpg] http://packages.cloud.google.com/apt cloud-sdk main" | tee -a /etc/apt/sources.list.d/google-cloud-sdk.list
-curl -fsSL https://packages.cloud.google.com/apt/doc/apt-key.gpg | gpg --dearmor -o /usr/share/keyrings/cloud.google.gpg
-apt-get update -y
-apt-get install -y google-cloud-sdk
+# Google Cloud SDK for Artifact Registry authentication (GCE Ubuntu images usually ship it)
+if command -v gcloud >/dev/null 2>&1; then
+  echo "✅ Google Cloud SDK already installed"
+  phase_skip sdk_install cached
+else
+  phase_begin sdk_install
+  echo "📦 Installing Google Cloud SDK..."
+  echo "deb [signed-by=/usr/share/keyrings/cloud.google.gpg] http://packages.cloud.google.com/apt cloud-sdk main" | tee /etc/apt/sources.list.d/google-cloud-sdk.list
+  curl -fsSL https://packages.cloud.google.com/apt/doc/apt-key.gpg | gpg --dearmor --yes -o /usr/share/keyrings/cloud.google.gpg
+  apt-get update -y
+  apt-get install -y google-cloud-sdk
+  phase_end
+fi
 
 APP_DIR="/opt/mannequin-segmenter"
 REPO_DIR="${APP_DIR}/repo"
 mkdir -p "$APP_DIR"
 cd "$APP_DIR"
 
-echo "🔐 Reading metadata..."
-MANNEQUIN_ENV_B64="$(metadata_get MANNEQUIN_ENV_B64 "")"
-IMAGE_URI="$(metadata_get IMAGE_URI "")"
-GITHUB_TOKEN="$(metadata_get GITHUB_TOKEN "")"
-GCP_SA_KEY_B64="$(metadata_get GCP_SA_KEY "")"
-
 ENV_PATH="${APP_DIR}/.env"
 if [ -n "$MANNEQUIN_ENV_B64" ]; then
   echo "$MANNEQUIN_ENV_B64" | base64 -d > "$ENV_PATH" || true
@@ -179,64 +273,98 @@ server {
         try_files $uri =404;
         add_header Cache-Control "public, max-age=31536000";
     }
+
+    # Boot phase timings for the readiness tooling
+    location /boot/ {
+        root /var/www;
+        default_type application/json;
+        add_header Cache-Control "no-store";
+    }
 }
 EOF
 
 systemctl enable nginx
 systemctl restart nginx
 
-echo "📦 Cloning mannequin-segmenter repository..."
-echo "🔍 Debug: REPO_DIR=$REPO_DIR"
-echo "🔍 Debug: GITHUB_TOKEN is ${GITHUB_TOKEN:+SET}${GITHUB_TOKEN:-NOT_SET}"
-
-if [ -d "$REPO_DIR" ]; then
-  echo "🧹 Removing existing repository directory"
-  rm -rf "$REPO_DIR"
+echo "🔑 Configuring Docker auth for registry..."
+# Registry authentication when IMAGE_URI is provided (fast boot pull or pushing custom builds)
+if [ -n "$IMAGE_URI" ]; then
+  REGISTRY_HOST="$(echo "$IMAGE_URI" | awk -F/ '{print $1}')"
+  if [[ "$REGISTRY_HOST" == *"gcr.io"* || "$REGISTRY_HOST" == *"pkg.dev"* ]]; then
+    gcloud auth configure-docker "$REGISTRY_HOST" --quiet
+  fi
 fi
 
-mkdir -p "$REPO_DIR"
-cd "$REPO_DIR"
-echo "🔍 Debug: Current directory: $(pwd)"
-
-if [ -n "$GITHUB_TOKEN" ]; then
-  echo "🔑 Using GitHub token for private repository access"
-  echo "🔍 Debug: Attempting git clone with token..."
-  if git clone https://${GITHUB_TOKEN}@github.com/gerzsonredi/mannequin-segmenter-new.git .; then
-    echo "✅ Repository cloned successfully"
-    echo "🔍 Debug: Repository contents:"
-    ls -la
+if [ "$FAST_BOOT" = true ]; then
+  echo "⚡ Fast boot: using pinned image $IMAGE_URI"
+  phase_skip clone fast_boot
+  phase_skip build fast_boot
+  if docker image inspect "$IMAGE_URI" >/dev/null 2>&1; then
+    echo "♻️  Image already present locally"
+    phase_skip pull cached
   else
-    echo "❌ Failed to clone repository with token"
-    exit 1
+    phase_begin pull
+    docker pull "$IMAGE_URI"
+    phase_end
   fi
+  RUN_IMAGE="$IMAGE_URI"
 else
-  echo "⚠️  No GitHub token found, attempting public clone"
-  echo "🔍 Debug: Attempting public git clone..."
-  if git clone https://github.com/gerzsonredi/mannequin-segmenter-new.git .; then
-    echo "✅ Repository cloned successfully (public)"
-    echo "🔍 Debug: Repository contents:"
-    ls -la
+  echo "📦 Building mannequin-segmenter from source..."
+  echo "🔍 Debug: REPO_DIR=$REPO_DIR"
+  echo "🔍 Debug: GITHUB_TOKEN is ${GITHUB_TOKEN:+SET}${GITHUB_TOKEN:-NOT_SET}"
+  if [ -n "$GITHUB_TOKEN" ]; then
+    echo "🔑 Using GitHub token for private repository access"
+    REPO_URL="https://${GITHUB_TOKEN}@github.com/gerzsonredi/mannequin-segmenter-new.git"
   else
-    echo "❌ Failed to clone repository (public access)"
-    exit 1
+    echo "⚠️  No GitHub token found, attempting public clone"
+    REPO_URL="https://github.com/gerzsonredi/mannequin-segmenter-new.git"
   fi
-fi
 
-if [ ! -f "Dockerfile" ]; then
-  echo "❌ Dockerfile not found in repository"
-  echo "🔍 Debug: Current directory contents:"
-  ls -la
-  exit 1
-else
-  echo "✅ Dockerfile found in repository"
-fi
-
-echo "🔑 Configuring Docker auth for registry..."
-# Configure registry authentication if IMAGE_URI is provided (for pushing custom builds)
-if [ -n "$IMAGE_URI" ]; then
-  REGISTRY_HOST="$(echo "$IMAGE_URI" | awk -F/ '{print $1}')"
-  if [[ "$REGISTRY_HOST" == *"gcr.io"* || "$REGISTRY_HOST" == *"pkg.dev"* ]]; then
-    gcloud auth configure-docker "$REGISTRY_HOST" --quiet
+  phase_begin clone
+  # Images are tagged with their source commit: an unchanged commit needs neither clone nor build
+  REMOTE_COMMIT="$(git ls-remote "$REPO_URL" HEAD 2>/dev/null | cut -f1 || true)"
+  echo "🔍 Debug: remote HEAD commit: ${REMOTE_COMMIT:-unknown}"
+  if [ -n "$REMOTE_COMMIT" ] && docker image inspect "mannequin-segmenter:${REMOTE_COMMIT}" >/dev/null 2>&1; then
+    echo "♻️  Cached image mannequin-segmenter:${REMOTE_COMMIT} matches the source commit, skipping clone and build"
+    phase_end cached
+    phase_skip build cached
+    RUN_IMAGE="mannequin-segmenter:${REMOTE_COMMIT}"
+  else
+    if [ -d "$REPO_DIR" ]; then
+      echo "🧹 Removing existing repository directory"
+      rm -rf "$REPO_DIR"
+    fi
+
+    mkdir -p "$REPO_DIR"
+    cd "$REPO_DIR"
+    echo "🔍 Debug: Current directory: $(pwd)"
+
+    if git clone --depth 1 "$REPO_URL" .; then
+      echo "✅ Repository cloned successfully"
+      echo "🔍 Debug: Repository contents:"
+      ls -la
+    else
+      echo "❌ Failed to clone repository"
+      phase_end failed
+      exit 1
+    fi
+    phase_end
+
+    if [ ! -f "Dockerfile" ]; then
+      echo "❌ Dockerfile not found in repository"
+      echo "🔍 Debug: Current directory contents:"
+      ls -la
+      exit 1
+    else
+      echo "✅ Dockerfile found in repository"
+    fi
+
+    COMMIT="$(git rev-parse HEAD)"
+    phase_begin build
+    echo "🏗️  Building Docker image from source (commit $COMMIT)..."
+    docker build -t mannequin-segmenter:local -t "mannequin-segmenter:${COMMIT}" -f Dockerfile .
+    phase_end
+    RUN_IMAGE="mannequin-segmenter:${COMMIT}"
   fi
 fi
 
@@ -245,10 +373,8 @@ if docker ps -a --format '{{.Names}}' | grep -q '^mannequin-segmenter$'; then
   docker rm -f mannequin-segmenter || true
 fi
 
-echo "🏗️  Building Docker image from source..."
-docker build -t mannequin-segmenter:local -f Dockerfile .
-
-echo "▶️  Starting mannequin-segmenter container on port 5001"
+phase_begin run
+echo "▶️  Starting mannequin-segmenter container ($RUN_IMAGE) on port 5001"
 docker run -d \
   --name mannequin-segmenter \
   --restart unless-stopped \
@@ -256,9 +382,12 @@ docker run -d \
   -e PORT=5001 \
   -v "$RESULTS_DIR_VAL":"$RESULTS_DIR_VAL":rw \
   -p 5001:5001 \
-  mannequin-segmenter:local
+  "$RUN_IMAGE"
+phase_end
+record_phase total ok "$SCRIPT_START" "$(date +%s.%N)"
 
 echo "✅ Setup complete. Service is listening on port 5001."
 echo "ℹ️  Logs: docker logs -f mannequin-segmenter"
+echo "ℹ️  Boot timings: $BOOT_TIMINGS_FILE (http://<external-ip>/boot/timings.jsonl)"
 
 
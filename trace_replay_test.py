@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Trace Replay Test Script for Mannequin Segmenter API
+Éles forgalomból rögzített, időbélyeges kérés napló visszajátszása a VM-ekre az eredeti
+ütemben (vagy gyorsítva): löketek, ismétlődő képek és a valós prompt_mode keverék.
+A napló soronként, lustán olvasódik - tetszőleges méretű lehet.
+
+Napló formátum (JSONL vagy CSV fejléccel):
+    {"arrival_time": "2025-11-03T10:15:02.120Z", "image_url": "https://...b.jpg", "prompt_mode": "both"}
+    arrival_time / timestamp / time / offset: ISO időbélyeg, epoch vagy relatív másodperc
+"""
+
+import asyncio
+
+from loadgen import (
+    ConnectionPool,
+    DynamicFleet,
+    LatencyHistogram,
+    Lane,
+    LiveDashboard,
+    LoadEngine,
+    ReadinessGate,
+    ReplayPacing,
+    ResultColumns,
+    TraceWorkload,
+    format_percentiles,
+    iter_trace,
+    make_discovery,
+    make_instances,
+    make_sink,
+    make_targets,
+    pacing_mode,
+    print_connection_statistics,
+    print_fleet_changes,
+    print_open_loop_latency,
+    print_phase_breakdown,
+    print_readiness_report,
+    print_summary_statistics,
+    record_run,
+)
+
+# ========== KONFIGURÁCIÓS PARAMÉTEREK ==========
+TRACE_FILE = "production_trace.jsonl"  # Kérés napló: JSONL / CSV (image_url, prompt_mode, érkezési idő)
+REPLAY_SPEED = 1.0          # 1 = valós idő, 2 = kétszeres tempó, 0.5 = fele
+MAX_REPLAY_SECONDS = None   # Visszajátszás időkorlátja (None = a napló végéig)
+MAX_TRACE_REQUESTS = None   # Legfeljebb ennyi kérés a naplóból (None = mind)
+DEFAULT_PROMPT_MODE = "both"  # Ha a naplóban nincs prompt_mode
+REQUEST_TIMEOUT = 60        # Timeout másodpercben
+ROUTING_POLICY = "least_outstanding"  # round_robin / least_outstanding / peak_ewma / power_of_two / weighted_round_robin
+MAX_OUTSTANDING = 1000      # Max nyitott kérés (felette eldobjuk, mint a nyílt hurkú módban)
+PREWARM_CONNECTIONS_PER_INSTANCE = 2  # Előre megnyitott kapcsolatok VM-enként (0 = nincs)
+RESULTS_FILE = None         # Kérésenkénti eredmények fájlba: "results.jsonl" / ".csv" / ".parquet"
+RESULTS_DB = "benchmark_results.db"  # Futás mentése (összevetés: benchmark_results.py compare); None = nincs mentés
+DASHBOARD_INTERVAL = 5      # Élő státusz sor frissítése másodpercben
+READINESS_GATE = True       # Indulás előtt warm-up /infer minden VM-re; csak a kész VM-ek kapnak terhelést
+READY_LATENCY_THRESHOLD = 10  # Kész, ha a warm-up /infer ennyi másodpercen belül sikeres
+READY_TIMEOUT = 300         # Legfeljebb eddig várunk a VM-ekre (s)
+
+# Instance discovery (None = a lenti VM_INSTANCES lista). "fleet": provision_fleet.py fleet fájl,
+# "registry": deploy-gcp.sh registry fájl, "gcloud": gcloud compute instances list JSON dump
+DISCOVERY_SOURCE = None
+DISCOVERY_PATH = "fleet-instances.json"  # A forrás fájlja (gcloud: None = élő lekérés a gcloud CLI-vel)
+DISCOVERY_REFRESH_SECONDS = 30  # Tagság újraolvasása futás közben: új VM be, eltűnt VM drain (None = csak induláskor)
+
+# VM Instance IP címek
+VM_INSTANCES = [
+    "http://35.233.66.133:5001",
+    "http://34.34.136.96:5001",
+    "http://192.158.29.6:5001",
+    "http://35.187.98.56:5001"
+]
+
+# API endpoint
+API_ENDPOINT = "/infer"
+
+# ===============================================
+
+def print_fleet_event(event, subject):
+    if event == "join":
+        print(f"\n➕ Új VM a visszajátszásban: {subject.url}")
+    elif event == "drain":
+        print(f"\n➖ VM kivonva (drain, {subject.in_flight} kérés még fut): {subject.url}")
+    elif event == "readiness":
+        print_readiness_report(subject)
+    elif event == "error":
+        print(f"\n⚠️  Discovery: {subject}")
+
+class TraceReplayTest:
+    def __init__(self, vm_instances=None, fleet=None):
+        self.fleet = fleet
+        if fleet is not None:
+            # Élő tagság: a policy és az engine a fleet aktív listáját látja, a frissítés helyben módosítja
+            self.instances = fleet.instances
+        else:
+            self.instances = make_instances(VM_INSTANCES if vm_instances is None else vm_instances)
+        self.workload = TraceWorkload(TRACE_FILE, DEFAULT_PROMPT_MODE, limit=MAX_TRACE_REQUESTS)
+        # Egy sáv elég: nyílt hurokban minden érkezés külön task, a routing policy osztja szét
+        lanes = [Lane(1, self.workload, make_targets(ROUTING_POLICY, self.instances))]
+        self.engine = LoadEngine(
+            self.instances,
+            lanes,
+            ReplayPacing(self.workload, REPLAY_SPEED, duration=MAX_REPLAY_SECONDS, max_outstanding=MAX_OUTSTANDING),
+            api_endpoint=API_ENDPOINT,
+            request_timeout=REQUEST_TIMEOUT,
+            on_complete=self.record_mode,
+            keep_results=False,
+            sink=make_sink(RESULTS_FILE),
+            columns=ResultColumns(),
+            connections=ConnectionPool(hosts=len(self.instances), prewarm=PREWARM_CONNECTIONS_PER_INSTANCE),
+        )
+        self.columns = self.engine.columns
+        # prompt_mode -> sikeres kérések válaszidő hisztogramja
+        self.by_prompt_mode = {}
+
+    def record_mode(self, result):
+        if result["success"]:
+            mode = result.get("prompt_mode")
+            if mode not in self.by_prompt_mode:
+                self.by_prompt_mode[mode] = LatencyHistogram()
+            self.by_prompt_mode[mode].record(result["response_time"])
+
+    async def run_test(self):
+        """Fő teszt futtatás"""
+        print(f"🚀 Trace Replay Teszt Indítás")
+        print(f"📊 Konfiguráció:")
+        print(f"   - Napló: {TRACE_FILE}")
+        print(f"   - Tempó: {REPLAY_SPEED:g}x")
+        if MAX_REPLAY_SECONDS:
+            print(f"   - Időkorlát: {MAX_REPLAY_SECONDS} másodperc")
+        if MAX_TRACE_REQUESTS:
+            print(f"   - Max kérés: {MAX_TRACE_REQUESTS}")
+        print(f"   - VM instance-ok: {len(self.instances)}")
+        if self.fleet is not None:
+            print(f"   - Discovery: {self.fleet.source.describe()}, frissítés {DISCOVERY_REFRESH_SECONDS}s")
+        print(f"   - Routing policy: {ROUTING_POLICY}")
+        print(f"   - Request timeout: {REQUEST_TIMEOUT}s")
+        print()
+
+        for i, instance in enumerate(self.instances):
+            print(f"   VM {i+1}: {instance.url}")
+        print()
+
+        dashboard = LiveDashboard(self.engine, DASHBOARD_INTERVAL)
+        monitors = [dashboard.run()]
+        if self.fleet is not None:
+            monitors.append(self.fleet.watch(self.engine))
+        await asyncio.gather(self.engine.run(), *monitors)
+
+        print(f"\n⏱️  Visszajátszás befejezve!")
+        self.print_statistics()
+        if RESULTS_DB:
+            mode = f"{pacing_mode(self.engine.pacing)}, {ROUTING_POLICY}"
+            record_run(RESULTS_DB, self.engine, "trace_replay_test", mode=mode, notes=TRACE_FILE)
+
+    def print_statistics(self):
+        """Statisztikák kiírása"""
+        frame = self.columns.frame()
+        successful = frame.successful()
+        total_requests = len(frame)
+        duration = self.engine.end_time - self.engine.start_time
+
+        print(f"\n📈 TRACE REPLAY EREDMÉNYEK")
+        print(f"=" * 60)
+        print(f"⏱️  Futási idő: {duration:.1f} másodperc")
+        print(f"📊 Visszajátszott kérések: {total_requests}")
+        print(f"✅ Sikeres kérések: {len(successful)}")
+        print(f"❌ Sikertelen kérések: {total_requests - len(successful)}")
+        if total_requests > 0:
+            print(f"📈 Sikeresség arány: {len(successful)/total_requests*100:.1f}%")
+
+        # A napló jellemzői: ismétlődő képek és prompt_mode keverék
+        issued = self.workload.issued
+        if issued:
+            print(f"\n🎞️  NAPLÓ KEVERÉK")
+            span = self.workload.last_offset
+            if span > 0:
+                print(f"   🔹 Napló időtartam: {span:.1f}s, átlag {issued / span:.2f} kérés/s (1x tempónál)")
+            repeated = self.workload.repeated
+            if repeated is not None:
+                print(f"   🔹 Ismétlődő képek (becslés): ~{repeated} ({repeated / issued * 100:.1f}%)")
+            for mode, count in sorted(self.workload.prompt_modes.items(), key=lambda item: -item[1]):
+                print(f"   🔹 prompt_mode={mode}: {count} ({count / issued * 100:.1f}%)")
+
+        if len(successful):
+            print(f"\n⏰ VÁLASZIDŐ STATISZTIKÁK (sikeres kérések)")
+            print_summary_statistics(successful.summary(), stdev=False)
+
+            print(f"\n🧾 PROMPT_MODE SZERINT")
+            for mode, histogram in sorted(self.by_prompt_mode.items(), key=lambda item: -item[1].count):
+                print(f"   🔹 {mode}: {histogram.count} kérés, átlag {histogram.mean():.3f}s, {format_percentiles(histogram)}")
+
+            print_phase_breakdown(self.engine.recorder)
+            # Tervezett (napló szerinti) indulástól mért késleltetés: a sorban állással együtt
+            print_open_loop_latency(self.engine.recorder)
+            print_connection_statistics(self.engine.recorder, self.engine.connections)
+
+            by_instance = successful.by_instance()
+            print(f"\n🖥️  INSTANCE-ONKÉNTI TELJESÍTMÉNY")
+            instances = self.fleet.all_instances() if self.fleet is not None else self.instances
+            for i, instance in enumerate(instances):
+                summary = by_instance.get(instance.instance_id)
+                if summary:
+                    print(f"   VM {i+1} ({instance.url}): {summary.count} kérés, átlag {summary.mean:.3f}s, "
+                          f"p99 {summary.quantiles[99]:.3f}s")
+                else:
+                    print(f"   VM {i+1} ({instance.url}): Nincs sikeres kérés")
+
+            throughput = successful.throughput()
+            if throughput:
+                print(f"\n🚀 THROUGHPUT")
+                print(f"   🔹 Sikeres kérések/másodperc: {throughput:.2f}")
+                print(f"   🔹 Átlagos instance terhelés: {throughput/len(self.instances):.2f} kérés/sec/instance")
+
+        if self.fleet is not None:
+            print_fleet_changes(self.fleet)
+
+        error_types = self.engine.recorder.errors_by_type()
+        if error_types:
+            print(f"\n❌ HIBÁK RÉSZLETEZÉSE")
+            for error_type, count in error_types.items():
+                print(f"   🔹 {error_type}: {count} alkalom")
+
+async def main():
+    """Fő program belépési pont"""
+    gate = None
+    if READINESS_GATE:
+        # Warm-up kép: a napló első kérése
+        first = next(iter_trace(TRACE_FILE, DEFAULT_PROMPT_MODE), None)
+        if first is None:
+            print(f"❌ Üres vagy hibás napló: {TRACE_FILE}")
+            return
+        gate = ReadinessGate(
+            first[1]["image_url"],
+            first[1]["prompt_mode"],
+            API_ENDPOINT,
+            latency_threshold=READY_LATENCY_THRESHOLD,
+            timeout=READY_TIMEOUT,
+        )
+    if DISCOVERY_SOURCE:
+        # Az új VM-ek a readiness gate-en át kerülnek be (induláskor és frissítéskor is)
+        fleet = DynamicFleet(
+            make_discovery(DISCOVERY_SOURCE, path=DISCOVERY_PATH),
+            refresh_interval=DISCOVERY_REFRESH_SECONDS,
+            gate=gate,
+            on_event=print_fleet_event,
+        )
+        try:
+            instances = await fleet.load()
+        except RuntimeError as e:
+            print(f"❌ Discovery hiba: {e}")
+            return
+        if not instances:
+            print(f"❌ Nincs kész VM a discovery forrásban ({fleet.source.describe()}), a visszajátszás nem indul")
+            return
+        tester = TraceReplayTest(fleet=fleet)
+        await tester.run_test()
+        return
+    vm_instances = VM_INSTANCES
+    if gate is not None:
+        report = await gate.wait(VM_INSTANCES)
+        print_readiness_report(report)
+        vm_instances = report.ready_urls()
+        if not vm_instances:
+            print("❌ Egyik VM sem lett kész, a visszajátszás nem indul")
+            return
+    tester = TraceReplayTest(vm_instances)
+    await tester.run_test()
+
+if __name__ == "__main__":
+    print("🔧 Mannequin Segmenter Trace Replay Test")
+    print("=" * 50)
+    asyncio.run(main())